@@ -14,18 +14,36 @@ their replay semantics are proven.
 """
 
 import argparse
+import array
+import atexit
+import bisect
+import difflib
+import hashlib
+import http.client
 import json
+import mmap
+import os
+import pickle
 import re
 import signal
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
 import time as time_mod
 import xml.etree.ElementTree as ET
+import zlib
 from abc import ABC, abstractmethod
-from collections.abc import Callable
-from dataclasses import dataclass
-from datetime import datetime, time, timezone
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from itertools import compress
 from pathlib import Path
+from urllib.parse import quote, urlencode, urlsplit
 
 
 __version__ = "0.1.0"
@@ -35,6 +53,7 @@ QUERY_ARGS_FILE_NAME = "queryArgs.json"
 
 COMMAND_TIMEOUT_SECONDS = 30
 DEFAULT_MAX_RUNTIME_SECONDS = 3600
+DEFAULT_JOBS = 1
 MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB hard limit for single-file VCS output
 
 _VALID_URL_SCHEMES = re.compile(r"^(https?://|svn://|svn\+ssh://|file://|/)", re.IGNORECASE)
@@ -75,6 +94,59 @@ class BlameLine:
 class IndexedFileDetail:
     line_locations: dict[int, int]
     line_ranges: list[tuple[int, int, int]]
+    # WHY: protocol ranges never overlap, so ranges sorted by start are also
+    # sorted by end and one bisect finds the only range that can hold a line.
+    sorted_line_ranges: list[tuple[int, int, int]] = field(init=False, repr=False, compare=False)
+    range_starts: list[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.sorted_line_ranges = sorted(self.line_ranges)
+        self.range_starts = [range_start for range_start, _range_end, _ratio in self.sorted_line_ranges]
+
+    def __getstate__(self) -> tuple[dict[int, int], list[tuple[int, int, int]]]:
+        # WHY: pickled indexes cross process and cache boundaries; the sorted
+        # views are derived, so only the protocol data is shipped.
+        return self.line_locations, self.line_ranges
+
+    def __setstate__(self, state: tuple[dict[int, int], list[tuple[int, int, int]]]) -> None:
+        self.line_locations, self.line_ranges = state
+        self.__post_init__()
+
+    def range_ratio(self, line_number: int) -> int:
+        range_index = bisect.bisect_right(self.range_starts, line_number) - 1
+        if range_index >= 0:
+            _range_start, range_end, ratio = self.sorted_line_ranges[range_index]
+            if line_number <= range_end:
+                return ratio
+        return 0
+
+
+class ProtocolLineCoverage:
+    """Sorted lineLocation and lineRange coverage of one DETAIL entry, for logarithmic overlap checks."""
+
+    def __init__(self) -> None:
+        self.exact_lines: list[int] = []
+        self.range_starts: list[int] = []
+        self.range_ends: list[int] = []
+
+    def range_covers(self, line_number: int) -> bool:
+        range_index = bisect.bisect_right(self.range_starts, line_number) - 1
+        return range_index >= 0 and line_number <= self.range_ends[range_index]
+
+    def overlaps(self, range_start: int, range_end: int) -> bool:
+        exact_index = bisect.bisect_left(self.exact_lines, range_start)
+        if exact_index < len(self.exact_lines) and self.exact_lines[exact_index] <= range_end:
+            return True
+        range_index = bisect.bisect_right(self.range_starts, range_end) - 1
+        return range_index >= 0 and self.range_ends[range_index] >= range_start
+
+    def add_line(self, line_number: int) -> None:
+        bisect.insort(self.exact_lines, line_number)
+
+    def add_range(self, range_start: int, range_end: int) -> None:
+        range_index = bisect.bisect_left(self.range_starts, range_start)
+        self.range_starts.insert(range_index, range_start)
+        self.range_ends.insert(range_index, range_end)
 
 
 @dataclass
@@ -85,13 +157,94 @@ class CommitDiffLine:
     new_line_number: int | None
 
 
+COMMIT_DIFF_LINE_KINDS = ("context", "delete", "add")
+_COMMIT_DIFF_LINE_KIND_CODES = {kind: code for code, kind in enumerate(COMMIT_DIFF_LINE_KINDS)}
+
+
+class CompactHunkLines(Sequence):
+    """Hunk lines kept as kind codes and end offsets into one text of this hunk's contents; each CommitDiffLine is built when read.
+
+    old_line_offsets and new_line_offsets count the old and new lines before
+    each line, so any line is read in constant time.
+    """
+
+    __slots__ = ("text", "old_start", "new_start", "kinds", "ends", "old_line_offsets", "new_line_offsets", "_pieces", "_counts")
+
+    def __init__(self, old_start: int, new_start: int):
+        self.text = ""
+        self.old_start = old_start
+        self.new_start = new_start
+        self.kinds = bytearray()
+        self.ends = array.array("I")
+        self.old_line_offsets = array.array("I")
+        self.new_line_offsets = array.array("I")
+        self._pieces: list[str] = []
+        self._counts = (0, 0, 0)
+
+    def append_line(self, kind: str, content: str) -> None:
+        code = _COMMIT_DIFF_LINE_KIND_CODES[kind]
+        old_line_count, new_line_count, text_length = self._counts
+        self.kinds.append(code)
+        self.old_line_offsets.append(old_line_count)
+        self.new_line_offsets.append(new_line_count)
+        text_length += len(content)
+        self.ends.append(text_length)
+        self._pieces.append(content)
+        self._counts = (old_line_count + (code != 2), new_line_count + (code != 1), text_length)
+
+    def finish(self) -> None:
+        """Join the contents appended so far into text; the parser calls this when the hunk ends."""
+        if self._pieces:
+            self.text += "".join(self._pieces)
+            self._pieces = []
+
+    def count_kind(self, kind: str) -> int:
+        return self.kinds.count(_COMMIT_DIFF_LINE_KIND_CODES[kind])
+
+    def _line(self, index: int) -> CommitDiffLine:
+        self.finish()
+        kind = COMMIT_DIFF_LINE_KINDS[self.kinds[index]]
+        content = self.text[self.ends[index - 1] if index else 0 : self.ends[index]]
+        old_line_number = self.old_start + self.old_line_offsets[index]
+        new_line_number = self.new_start + self.new_line_offsets[index]
+        if kind == "add":
+            return CommitDiffLine(kind=kind, content=sys.intern(content), old_line_number=None, new_line_number=new_line_number)
+        if kind == "delete":
+            return CommitDiffLine(kind=kind, content=content, old_line_number=old_line_number, new_line_number=None)
+        return CommitDiffLine(kind=kind, content=content, old_line_number=old_line_number, new_line_number=new_line_number)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[CommitDiffLine]:
+        for index in range(len(self.kinds)):
+            yield self._line(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(position) for position in range(*index.indices(len(self.kinds)))]
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("hunk line index out of range")
+        return self._line(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"CompactHunkLines({list(self)!r})"
+
+
 @dataclass
 class CommitDiffHunk:
     old_start: int
     old_length: int
     new_start: int
     new_length: int
-    lines: list[CommitDiffLine]
+    lines: Sequence[CommitDiffLine]
 
 
 @dataclass
@@ -115,13 +268,157 @@ class RevisionCommitDiff:
     final_file_lines_by_new_path: dict[str, list[str]] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LineState:
+    """One replayed line, as read from LineStateColumns. Contents are interned, so repeated lines share one string."""
+
     content: str
     origin_revision_id: str | None
     gen_ratio: int = 0
 
 
+class RevisionIdTable:
+    """Small-integer index for each origin revision id; index 0 stands for no origin."""
+
+    def __init__(self) -> None:
+        self.revision_ids: list[str | None] = [None]
+        self._indexes: dict[str | None, int] = {None: 0}
+
+    def index(self, revision_id: str | None) -> int:
+        index = self._indexes.get(revision_id)
+        if index is None:
+            index = self._indexes[revision_id] = len(self.revision_ids)
+            self.revision_ids.append(revision_id)
+        return index
+
+    def __getitem__(self, index: int) -> str | None:
+        return self.revision_ids[index]
+
+    def __len__(self) -> int:
+        return len(self.revision_ids)
+
+
+# WHY: one table per process, so columns of different files and snapshots
+# can be spliced together without remapping their origin indexes.
+REVISION_ID_TABLE = RevisionIdTable()
+
+
+class LineStateColumns(Sequence):
+    """Replayed lines of one file as parallel columns; each LineState is built when read.
+
+    contents holds the interned line strings, origins their index in
+    REVISION_ID_TABLE and gen_ratios one byte per line.
+    """
+
+    __slots__ = ("contents", "origins", "gen_ratios")
+
+    def __init__(self) -> None:
+        self.contents: list[str] = []
+        self.origins = array.array("I")
+        self.gen_ratios = array.array("B")
+
+    @classmethod
+    def from_line_states(cls, line_states: Iterable[LineState]) -> "LineStateColumns":
+        if isinstance(line_states, LineStateColumns):
+            return line_states
+        columns = cls()
+        for line_state in line_states:
+            columns.append(line_state.content, REVISION_ID_TABLE.index(line_state.origin_revision_id), line_state.gen_ratio)
+        return columns
+
+    def append(self, content: str, origin: int, gen_ratio: int) -> None:
+        self.contents.append(content)
+        self.origins.append(origin)
+        self.gen_ratios.append(gen_ratio)
+
+    def append_from(self, other: "LineStateColumns", index: int) -> None:
+        self.contents.append(other.contents[index])
+        self.origins.append(other.origins[index])
+        self.gen_ratios.append(other.gen_ratios[index])
+
+    def extend_from(self, other: "LineStateColumns", start: int, stop: int) -> None:
+        self.contents.extend(other.contents[start:stop])
+        self.origins.extend(other.origins[start:stop])
+        self.gen_ratios.extend(other.gen_ratios[start:stop])
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = LineStateColumns()
+            columns.contents = self.contents[index]
+            columns.origins = self.origins[index]
+            columns.gen_ratios = self.gen_ratios[index]
+            return columns
+        return LineState(self.contents[index], REVISION_ID_TABLE[self.origins[index]], self.gen_ratios[index])
+
+    def __iter__(self) -> Iterator[LineState]:
+        revision_ids = REVISION_ID_TABLE.revision_ids
+        for content, origin, gen_ratio in zip(self.contents, self.origins, self.gen_ratios):
+            yield LineState(content, revision_ids[origin], gen_ratio)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"LineStateColumns({list(self)!r})"
+
+    def __reduce__(self):
+        # WHY: worker processes have their own REVISION_ID_TABLE, so origins
+        # travel as indexes into the revision ids this file actually uses.
+        used_origins = sorted(set(self.origins))
+        local_indexes = {origin: local_index for local_index, origin in enumerate(used_origins)}
+        return (
+            _rebuild_line_state_columns,
+            (
+                self.contents,
+                [REVISION_ID_TABLE[origin] for origin in used_origins],
+                array.array("I", [local_indexes[origin] for origin in self.origins]),
+                self.gen_ratios,
+            ),
+        )
+
+
+def _rebuild_line_state_columns(
+    contents: list[str],
+    revision_ids: list[str | None],
+    local_origins: array.array,
+    gen_ratios: array.array,
+) -> LineStateColumns:
+    origins_by_local_index = [REVISION_ID_TABLE.index(revision_id) for revision_id in revision_ids]
+    columns = LineStateColumns()
+    columns.contents = [sys.intern(content) for content in contents]
+    columns.origins = array.array("I", [origins_by_local_index[local_index] for local_index in local_origins])
+    columns.gen_ratios = gen_ratios
+    return columns
+
+
+class RevisionMetadataCache:
+    """Commit time, parents and author for every revision reachable from an end revision."""
+
+    def __init__(self) -> None:
+        self.commit_times: dict[str, datetime] = {}
+        self.parent_revision_ids: dict[str, list[str]] = {}
+        self.authors: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.commit_times)
+
+    def add(self, revision_id: str, commit_time: datetime, parent_revision_ids: list[str], author: str) -> None:
+        self.commit_times[revision_id] = commit_time
+        self.parent_revision_ids[revision_id] = parent_revision_ids
+        self.authors[revision_id] = author
+
+    def first_parent_revisions(self) -> dict[str, str | None]:
+        return {
+            revision_id: parent_revision_ids[0] if parent_revision_ids else None
+            for revision_id, parent_revision_ids in self.parent_revision_ids.items()
+        }
+
+
 class AggregateGenCodeDescError(RuntimeError):
     pass
 
@@ -158,31 +455,64 @@ class RuntimeLogger:
         self._level_num = self._LEVELS.get(level, 0)
         self._warnings: list[str] = []
         self._warning_keys: set[str] = set()
+        self._capture = threading.local()
+
+    def _captured(self, method: str, *args: str) -> bool:
+        records = getattr(self._capture, "records", None)
+        if records is None:
+            return False
+        records.append((method, args))
+        return True
+
+    @contextmanager
+    def capture(self) -> Iterator[list[tuple[str, tuple[str, ...]]]]:
+        """Buffer this thread's log calls so a worker's output can be replayed in serial order."""
+        records: list[tuple[str, tuple[str, ...]]] = []
+        self._capture.records = records
+        try:
+            yield records
+        finally:
+            self._capture.records = None
+
+    def replay(self, records: list[tuple[str, tuple[str, ...]]]) -> None:
+        for method, args in records:
+            getattr(self, method)(*args)
 
     def _emit(self, severity: str, message: str) -> None:
         ts = datetime.now(tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
         print(f"{ts} [{severity}] [agg] {message}", file=sys.stderr)
 
     def error(self, message: str) -> None:
+        if self._captured("error", message):
+            return
         self._emit("ERROR", message)
 
     def warn(self, message: str) -> None:
+        if self._captured("warn", message):
+            return
         self._warnings.append(message)
         if self._level_num >= 1:
             self._emit("WARN", message)
 
     def warn_once(self, key: str, message: str) -> None:
+        # WHY: the dedupe key is checked at replay time, so the first warning
+        # kept is the one the serial run would have kept.
+        if self._captured("warn_once", key, message):
+            return
         if key in self._warning_keys:
             return
         self._warning_keys.add(key)
         self.warn(message)
 
+    def info_enabled(self) -> bool:
+        return self._level_num >= 1
+
     def info(self, message: str) -> None:
-        if self._level_num >= 1:
+        if self._level_num >= 1 and not self._captured("info", message):
             self._emit("INFO", message)
 
     def debug(self, message: str) -> None:
-        if self._level_num >= 2:
+        if self._level_num >= 2 and not self._captured("debug", message):
             self._emit("DEBUG", message)
 
     def warnings(self) -> list[str]:
@@ -194,6 +524,14 @@ class GenCodeDescProvider(ABC):
     def get_revision_metadata(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict:
         raise NotImplementedError
 
+    def prefetch_revision_metadata(self, repo_url: str, repo_branch: str, revision_ids: Iterable[str], vcs_type: str) -> None:
+        """Warm the provider for revisions that will be requested next. Only batching providers override this."""
+        return None
+
+    def revision_metadata_path(self, revision_id: str) -> Path | None:
+        """Local file holding the revision's record, if any. File-backed providers override this so it can be indexed out of process."""
+        return None
+
 
 class CommitDiffProvider(ABC):
     @abstractmethod
@@ -229,28 +567,159 @@ class EmptyCommitDiffProvider(CommitDiffProvider):
         return None
 
 
+def validate_revision_metadata_identity(
+    protocol: dict,
+    repo_url: str,
+    repo_branch: str,
+    revision_id: str,
+    vcs_type: str,
+    logger: RuntimeLogger,
+) -> None:
+    repository = protocol.get("REPOSITORY", {})
+    # WHY: genCodeDesc is external metadata, not repository content. We
+    # validate identity fields here so the analyzer cannot silently join a
+    # real repository revision with the wrong external record.
+    protocol_vcs_type = repository.get("vcsType")
+    if protocol_vcs_type and protocol_vcs_type != vcs_type:
+        raise ProtocolValidationError(
+            f"Metadata vcsType mismatch for revision {revision_id}: expected {vcs_type}, got {protocol_vcs_type}"
+        )
+
+    protocol_repo_url = repository.get("repoURL")
+    if repo_url and protocol_repo_url and protocol_repo_url != repo_url:
+        raise ProtocolValidationError(
+            f"Metadata repoURL mismatch for revision {revision_id}: expected {repo_url}, got {protocol_repo_url}"
+        )
+
+    protocol_repo_branch = repository.get("repoBranch")
+    # WHY: repoBranch describes where that metadata record was produced, but
+    # merged revisions can legitimately originate from a different branch
+    # than the query branch while still being part of the end revision's
+    # reachable history. Branch equality is therefore not a stable
+    # revision-identity check for revision-scoped metadata.
+    if protocol_repo_branch and protocol_repo_branch != repo_branch:
+        logger.debug(
+            f"Metadata repoBranch differs for revision {revision_id}: query={repo_branch} metadata={protocol_repo_branch}; accepting revision-scoped metadata"
+        )
+
+    protocol_revision_id = repository.get("revisionId")
+    if protocol_revision_id and protocol_revision_id != revision_id:
+        raise ProtocolValidationError(
+            f"Metadata revisionId mismatch for revision {revision_id}: expected {revision_id}, got {protocol_revision_id}"
+        )
+
+
+GEN_CODE_DESC_INDEX_FORMAT_VERSION = 1
+
+
 class GenCodeDescSetDirProvider(GenCodeDescProvider):
-    def __init__(self, base_dir: Path, fail_on_missing: bool, warn_on_missing: bool = False, logger: RuntimeLogger | None = None):
+    def __init__(
+        self,
+        base_dir: Path,
+        fail_on_missing: bool,
+        warn_on_missing: bool = False,
+        logger: RuntimeLogger | None = None,
+        index_path: Path | None = None,
+    ):
         self.base_dir = base_dir
         self.fail_on_missing = fail_on_missing
         self.warn_on_missing = warn_on_missing
         self.logger = RuntimeLogger("quiet") if logger is None else logger
+        self.index_path = index_path
+        self._protocol_file_names: set[str] | None = None
+        self._protocol_paths_by_revision_id: dict[str, Path] = {}
+        self._index_lock = threading.Lock()
 
-    def _find_protocol_path(self, revision_id: str) -> Path | None:
-        direct_path = self.base_dir / f"{revision_id}_genCodeDesc.json"
-        if direct_path.exists():
-            return direct_path
+    def _read_index_file(self) -> dict[str, list]:
+        if self.index_path is None:
+            return {}
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(index, dict)
+            or index.get("version") != GEN_CODE_DESC_INDEX_FORMAT_VERSION
+            or index.get("baseDir") != str(self.base_dir.resolve())
+            or not isinstance(index.get("files"), dict)
+        ):
+            return {}
+        return index["files"]
+
+    def _write_index_file(self, entries: dict[str, list]) -> None:
+        index = {
+            "version": GEN_CODE_DESC_INDEX_FORMAT_VERSION,
+            "baseDir": str(self.base_dir.resolve()),
+            "files": entries,
+        }
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp_path.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+            os.replace(temp_path, self.index_path)
+        except OSError as exc:
+            self.logger.debug(f"Could not write genCodeDesc index {self.index_path}: {exc}")
+
+    def _build_revision_index(self) -> None:
+        cached_entries = self._read_index_file()
+        entries: dict[str, list] = {}
+        parsed_count = 0
+        try:
+            dir_entries = sorted(
+                (entry for entry in os.scandir(self.base_dir) if entry.name.endswith("_genCodeDesc.json")),
+                key=lambda entry: entry.name,
+            )
+        except OSError:
+            dir_entries = []
 
-        for candidate_path in sorted(self.base_dir.glob("*_genCodeDesc.json")):
+        for dir_entry in dir_entries:
             try:
-                candidate_protocol = load_json_document(candidate_path.read_text(encoding="utf-8"))
-            except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+                stat = dir_entry.stat()
+            except OSError:
                 continue
-            candidate_revision_id = candidate_protocol.get("REPOSITORY", {}).get("revisionId")
-            if candidate_revision_id == revision_id:
-                return candidate_path
+            cached_entry = cached_entries.get(dir_entry.name)
+            if isinstance(cached_entry, list) and len(cached_entry) == 3 and cached_entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+                entries[dir_entry.name] = cached_entry
+                continue
+            revision_id = None
+            try:
+                protocol = load_json_document(Path(dir_entry.path).read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+                protocol = None
+            if isinstance(protocol, dict) and isinstance(protocol.get("REPOSITORY"), dict):
+                revision_id = protocol["REPOSITORY"].get("revisionId")
+            entries[dir_entry.name] = [stat.st_mtime_ns, stat.st_size, revision_id if isinstance(revision_id, str) else None]
+            parsed_count += 1
+
+        for file_name, (_mtime_ns, _size, revision_id) in entries.items():
+            if revision_id is not None:
+                # WHY: files are scanned in name order and the first match
+                # wins, the same file the old per-lookup directory scan chose.
+                self._protocol_paths_by_revision_id.setdefault(revision_id, self.base_dir / file_name)
+        self._protocol_file_names = set(entries)
+        if self.index_path is not None and (parsed_count or entries.keys() != cached_entries.keys()):
+            self._write_index_file(entries)
+        self.logger.debug(
+            f"Indexed {len(entries)} genCodeDesc files in {self.base_dir} (parsed={parsed_count} reused={len(entries) - parsed_count})"
+        )
 
-        return None
+    def _find_protocol_path(self, revision_id: str) -> Path | None:
+        file_name = f"{revision_id}_genCodeDesc.json"
+        if self._protocol_file_names is None:
+            direct_path = self.base_dir / file_name
+            if direct_path.exists():
+                return direct_path
+            with self._index_lock:
+                if self._protocol_file_names is None:
+                    self._build_revision_index()
+
+        # WHY: once a lookup misses by name the directory is indexed, so
+        # human-only revisions are answered from memory instead of a rescan.
+        if file_name in self._protocol_file_names:
+            return self.base_dir / file_name
+        return self._protocol_paths_by_revision_id.get(revision_id)
+
+    def revision_metadata_path(self, revision_id: str) -> Path | None:
+        return self._find_protocol_path(revision_id)
 
     def get_revision_metadata(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict:
         protocol_path = self._find_protocol_path(revision_id)
@@ -270,55 +739,268 @@ class GenCodeDescSetDirProvider(GenCodeDescProvider):
                 )
             return {}
         protocol = load_json_document(protocol_path.read_text(encoding="utf-8"))
-        repository = protocol.get("REPOSITORY", {})
         self.logger.debug(f"Loaded genCodeDesc for revision {revision_id} from {protocol_path}")
+        validate_revision_metadata_identity(protocol, repo_url, repo_branch, revision_id, vcs_type, self.logger)
+        return protocol
 
-        # WHY: genCodeDesc is external metadata, not repository content. We
-        # validate identity fields here so the analyzer cannot silently join a
-        # real repository revision with the wrong external record.
-        protocol_vcs_type = repository.get("vcsType")
-        if protocol_vcs_type and protocol_vcs_type != vcs_type:
-            raise ProtocolValidationError(
-                f"Metadata vcsType mismatch for revision {revision_id}: expected {vcs_type}, got {protocol_vcs_type}"
-            )
 
-        protocol_repo_url = repository.get("repoURL")
-        if repo_url and protocol_repo_url and protocol_repo_url != repo_url:
-            raise ProtocolValidationError(
-                f"Metadata repoURL mismatch for revision {revision_id}: expected {repo_url}, got {protocol_repo_url}"
-            )
+METADATA_SOURCES = ("genCodeDesc", "genCodeDescService")
+DEFAULT_GEN_CODE_DESC_SERVICE_BATCH_SIZE = 100
+DEFAULT_GEN_CODE_DESC_SERVICE_RETRIES = 3
+DEFAULT_GEN_CODE_DESC_SERVICE_BACKOFF_SECONDS = 0.5
+
+
+class GenCodeDescServiceProvider(GenCodeDescProvider):
+    """genCodeDesc records served over HTTP, keyed by repoURL + repoBranch + vcsType + revisionId.
+
+    GET  <serviceURL>/revisions/<revisionId>?repoURL=..&repoBranch=..&vcsType=..  -> 200 protocol, 404 no record
+    POST <serviceURL>/revisions/batch {"repoURL", "repoBranch", "vcsType", "revisionIds"}
+         -> 200 {"protocols": {revisionId: protocol}}; revisions left out have no record
+    """
+
+    def __init__(
+        self,
+        service_url: str,
+        fail_on_missing: bool,
+        warn_on_missing: bool = False,
+        logger: RuntimeLogger | None = None,
+        cache_dir: Path | None = None,
+        timeout: float = COMMAND_TIMEOUT_SECONDS,
+        pool_size: int = 1,
+        batch_size: int = DEFAULT_GEN_CODE_DESC_SERVICE_BATCH_SIZE,
+        max_retries: int = DEFAULT_GEN_CODE_DESC_SERVICE_RETRIES,
+        backoff_seconds: float = DEFAULT_GEN_CODE_DESC_SERVICE_BACKOFF_SECONDS,
+    ):
+        url_parts = urlsplit(service_url)
+        self.service_url = service_url
+        self.fail_on_missing = fail_on_missing
+        self.warn_on_missing = warn_on_missing
+        self.logger = RuntimeLogger("quiet") if logger is None else logger
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._connection_class = http.client.HTTPSConnection if url_parts.scheme == "https" else http.client.HTTPConnection
+        self._host = url_parts.netloc
+        self._base_path = url_parts.path.rstrip("/")
+        self._idle_connections: list[http.client.HTTPConnection] = []
+        self._pool_lock = threading.Lock()
+        self._prefetched: dict[str, dict | None] = {}
+        self._prefetched_lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            idle_connections, self._idle_connections = self._idle_connections, []
+        for connection in idle_connections:
+            connection.close()
+
+    def _send(self, method: str, target: str, payload: bytes | None, headers: dict[str, str]) -> tuple[int, bytes]:
+        while True:
+            with self._pool_lock:
+                connection = self._idle_connections.pop() if self._idle_connections else None
+            reused = connection is not None
+            if connection is None:
+                connection = self._connection_class(self._host, timeout=self.timeout)
+            try:
+                connection.request(method, target, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                # WHY: servers drop idle keep-alive connections at will. A
+                # pooled connection that was closed under us is not a service
+                # failure, so resend on another connection without backing off.
+                if reused and isinstance(exc, (ConnectionResetError, BrokenPipeError)):
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._pool_lock:
+                    if len(self._idle_connections) < self.pool_size:
+                        self._idle_connections.append(connection)
+                        connection = None
+                if connection is not None:
+                    connection.close()
+            return response.status, data
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> tuple[int, bytes]:
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        last_error = ""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time_mod.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            try:
+                status, data = self._send(method, self._base_path + path, payload, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+                continue
+            if status == 429 or status >= 500:
+                last_error = f"HTTP {status}"
+                continue
+            return status, data
+        raise ProtocolValidationError(
+            f"genCodeDesc metadata service request {method} {self.service_url}{path.split('?', 1)[0]} "
+            f"failed after {self.max_retries + 1} attempts: {last_error}"
+        )
+
+    def _decode(self, data: bytes, context: str) -> object:
+        try:
+            return load_json_document(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ProtocolValidationError(f"genCodeDesc metadata service returned invalid JSON for {context}: {exc}") from exc
+
+    def _cache_key(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> str:
+        identity = json.dumps([repo_url, repo_branch, vcs_type, revision_id])
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_cache(self, key: str) -> tuple[bool, dict | None]:
+        if self.cache_dir is None:
+            return False, None
+        try:
+            entry = json.loads(self._cache_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False, None
+        protocol = entry.get("protocol") if isinstance(entry, dict) else None
+        # WHY: entries without a record (written by older versions) are misses,
+        # so the revision is asked for again instead of staying unattributed.
+        if not isinstance(protocol, dict):
+            return False, None
+        return True, protocol
 
-        protocol_repo_branch = repository.get("repoBranch")
-        # WHY: repoBranch describes where that metadata record was produced, but
-        # merged revisions can legitimately originate from a different branch
-        # than the query branch while still being part of the end revision's
-        # reachable history. Branch equality is therefore not a stable
-        # revision-identity check for revision-scoped metadata.
-        if protocol_repo_branch and protocol_repo_branch != repo_branch:
+    def _write_cache(self, key: str, revision_id: str, protocol: dict) -> None:
+        if self.cache_dir is None:
+            return
+        cache_path = self._cache_path(key)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps({"revisionId": revision_id, "protocol": protocol}, separators=(",", ":")), encoding="utf-8")
+            os.replace(temp_path, cache_path)
+        except OSError as exc:
+            self.logger.debug(f"Could not write genCodeDesc cache entry {cache_path}: {exc}")
+
+    def prefetch_revision_metadata(self, repo_url: str, repo_branch: str, revision_ids: Iterable[str], vcs_type: str) -> None:
+        pending: dict[str, str] = {}
+        for revision_id in revision_ids:
+            key = self._cache_key(repo_url, repo_branch, revision_id, vcs_type)
+            if key in self._prefetched or (self.cache_dir is not None and self._cache_path(key).exists()):
+                continue
+            pending.setdefault(revision_id, key)
+        revision_id_list = list(pending)
+        for start in range(0, len(revision_id_list), self.batch_size):
+            batch = revision_id_list[start : start + self.batch_size]
+            status, data = self._request(
+                "POST",
+                "/revisions/batch",
+                {"repoURL": repo_url, "repoBranch": repo_branch, "vcsType": vcs_type, "revisionIds": batch},
+            )
+            if status in (404, 405):
+                self.logger.debug(f"genCodeDesc metadata service {self.service_url} has no batch endpoint; fetching revisions one by one")
+                return
+            if status != 200:
+                raise ProtocolValidationError(f"genCodeDesc metadata service returned HTTP {status} for a batch of {len(batch)} revisions")
+            response = self._decode(data, f"a batch of {len(batch)} revisions")
+            protocols = response.get("protocols") if isinstance(response, dict) else None
+            if not isinstance(protocols, dict):
+                raise ProtocolValidationError("genCodeDesc metadata service batch response must contain a protocols object")
+            for revision_id in batch:
+                protocol = protocols.get(revision_id)
+                if protocol is not None and not isinstance(protocol, dict):
+                    raise ProtocolValidationError(f"genCodeDesc metadata service returned a non-object record for revision {revision_id}")
+                # WHY: only found records go to the cache directory. A record
+                # may be uploaded after the revision was first queried, so
+                # "no record" is kept for this run only and re-queried next run.
+                if self.cache_dir is None or protocol is None:
+                    with self._prefetched_lock:
+                        self._prefetched[pending[revision_id]] = protocol
+                else:
+                    self._write_cache(pending[revision_id], revision_id, protocol)
+        if revision_id_list:
             self.logger.debug(
-                f"Metadata repoBranch differs for revision {revision_id}: query={repo_branch} metadata={protocol_repo_branch}; accepting revision-scoped metadata"
+                f"Prefetched {len(revision_id_list)} genCodeDesc records from {self.service_url} "
+                f"in {(len(revision_id_list) + self.batch_size - 1) // self.batch_size} batch requests"
             )
 
-        protocol_revision_id = repository.get("revisionId")
-        if protocol_revision_id and protocol_revision_id != revision_id:
-            raise ProtocolValidationError(
-                f"Metadata revisionId mismatch for revision {revision_id}: expected {revision_id}, got {protocol_revision_id}"
-            )
+    def _fetch_revision(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict | None:
+        query = urlencode({"repoURL": repo_url, "repoBranch": repo_branch, "vcsType": vcs_type})
+        status, data = self._request("GET", f"/revisions/{quote(revision_id, safe='')}?{query}")
+        if status == 404:
+            return None
+        if status != 200:
+            raise ProtocolValidationError(f"genCodeDesc metadata service returned HTTP {status} for revision {revision_id}")
+        protocol = self._decode(data, f"revision {revision_id}")
+        if not isinstance(protocol, dict):
+            raise ProtocolValidationError(f"genCodeDesc metadata service returned a non-object record for revision {revision_id}")
+        return protocol
 
+    def get_revision_metadata(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict:
+        key = self._cache_key(repo_url, repo_branch, revision_id, vcs_type)
+        with self._prefetched_lock:
+            found = key in self._prefetched
+            protocol = self._prefetched.pop(key, None)
+        if found:
+            source = "batch prefetch"
+        else:
+            found, protocol = self._read_cache(key)
+            source = f"cache {self.cache_dir}"
+        if not found:
+            protocol = self._fetch_revision(repo_url, repo_branch, revision_id, vcs_type)
+            if protocol is not None:
+                self._write_cache(key, revision_id, protocol)
+            source = self.service_url
+
+        if protocol is None:
+            if self.fail_on_missing:
+                raise ProtocolValidationError(f"genCodeDesc record not found for revision {revision_id} at {self.service_url}")
+            if self.warn_on_missing:
+                self.logger.warn_once(
+                    f"missing-protocol:{repo_url}:{repo_branch}:{revision_id}:{vcs_type}",
+                    f"genCodeDesc record not found for revision {revision_id} at {self.service_url}; treating affected lines as human/unattributed",
+                )
+            else:
+                self.logger.debug(
+                    f"No genCodeDesc record for revision {revision_id} at {self.service_url}; treating revision as human/unattributed"
+                )
+            return {}
+        self.logger.debug(f"Loaded genCodeDesc for revision {revision_id} from {source}")
+        validate_revision_metadata_identity(protocol, repo_url, repo_branch, revision_id, vcs_type, self.logger)
         return protocol
 
 
 class CommitDiffSetDirProvider(CommitDiffProvider):
-    def __init__(self, base_dir: Path, logger: RuntimeLogger):
+    def __init__(self, base_dir: Path, logger: RuntimeLogger, use_mmap: bool = False):
         self.base_dir = base_dir
         self.logger = logger
+        self.use_mmap = use_mmap
+        self._patch_index: CommitDiffPatchIndex | None = None
+
+    def patch_index(self) -> "CommitDiffPatchIndex":
+        # WHY: the directory is scanned once per provider; re-globbing it for
+        # every revision made loading n patches cost n² filename matches.
+        if self._patch_index is None:
+            self._patch_index = CommitDiffPatchIndex.scan(self.base_dir)
+            self.logger.debug(f"Indexed {len(self._patch_index.patch_files)} commit diff patch files in {self.base_dir}")
+        return self._patch_index
+
+    def list_revision_ids(self) -> list[str]:
+        return self.patch_index().revision_ids()
 
     def get_commit_diff_patch(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> str:
-        patch_path = resolve_commit_diff_patch_path(self.base_dir, revision_id)
+        patch_path = self.patch_index().resolve(revision_id)
         if not patch_path.exists():
             raise ProtocolValidationError(f"Commit diff patch file not found: {patch_path}")
 
-        patch_text = patch_path.read_text(encoding="utf-8")
+        patch_text = read_mapped_text(patch_path) if self.use_mmap else patch_path.read_text(encoding="utf-8")
         if not patch_text.strip():
             raise ProtocolValidationError(f"Commit diff patch file is empty: {patch_path}")
 
@@ -347,66 +1029,147 @@ def parse_commit_diff_patch_filename(file_name: str) -> tuple[int | None, str] |
     return (int(time_seq) if time_seq is not None else None, revision_id)
 
 
-def list_commit_diff_patch_files(commit_diff_set_dir: Path, *, fail_on_empty: bool = True) -> list[CommitDiffPatchFile]:
-    parsed_patch_files: list[CommitDiffPatchFile] = []
-    has_time_seq_name = False
-    has_legacy_name = False
+class CommitDiffPatchIndex:
+    """One scan of a commitDiffSetDir: revisionId to patch path, and the replay order of all patches."""
 
-    for patch_path in commit_diff_set_dir.glob("*_commitDiff.patch"):
-        parsed_name = parse_commit_diff_patch_filename(patch_path.name)
-        if parsed_name is None:
-            continue
-        time_seq, revision_id = parsed_name
-        if time_seq is None:
-            has_legacy_name = True
-        else:
-            has_time_seq_name = True
-        parsed_patch_files.append(
-            CommitDiffPatchFile(path=patch_path, revision_id=revision_id, time_seq=time_seq)
+    def __init__(self, commit_diff_set_dir: Path, patch_files: list[CommitDiffPatchFile]):
+        self.commit_diff_set_dir = commit_diff_set_dir
+        self.patch_files = patch_files
+        self.mixed_naming = any(patch_file.time_seq is None for patch_file in patch_files) and any(
+            patch_file.time_seq is not None for patch_file in patch_files
         )
+        self.paths_by_revision_id: dict[str, Path] = {}
+        self.duplicate_revision_ids: set[str] = set()
+        for patch_file in patch_files:
+            if patch_file.revision_id in self.paths_by_revision_id:
+                self.duplicate_revision_ids.add(patch_file.revision_id)
+            self.paths_by_revision_id[patch_file.revision_id] = patch_file.path
+        self._revision_ids: list[str] | None = None
+
+    @classmethod
+    def scan(cls, commit_diff_set_dir: Path) -> "CommitDiffPatchIndex":
+        patch_files: list[CommitDiffPatchFile] = []
+        for patch_path in commit_diff_set_dir.glob("*_commitDiff.patch"):
+            parsed_name = parse_commit_diff_patch_filename(patch_path.name)
+            if parsed_name is None:
+                continue
+            time_seq, revision_id = parsed_name
+            patch_files.append(CommitDiffPatchFile(path=patch_path, revision_id=revision_id, time_seq=time_seq))
+        return cls(commit_diff_set_dir, patch_files)
 
-    if not parsed_patch_files and fail_on_empty:
-        raise ProtocolValidationError(f"No commit diff patch files found in {commit_diff_set_dir}")
-
-    if has_time_seq_name and has_legacy_name:
-        raise ProtocolValidationError(
-            "Mixed commit diff patch naming styles are not supported in one commitDiffSetDir; "
-            "use either all <timeSeq>_<revisionId>_commitDiff.patch files or all <revisionId>_commitDiff.patch files"
-        )
+    def validate(self, *, fail_on_empty: bool = True) -> None:
+        if not self.patch_files and fail_on_empty:
+            raise ProtocolValidationError(f"No commit diff patch files found in {self.commit_diff_set_dir}")
 
-    return parsed_patch_files
+        if self.mixed_naming:
+            raise ProtocolValidationError(
+                "Mixed commit diff patch naming styles are not supported in one commitDiffSetDir; "
+                "use either all <timeSeq>_<revisionId>_commitDiff.patch files or all <revisionId>_commitDiff.patch files"
+            )
 
+    def resolve(self, revision_id: str) -> Path:
+        self.validate(fail_on_empty=False)
+        if revision_id in self.duplicate_revision_ids:
+            raise ProtocolValidationError(
+                f"Multiple commit diff patch files matched revision {revision_id} in {self.commit_diff_set_dir}"
+            )
+        return self.paths_by_revision_id.get(revision_id, self.commit_diff_set_dir / f"{revision_id}_commitDiff.patch")
+
+    def revision_ids(self) -> list[str]:
+        self.validate()
+        if self._revision_ids is None:
+            parsed_patch_files: list[tuple[tuple[int, list[object]], str]] = []
+            for patch_file in self.patch_files:
+                time_seq = patch_file.time_seq
+                sort_key = (0, [time_seq]) if time_seq is not None else (
+                    1,
+                    [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", patch_file.path.name)],
+                )
+                parsed_patch_files.append((sort_key, patch_file.revision_id))
 
-def resolve_commit_diff_patch_path(commit_diff_set_dir: Path, revision_id: str) -> Path:
-    matches: list[tuple[int, Path]] = []
-    for patch_file in list_commit_diff_patch_files(commit_diff_set_dir, fail_on_empty=False):
-        if patch_file.revision_id != revision_id:
-            continue
-        matches.append((patch_file.time_seq if patch_file.time_seq is not None else sys.maxsize, patch_file.path))
+            parsed_patch_files.sort(key=lambda item: item[0])
+            self._revision_ids = [revision_id for _sort_key, revision_id in parsed_patch_files]
+        return list(self._revision_ids)
 
-    if not matches:
-        return commit_diff_set_dir / f"{revision_id}_commitDiff.patch"
 
-    matches.sort(key=lambda item: (item[0], item[1].name.lower()))
-    if len(matches) > 1:
-        raise ProtocolValidationError(
-            f"Multiple commit diff patch files matched revision {revision_id} in {commit_diff_set_dir}"
-        )
-    return matches[0][1]
+def list_commit_diff_patch_files(commit_diff_set_dir: Path, *, fail_on_empty: bool = True) -> list[CommitDiffPatchFile]:
+    patch_index = CommitDiffPatchIndex.scan(commit_diff_set_dir)
+    patch_index.validate(fail_on_empty=fail_on_empty)
+    return patch_index.patch_files
 
 
-def parse_commit_diff_patch(patch_text: str) -> ParsedCommitDiff:
-    lines = patch_text.splitlines()
-    parsed_files: list[CommitDiffFile] = []
+def resolve_commit_diff_patch_path(commit_diff_set_dir: Path, revision_id: str) -> Path:
+    return CommitDiffPatchIndex.scan(commit_diff_set_dir).resolve(revision_id)
+
+
+def read_mapped_text(path: Path) -> str:
+    """read_text(encoding="utf-8") through a read-only mapping, so large patches are decoded without an extra bytes copy."""
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            text = str(mapped, "utf-8")
+    # WHY: read_text translates universal newlines; patches must parse the same either way.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+# WHY: the same boundaries as str.splitlines(), so patches split exactly as before.
+_PATCH_LINE_RE = re.compile(r"([^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*)(?:\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]|\Z)")
+
+CommitDiffPatchSource = str | bytes | mmap.mmap | Iterable[str]
+
+
+def iter_commit_diff_patch_lines(patch: CommitDiffPatchSource) -> Iterator[str]:
+    """Yield the lines of a patch given as text, UTF-8 bytes or mmap, or a text stream, one at a time.
+
+    Lines end where str.splitlines() would end them, whatever the source.
+    """
+    if isinstance(patch, str):
+        text_length = len(patch)
+        for line_match in _PATCH_LINE_RE.finditer(patch):
+            if line_match.start() == text_length:
+                return
+            yield line_match.group(1)
+        return
+    if isinstance(patch, (bytes, mmap.mmap)):
+        line_start = 0
+        while line_start < len(patch):
+            line_end = patch.find(b"\n", line_start)
+            line_end = len(patch) if line_end < 0 else line_end + 1
+            try:
+                physical_line = str(patch[line_start:line_end], "utf-8")
+            except UnicodeDecodeError:
+                # WHY: raise the error a whole-file decode would, with its file position.
+                str(patch, "utf-8")
+                raise
+            yield from physical_line.splitlines()
+            line_start = line_end
+        return
+    for physical_line in patch:
+        yield from physical_line.splitlines()
+
+
+def iter_commit_diff_file_sections(patch: CommitDiffPatchSource) -> Iterator[CommitDiffFile]:
+    """Yield each file section of a unified diff as soon as it is complete.
+
+    The patch is read line by line, and each hunk copies only its own line
+    contents into a CompactHunkLines, so no hunk holds on to the patch. Path
+    headers are not checked here; parse_commit_diff_patch validates the
+    finished patch.
+    """
     current_file: CommitDiffFile | None = None
-    current_hunk: CommitDiffHunk | None = None
+    current_hunk_lines: CompactHunkLines | None = None
     old_line_cursor: int | None = None
     new_line_cursor: int | None = None
 
-    for raw_line in lines:
+    for raw_line in iter_commit_diff_patch_lines(patch):
         if raw_line.startswith("diff --git "):
+            if current_hunk_lines is not None:
+                current_hunk_lines.finish()
             if current_file is not None:
-                parsed_files.append(current_file)
+                yield current_file
             header_parts = raw_line.split()
             old_path = ""
             new_path = ""
@@ -414,7 +1177,7 @@ def parse_commit_diff_patch(patch_text: str) -> ParsedCommitDiff:
                 old_path = header_parts[2].removeprefix("a/")
                 new_path = header_parts[3].removeprefix("b/")
             current_file = CommitDiffFile(old_path=old_path, new_path=new_path, hunks=[])
-            current_hunk = None
+            current_hunk_lines = None
             old_line_cursor = None
             new_line_cursor = None
             continue
@@ -424,95 +1187,76 @@ def parse_commit_diff_patch(patch_text: str) -> ParsedCommitDiff:
                 continue
             raise ProtocolValidationError("Commit diff patch content must start with a diff --git file header")
 
-        if raw_line.startswith("--- "):
-            current_file.old_path = raw_line.removeprefix("--- ").removeprefix("a/")
-            continue
-
-        if raw_line.startswith("+++ "):
-            current_file.new_path = raw_line.removeprefix("+++ ").removeprefix("b/")
-            continue
-
-        if raw_line.startswith("rename from "):
-            current_file.old_path = raw_line.removeprefix("rename from ")
-            continue
-
-        if raw_line.startswith("rename to "):
-            current_file.new_path = raw_line.removeprefix("rename to ")
-            continue
-
-        if raw_line.startswith("@@ "):
-            hunk_match = _HUNK_HEADER_RE.match(raw_line)
-            if hunk_match is None:
-                raise ProtocolValidationError(f"Malformed commit diff hunk header: {raw_line}")
-            old_start = int(hunk_match.group(1))
-            old_length = int(hunk_match.group(2) or "1")
-            new_start = int(hunk_match.group(3))
-            new_length = int(hunk_match.group(4) or "1")
-            current_hunk = CommitDiffHunk(
-                old_start=old_start,
-                old_length=old_length,
-                new_start=new_start,
-                new_length=new_length,
-                lines=[],
-            )
-            current_file.hunks.append(current_hunk)
-            old_line_cursor = old_start
-            new_line_cursor = new_start
-            continue
-
-        if current_hunk is None:
+        if raw_line.startswith(("--- ", "+++ ", "rename from ", "rename to ", "@@ ")):
+            if raw_line.startswith("--- "):
+                current_file.old_path = raw_line.removeprefix("--- ").removeprefix("a/")
+            elif raw_line.startswith("+++ "):
+                current_file.new_path = raw_line.removeprefix("+++ ").removeprefix("b/")
+            elif raw_line.startswith("rename from "):
+                current_file.old_path = raw_line.removeprefix("rename from ")
+            elif raw_line.startswith("rename to "):
+                current_file.new_path = raw_line.removeprefix("rename to ")
+            else:
+                hunk_match = _HUNK_HEADER_RE.match(raw_line)
+                if hunk_match is None:
+                    raise ProtocolValidationError(f"Malformed commit diff hunk header: {raw_line}")
+                old_start = int(hunk_match.group(1))
+                new_start = int(hunk_match.group(3))
+                if current_hunk_lines is not None:
+                    current_hunk_lines.finish()
+                current_hunk_lines = CompactHunkLines(old_start, new_start)
+                current_file.hunks.append(
+                    CommitDiffHunk(
+                        old_start=old_start,
+                        old_length=int(hunk_match.group(2) or "1"),
+                        new_start=new_start,
+                        new_length=int(hunk_match.group(4) or "1"),
+                        lines=current_hunk_lines,
+                    )
+                )
+                old_line_cursor = old_start
+                new_line_cursor = new_start
             continue
 
-        if raw_line.startswith("\\ No newline at end of file"):
+        if current_hunk_lines is None:
             continue
 
-        if raw_line.startswith("+"):
-            current_hunk.lines.append(
-                CommitDiffLine(
-                    kind="add",
-                    content=raw_line[1:],
-                    old_line_number=None,
-                    new_line_number=new_line_cursor,
-                )
-            )
+        marker = raw_line[:1]
+        if marker == "+":
             if new_line_cursor is None:
                 raise ProtocolValidationError("Commit diff parser lost new-file line cursor state")
+            current_hunk_lines.append_line("add", raw_line[1:])
             new_line_cursor += 1
             continue
 
-        if raw_line.startswith("-"):
-            current_hunk.lines.append(
-                CommitDiffLine(
-                    kind="delete",
-                    content=raw_line[1:],
-                    old_line_number=old_line_cursor,
-                    new_line_number=None,
-                )
-            )
+        if marker == "-":
             if old_line_cursor is None:
                 raise ProtocolValidationError("Commit diff parser lost old-file line cursor state")
+            current_hunk_lines.append_line("delete", raw_line[1:])
             old_line_cursor += 1
             continue
 
-        if raw_line.startswith(" "):
-            current_hunk.lines.append(
-                CommitDiffLine(
-                    kind="context",
-                    content=raw_line[1:],
-                    old_line_number=old_line_cursor,
-                    new_line_number=new_line_cursor,
-                )
-            )
+        if marker == " ":
             if old_line_cursor is None or new_line_cursor is None:
                 raise ProtocolValidationError("Commit diff parser lost line cursor state")
+            current_hunk_lines.append_line("context", raw_line[1:])
             old_line_cursor += 1
             new_line_cursor += 1
             continue
 
+        if raw_line.startswith("\\ No newline at end of file"):
+            continue
+
         raise ProtocolValidationError(f"Unsupported commit diff patch line: {raw_line}")
 
+    if current_hunk_lines is not None:
+        current_hunk_lines.finish()
     if current_file is not None:
-        parsed_files.append(current_file)
+        yield current_file
+
+
+def parse_commit_diff_patch(patch: CommitDiffPatchSource) -> ParsedCommitDiff:
+    parsed_files = list(iter_commit_diff_file_sections(patch))
 
     if not parsed_files:
         raise ProtocolValidationError("Commit diff patch did not contain any diff --git file sections")
@@ -531,18 +1275,24 @@ def load_commit_diff_sequence(
     revision_ids: list[str],
     vcs_type: str,
 ) -> list[RevisionCommitDiff]:
-    loaded_sequence: list[RevisionCommitDiff] = []
+    return list(iter_commit_diff_sequence(provider, repo_url, repo_branch, revision_ids, vcs_type))
+
+
+def iter_commit_diff_sequence(
+    provider: CommitDiffProvider,
+    repo_url: str,
+    repo_branch: str,
+    revision_ids: list[str],
+    vcs_type: str,
+) -> Iterator[RevisionCommitDiff]:
     for revision_id in revision_ids:
         patch_text = provider.get_commit_diff_patch(repo_url, repo_branch, revision_id, vcs_type)
         if patch_text is None:
             raise ProtocolValidationError(f"Commit diff provider returned no patch for revision {revision_id}")
-        loaded_sequence.append(
-            RevisionCommitDiff(
-                revision_id=revision_id,
-                parsed_patch=parse_commit_diff_patch(patch_text),
-            )
+        yield RevisionCommitDiff(
+            revision_id=revision_id,
+            parsed_patch=parse_commit_diff_patch(patch_text),
         )
-    return loaded_sequence
 
 
 def build_result_document(
@@ -553,6 +1303,7 @@ def build_result_document(
     repo_url_override: str | None = None,
     protocol_version: str | None = None,
     repository_override: dict[str, str] | None = None,
+    warnings: list[str] | None = None,
 ) -> dict:
     repository = {
         "vcsType": args.vcsType,
@@ -568,7 +1319,8 @@ def build_result_document(
         "SUMMARY": summary,
         "REPOSITORY": repository,
     }
-    warnings = logger.warnings()
+    if warnings is None:
+        warnings = logger.warnings()
     if warnings:
         result["WARNINGS"] = warnings
     return result
@@ -622,6 +1374,42 @@ def _read_query_args_revision_list(query_args_document: dict, field_name: str) -
     return value
 
 
+def parse_query_windows(value: object, label: str) -> list[tuple[str, str]]:
+    if isinstance(value, dict):
+        value = value.get("windows")
+    if not isinstance(value, list) or not value:
+        raise InputValidationError(f"{label} must be a non-empty list of {{startTime, endTime}} objects")
+    windows: list[tuple[str, str]] = []
+    for position, entry in enumerate(value):
+        if not isinstance(entry, dict):
+            raise InputValidationError(f"{label}[{position}] must be an object with startTime and endTime")
+        for field_name in ("startTime", "endTime"):
+            field_value = entry.get(field_name)
+            if not isinstance(field_value, str) or not field_value:
+                raise InputValidationError(f"{label}[{position}].{field_name} must be a non-empty string")
+            validate_iso_date(field_value, f"{label}[{position}].{field_name}")
+        if parse_day_start(entry["startTime"]) > parse_day_end(entry["endTime"]):
+            raise InputValidationError(f"{label}[{position}] has startTime after endTime")
+        windows.append((entry["startTime"], entry["endTime"]))
+    return windows
+
+
+def load_query_windows(args: argparse.Namespace, query_args_document: dict | None) -> list[tuple[str, str]] | None:
+    windows_file = getattr(args, "windows", None)
+    if windows_file:
+        windows_path = Path(windows_file)
+        if not windows_path.is_file():
+            raise InputValidationError(f"--windows does not exist or is not a file: {windows_file}")
+        try:
+            windows_document = load_json_document(windows_path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise InputValidationError(f"Failed to read --windows from {windows_file}: {exc}") from exc
+        return parse_query_windows(windows_document, "--windows")
+    if query_args_document is not None and query_args_document.get("windows") is not None:
+        return parse_query_windows(query_args_document["windows"], "query args windows")
+    return None
+
+
 def apply_query_args(args: argparse.Namespace) -> argparse.Namespace:
     query_args_document = load_query_args_document(args)
     if query_args_document is not None:
@@ -648,6 +1436,8 @@ def apply_query_args(args: argparse.Namespace) -> argparse.Namespace:
             if included_revision_ids is not None:
                 args.includedRevisionIds = included_revision_ids
 
+    args.queryWindows = load_query_windows(args, query_args_document)
+
     if not args.vcsType:
         args.vcsType = "git"
     if not args.algorithm:
@@ -657,10 +1447,12 @@ def apply_query_args(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
-def resolve_algorithm_b_offline_revision_ids(args: argparse.Namespace) -> list[str]:
+def resolve_algorithm_b_offline_revision_ids(args: argparse.Namespace, diff_provider: CommitDiffProvider | None = None) -> list[str]:
     if args.includedRevisionIds is not None:
         return args.includedRevisionIds
 
+    if isinstance(diff_provider, CommitDiffSetDirProvider):
+        return diff_provider.list_revision_ids()
     return list_commit_diff_revision_ids(Path(args.commitDiffSetDir))
 
 
@@ -675,10 +1467,11 @@ def resolve_added_line_gen_ratios(
     if protocol_index is None:
         return [0 for _ in added_lines]
 
-    direct_ratios = [
-        line_ratio(protocol_index, commit_diff_file.new_path, added_line.new_line_number or 0)
-        for added_line in added_lines
-    ]
+    direct_ratios = line_ratios(
+        protocol_index,
+        commit_diff_file.new_path,
+        [added_line.new_line_number or 0 for added_line in added_lines],
+    )
     indexed_file = protocol_index.get(commit_diff_file.new_path)
     if indexed_file is None or indexed_file.line_ranges:
         return direct_ratios
@@ -692,17 +1485,37 @@ def resolve_added_line_gen_ratios(
     return direct_ratios
 
 
-def apply_commit_diff_file_to_line_states(
-    current_lines: list[LineState],
+def _hunk_old_start_index(hunk: CommitDiffHunk) -> int:
+    return 0 if hunk.old_start == 0 else hunk.old_start - 1
+
+
+def _hunk_old_line_count(hunk: CommitDiffHunk) -> int:
+    if isinstance(hunk.lines, CompactHunkLines):
+        return len(hunk.lines) - hunk.lines.count_kind("add")
+    return sum(1 for diff_line in hunk.lines if diff_line.kind != "add")
+
+
+def _hunks_are_ascending(hunks: list[CommitDiffHunk]) -> bool:
+    old_end = 0
+    for hunk in hunks:
+        old_start_index = _hunk_old_start_index(hunk)
+        if old_start_index < old_end:
+            return False
+        old_end = old_start_index + _hunk_old_line_count(hunk)
+    return True
+
+
+def _apply_commit_diff_hunks_in_place(
+    current_lines: Sequence[LineState],
     commit_diff_file: CommitDiffFile,
     revision_id: str,
-    protocol_index: dict[str, IndexedFileDetail] | None = None,
-) -> list[LineState]:
+    protocol_index: dict[str, IndexedFileDetail] | None,
+) -> LineStateColumns:
     updated_lines = list(current_lines)
     line_offset = 0
 
     for hunk in commit_diff_file.hunks:
-        insertion_index = (0 if hunk.old_start == 0 else hunk.old_start - 1) + line_offset
+        insertion_index = _hunk_old_start_index(hunk) + line_offset
         if insertion_index < 0 or insertion_index > len(updated_lines):
             raise ProtocolValidationError(
                 f"Commit diff hunk starts outside current file bounds for {commit_diff_file.new_path}: {hunk.old_start}"
@@ -742,6 +1555,72 @@ def apply_commit_diff_file_to_line_states(
 
             raise ProtocolValidationError(f"Unsupported commit diff line kind: {diff_line.kind}")
 
+    return LineStateColumns.from_line_states(updated_lines)
+
+
+def apply_commit_diff_file_to_line_states(
+    current_lines: Sequence[LineState],
+    commit_diff_file: CommitDiffFile,
+    revision_id: str,
+    protocol_index: dict[str, IndexedFileDetail] | None = None,
+) -> LineStateColumns:
+    """Apply one file's hunks by copying the old line list once and splicing each hunk in.
+
+    Hunk positions are old-file line numbers, so ascending hunks never need the
+    running offset the in-place engine tracks.
+    """
+    if not _hunks_are_ascending(commit_diff_file.hunks):
+        # WHY: overlapping or unordered hunks only occur in hand-written diffs.
+        # They keep the in-place semantics, where later hunks see earlier edits.
+        return _apply_commit_diff_hunks_in_place(current_lines, commit_diff_file, revision_id, protocol_index)
+
+    current_lines = LineStateColumns.from_line_states(current_lines)
+    current_contents = current_lines.contents
+    updated_lines = LineStateColumns()
+    origin = REVISION_ID_TABLE.index(revision_id)
+    old_line_count = len(current_lines)
+    old_cursor = 0
+
+    for hunk in commit_diff_file.hunks:
+        old_start_index = _hunk_old_start_index(hunk)
+        if old_start_index > old_line_count:
+            raise ProtocolValidationError(
+                f"Commit diff hunk starts outside current file bounds for {commit_diff_file.new_path}: {hunk.old_start}"
+            )
+        updated_lines.extend_from(current_lines, old_cursor, old_start_index)
+
+        scan_index = old_start_index
+        added_line_gen_ratios = resolve_added_line_gen_ratios(commit_diff_file, hunk, protocol_index)
+        added_line_index = 0
+        for diff_line in hunk.lines:
+            if diff_line.kind == "context":
+                if scan_index >= old_line_count or current_contents[scan_index] != diff_line.content:
+                    raise ProtocolValidationError(
+                        f"Commit diff context mismatch for {commit_diff_file.new_path} at line {diff_line.old_line_number}"
+                    )
+                updated_lines.append_from(current_lines, scan_index)
+                scan_index += 1
+                continue
+
+            if diff_line.kind == "delete":
+                if scan_index >= old_line_count or current_contents[scan_index] != diff_line.content:
+                    raise ProtocolValidationError(
+                        f"Commit diff delete mismatch for {commit_diff_file.new_path} at line {diff_line.old_line_number}"
+                    )
+                scan_index += 1
+                continue
+
+            if diff_line.kind == "add":
+                added_gen_ratio = added_line_gen_ratios[added_line_index] if added_line_index < len(added_line_gen_ratios) else 0
+                updated_lines.append(diff_line.content, origin, added_gen_ratio)
+                added_line_index += 1
+                continue
+
+            raise ProtocolValidationError(f"Unsupported commit diff line kind: {diff_line.kind}")
+
+        old_cursor = scan_index
+
+    updated_lines.extend_from(current_lines, old_cursor, old_line_count)
     return updated_lines
 
 
@@ -765,27 +1644,43 @@ def _summary_field_names(scope: str) -> tuple[str, str, str]:
     return "totalCodeLines", "fullGeneratedCodeLines", "partialGeneratedCodeLines"
 
 
-def summarize_live_changed_line_states_by_revision_ids(
-    line_states: list[LineState],
-    included_revision_ids: list[str],
-    scope: str = "A",
+def _summarize_code_line_states(
+    line_state_lists: Iterable[Sequence[LineState]],
+    is_included_origin: Callable[[str | None], bool],
+    scope: str,
 ) -> dict[str, int]:
-    included_revision_id_set = set(included_revision_ids)
     total_code_lines = 0
     full_generated_code_lines = 0
     partial_generated_code_lines = 0
-
-    for line_state in line_states:
-        if line_state.origin_revision_id not in included_revision_id_set:
-            continue
-        if not is_code_line(line_state.content, scope):
-            continue
-
-        total_code_lines += 1
-        if line_state.gen_ratio == 100:
-            full_generated_code_lines += 1
-        elif line_state.gen_ratio > 0:
-            partial_generated_code_lines += 1
+    # WHY: a replay has millions of lines but few distinct origins, so the
+    # origin check runs once per revision and lines are then selected by an
+    # origin mask. A failing check is kept and only raised when a code line
+    # actually carries that origin.
+    included_by_origin: dict[int, bool | ProtocolValidationError] = {}
+
+    for line_states in line_state_lists:
+        columns = LineStateColumns.from_line_states(line_states)
+        for origin in set(columns.origins).difference(included_by_origin):
+            try:
+                included_by_origin[origin] = is_included_origin(REVISION_ID_TABLE[origin])
+            except ProtocolValidationError as error:
+                included_by_origin[origin] = error
+        failing_origins = {origin for origin, included in included_by_origin.items() if included is not True and included is not False}
+        if failing_origins:
+            failing_mask = map(failing_origins.__contains__, columns.origins)
+            for content, origin in compress(zip(columns.contents, columns.origins), failing_mask):
+                if is_code_line(content, scope):
+                    raise included_by_origin[origin]
+
+        included_mask = map(included_by_origin.__getitem__, columns.origins)
+        for content, gen_ratio in compress(zip(columns.contents, columns.gen_ratios), included_mask):
+            if not is_code_line(content, scope):
+                continue
+            total_code_lines += 1
+            if gen_ratio == 100:
+                full_generated_code_lines += 1
+            elif gen_ratio > 0:
+                partial_generated_code_lines += 1
 
     total_key, full_key, partial_key = _summary_field_names(scope)
     return {
@@ -795,20 +1690,16 @@ def summarize_live_changed_line_states_by_revision_ids(
     }
 
 
-def list_commit_diff_revision_ids(commit_diff_set_dir: Path) -> list[str]:
-    parsed_patch_files: list[tuple[tuple[int, list[object]], str]] = []
-    for patch_file in list_commit_diff_patch_files(commit_diff_set_dir):
-        time_seq = patch_file.time_seq
-        revision_id = patch_file.revision_id
-        sort_key = (0, [time_seq]) if time_seq is not None else (
-            1,
-            [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", patch_file.path.name)],
-        )
-        parsed_patch_files.append((sort_key, revision_id))
+def summarize_live_changed_line_states_by_revision_ids(
+    line_states: list[LineState],
+    included_revision_ids: list[str],
+    scope: str = "A",
+) -> dict[str, int]:
+    return summarize_live_changed_file_states_by_revision_ids({"": line_states}, included_revision_ids, scope)
 
-    parsed_patch_files.sort(key=lambda item: item[0])
-    revision_ids = [revision_id for _sort_key, revision_id in parsed_patch_files]
-    return revision_ids
+
+def list_commit_diff_revision_ids(commit_diff_set_dir: Path) -> list[str]:
+    return CommitDiffPatchIndex.scan(commit_diff_set_dir).revision_ids()
 
 
 def is_source_file_path(path_value: str) -> bool:
@@ -833,6 +1724,15 @@ def is_included_file_path(path_value: str, scope: str = "A") -> bool:
 
 def list_git_source_paths_for_revision(repo_dir: Path, revision_id: str, scope: str = "A") -> list[str]:
     parent_revision = resolve_parent_revision("git", repo_dir, "", "", revision_id)
+    return _list_git_source_paths_against_parent(repo_dir, revision_id, parent_revision, scope)
+
+
+def _list_git_source_paths_against_parent(
+    repo_dir: Path,
+    revision_id: str,
+    parent_revision: str | None,
+    scope: str,
+) -> list[str]:
     if parent_revision is None:
         output = run_git(repo_dir, ["show", "--format=", "--name-status", "--find-renames=25%", "--root", revision_id])
     else:
@@ -864,7 +1764,19 @@ def build_git_source_patch_for_revision(repo_dir: Path, revision_id: str, source
         return ""
 
     parent_revision = resolve_parent_revision("git", repo_dir, "", "", revision_id)
-    if parent_revision is None:
+    return _build_git_source_patch_against_parent(repo_dir, revision_id, parent_revision, source_paths)
+
+
+def _build_git_source_patch_against_parent(
+    repo_dir: Path,
+    revision_id: str,
+    parent_revision: str | None,
+    source_paths: list[str],
+) -> str:
+    if not source_paths:
+        return ""
+
+    if parent_revision is None:
         return run_git(
             repo_dir,
             ["show", "--format=", "--find-renames=25%", "--root", revision_id, "--", *source_paths],
@@ -920,60 +1832,69 @@ def resolve_algorithm_b_git_revision_ids(args: argparse.Namespace, repo_dir: Pat
     return revision_ids, end_revision_id
 
 
-def load_git_commit_diff_sequence_from_repository(repo_dir: Path, revision_ids: list[str], scope: str = "A") -> list[RevisionCommitDiff]:
-    loaded_sequence: list[RevisionCommitDiff] = []
+NO_LOCAL_GIT_COMMIT_DIFFS_MESSAGE = "Algorithm B local git replay did not find any source-file commit diffs in the requested window"
+
+
+def load_git_commit_diff_sequence_from_repository(
+    repo_dir: Path,
+    revision_ids: list[str],
+    scope: str = "A",
+    revision_metadata: RevisionMetadataCache | None = None,
+) -> list[RevisionCommitDiff]:
+    loaded_sequence = list(iter_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, scope, revision_metadata))
+    if not loaded_sequence:
+        raise ProtocolValidationError(NO_LOCAL_GIT_COMMIT_DIFFS_MESSAGE)
+    return loaded_sequence
+
+
+def iter_git_commit_diff_sequence_from_repository(
+    repo_dir: Path,
+    revision_ids: list[str],
+    scope: str = "A",
+    revision_metadata: RevisionMetadataCache | None = None,
+) -> Iterator[RevisionCommitDiff]:
+    reader = get_git_cat_file_reader(repo_dir)
 
     for revision_id in revision_ids:
-        parent_revision = resolve_parent_revision("git", repo_dir, "", "", revision_id)
-        parent_revision_ids = list_git_parent_revisions(repo_dir, revision_id)
-        source_paths = list_git_source_paths_for_revision(repo_dir, revision_id, scope)
+        if revision_metadata is not None and revision_id in revision_metadata.parent_revision_ids:
+            parent_revision_ids = revision_metadata.parent_revision_ids[revision_id]
+            parent_revision = parent_revision_ids[0] if parent_revision_ids else None
+        else:
+            parent_revision = resolve_parent_revision("git", repo_dir, "", "", revision_id)
+            parent_revision_ids = list_git_parent_revisions(repo_dir, revision_id)
+        source_paths = _list_git_source_paths_against_parent(repo_dir, revision_id, parent_revision, scope)
         if not source_paths:
             continue
 
-        patch_text = build_git_source_patch_for_revision(repo_dir, revision_id, source_paths)
+        patch_text = _build_git_source_patch_against_parent(repo_dir, revision_id, parent_revision, source_paths)
         if not patch_text.strip():
             continue
 
         parsed_patch = parse_commit_diff_patch(patch_text)
-        base_file_lines_by_old_path: dict[str, list[str]] = {}
-        final_file_lines_by_new_path: dict[str, list[str]] = {}
-        if parent_revision is not None:
-            for commit_diff_file in parsed_patch.files:
-                old_path = commit_diff_file.old_path
-                if not is_included_file_path(old_path, scope) or old_path in base_file_lines_by_old_path:
-                    continue
-                base_file_lines = read_git_file_lines_at_revision(repo_dir, parent_revision, old_path)
-                if base_file_lines is not None:
-                    base_file_lines_by_old_path[old_path] = base_file_lines
-        for commit_diff_file in parsed_patch.files:
-            new_path = commit_diff_file.new_path
-            if not is_included_file_path(new_path, scope) or new_path in final_file_lines_by_new_path:
-                continue
-            final_file_lines = read_git_file_lines_at_revision(repo_dir, revision_id, new_path)
-            if final_file_lines is not None:
-                final_file_lines_by_new_path[new_path] = final_file_lines
-
-        loaded_sequence.append(
-            RevisionCommitDiff(
-                revision_id=revision_id,
-                parsed_patch=parsed_patch,
-                base_file_lines_by_old_path=base_file_lines_by_old_path or None,
-                parent_revision_ids=parent_revision_ids or None,
-                final_file_lines_by_new_path=final_file_lines_by_new_path or None,
-            )
+        base_file_lines_by_old_path, final_file_lines_by_new_path = read_git_commit_diff_file_lines(
+            reader,
+            parsed_patch,
+            revision_id,
+            parent_revision,
+            scope,
         )
 
-    if not loaded_sequence:
-        raise ProtocolValidationError("Algorithm B local git replay did not find any source-file commit diffs in the requested window")
-
-    return loaded_sequence
+        yield RevisionCommitDiff(
+            revision_id=revision_id,
+            parsed_patch=parsed_patch,
+            base_file_lines_by_old_path=base_file_lines_by_old_path or None,
+            parent_revision_ids=parent_revision_ids or None,
+            final_file_lines_by_new_path=final_file_lines_by_new_path or None,
+        )
 
 
-def collect_git_revision_commit_times(repo_dir: Path, revision_ids: list[str]) -> dict[str, datetime]:
-    return {
-        revision_id: parse_git_timestamp(run_git(repo_dir, ["show", "-s", "--format=%cI", revision_id]))
-        for revision_id in revision_ids
-    }
+def collect_git_revision_commit_times(
+    repo_dir: Path,
+    revision_ids: list[str],
+    revision_metadata: RevisionMetadataCache | None = None,
+) -> dict[str, datetime]:
+    commit_times = {} if revision_metadata is None else revision_metadata.commit_times
+    return {revision_id: get_commit_time(repo_dir, revision_id, commit_times) for revision_id in revision_ids}
 
 
 def list_git_parent_revisions(repo_dir: Path, revision_id: str) -> list[str]:
@@ -996,62 +1917,539 @@ def read_git_file_lines_at_revision(repo_dir: Path, revision_id: str, relative_p
     return result.stdout.splitlines()
 
 
-def reconstruct_base_line_states_from_lines(file_lines: list[str]) -> list[LineState]:
-    return [LineState(content=line, origin_revision_id=None, gen_ratio=0) for line in file_lines]
+GIT_CAT_FILE_BATCH_SIZE = 256
 
 
-def find_next_matching_line_state(line_states: list[LineState], content: str, start_index: int) -> int | None:
-    for index in range(start_index, len(line_states)):
-        if line_states[index].content == content:
-            return index
-    return None
+class GitCatFileReader:
+    """Long-lived `git cat-file --batch-check` / `--batch` session for one repository."""
+
+    def __init__(self, repo_dir: Path, max_file_size: int = MAX_FILE_SIZE_BYTES):
+        self.repo_dir = repo_dir
+        self.max_file_size = max_file_size
+        self._lock = threading.Lock()
+        self.closed = False
+        self._check_process = self._start("--batch-check")
+        self._batch_process = self._start("--batch")
+
+    def _start(self, mode: str) -> subprocess.Popen[bytes]:
+        try:
+            return subprocess.Popen(
+                ["git", "cat-file", mode],
+                cwd=self.repo_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as exc:
+            raise CommandExecutionError("Required command not found: git") from exc
+
+    def __enter__(self) -> "GitCatFileReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.closed = True
+        for process in (self._check_process, self._batch_process):
+            if process.poll() is not None:
+                continue
+            try:
+                process.stdin.close()
+                process.wait(timeout=COMMAND_TIMEOUT_SECONDS)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+
+    def _exchange(self, process: subprocess.Popen[bytes], requests: list[bytes]) -> None:
+        try:
+            process.stdin.write(b"".join(requests))
+            process.stdin.flush()
+        except OSError as exc:
+            raise CommandExecutionError(f"git cat-file session for {self.repo_dir} terminated unexpectedly") from exc
+
+    def _read_header(self, process: subprocess.Popen[bytes]) -> list[str]:
+        header = process.stdout.readline()
+        if not header:
+            raise CommandExecutionError(f"git cat-file session for {self.repo_dir} terminated unexpectedly")
+        return header.decode("utf-8", errors="replace").split()
+
+    def read_blobs(self, requests: list[tuple[str, str]]) -> list[bytes | None]:
+        """Return raw blob bytes for each (revision, path); None when the object is missing or not a blob."""
+        results: list[bytes | None] = [None] * len(requests)
+        with self._lock:
+            if self.closed:
+                raise CommandExecutionError(f"git cat-file session for {self.repo_dir} is closed")
+            try:
+                self._read_blobs_locked(requests, results)
+            except RepositoryStateError:
+                raise
+            except BaseException:
+                # WHY: a failure part-way through an exchange leaves unread
+                # replies in the pipes, so the session cannot be reused.
+                # get_git_cat_file_reader starts a fresh one for closed readers.
+                self.close()
+                raise
+        return results
+
+    def _read_blobs_locked(self, requests: list[tuple[str, str]], results: list[bytes | None]) -> None:
+        # WHY: requests are pipelined in bounded batches. Each batch of
+        # object names fits in the pipe buffer, so git can never block on a
+        # full stdout while we are still writing its stdin.
+        for batch_start in range(0, len(requests), GIT_CAT_FILE_BATCH_SIZE):
+            batch = list(enumerate(requests[batch_start:batch_start + GIT_CAT_FILE_BATCH_SIZE], start=batch_start))
+            readable = []
+            for index, (revision_id, relative_path) in batch:
+                # WHY: batch requests are newline-delimited, so a path that
+                # contains a newline is read with its own git cat-file call.
+                if "\n" in relative_path:
+                    results[index] = self._read_blob_unbatched(revision_id, relative_path)
+                else:
+                    readable.append((index, revision_id, relative_path))
+            self._exchange(
+                self._check_process,
+                [f"{revision_id}:{relative_path}\n".encode("utf-8") for _index, revision_id, relative_path in readable],
+            )
+            blob_ids: list[tuple[int, bytes]] = []
+            oversized: RepositoryStateError | None = None
+            for index, revision_id, relative_path in readable:
+                header = self._read_header(self._check_process)
+                if oversized is not None or len(header) != 3 or header[1] != "blob":
+                    continue
+                size = int(header[2])
+                # WHY: the size guard is enforced from the batch-check
+                # header, so oversized payloads are never read at all. The
+                # remaining headers of the batch are still drained, which
+                # keeps the session in step for the next caller.
+                if size > self.max_file_size:
+                    oversized = RepositoryStateError(
+                        f"File {relative_path} at {revision_id} exceeds {self.max_file_size} byte limit "
+                        f"({size} bytes) — possible binary or generated file"
+                    )
+                    continue
+                blob_ids.append((index, header[0].encode("ascii")))
+            if oversized is not None:
+                raise oversized
+
+            self._exchange(self._batch_process, [blob_id + b"\n" for _index, blob_id in blob_ids])
+            for index, _blob_id in blob_ids:
+                header = self._read_header(self._batch_process)
+                if len(header) != 3:
+                    raise CommandExecutionError(f"Unexpected git cat-file --batch header: {' '.join(header)}")
+                payload = self._batch_process.stdout.read(int(header[2]) + 1)
+                results[index] = payload[:-1]
+
+    def _read_blob_unbatched(self, revision_id: str, relative_path: str) -> bytes | None:
+        try:
+            result = subprocess.run(
+                ["git", "cat-file", "blob", f"{revision_id}:{relative_path}"],
+                cwd=self.repo_dir,
+                capture_output=True,
+                timeout=COMMAND_TIMEOUT_SECONDS,
+                check=False,
+            )
+        except FileNotFoundError as exc:
+            raise CommandExecutionError("Required command not found: git") from exc
+        except subprocess.TimeoutExpired as exc:
+            raise CommandExecutionError(f"Command timed out after {COMMAND_TIMEOUT_SECONDS}s: git cat-file blob {revision_id}:{relative_path!r}") from exc
+        if result.returncode != 0:
+            return None
+        if len(result.stdout) > self.max_file_size:
+            raise RepositoryStateError(
+                f"File {relative_path} at {revision_id} exceeds {self.max_file_size} byte limit "
+                f"({len(result.stdout)} bytes) — possible binary or generated file"
+            )
+        return result.stdout
+
+    def read_blob(self, revision_id: str, relative_path: str) -> bytes | None:
+        return self.read_blobs([(revision_id, relative_path)])[0]
+
+
+_GIT_CAT_FILE_READERS: dict[Path, GitCatFileReader] = {}
+# WHY: agg-blame worker threads reach the registry through BlameCache; without
+# the lock two threads can both start a session and one process pair leaks.
+_GIT_CAT_FILE_READERS_LOCK = threading.Lock()
+
+
+def get_git_cat_file_reader(repo_dir: Path) -> GitCatFileReader:
+    with _GIT_CAT_FILE_READERS_LOCK:
+        reader = _GIT_CAT_FILE_READERS.get(repo_dir)
+        if reader is None or reader.closed:
+            reader = GitCatFileReader(repo_dir)
+            _GIT_CAT_FILE_READERS[repo_dir] = reader
+    return reader
+
+
+@atexit.register
+def close_git_cat_file_readers() -> None:
+    with _GIT_CAT_FILE_READERS_LOCK:
+        readers = list(_GIT_CAT_FILE_READERS.values())
+        _GIT_CAT_FILE_READERS.clear()
+    for reader in readers:
+        reader.close()
+
+
+def decode_file_lines(raw_content: bytes) -> list[str]:
+    # WHY: decoding is strict, like the `git show` text reads this replaced;
+    # a file that is not UTF-8 fails loudly instead of replaying altered lines.
+    return raw_content.decode("utf-8").splitlines()
+
+
+class LazyFileLinesByPath(Mapping):
+    """Path -> file lines mapping that keeps raw blob bytes until a path is first read."""
+
+    def __init__(self, raw_content_by_path: dict[str, bytes]):
+        self._raw_content_by_path = raw_content_by_path
+        self._decoded: dict[str, list[str]] = {}
+
+    def __getitem__(self, path: str) -> list[str]:
+        lines = self._decoded.get(path)
+        if lines is None:
+            lines = decode_file_lines(self._raw_content_by_path[path])
+            self._decoded[path] = lines
+        return lines
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_content_by_path)
+
+    def __len__(self) -> int:
+        return len(self._raw_content_by_path)
+
+
+def read_git_file_lines_by_path(
+    reader: GitCatFileReader,
+    requests: list[tuple[str, str]],
+) -> LazyFileLinesByPath:
+    raw_contents = reader.read_blobs(requests)
+    return LazyFileLinesByPath(
+        {
+            relative_path: raw_content
+            for (_revision_id, relative_path), raw_content in zip(requests, raw_contents)
+            if raw_content is not None
+        }
+    )
+
+
+def read_git_commit_diff_file_lines(
+    reader: GitCatFileReader,
+    parsed_patch: ParsedCommitDiff,
+    revision_id: str,
+    parent_revision: str | None,
+    scope: str,
+) -> tuple[LazyFileLinesByPath, LazyFileLinesByPath]:
+    base_requests: list[tuple[str, str]] = []
+    if parent_revision is not None:
+        for old_path in dict.fromkeys(commit_diff_file.old_path for commit_diff_file in parsed_patch.files):
+            if is_included_file_path(old_path, scope):
+                base_requests.append((parent_revision, old_path))
+    final_requests = [
+        (revision_id, new_path)
+        for new_path in dict.fromkeys(commit_diff_file.new_path for commit_diff_file in parsed_patch.files)
+        if is_included_file_path(new_path, scope)
+    ]
+    return (
+        read_git_file_lines_by_path(reader, base_requests),
+        read_git_file_lines_by_path(reader, final_requests),
+    )
+
+
+_GIT_LOG_COMMIT_MARKER = "\x01"
+GIT_HISTORY_SCAN_MODES = ("per-revision", "single-pass")
+DEFAULT_GIT_HISTORY_SCAN = "per-revision"
+
+
+def git_scope_pathspecs(scope: str = "A") -> list[str]:
+    if scope == "C":
+        extensions = DOC_EXTENSIONS
+    elif scope == "D":
+        extensions = SOURCE_EXTENSIONS | DOC_EXTENSIONS
+    else:
+        extensions = SOURCE_EXTENSIONS
+    return [f"*{extension}" for extension in sorted(extensions)]
+
+
+def iter_git_commit_diff_sequence_single_pass(
+    repo_dir: Path,
+    revision_ids: list[str],
+    scope: str = "A",
+) -> Iterator[RevisionCommitDiff]:
+    # WHY: one streaming `git log -p` replaces the per-revision parent lookup,
+    # name-status listing and patch builds. The scope pathspecs limit rename
+    # detection the same way the per-revision `git diff -- <paths>` does, and
+    # merges are diffed against their first parent like the per-revision path.
+    # --full-history keeps merges that only match their second parent.
+    command = [
+        "git",
+        "log",
+        "-p",
+        "--no-walk=unsorted",
+        "--stdin",
+        "--full-history",
+        "--root",
+        "--diff-merges=first-parent",
+        "--find-renames=25%",
+        "--no-color",
+        "--no-ext-diff",
+        f"--format={_GIT_LOG_COMMIT_MARKER}%H %P",
+        "--",
+        *git_scope_pathspecs(scope),
+    ]
+    # WHY: stderr goes to a temporary file rather than a pipe. It is only read
+    # once stdout is drained, and a pipe filled by warnings would stall git
+    # before it finished writing the patches.
+    error_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=repo_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=error_file,
+            text=True,
+        )
+    except FileNotFoundError as exc:
+        error_file.close()
+        raise CommandExecutionError("Required command not found: git") from exc
+
+    reader = get_git_cat_file_reader(repo_dir)
+    completed = False
+    try:
+        # WHY: git reads every --stdin revision before it starts writing, so the
+        # whole list can be written up front without deadlocking on stdout.
+        process.stdin.write("".join(f"{revision_id}\n" for revision_id in revision_ids))
+        process.stdin.close()
+
+        commit_header: list[str] | None = None
+        patch_lines: list[str] = []
+        for raw_line in process.stdout:
+            if raw_line.startswith(_GIT_LOG_COMMIT_MARKER):
+                if commit_header is not None:
+                    revision_diff = _build_single_pass_revision_diff(reader, commit_header, patch_lines, scope)
+                    if revision_diff is not None:
+                        yield revision_diff
+                commit_header = raw_line[1:].split()
+                patch_lines = []
+                continue
+            patch_lines.append(raw_line)
+        if commit_header is not None:
+            revision_diff = _build_single_pass_revision_diff(reader, commit_header, patch_lines, scope)
+            if revision_diff is not None:
+                yield revision_diff
+
+        if process.wait(timeout=COMMAND_TIMEOUT_SECONDS) != 0:
+            error_file.seek(0)
+            error_output = error_file.read().decode("utf-8", errors="replace")
+            raise CommandExecutionError(
+                f"Command failed ({process.returncode}): {' '.join(command)}\n"
+                f"{(error_output or 'command failed without output').strip()}"
+            )
+        completed = True
+    finally:
+        if not completed and process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        error_file.close()
+
+
+def _build_single_pass_revision_diff(
+    reader: GitCatFileReader,
+    commit_header: list[str],
+    patch_lines: list[str],
+    scope: str,
+) -> RevisionCommitDiff | None:
+    # WHY: the lines are parsed as they are instead of joined into one patch
+    # text; trailing whitespace is trimmed as str.strip() trimmed the joined text.
+    while patch_lines and not patch_lines[-1].strip():
+        patch_lines.pop()
+    if not patch_lines:
+        return None
+    patch_lines[-1] = patch_lines[-1].rstrip()
+
+    revision_id, parent_revision_ids = commit_header[0], commit_header[1:]
+    parent_revision = parent_revision_ids[0] if parent_revision_ids else None
+    parsed_patch = parse_commit_diff_patch(patch_lines)
+    base_file_lines_by_old_path, final_file_lines_by_new_path = read_git_commit_diff_file_lines(
+        reader,
+        parsed_patch,
+        revision_id,
+        parent_revision,
+        scope,
+    )
+    return RevisionCommitDiff(
+        revision_id=revision_id,
+        parsed_patch=parsed_patch,
+        base_file_lines_by_old_path=base_file_lines_by_old_path or None,
+        parent_revision_ids=parent_revision_ids or None,
+        final_file_lines_by_new_path=final_file_lines_by_new_path or None,
+    )
+
+
+def load_algorithm_b_git_commit_diff_sequence(
+    args: argparse.Namespace,
+    repo_dir: Path,
+    revision_ids: list[str],
+    revision_metadata: RevisionMetadataCache,
+) -> Iterable[RevisionCommitDiff]:
+    if getattr(args, "gitHistoryScan", DEFAULT_GIT_HISTORY_SCAN) == "single-pass":
+        commit_diffs = iter_git_commit_diff_sequence_single_pass(repo_dir, revision_ids, args.scope)
+    else:
+        commit_diffs = iter_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, args.scope, revision_metadata)
+    if getattr(args, "replayMode", DEFAULT_REPLAY_MODE) == "streaming":
+        return _require_commit_diffs(commit_diffs)
+
+    loaded_sequence = list(commit_diffs)
+    if not loaded_sequence:
+        raise ProtocolValidationError(NO_LOCAL_GIT_COMMIT_DIFFS_MESSAGE)
+    return loaded_sequence
+
+
+def _require_commit_diffs(commit_diffs: Iterator[RevisionCommitDiff]) -> Iterator[RevisionCommitDiff]:
+    yielded = False
+    for revision_diff in commit_diffs:
+        yielded = True
+        yield revision_diff
+    if not yielded:
+        raise ProtocolValidationError(NO_LOCAL_GIT_COMMIT_DIFFS_MESSAGE)
+
+
+def reconstruct_base_line_states_from_lines(file_lines: list[str]) -> LineStateColumns:
+    base_lines = LineStateColumns()
+    base_lines.contents = [sys.intern(line) for line in file_lines]
+    base_lines.origins = array.array("I", bytes(4 * len(file_lines)))
+    base_lines.gen_ratios = array.array("B", bytes(len(file_lines)))
+    return base_lines
+
+
+def _patience_anchor_pairs(
+    final_ids: list[int],
+    parent_ids: list[int],
+    final_lo: int,
+    final_hi: int,
+    parent_lo: int,
+    parent_hi: int,
+) -> list[tuple[int, int]]:
+    final_positions: dict[int, int] = {}
+    for index in range(final_lo, final_hi):
+        line_id = final_ids[index]
+        final_positions[line_id] = -1 if line_id in final_positions else index
+    parent_positions: dict[int, int] = {}
+    for index in range(parent_lo, parent_hi):
+        line_id = parent_ids[index]
+        if final_positions.get(line_id, -1) >= 0:
+            parent_positions[line_id] = -1 if line_id in parent_positions else index
+
+    candidates = [
+        (final_positions[line_id], parent_index)
+        for line_id, parent_index in parent_positions.items()
+        if parent_index >= 0
+    ]
+    candidates.sort()
+    # WHY: the longest increasing run of parent positions (ordered by final
+    # position) is the patience anchor chain, found in O(k log k).
+    tails: list[int] = []
+    tail_indexes: list[int] = []
+    previous: list[int] = [-1] * len(candidates)
+    for candidate_index, (_final_index, parent_index) in enumerate(candidates):
+        slot = bisect.bisect_left(tails, parent_index)
+        if slot:
+            previous[candidate_index] = tail_indexes[slot - 1]
+        if slot == len(tails):
+            tails.append(parent_index)
+            tail_indexes.append(candidate_index)
+        else:
+            tails[slot] = parent_index
+            tail_indexes[slot] = candidate_index
+
+    anchors: list[tuple[int, int]] = []
+    candidate_index = tail_indexes[-1] if tail_indexes else -1
+    while candidate_index >= 0:
+        anchors.append(candidates[candidate_index])
+        candidate_index = previous[candidate_index]
+    anchors.reverse()
+    return anchors
+
+
+def align_final_lines_to_parent(final_ids: list[int], parent_ids: list[int]) -> list[int | None]:
+    """Map each final line to the parent line it is carried from, using patience alignment.
+
+    Line ids are interned content hashes. Regions without unique anchors fall
+    back to difflib matching blocks within that region only.
+    """
+    parent_index_by_final_index: list[int | None] = [None] * len(final_ids)
+    pending = [(0, len(final_ids), 0, len(parent_ids))]
+    while pending:
+        final_lo, final_hi, parent_lo, parent_hi = pending.pop()
+        while final_lo < final_hi and parent_lo < parent_hi and final_ids[final_lo] == parent_ids[parent_lo]:
+            parent_index_by_final_index[final_lo] = parent_lo
+            final_lo += 1
+            parent_lo += 1
+        while final_lo < final_hi and parent_lo < parent_hi and final_ids[final_hi - 1] == parent_ids[parent_hi - 1]:
+            final_hi -= 1
+            parent_hi -= 1
+            parent_index_by_final_index[final_hi] = parent_hi
+        if final_lo == final_hi or parent_lo == parent_hi:
+            continue
+
+        anchors = _patience_anchor_pairs(final_ids, parent_ids, final_lo, final_hi, parent_lo, parent_hi)
+        if not anchors:
+            matcher = difflib.SequenceMatcher(
+                None, final_ids[final_lo:final_hi], parent_ids[parent_lo:parent_hi], autojunk=False
+            )
+            for final_offset, parent_offset, size in matcher.get_matching_blocks():
+                for step in range(size):
+                    parent_index_by_final_index[final_lo + final_offset + step] = parent_lo + parent_offset + step
+            continue
+
+        for final_index, parent_index in anchors:
+            parent_index_by_final_index[final_index] = parent_index
+            pending.append((final_lo, final_index, parent_lo, parent_index))
+            final_lo, parent_lo = final_index + 1, parent_index + 1
+        pending.append((final_lo, final_hi, parent_lo, parent_hi))
+
+    return parent_index_by_final_index
 
 
 def merge_commit_file_line_states(
-    first_parent_lines: list[LineState],
-    other_parent_lines: list[list[LineState]],
+    first_parent_lines: Sequence[LineState],
+    other_parent_lines: list[Sequence[LineState]],
     final_file_lines: list[str],
     revision_id: str,
     target_path: str,
     protocol_index: dict[str, IndexedFileDetail] | None = None,
-) -> list[LineState]:
-    merged_lines: list[LineState] = []
-    first_parent_cursor = 0
-    other_parent_cursors = [0 for _ in other_parent_lines]
-
-    for final_line_number, content in enumerate(final_file_lines, start=1):
-        first_parent_match = find_next_matching_line_state(first_parent_lines, content, first_parent_cursor)
-        other_parent_matches: list[tuple[int, int]] = []
-        for parent_index, parent_lines in enumerate(other_parent_lines):
-            match_index = find_next_matching_line_state(parent_lines, content, other_parent_cursors[parent_index])
-            if match_index is not None:
-                other_parent_matches.append((parent_index, match_index))
-
-        if first_parent_match is not None and (
-            not other_parent_matches or first_parent_match <= min(match_index for _parent_index, match_index in other_parent_matches)
-        ):
-            merged_lines.append(first_parent_lines[first_parent_match])
-            first_parent_cursor = first_parent_match + 1
-            continue
-
-        if other_parent_matches:
-            parent_index, match_index = min(other_parent_matches, key=lambda item: item[1])
-            merged_lines.append(other_parent_lines[parent_index][match_index])
-            other_parent_cursors[parent_index] = match_index + 1
-            continue
+) -> LineStateColumns:
+    line_ids: dict[str, int] = {}
+
+    def intern_contents(contents: Iterable[str]) -> list[int]:
+        return [line_ids.setdefault(content, len(line_ids)) for content in contents]
+
+    final_ids = intern_contents(final_file_lines)
+    parent_lines_in_order = [LineStateColumns.from_line_states(parent_lines) for parent_lines in (first_parent_lines, *other_parent_lines)]
+    # WHY: the first parent's alignment is consulted first, so a line both
+    # sides carry keeps the mainline origin, as git blame --first-parent does.
+    alignments = [
+        align_final_lines_to_parent(final_ids, intern_contents(parent_lines.contents))
+        for parent_lines in parent_lines_in_order
+    ]
 
-        merged_lines.append(
-            LineState(
-                content=content,
-                origin_revision_id=revision_id,
-                gen_ratio=0 if protocol_index is None else line_ratio(protocol_index, target_path, final_line_number),
+    origin = REVISION_ID_TABLE.index(revision_id)
+    merged_lines = LineStateColumns()
+    for final_index, content in enumerate(final_file_lines):
+        for parent_lines, alignment in zip(parent_lines_in_order, alignments):
+            parent_index = alignment[final_index]
+            if parent_index is not None:
+                merged_lines.append_from(parent_lines, parent_index)
+                break
+        else:
+            merged_lines.append(
+                sys.intern(content),
+                origin,
+                0 if protocol_index is None else line_ratio(protocol_index, target_path, final_index + 1),
             )
-        )
 
     return merged_lines
 
 
-def reconstruct_base_line_states_from_patch(commit_diff_file: CommitDiffFile) -> list[LineState]:
+def reconstruct_base_line_states_from_patch(commit_diff_file: CommitDiffFile) -> LineStateColumns:
     if len(commit_diff_file.hunks) != 1:
         raise UnsupportedConfigurationError(
             "Current Algorithm B offline slice only supports a single hunk in the first patch when reconstructing the base file"
@@ -1063,10 +2461,10 @@ def reconstruct_base_line_states_from_patch(commit_diff_file: CommitDiffFile) ->
             "Current Algorithm B offline slice only supports first-patch base reconstruction starting at line 1 or from an empty file"
         )
 
-    base_lines: list[LineState] = []
+    base_lines = LineStateColumns()
     for diff_line in first_hunk.lines:
         if diff_line.kind in {"context", "delete"}:
-            base_lines.append(LineState(content=diff_line.content, origin_revision_id=None, gen_ratio=0))
+            base_lines.append(sys.intern(diff_line.content), 0, 0)
     return base_lines
 
 
@@ -1092,111 +2490,408 @@ def reconstruct_final_line_states_from_commit_diff_sequence(
     return target_file, current_lines
 
 
+class FileStateSnapshot(Mapping):
+    """Persistent path -> line states mapping that shares unchanged files with the snapshot it derives from.
+
+    Line-state lists are treated as immutable values: replay always builds a
+    new list for a touched file, so a snapshot only records the paths its
+    revision removed, updated in place or appended, on top of its base.
+    """
+
+    MAX_DEPTH = 32
+
+    __slots__ = ("_base", "_removed", "_updated", "_appended", "_depth", "_size", "__weakref__")
+
+    def __init__(
+        self,
+        base: "FileStateSnapshot | None" = None,
+        removed: frozenset[str] = frozenset(),
+        updated: dict[str, list[LineState]] | None = None,
+        appended: dict[str, list[LineState]] | None = None,
+    ):
+        self._base = base
+        self._removed = removed
+        self._updated = updated or {}
+        self._appended = appended or {}
+        self._depth = 0 if base is None else base._depth + 1
+        self._size = (0 if base is None else len(base)) - len(removed) + len(self._appended)
+
+    def __getitem__(self, path: str) -> list[LineState]:
+        node: FileStateSnapshot | None = self
+        while node is not None:
+            if path in node._appended:
+                return node._appended[path]
+            if path in node._updated:
+                return node._updated[path]
+            if path in node._removed:
+                break
+            node = node._base
+        raise KeyError(path)
+
+    def __iter__(self) -> Iterator[str]:
+        for path, _line_states in self.items():
+            yield path
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self) -> Iterator[tuple[str, list[LineState]]]:
+        if self._base is not None:
+            for path, line_states in self._base.items():
+                if path not in self._removed:
+                    yield path, self._updated.get(path, line_states)
+        yield from self._appended.items()
+
+    def derive(
+        self,
+        removed: set[str],
+        updated: dict[str, list[LineState]],
+        appended: dict[str, list[LineState]],
+    ) -> "FileStateSnapshot":
+        if not removed and not updated and not appended:
+            return self
+        derived = FileStateSnapshot(self, frozenset(removed), updated, appended)
+        if derived._depth > self.MAX_DEPTH:
+            # WHY: lookups walk the base chain, so long chains are flattened
+            # back into one path map. That costs O(files) once every MAX_DEPTH
+            # revisions instead of on every snapshot.
+            return FileStateSnapshot(appended=dict(derived.items()))
+        return derived
+
+
+EMPTY_FILE_STATE_SNAPSHOT = FileStateSnapshot()
+
+
+class FileStateWorkingSet:
+    """Mutable view of one revision's file states on top of its parent snapshot.
+
+    pop and item assignment follow dict insertion order (a popped and re-added
+    path moves to the end), so replay output order matches a plain dict.
+    """
+
+    def __init__(self, base: FileStateSnapshot):
+        self._base = base
+        self._removed: set[str] = set()
+        self._updated: dict[str, list[LineState]] = {}
+        self._appended: dict[str, list[LineState]] = {}
+
+    def _in_base(self, path: str) -> bool:
+        return path not in self._removed and path in self._base
+
+    def pop(self, path: str, default: list[LineState] | None = None) -> list[LineState] | None:
+        if path in self._appended:
+            return self._appended.pop(path)
+        if self._in_base(path):
+            line_states = self._updated.pop(path, None)
+            self._removed.add(path)
+            return self._base[path] if line_states is None else line_states
+        return default
+
+    def __setitem__(self, path: str, line_states: list[LineState]) -> None:
+        if path not in self._appended and self._in_base(path):
+            self._updated[path] = line_states
+        else:
+            self._appended[path] = line_states
+
+    def freeze(self) -> FileStateSnapshot:
+        return self._base.derive(self._removed, self._updated, self._appended)
+
+
+def replay_revision_commit_diff(
+    revision_diff: RevisionCommitDiff,
+    file_states: FileStateSnapshot,
+    revision_file_states: Mapping[str, FileStateSnapshot],
+    protocol_index: dict[str, IndexedFileDetail] | None,
+    scope: str = "A",
+) -> FileStateSnapshot:
+    parent_revision_ids = revision_diff.parent_revision_ids or []
+    if parent_revision_ids:
+        file_states = revision_file_states.get(parent_revision_ids[0], EMPTY_FILE_STATE_SNAPSHOT)
+    working_set = FileStateWorkingSet(file_states)
+
+    for commit_diff_file in revision_diff.parsed_patch.files:
+        if not is_included_file_path(commit_diff_file.old_path, scope) and not is_included_file_path(commit_diff_file.new_path, scope):
+            continue
+
+        if len(parent_revision_ids) > 1 and revision_diff.final_file_lines_by_new_path is not None:
+            final_file_lines = revision_diff.final_file_lines_by_new_path.get(commit_diff_file.new_path)
+            if final_file_lines is not None:
+                first_parent_lines = revision_file_states.get(parent_revision_ids[0], {}).get(commit_diff_file.old_path)
+                if first_parent_lines is None:
+                    first_parent_lines = revision_file_states.get(parent_revision_ids[0], {}).get(commit_diff_file.new_path, [])
+                other_parent_line_states: list[list[LineState]] = []
+                for parent_revision_id in parent_revision_ids[1:]:
+                    parent_file_states = revision_file_states.get(parent_revision_id, {})
+                    side_lines = parent_file_states.get(commit_diff_file.new_path)
+                    if side_lines is None:
+                        side_lines = parent_file_states.get(commit_diff_file.old_path)
+                    if side_lines is not None:
+                        other_parent_line_states.append(side_lines)
+                updated_lines = merge_commit_file_line_states(
+                    first_parent_lines or [],
+                    other_parent_line_states,
+                    final_file_lines,
+                    revision_diff.revision_id,
+                    commit_diff_file.new_path,
+                    protocol_index,
+                )
+                working_set.pop(commit_diff_file.old_path, None)
+                working_set[commit_diff_file.new_path] = updated_lines
+                continue
+
+        current_lines = working_set.pop(commit_diff_file.old_path, None)
+        if current_lines is None:
+            current_lines = working_set.pop(commit_diff_file.new_path, None)
+        if current_lines is None:
+            base_file_lines_by_old_path = revision_diff.base_file_lines_by_old_path or {}
+            base_file_lines = base_file_lines_by_old_path.get(commit_diff_file.old_path)
+            if base_file_lines is not None:
+                current_lines = reconstruct_base_line_states_from_lines(base_file_lines)
+            else:
+                current_lines = reconstruct_base_line_states_from_patch(commit_diff_file)
+
+        updated_lines = apply_commit_diff_file_to_line_states(
+            current_lines,
+            commit_diff_file,
+            revision_diff.revision_id,
+            protocol_index,
+        )
+        working_set[commit_diff_file.new_path] = updated_lines
+
+    return working_set.freeze()
+
+
 def reconstruct_final_file_states_by_path_from_commit_diff_sequence(
     commit_diff_sequence: list[RevisionCommitDiff],
     protocol_indexes: dict[str, dict[str, IndexedFileDetail]] | None = None,
     scope: str = "A",
     *,
     out_revision_file_states: dict | None = None,
+    on_revision: Callable[[RevisionCommitDiff, FileStateSnapshot], None] | None = None,
 ) -> dict[str, list[LineState]]:
-    if not commit_diff_sequence:
-        raise ProtocolValidationError("Algorithm B replay requires at least one replayable commit diff patch")
+    return replay_commit_diff_stream(
+        commit_diff_sequence,
+        [revision_diff.revision_id for revision_diff in commit_diff_sequence],
+        {revision_diff.revision_id: revision_diff.parent_revision_ids or [] for revision_diff in commit_diff_sequence},
+        None if protocol_indexes is None else protocol_indexes.get,
+        scope,
+        out_revision_file_states=out_revision_file_states,
+        on_revision=on_revision,
+    )
 
-    file_states: dict[str, list[LineState]] = {}
-    revision_file_states: dict[str, dict[str, list[LineState]]] = {}
 
+def plan_commit_diff_lineage_shards(
+    commit_diff_sequence: list[RevisionCommitDiff],
+    shard_count: int,
+    scope: str = "A",
+) -> list[set[str]]:
+    """Group paths joined by renames into lineages and spread them, heaviest first, over at most shard_count shards."""
+    parents: dict[str, str] = {}
+
+    def find(path: str) -> str:
+        root = parents.setdefault(path, path)
+        while root != parents[root]:
+            root = parents[root]
+        while path != root:
+            parents[path], path = root, parents[path]
+        return root
+
+    path_weights: dict[str, int] = {}
     for revision_diff in commit_diff_sequence:
-        protocol_index = None if protocol_indexes is None else protocol_indexes.get(revision_diff.revision_id)
-        parent_revision_ids = revision_diff.parent_revision_ids or []
-        if parent_revision_ids:
-            file_states = {
-                path: list(line_states)
-                for path, line_states in revision_file_states.get(parent_revision_ids[0], {}).items()
-            }
-
         for commit_diff_file in revision_diff.parsed_patch.files:
             if not is_included_file_path(commit_diff_file.old_path, scope) and not is_included_file_path(commit_diff_file.new_path, scope):
                 continue
+            paths = [path for path in (commit_diff_file.old_path, commit_diff_file.new_path) if path != "/dev/null"]
+            if not paths:
+                continue
+            roots = [find(path) for path in paths]
+            if roots[0] != roots[-1]:
+                parents[roots[-1]] = roots[0]
+            path_weights[paths[0]] = path_weights.get(paths[0], 0) + 1 + sum(len(hunk.lines) for hunk in commit_diff_file.hunks)
+
+    lineages: dict[str, tuple[set[str], list[int]]] = {}
+    for path in parents:
+        paths, weight = lineages.setdefault(find(path), (set(), [0]))
+        paths.add(path)
+        weight[0] += path_weights.get(path, 0)
+
+    shards: list[tuple[int, set[str]]] = [(0, set()) for _ in range(max(1, shard_count))]
+    for paths, weight in sorted(lineages.values(), key=lambda lineage: (-lineage[1][0], min(lineage[0]))):
+        lightest = min(range(len(shards)), key=lambda index: shards[index][0])
+        shards[lightest] = (shards[lightest][0] + weight[0], shards[lightest][1] | paths)
+    return [paths for _weight, paths in shards if paths]
+
+
+def _replay_commit_diff_shard(
+    item: tuple[list[RevisionCommitDiff], dict[str, dict[str, IndexedFileDetail]] | None, str],
+) -> dict[str, list[LineState]] | None:
+    """Replay one lineage shard; runs in worker processes and returns None when the caller must replay serially."""
+    commit_diff_sequence, protocol_indexes, scope = item
+    parked_revision_ids: list[str] = []
+
+    # WHY: deletions park their lines under "/dev/null" until the next add of
+    # a new file takes them, which can cross lineages; such windows replay
+    # serially so the shared placeholder behaves exactly as before.
+    def note_parked_lines(revision_diff: RevisionCommitDiff, file_states: FileStateSnapshot) -> None:
+        if file_states.get("/dev/null"):
+            parked_revision_ids.append(revision_diff.revision_id)
 
-            if len(parent_revision_ids) > 1 and revision_diff.final_file_lines_by_new_path is not None:
-                final_file_lines = revision_diff.final_file_lines_by_new_path.get(commit_diff_file.new_path)
-                if final_file_lines is not None:
-                    first_parent_lines = revision_file_states.get(parent_revision_ids[0], {}).get(commit_diff_file.old_path)
-                    if first_parent_lines is None:
-                        first_parent_lines = revision_file_states.get(parent_revision_ids[0], {}).get(commit_diff_file.new_path, [])
-                    other_parent_line_states: list[list[LineState]] = []
-                    for parent_revision_id in parent_revision_ids[1:]:
-                        parent_file_states = revision_file_states.get(parent_revision_id, {})
-                        side_lines = parent_file_states.get(commit_diff_file.new_path)
-                        if side_lines is None:
-                            side_lines = parent_file_states.get(commit_diff_file.old_path)
-                        if side_lines is not None:
-                            other_parent_line_states.append(side_lines)
-                    updated_lines = merge_commit_file_line_states(
-                        first_parent_lines or [],
-                        other_parent_line_states,
-                        final_file_lines,
-                        revision_diff.revision_id,
-                        commit_diff_file.new_path,
-                        protocol_index,
-                    )
-                    file_states.pop(commit_diff_file.old_path, None)
-                    file_states[commit_diff_file.new_path] = updated_lines
-                    continue
+    try:
+        file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+            commit_diff_sequence,
+            protocol_indexes,
+            scope,
+            on_revision=note_parked_lines,
+        )
+    except AggregateGenCodeDescError:
+        return None
+    if parked_revision_ids:
+        return None
+    return {path: line_states for path, line_states in file_states_by_path.items() if path != "/dev/null"}
 
-            current_lines = file_states.pop(commit_diff_file.old_path, None)
-            if current_lines is None:
-                current_lines = file_states.pop(commit_diff_file.new_path, None)
-            if current_lines is None:
-                base_file_lines_by_old_path = revision_diff.base_file_lines_by_old_path or {}
-                base_file_lines = base_file_lines_by_old_path.get(commit_diff_file.old_path)
-                if base_file_lines is not None:
-                    current_lines = reconstruct_base_line_states_from_lines(base_file_lines)
-                else:
-                    current_lines = reconstruct_base_line_states_from_patch(commit_diff_file)
 
-            updated_lines = apply_commit_diff_file_to_line_states(
-                current_lines,
-                commit_diff_file,
-                revision_diff.revision_id,
-                protocol_index,
+def replay_commit_diff_sequence_sharded(
+    commit_diff_sequence: list[RevisionCommitDiff],
+    protocol_indexes: dict[str, dict[str, IndexedFileDetail]] | None,
+    scope: str,
+    shard_count: int,
+) -> dict[str, list[LineState]] | None:
+    """Replay rename lineages on separate worker processes and merge their final file states.
+
+    Returns None when the window has merge commits, fits in one shard, or a
+    shard hit something only the serial replay reproduces exactly.
+    """
+    if any(len(revision_diff.parent_revision_ids or []) > 1 for revision_diff in commit_diff_sequence):
+        return None
+    shards = plan_commit_diff_lineage_shards(commit_diff_sequence, shard_count, scope)
+    if len(shards) < 2:
+        return None
+    shard_by_path = {path: shard_index for shard_index, paths in enumerate(shards) for path in paths}
+
+    # WHY: every shard replays every revision, even ones that do not touch
+    # its files, so first-parent snapshot resets behave as in the serial run.
+    shard_sequences: list[list[RevisionCommitDiff]] = [[] for _ in shards]
+    for revision_diff in commit_diff_sequence:
+        files_by_shard: list[list[CommitDiffFile]] = [[] for _ in shards]
+        for commit_diff_file in revision_diff.parsed_patch.files:
+            path = commit_diff_file.new_path if commit_diff_file.old_path == "/dev/null" else commit_diff_file.old_path
+            shard_index = shard_by_path.get(path)
+            if shard_index is not None:
+                files_by_shard[shard_index].append(commit_diff_file)
+        base_file_lines_by_old_path = revision_diff.base_file_lines_by_old_path
+        for shard_index, files in enumerate(files_by_shard):
+            shard_sequences[shard_index].append(
+                RevisionCommitDiff(
+                    revision_id=revision_diff.revision_id,
+                    parsed_patch=ParsedCommitDiff(files),
+                    base_file_lines_by_old_path=None
+                    if base_file_lines_by_old_path is None
+                    else {path: lines for path, lines in base_file_lines_by_old_path.items() if shard_by_path.get(path) == shard_index},
+                    parent_revision_ids=revision_diff.parent_revision_ids,
+                )
             )
-            file_states[commit_diff_file.new_path] = updated_lines
 
-        revision_file_states[revision_diff.revision_id] = {
-            path: list(line_states) for path, line_states in file_states.items()
-        }
+    items = []
+    for shard_index, shard_sequence in enumerate(shard_sequences):
+        shard_indexes = None
+        if protocol_indexes is not None:
+            shard_indexes = {
+                revision_id: {path: detail for path, detail in protocol_index.items() if shard_by_path.get(path) == shard_index}
+                for revision_id, protocol_index in protocol_indexes.items()
+            }
+        items.append((shard_sequence, shard_indexes, scope))
 
+    file_states_by_path: dict[str, list[LineState]] = {}
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        for shard_file_states in executor.map(_replay_commit_diff_shard, items):
+            if shard_file_states is None:
+                return None
+            file_states_by_path.update(shard_file_states)
+    return file_states_by_path or None
+
+
+def plan_snapshot_release_positions(
+    revision_ids: list[str],
+    parent_revision_ids_by_revision: Mapping[str, list[str]],
+) -> dict[str, int]:
+    """Map each window parent revision to the stream position of its last child."""
+    release_positions: dict[str, int] = {}
+    for position, revision_id in enumerate(revision_ids):
+        for parent_revision_id in parent_revision_ids_by_revision.get(revision_id) or []:
+            release_positions[parent_revision_id] = position
+    return release_positions
+
+
+def replay_commit_diff_stream(
+    commit_diff_stream: Iterable[RevisionCommitDiff],
+    revision_ids: list[str],
+    parent_revision_ids_by_revision: Mapping[str, list[str]],
+    load_protocol_index: Callable[[str], dict[str, IndexedFileDetail]] | None = None,
+    scope: str = "A",
+    *,
+    out_revision_file_states: dict | None = None,
+    out_revision_prev_map: dict | None = None,
+    on_revision: Callable[[RevisionCommitDiff, FileStateSnapshot], None] | None = None,
+) -> dict[str, list[LineState]]:
+    # WHY: a revision snapshot is only read back when a later revision names
+    # it as a parent, so it is dropped once the stream passes the last such
+    # child (children without replayable diffs are skipped by the loaders and
+    # must not pin it). Only callers that read revision states after replay,
+    # such as window batches, ask for every snapshot to be kept; on_revision
+    # sees each snapshot as it is built.
+    retain_all_snapshots = out_revision_file_states is not None
+    release_positions = plan_snapshot_release_positions(revision_ids, parent_revision_ids_by_revision)
+    revision_positions = {revision_id: position for position, revision_id in enumerate(revision_ids)}
+    release_buckets: dict[int, list[str]] = {}
+    file_states = EMPTY_FILE_STATE_SNAPSHOT
+    revision_file_states: dict[str, FileStateSnapshot] = {}
+    previous_revision_id: str | None = None
+    replayed_count = 0
+
+    for revision_diff in commit_diff_stream:
+        revision_id = revision_diff.revision_id
+        protocol_index = None if load_protocol_index is None else load_protocol_index(revision_id)
+        file_states = replay_revision_commit_diff(revision_diff, file_states, revision_file_states, protocol_index, scope)
+        replayed_count += 1
+        if on_revision is not None:
+            on_revision(revision_diff, file_states)
+        if out_revision_prev_map is not None:
+            parent_revision_ids = revision_diff.parent_revision_ids or []
+            out_revision_prev_map[revision_id] = parent_revision_ids[0] if parent_revision_ids else previous_revision_id
+        previous_revision_id = revision_id
+
+        position = revision_positions.get(revision_id)
+        if retain_all_snapshots:
+            revision_file_states[revision_id] = file_states
+            continue
+        if position is None:
+            continue
+        for released_position in [bucket for bucket in release_buckets if bucket <= position]:
+            for released_revision_id in release_buckets.pop(released_position):
+                del revision_file_states[released_revision_id]
+        release_position = release_positions.get(revision_id, -1)
+        if release_position > position:
+            revision_file_states[revision_id] = file_states
+            release_buckets.setdefault(release_position, []).append(revision_id)
+
+    if not replayed_count:
+        raise ProtocolValidationError("Algorithm B replay requires at least one replayable commit diff patch")
     if not file_states:
         raise ProtocolValidationError("Algorithm B replay did not produce any final file state")
 
     if out_revision_file_states is not None:
         out_revision_file_states.update(revision_file_states)
 
-    return file_states
+    return dict(file_states.items())
 
 
 def summarize_live_changed_file_states_by_revision_ids(
-    file_states_by_path: dict[str, list[LineState]],
+    file_states_by_path: Mapping[str, list[LineState]],
     included_revision_ids: list[str],
     scope: str = "A",
 ) -> dict[str, int]:
-    total_key, full_key, partial_key = _summary_field_names(scope)
-    total_code_lines = 0
-    full_generated_code_lines = 0
-    partial_generated_code_lines = 0
-
-    for line_states in file_states_by_path.values():
-        file_summary = summarize_live_changed_line_states_by_revision_ids(line_states, included_revision_ids, scope)
-        total_code_lines += file_summary[total_key]
-        full_generated_code_lines += file_summary[full_key]
-        partial_generated_code_lines += file_summary[partial_key]
-
-    return {
-        total_key: total_code_lines,
-        full_key: full_generated_code_lines,
-        partial_key: partial_generated_code_lines,
-    }
+    included_revision_id_set = set(included_revision_ids)
+    return _summarize_code_line_states(file_states_by_path.values(), included_revision_id_set.__contains__, scope)
 
 
 def summarize_live_snapshot_line_states(
@@ -1206,69 +2901,27 @@ def summarize_live_snapshot_line_states(
     end_bound: datetime,
     scope: str = "A",
 ) -> dict[str, int]:
-    total_code_lines = 0
-    full_generated_code_lines = 0
-    partial_generated_code_lines = 0
-
-    for line_state in line_states:
-        if not is_code_line(line_state.content, scope):
-            continue
-
-        origin_revision_id = line_state.origin_revision_id
-        if origin_revision_id is None:
-            continue
-
-        commit_time = revision_commit_times.get(origin_revision_id)
-        if commit_time is None:
-            raise ProtocolValidationError(
-                f"Missing commit time for replayed live-snapshot revision {origin_revision_id}"
-            )
-        if not (start_bound <= commit_time <= end_bound):
-            continue
-
-        total_code_lines += 1
-        if line_state.gen_ratio == 100:
-            full_generated_code_lines += 1
-        elif line_state.gen_ratio > 0:
-            partial_generated_code_lines += 1
-
-    total_key, full_key, partial_key = _summary_field_names(scope)
-    return {
-        total_key: total_code_lines,
-        full_key: full_generated_code_lines,
-        partial_key: partial_generated_code_lines,
-    }
+    return summarize_live_snapshot_file_states({"": line_states}, revision_commit_times, start_bound, end_bound, scope)
 
 
 def summarize_live_snapshot_file_states(
-    file_states_by_path: dict[str, list[LineState]],
+    file_states_by_path: Mapping[str, list[LineState]],
     revision_commit_times: dict[str, datetime],
     start_bound: datetime,
     end_bound: datetime,
     scope: str = "A",
 ) -> dict[str, int]:
-    total_key, full_key, partial_key = _summary_field_names(scope)
-    total_code_lines = 0
-    full_generated_code_lines = 0
-    partial_generated_code_lines = 0
-
-    for line_states in file_states_by_path.values():
-        file_summary = summarize_live_snapshot_line_states(
-            line_states,
-            revision_commit_times,
-            start_bound,
-            end_bound,
-            scope,
-        )
-        total_code_lines += file_summary[total_key]
-        full_generated_code_lines += file_summary[full_key]
-        partial_generated_code_lines += file_summary[partial_key]
+    def is_live_in_window(origin_revision_id: str | None) -> bool:
+        if origin_revision_id is None:
+            return False
+        commit_time = revision_commit_times.get(origin_revision_id)
+        if commit_time is None:
+            raise ProtocolValidationError(
+                f"Missing commit time for replayed live-snapshot revision {origin_revision_id}"
+            )
+        return start_bound <= commit_time <= end_bound
 
-    return {
-        total_key: total_code_lines,
-        full_key: full_generated_code_lines,
-        partial_key: partial_generated_code_lines,
-    }
+    return _summarize_code_line_states(file_states_by_path.values(), is_live_in_window, scope)
 
 
 def _build_protocol_index_for_scope(protocol: dict, scope: str) -> dict[str, "IndexedFileDetail"]:
@@ -1297,8 +2950,200 @@ def _log_algorithm_b_summary(logger: "RuntimeLogger", label: str, summary: dict,
         )
 
 
+REPLAY_MODES = ("buffered", "streaming")
+DEFAULT_REPLAY_MODE = "buffered"
+DEFAULT_REPLAY_SHARDS = 1
+
+
+def _describe_commit_diff_count(commit_diffs: Iterable[RevisionCommitDiff], revision_ids: list[str]) -> str:
+    if isinstance(commit_diffs, list):
+        return f"patchCount={len(commit_diffs)}"
+    return f"revisionCount={len(revision_ids)} replayMode=streaming"
+
+
+class PreviousGenRatioColumns:
+    """gen_ratio columns of the snapshot each revision was replayed on, recorded during replay for TransitionHints.
+
+    A revision keeps one byte per line for the files it touched, and only
+    while some snapshot that replay can still reach holds a line it added.
+    Parent snapshots are held on the schedule replay_commit_diff_stream uses,
+    so memory follows the live history rather than the window length.
+    """
+
+    def __init__(
+        self,
+        scope: str = "A",
+        revision_ids: list[str] | None = None,
+        parent_revision_ids_by_revision: Mapping[str, list[str]] | None = None,
+        retain_all: bool = False,
+    ):
+        self._scope = scope
+        # WHY: window batches read the state of every revision after replay,
+        # and without a revision plan no parent can be known to be finished.
+        self._retain_all = retain_all or revision_ids is None
+        self._release_positions = plan_snapshot_release_positions(revision_ids or [], parent_revision_ids_by_revision or {})
+        self._revision_positions = {revision_id: position for position, revision_id in enumerate(revision_ids or [])}
+        self._release_buckets: dict[int, list[str]] = {}
+        self._states_by_revision: dict[str, tuple[FileStateSnapshot, Counter]] = {}
+        self._current: tuple[str, FileStateSnapshot, Counter] | None = None
+        self._base_columns_by_revision: dict[str, dict[str, array.array]] = {}
+
+    def record(self, revision_diff: RevisionCommitDiff, file_states: FileStateSnapshot) -> None:
+        revision_id = revision_diff.revision_id
+        # WHY: the base mirrors replay_revision_commit_diff (first parent, else
+        # the previously replayed revision), which is the revision that
+        # TransitionHints compare a line's origin against.
+        parent_revision_ids = revision_diff.parent_revision_ids or []
+        base_revision_id = parent_revision_ids[0] if parent_revision_ids else None
+        if base_revision_id is None and self._current is not None:
+            base_revision_id = self._current[0]
+        if base_revision_id in self._states_by_revision:
+            base_states, base_counts = self._states_by_revision[base_revision_id]
+        elif self._current is not None and self._current[0] == base_revision_id:
+            base_states, base_counts = self._current[1], self._current[2]
+        else:
+            base_revision_id, base_states, base_counts = None, EMPTY_FILE_STATE_SNAPSHOT, Counter()
+
+        base_columns: dict[str, array.array] = {}
+        origin_delta: Counter = Counter()
+        for commit_diff_file in revision_diff.parsed_patch.files:
+            in_scope = is_included_file_path(commit_diff_file.old_path, self._scope) or is_included_file_path(commit_diff_file.new_path, self._scope)
+            for path in dict.fromkeys((commit_diff_file.old_path, commit_diff_file.new_path)):
+                base_lines = base_states.get(path)
+                line_states = file_states.get(path)
+                if in_scope and base_lines is not None:
+                    base_columns[path] = array.array("B", LineStateColumns.from_line_states(base_lines).gen_ratios)
+                if not self._retain_all and base_lines is not line_states:
+                    if base_lines is not None:
+                        origin_delta.subtract(LineStateColumns.from_line_states(base_lines).origins)
+                    if line_states is not None:
+                        origin_delta.update(LineStateColumns.from_line_states(line_states).origins)
+        if base_columns:
+            self._base_columns_by_revision[revision_id] = base_columns
+        if self._retain_all:
+            self._states_by_revision[revision_id] = (file_states, base_counts)
+            self._current = (revision_id, file_states, base_counts)
+            return
+
+        # WHY: a base snapshot that no later revision reads is handed over to
+        # this revision, so a linear history updates one origin count in place
+        # and only branch points copy it.
+        position = self._revision_positions.get(revision_id)
+        dropped: list[tuple[str, Counter]] = []
+        if position is not None:
+            for released_position in [bucket for bucket in self._release_buckets if bucket <= position]:
+                for released_revision_id in self._release_buckets.pop(released_position):
+                    dropped.append((released_revision_id, self._states_by_revision.pop(released_revision_id)[1]))
+        if self._current is not None and self._current[0] not in self._states_by_revision:
+            dropped.append((self._current[0], self._current[2]))
+        handed_over = next((index for index, (dropped_id, _counts) in enumerate(dropped) if dropped_id == base_revision_id), None)
+        if handed_over is not None:
+            counts = dropped.pop(handed_over)[1]
+        else:
+            counts = base_counts.copy()
+        counts.update(origin_delta)
+        candidates = {origin for origin, delta in origin_delta.items() if delta < 0}
+        for origin in candidates:
+            if counts[origin] <= 0:
+                del counts[origin]
+
+        self._current = (revision_id, file_states, counts)
+        if position is not None and self._release_positions.get(revision_id, -1) > position:
+            self._states_by_revision[revision_id] = (file_states, counts)
+            self._release_buckets.setdefault(self._release_positions[revision_id], []).append(revision_id)
+        candidates.add(REVISION_ID_TABLE.index(revision_id))
+        for _dropped_id, dropped_counts in dropped:
+            candidates.update(dropped_counts)
+        live_counts = [counts, *(held_counts for _states, held_counts in self._states_by_revision.values())]
+        for origin in candidates:
+            if not any(held_counts.get(origin) for held_counts in live_counts):
+                self._base_columns_by_revision.pop(REVISION_ID_TABLE[origin], None)
+
+    def gen_ratio_before(self, revision_id: str, path: str, line_number: int) -> int | None:
+        """gen_ratio at line_number of path in the snapshot revision_id was replayed on, or None when there is no such line."""
+        column = self._base_columns_by_revision.get(revision_id, {}).get(path)
+        if column is None or line_number > len(column):
+            return None
+        return column[line_number - 1]
+
+
+def replay_algorithm_b_commit_diffs(
+    args: argparse.Namespace,
+    logger: RuntimeLogger,
+    provider: GenCodeDescProvider,
+    commit_diffs: Iterable[RevisionCommitDiff],
+    revision_ids: list[str],
+    parent_revision_ids_by_revision: Mapping[str, list[str]],
+    out_revision_file_states: dict | None = None,
+) -> tuple[dict[str, list[LineState]], PreviousGenRatioColumns | None, dict[str, str | None]]:
+    """Replay Algorithm B commit diffs; gen_ratio columns for TransitionHints are only recorded at --logLevel info and above."""
+    protocol_cache_dir = getattr(args, "protocolIndexCacheDir", None)
+    index_preparer = ProtocolIndexPreparer(
+        provider,
+        logger,
+        args,
+        jobs=getattr(args, "indexJobs", DEFAULT_INDEX_JOBS),
+        cache_dir=Path(protocol_cache_dir) if protocol_cache_dir else None,
+    )
+
+    # WHY: the replay set is known up front, so batching providers can fetch
+    # it in a few bulk requests instead of one round trip per revision.
+    provider.prefetch_revision_metadata(args.repoURL, args.repoBranch, revision_ids, args.vcsType)
+    previous_gen_ratios = None
+    if logger.info_enabled():
+        # WHY: the columns follow the release plan of the replay that feeds
+        # them, and the buffered replay plans over the diffs it was given.
+        replay_revision_ids, replay_parent_map = revision_ids, parent_revision_ids_by_revision
+        if isinstance(commit_diffs, list):
+            replay_revision_ids = [revision_diff.revision_id for revision_diff in commit_diffs]
+            replay_parent_map = {revision_diff.revision_id: revision_diff.parent_revision_ids or [] for revision_diff in commit_diffs}
+        previous_gen_ratios = PreviousGenRatioColumns(
+            args.scope,
+            replay_revision_ids,
+            replay_parent_map,
+            retain_all=out_revision_file_states is not None,
+        )
+    on_revision = None if previous_gen_ratios is None else previous_gen_ratios.record
+    if isinstance(commit_diffs, list):
+        protocol_indexes = index_preparer.prepare(revision_diff.revision_id for revision_diff in commit_diffs)
+        logger.debug(
+            f"Prepared {len(protocol_indexes)} genCodeDesc indexes (indexed={index_preparer.indexed} "
+            f"cached={index_preparer.cache_hits} indexJobs={index_preparer.jobs})"
+        )
+        replay_shards = getattr(args, "replayShards", DEFAULT_REPLAY_SHARDS)
+        # WHY: per-line logs and window batches read state recorded at every
+        # revision, which only the serial replay builds.
+        if replay_shards > 1 and out_revision_file_states is None and previous_gen_ratios is None:
+            file_states_by_path = replay_commit_diff_sequence_sharded(commit_diffs, protocol_indexes, args.scope, replay_shards)
+            if file_states_by_path is not None:
+                logger.debug(f"Replayed {len(commit_diffs)} commit diffs on {replay_shards} lineage shards")
+                return file_states_by_path, None, _make_revision_prev_map(commit_diffs)
+            logger.debug("Lineage-sharded replay not applicable to this window; replaying serially")
+        file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+            commit_diffs,
+            protocol_indexes,
+            args.scope,
+            out_revision_file_states=out_revision_file_states,
+            on_revision=on_revision,
+        )
+        return file_states_by_path, previous_gen_ratios, _make_revision_prev_map(commit_diffs)
+
+    revision_prev_map: dict[str, str | None] = {}
+    file_states_by_path = replay_commit_diff_stream(
+        commit_diffs,
+        revision_ids,
+        parent_revision_ids_by_revision,
+        index_preparer.get,
+        args.scope,
+        out_revision_file_states=out_revision_file_states,
+        out_revision_prev_map=revision_prev_map,
+        on_revision=on_revision,
+    )
+    return file_states_by_path, previous_gen_ratios, revision_prev_map
+
+
 def _make_revision_prev_map(commit_diff_sequence: list[RevisionCommitDiff]) -> dict[str, str | None]:
-    """Map each revision_id to its previous revision_id for best-effort TransitionHint detection."""
+    """Map each replayed revision_id to its first parent, else the revision replayed before it."""
     result: dict[str, str | None] = {}
     for i, revision_diff in enumerate(commit_diff_sequence):
         parent_revision_ids = revision_diff.parent_revision_ids or []
@@ -1314,12 +3159,13 @@ def _make_revision_prev_map(commit_diff_sequence: list[RevisionCommitDiff]) -> d
 def _log_algorithm_b_per_line_states(
     logger: RuntimeLogger,
     file_states_by_path: dict[str, list[LineState]],
-    revision_file_states: dict[str, dict[str, list[LineState]]],
-    rev_to_prev_map: dict[str, str | None],
+    previous_gen_ratios: PreviousGenRatioColumns | None,
     line_in_scope: Callable[[LineState], bool],
     scope: str,
 ) -> None:
     """Emit LiveLine and TransitionHint log entries for all in-scope Algorithm B final line states."""
+    if previous_gen_ratios is None:
+        return
     for file_path, line_states in file_states_by_path.items():
         for line_num, line_state in enumerate(line_states, start=1):
             if not line_in_scope(line_state):
@@ -1327,17 +3173,13 @@ def _log_algorithm_b_per_line_states(
             if not is_code_line(line_state.content, scope):
                 continue
             origin_revision_id = line_state.origin_revision_id or ""
-            prev_rev = rev_to_prev_map.get(origin_revision_id)
-            if prev_rev is not None:
-                prev_file_lines = revision_file_states.get(prev_rev, {}).get(file_path, [])
-                if line_num - 1 < len(prev_file_lines):
-                    prev_gen_ratio = prev_file_lines[line_num - 1].gen_ratio
-                    if prev_gen_ratio != line_state.gen_ratio:
-                        logger.info(
-                            f"TransitionHint {file_path}:{line_num} "
-                            f"origin={file_path}:{line_num}@{origin_revision_id} "
-                            f"best_effort_transition={describe_ratio(prev_gen_ratio)}->{describe_ratio(line_state.gen_ratio)}"
-                        )
+            prev_gen_ratio = previous_gen_ratios.gen_ratio_before(origin_revision_id, file_path, line_num)
+            if prev_gen_ratio is not None and prev_gen_ratio != line_state.gen_ratio:
+                logger.info(
+                    f"TransitionHint {file_path}:{line_num} "
+                    f"origin={file_path}:{line_num}@{origin_revision_id} "
+                    f"best_effort_transition={describe_ratio(prev_gen_ratio)}->{describe_ratio(line_state.gen_ratio)}"
+                )
             logger.info(
                 f"LiveLine {file_path}:{line_num} aggregate "
                 f"origin={file_path}:{line_num}@{origin_revision_id} "
@@ -1352,42 +3194,31 @@ def build_result_algorithm_b_offline(args: argparse.Namespace, logger: RuntimeLo
     analysis_start = time_mod.monotonic()
     provider = build_gen_code_desc_provider(args, logger)
     diff_provider = build_commit_diff_provider(args, logger)
-    revision_ids = resolve_algorithm_b_offline_revision_ids(args)
-    commit_diff_sequence = load_commit_diff_sequence(
-        diff_provider,
-        args.repoURL,
-        args.repoBranch,
-        revision_ids,
-        args.vcsType,
-    )
-    if not commit_diff_sequence:
-        raise ProtocolValidationError("Algorithm B offline slice requires at least one replayable commit diff patch")
+    revision_ids = resolve_algorithm_b_offline_revision_ids(args, diff_provider)
+    commit_diffs: Iterable[RevisionCommitDiff] = iter_algorithm_b_offline_commit_diffs(args, logger, diff_provider, revision_ids)
+    if getattr(args, "replayMode", DEFAULT_REPLAY_MODE) != "streaming":
+        commit_diffs = list(commit_diffs)
+        if not commit_diffs:
+            raise ProtocolValidationError("Algorithm B offline slice requires at least one replayable commit diff patch")
 
     logger.info(
         f"Starting Algorithm B offline analysis for repo={args.repoURL} "
         f"branch={args.repoBranch} window={args.startTime}..{args.endTime} "
-        f"patchCount={len(commit_diff_sequence)}"
+        f"{_describe_commit_diff_count(commit_diffs, revision_ids)}"
     )
-    protocol_indexes = {
-        revision_diff.revision_id: _build_protocol_index_for_scope(
-            provider.get_revision_metadata(args.repoURL, args.repoBranch, revision_diff.revision_id, args.vcsType),
-            args.scope,
-        )
-        for revision_diff in commit_diff_sequence
-    }
-    revision_file_states_offline: dict[str, dict[str, list[LineState]]] = {}
-    file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
-        commit_diff_sequence,
-        protocol_indexes,
-        args.scope,
-        out_revision_file_states=revision_file_states_offline,
+    file_states_by_path, previous_gen_ratios, revision_prev_map = replay_algorithm_b_commit_diffs(
+        args,
+        logger,
+        provider,
+        commit_diffs,
+        revision_ids,
+        {},
     )
     included_revision_id_set_offline = set(revision_ids)
     _log_algorithm_b_per_line_states(
         logger,
         file_states_by_path,
-        revision_file_states_offline,
-        _make_revision_prev_map(commit_diff_sequence),
+        previous_gen_ratios,
         lambda ls: ls.origin_revision_id in included_revision_id_set_offline,
         args.scope,
     )
@@ -1406,35 +3237,31 @@ def build_result_algorithm_b_offline_local_git(args: argparse.Namespace, logger:
     analysis_start = time_mod.monotonic()
     repo_dir = resolve_local_git_repository_dir(args)
     revision_ids, end_revision_id = resolve_algorithm_b_git_revision_ids(args, repo_dir)
-    commit_diff_sequence = load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, args.scope)
+    revision_metadata = preload_revision_metadata(
+        "git", repo_dir, args.repoURL, end_revision_id, logger, revision_ids, getattr(args, "timeout", COMMAND_TIMEOUT_SECONDS)
+    )
+    commit_diffs = load_algorithm_b_git_commit_diff_sequence(args, repo_dir, revision_ids, revision_metadata)
 
     logger.info(
         f"Starting Algorithm B local git period-added analysis for repo={args.repoURL} "
         f"branch={args.repoBranch} window={args.startTime}..{args.endTime} "
-        f"patchCount={len(commit_diff_sequence)}"
+        f"{_describe_commit_diff_count(commit_diffs, revision_ids)}"
     )
     provider = build_gen_code_desc_provider(args, logger)
-    protocol_indexes = {
-        revision_diff.revision_id: _build_protocol_index_for_scope(
-            provider.get_revision_metadata(args.repoURL, args.repoBranch, revision_diff.revision_id, args.vcsType),
-            args.scope,
-        )
-        for revision_diff in commit_diff_sequence
-    }
-    revision_file_states_local_git: dict[str, dict[str, list[LineState]]] = {}
-    file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
-        commit_diff_sequence,
-        protocol_indexes,
-        args.scope,
-        out_revision_file_states=revision_file_states_local_git,
+    file_states_by_path, previous_gen_ratios, revision_prev_map = replay_algorithm_b_commit_diffs(
+        args,
+        logger,
+        provider,
+        commit_diffs,
+        revision_ids,
+        revision_metadata.parent_revision_ids,
     )
-    replay_revision_ids = [revision_diff.revision_id for revision_diff in commit_diff_sequence]
+    replay_revision_ids = list(revision_prev_map)
     included_revision_id_set_local_git = set(replay_revision_ids)
     _log_algorithm_b_per_line_states(
         logger,
         file_states_by_path,
-        revision_file_states_local_git,
-        _make_revision_prev_map(commit_diff_sequence),
+        previous_gen_ratios,
         lambda ls: ls.origin_revision_id in included_revision_id_set_local_git,
         args.scope,
     )
@@ -1452,42 +3279,31 @@ def build_result_algorithm_b_live_snapshot_offline(args: argparse.Namespace, log
     analysis_start = time_mod.monotonic()
     provider = build_gen_code_desc_provider(args, logger)
     diff_provider = build_commit_diff_provider(args, logger)
-    revision_ids = resolve_algorithm_b_offline_revision_ids(args)
-    commit_diff_sequence = load_commit_diff_sequence(
-        diff_provider,
-        args.repoURL,
-        args.repoBranch,
-        revision_ids,
-        args.vcsType,
-    )
-    if not commit_diff_sequence:
-        raise ProtocolValidationError("Algorithm B live-snapshot slice requires at least one replayable commit diff patch")
+    revision_ids = resolve_algorithm_b_offline_revision_ids(args, diff_provider)
+    commit_diffs: Iterable[RevisionCommitDiff] = iter_algorithm_b_offline_commit_diffs(args, logger, diff_provider, revision_ids)
+    if getattr(args, "replayMode", DEFAULT_REPLAY_MODE) != "streaming":
+        commit_diffs = list(commit_diffs)
+        if not commit_diffs:
+            raise ProtocolValidationError("Algorithm B live-snapshot slice requires at least one replayable commit diff patch")
 
     logger.info(
         f"Starting Algorithm B live-snapshot offline analysis for repo={args.repoURL} "
         f"branch={args.repoBranch} window={args.startTime}..{args.endTime} "
-        f"patchCount={len(commit_diff_sequence)}"
+        f"{_describe_commit_diff_count(commit_diffs, revision_ids)}"
     )
-    protocol_indexes = {
-        revision_diff.revision_id: _build_protocol_index_for_scope(
-            provider.get_revision_metadata(args.repoURL, args.repoBranch, revision_diff.revision_id, args.vcsType),
-            args.scope,
-        )
-        for revision_diff in commit_diff_sequence
-    }
-    revision_file_states_ls_offline: dict[str, dict[str, list[LineState]]] = {}
-    file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
-        commit_diff_sequence,
-        protocol_indexes,
-        args.scope,
-        out_revision_file_states=revision_file_states_ls_offline,
+    file_states_by_path, previous_gen_ratios, revision_prev_map = replay_algorithm_b_commit_diffs(
+        args,
+        logger,
+        provider,
+        commit_diffs,
+        revision_ids,
+        {},
     )
     included_revision_id_set_ls_offline = set(revision_ids)
     _log_algorithm_b_per_line_states(
         logger,
         file_states_by_path,
-        revision_file_states_ls_offline,
-        _make_revision_prev_map(commit_diff_sequence),
+        previous_gen_ratios,
         lambda ls: ls.origin_revision_id in included_revision_id_set_ls_offline,
         args.scope,
     )
@@ -1506,40 +3322,33 @@ def build_result_algorithm_b_live_snapshot_local_git(args: argparse.Namespace, l
     analysis_start = time_mod.monotonic()
     repo_dir = resolve_local_git_repository_dir(args)
     revision_ids, end_revision_id = resolve_algorithm_b_git_revision_ids(args, repo_dir)
-    commit_diff_sequence = load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, args.scope)
+    revision_metadata = preload_revision_metadata(
+        "git", repo_dir, args.repoURL, end_revision_id, logger, revision_ids, getattr(args, "timeout", COMMAND_TIMEOUT_SECONDS)
+    )
+    commit_diffs = load_algorithm_b_git_commit_diff_sequence(args, repo_dir, revision_ids, revision_metadata)
 
     logger.info(
         f"Starting Algorithm B local git live-snapshot analysis for repo={args.repoURL} "
         f"branch={args.repoBranch} window={args.startTime}..{args.endTime} "
-        f"patchCount={len(commit_diff_sequence)}"
+        f"{_describe_commit_diff_count(commit_diffs, revision_ids)}"
     )
 
     provider = build_gen_code_desc_provider(args, logger)
-    protocol_indexes = {
-        revision_diff.revision_id: _build_protocol_index_for_scope(
-            provider.get_revision_metadata(args.repoURL, args.repoBranch, revision_diff.revision_id, args.vcsType),
-            args.scope,
-        )
-        for revision_diff in commit_diff_sequence
-    }
-    revision_file_states_ls_git: dict[str, dict[str, list[LineState]]] = {}
-    file_states_by_path = reconstruct_final_file_states_by_path_from_commit_diff_sequence(
-        commit_diff_sequence,
-        protocol_indexes,
-        args.scope,
-        out_revision_file_states=revision_file_states_ls_git,
-    )
-    revision_commit_times = collect_git_revision_commit_times(
-        repo_dir,
-        [revision_diff.revision_id for revision_diff in commit_diff_sequence],
+    file_states_by_path, previous_gen_ratios, revision_prev_map = replay_algorithm_b_commit_diffs(
+        args,
+        logger,
+        provider,
+        commit_diffs,
+        revision_ids,
+        revision_metadata.parent_revision_ids,
     )
+    revision_commit_times = collect_git_revision_commit_times(repo_dir, list(revision_prev_map), revision_metadata)
     ls_git_start_bound = parse_day_start(args.startTime)
     ls_git_end_bound = parse_day_end(args.endTime)
     _log_algorithm_b_per_line_states(
         logger,
         file_states_by_path,
-        revision_file_states_ls_git,
-        _make_revision_prev_map(commit_diff_sequence),
+        previous_gen_ratios,
         lambda ls: (
             ls.origin_revision_id is not None
             and (ct := revision_commit_times.get(ls.origin_revision_id)) is not None
@@ -1560,65 +3369,115 @@ def build_result_algorithm_b_live_snapshot_local_git(args: argparse.Namespace, l
     return build_result_document(args, summary, end_revision_id, logger)
 
 
-def strip_json_comments(raw_text: str) -> str:
-    result: list[str] = []
-    in_string = False
-    escaped = False
-    in_line_comment = False
-    in_block_comment = False
-    index = 0
+def build_results_algorithm_b_live_snapshot_local_git(
+    args: argparse.Namespace,
+    logger: RuntimeLogger,
+    windows: list[tuple[str, str]],
+) -> list[dict] | None:
+    """One local git live-snapshot replay over the windows' span, read at each window's last replayed revision.
 
-    while index < len(raw_text):
-        char = raw_text[index]
-        next_char = raw_text[index + 1] if index + 1 < len(raw_text) else ""
+    Returns None when some window's history is not part of the span's replay, so the caller runs windows one by one.
+    """
+    if args.vcsType != "git":
+        raise UnsupportedConfigurationError("Current Algorithm B local live-snapshot replay only supports git")
 
-        if in_line_comment:
-            if char == "\n":
-                in_line_comment = False
-                result.append(char)
-            index += 1
-            continue
+    analysis_start = time_mod.monotonic()
+    repo_dir = resolve_local_git_repository_dir(args)
+    span_args = query_window_args(
+        args,
+        (
+            min((window[0] for window in windows), key=parse_day_start),
+            max((window[1] for window in windows), key=parse_day_end),
+        ),
+    )
+    revision_ids, end_revision_id = resolve_algorithm_b_git_revision_ids(span_args, repo_dir)
+    span_revision_ids = set(revision_ids)
+    window_revisions = []
+    for window in windows:
+        window_revision_ids, window_end_revision_id = resolve_algorithm_b_git_revision_ids(query_window_args(args, window), repo_dir)
+        if not span_revision_ids.issuperset(window_revision_ids):
+            return None
+        window_revisions.append((window_revision_ids, window_end_revision_id))
 
-        if in_block_comment:
-            if char == "*" and next_char == "/":
-                in_block_comment = False
-                index += 2
-                continue
-            if char == "\n":
-                result.append(char)
-            index += 1
-            continue
+    revision_metadata = preload_revision_metadata(
+        "git", repo_dir, args.repoURL, end_revision_id, logger, revision_ids, getattr(args, "timeout", COMMAND_TIMEOUT_SECONDS)
+    )
+    commit_diffs = load_algorithm_b_git_commit_diff_sequence(span_args, repo_dir, revision_ids, revision_metadata)
+    provider = build_gen_code_desc_provider(args, logger)
+    revision_file_states: dict[str, FileStateSnapshot] = {}
+    _file_states_by_path, previous_gen_ratios, revision_prev_map = replay_algorithm_b_commit_diffs(
+        span_args,
+        logger,
+        provider,
+        commit_diffs,
+        revision_ids,
+        revision_metadata.parent_revision_ids,
+        out_revision_file_states=revision_file_states,
+    )
+    revision_commit_times = collect_git_revision_commit_times(repo_dir, list(revision_prev_map), revision_metadata)
+
+    results = []
+    for window, (window_revision_ids, window_end_revision_id) in zip(windows, window_revisions):
+        window_args = query_window_args(args, window)
+        replayed_revision_ids = [revision_id for revision_id in window_revision_ids if revision_id in revision_file_states]
+        if not replayed_revision_ids:
+            raise ProtocolValidationError(NO_LOCAL_GIT_COMMIT_DIFFS_MESSAGE)
+        logger.info(
+            f"Starting Algorithm B local git live-snapshot analysis for repo={args.repoURL} "
+            f"branch={args.repoBranch} window={window[0]}..{window[1]} "
+            f"{_describe_commit_diff_count(replayed_revision_ids if isinstance(commit_diffs, list) else iter(()), window_revision_ids)}"
+        )
+        # WHY: a standalone window run ends on the state of its last replayed
+        # revision; lines that came from earlier windows keep their true
+        # origin here and fall outside this window's time bounds.
+        file_states_by_path = dict(revision_file_states[replayed_revision_ids[-1]].items())
+        start_bound = parse_day_start(window[0])
+        end_bound = parse_day_end(window[1])
+        _log_algorithm_b_per_line_states(
+            logger,
+            file_states_by_path,
+            previous_gen_ratios,
+            lambda ls: (
+                ls.origin_revision_id is not None
+                and (ct := revision_commit_times.get(ls.origin_revision_id)) is not None
+                and start_bound <= ct <= end_bound
+            ),
+            args.scope,
+        )
+        summary = summarize_live_snapshot_file_states(file_states_by_path, revision_commit_times, start_bound, end_bound, args.scope)
+        elapsed = time_mod.monotonic() - analysis_start
+        _log_algorithm_b_summary(logger, "local git live-snapshot", summary, window_end_revision_id, args.scope, elapsed=elapsed)
+        results.append(build_result_document(window_args, summary, window_end_revision_id, logger))
+    return results
 
-        if in_string:
-            result.append(char)
-            if escaped:
-                escaped = False
-            elif char == "\\":
-                escaped = True
-            elif char == '"':
-                in_string = False
-            index += 1
-            continue
 
-        if char == "/" and next_char == "/":
-            in_line_comment = True
-            index += 2
-            continue
+# WHY: group 1 is a run of plain JSON text and whole string literals, so a
+# "//" inside a URL string is never mistaken for a comment. The other branch
+# is a line comment or a block comment, unterminated ones running to the end.
+_JSONC_TOKEN_PATTERN = re.compile(
+    r'((?:[^"/]+|"[^"\\]*(?:\\.[^"\\]*)*"?|/(?![/*]))+)|//[^\n]*|/\*.*?(?:\*/|\Z)',
+    re.DOTALL,
+)
 
-        if char == "/" and next_char == "*":
-            in_block_comment = True
-            index += 2
-            continue
 
-        result.append(char)
-        if char == '"':
-            in_string = True
-        index += 1
+def _keep_json_text_or_comment_newlines(match: re.Match) -> str:
+    text = match.group(1)
+    if text is not None:
+        return text
+    return "\n" * match.group(0).count("\n")
+
 
-    return "".join(result)
+def strip_json_comments(raw_text: str) -> str:
+    return _JSONC_TOKEN_PATTERN.sub(_keep_json_text_or_comment_newlines, raw_text)
 
 
 def load_json_document(raw_text: str) -> dict:
+    # WHY: a comment outside a string is never valid JSON, so a document that
+    # parses as-is has nothing to strip. Most protocols take this path.
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        pass
     return json.loads(strip_json_comments(raw_text))
 
 
@@ -1678,6 +3537,14 @@ def validate_iso_date(value: str, label: str) -> None:
 
 
 def validate_inputs(args: argparse.Namespace) -> None:
+    query_windows = getattr(args, "queryWindows", None)
+    if query_windows is not None:
+        if args.startTime or args.endTime:
+            raise InputValidationError("--windows cannot be combined with --startTime or --endTime")
+        # WHY: the span covering every window feeds the shared validation and
+        # any analysis that runs once for the whole batch.
+        args.startTime = min((window[0] for window in query_windows), key=parse_day_start)
+        args.endTime = max((window[1] for window in query_windows), key=parse_day_end)
     if not args.startTime:
         raise InputValidationError("--startTime is required")
     if not args.endTime:
@@ -1728,6 +3595,68 @@ def validate_inputs(args: argparse.Namespace) -> None:
         query_args_path = Path(args.queryArgsFile)
         if not query_args_path.exists() or not query_args_path.is_file():
             raise InputValidationError(f"--queryArgsFile does not exist or is not a file: {args.queryArgsFile}")
+    if getattr(args, "jobs", DEFAULT_JOBS) < 1:
+        raise InputValidationError("--jobs must be a positive integer")
+    if getattr(args, "metadataJobs", DEFAULT_METADATA_JOBS) < 1:
+        raise InputValidationError("--metadataJobs must be a positive integer")
+    if getattr(args, "protocolCacheSize", DEFAULT_PROTOCOL_CACHE_SIZE) < 1:
+        raise InputValidationError("--protocolCacheSize must be a positive integer")
+    blame_cache_dir = getattr(args, "blameCacheDir", None)
+    if blame_cache_dir:
+        if args.algorithm != "A" or args.vcsType != "git":
+            raise InputValidationError("--blameCacheDir is only supported with --algorithm A and --vcsType git")
+        if Path(blame_cache_dir).exists() and not Path(blame_cache_dir).is_dir():
+            raise InputValidationError(f"--blameCacheDir is not a directory: {blame_cache_dir}")
+    gen_code_desc_index_file = getattr(args, "genCodeDescIndexFile", None)
+    if gen_code_desc_index_file:
+        if not args.genCodeDescSetDir:
+            raise InputValidationError("--genCodeDescIndexFile requires --genCodeDescSetDir")
+        if Path(gen_code_desc_index_file).is_dir():
+            raise InputValidationError(f"--genCodeDescIndexFile is a directory: {gen_code_desc_index_file}")
+    gen_code_desc_service_url = getattr(args, "genCodeDescServiceURL", None)
+    gen_code_desc_cache_dir = getattr(args, "genCodeDescCacheDir", None)
+    if getattr(args, "metadataSource", "genCodeDesc") == "genCodeDescService":
+        if not gen_code_desc_service_url:
+            raise InputValidationError("--metadataSource genCodeDescService requires --genCodeDescServiceURL")
+        if urlsplit(gen_code_desc_service_url).scheme not in ("http", "https") or not urlsplit(gen_code_desc_service_url).netloc:
+            raise InputValidationError(f"--genCodeDescServiceURL must be an http:// or https:// URL: {gen_code_desc_service_url}")
+        if args.algorithm == "C":
+            raise InputValidationError("--metadataSource genCodeDescService is not supported with --algorithm C")
+    elif gen_code_desc_service_url or gen_code_desc_cache_dir:
+        raise InputValidationError("--genCodeDescServiceURL and --genCodeDescCacheDir require --metadataSource genCodeDescService")
+    if gen_code_desc_cache_dir and Path(gen_code_desc_cache_dir).exists() and not Path(gen_code_desc_cache_dir).is_dir():
+        raise InputValidationError(f"--genCodeDescCacheDir is not a directory: {gen_code_desc_cache_dir}")
+    if query_windows is not None:
+        if args.endRevisionId:
+            raise InputValidationError("--windows cannot be combined with --endRevisionId")
+        if getattr(args, "includedRevisionIds", None) is not None:
+            raise InputValidationError("--windows cannot be combined with --includedRevisionIds")
+    if getattr(args, "indexJobs", DEFAULT_INDEX_JOBS) < 1:
+        raise InputValidationError("--indexJobs must be a positive integer")
+    protocol_index_cache_dir = getattr(args, "protocolIndexCacheDir", None)
+    if (getattr(args, "indexJobs", DEFAULT_INDEX_JOBS) > 1 or protocol_index_cache_dir) and args.algorithm != "B":
+        raise InputValidationError("--indexJobs and --protocolIndexCacheDir are only supported with --algorithm B")
+    if protocol_index_cache_dir and Path(protocol_index_cache_dir).exists() and not Path(protocol_index_cache_dir).is_dir():
+        raise InputValidationError(f"--protocolIndexCacheDir is not a directory: {protocol_index_cache_dir}")
+    if getattr(args, "commitDiffMmap", False) and not args.commitDiffSetDir:
+        raise InputValidationError("--commitDiffMmap requires --commitDiffSetDir")
+    if getattr(args, "patchJobs", DEFAULT_PATCH_JOBS) < 1:
+        raise InputValidationError("--patchJobs must be a positive integer")
+    commit_diff_cache_dir = getattr(args, "commitDiffCacheDir", None)
+    if (getattr(args, "patchJobs", DEFAULT_PATCH_JOBS) > 1 or commit_diff_cache_dir) and not args.commitDiffSetDir:
+        raise InputValidationError("--patchJobs and --commitDiffCacheDir require --commitDiffSetDir")
+    if commit_diff_cache_dir and Path(commit_diff_cache_dir).exists() and not Path(commit_diff_cache_dir).is_dir():
+        raise InputValidationError(f"--commitDiffCacheDir is not a directory: {commit_diff_cache_dir}")
+    if getattr(args, "replayShards", DEFAULT_REPLAY_SHARDS) < 1:
+        raise InputValidationError("--replayShards must be a positive integer")
+    if getattr(args, "replayShards", DEFAULT_REPLAY_SHARDS) > 1 and args.algorithm != "B":
+        raise InputValidationError("--replayShards is only supported with --algorithm B")
+    checkpoint_dir = getattr(args, "checkpointDir", None)
+    if checkpoint_dir:
+        if args.algorithm != "C":
+            raise InputValidationError("--checkpointDir is only supported with --algorithm C")
+        if Path(checkpoint_dir).exists() and not Path(checkpoint_dir).is_dir():
+            raise InputValidationError(f"--checkpointDir is not a directory: {checkpoint_dir}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -1746,9 +3675,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--outputFile")
     parser.add_argument("--outputFormat", default="json")
     parser.add_argument("--metadataSource", default="genCodeDesc")
+    parser.add_argument("--genCodeDescServiceURL", help="Base URL of the genCodeDesc metadata service")
+    parser.add_argument("--genCodeDescCacheDir", help="Local write-through cache directory for genCodeDesc service records")
     parser.add_argument("--genCodeDescSetDir")
     parser.add_argument("--commitDiffSetDir")
     parser.add_argument("--queryArgsFile")
+    parser.add_argument("--windows", help="JSON list of {startTime, endTime} windows answered from one analysis")
     parser.add_argument("--workingDir")
     parser.add_argument("--endRevisionId")
     parser.add_argument("--includedRevisionIds", nargs="+")
@@ -1758,11 +3690,60 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--logLevel", choices=["quiet", "info", "debug"], default="info")
     parser.add_argument("--timeout", type=int, default=COMMAND_TIMEOUT_SECONDS, help="Per-command timeout in seconds")
     parser.add_argument("--maxRuntime", type=int, default=DEFAULT_MAX_RUNTIME_SECONDS, help="Overall analysis timeout in seconds")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Parallel per-file blame workers for Algorithm A")
+    parser.add_argument(
+        "--gitHistoryScan",
+        choices=GIT_HISTORY_SCAN_MODES,
+        default=DEFAULT_GIT_HISTORY_SCAN,
+        help="Algorithm B local git patch loading: one git log -p stream or per-revision diffs",
+    )
+    parser.add_argument(
+        "--replayMode",
+        choices=REPLAY_MODES,
+        default=DEFAULT_REPLAY_MODE,
+        help="Algorithm B replay: buffer the whole patch sequence or stream it with bounded snapshot retention",
+    )
+    parser.add_argument("--blameCacheDir", help="Persistent per-file blame cache directory for git Algorithm A")
+    parser.add_argument("--genCodeDescIndexFile", help="Persistent revisionId index for --genCodeDescSetDir files")
+    parser.add_argument("--checkpointDir", help="Algorithm C surviving-line checkpoint directory for incremental reruns")
+    parser.add_argument(
+        "--metadataJobs",
+        type=int,
+        default=DEFAULT_METADATA_JOBS,
+        help="Parallel genCodeDesc fetch and index workers for Algorithm A",
+    )
+    parser.add_argument(
+        "--protocolCacheSize",
+        type=int,
+        default=DEFAULT_PROTOCOL_CACHE_SIZE,
+        help="Maximum parsed genCodeDesc protocols kept in memory by Algorithm A",
+    )
+    parser.add_argument(
+        "--indexJobs",
+        type=int,
+        default=DEFAULT_INDEX_JOBS,
+        help="Worker processes that parse and index genCodeDesc protocols for Algorithm B",
+    )
+    parser.add_argument("--protocolIndexCacheDir", help="Persistent validated protocol index cache for Algorithm B, keyed by file content")
+    parser.add_argument("--commitDiffMmap", action="store_true", help="Read --commitDiffSetDir patch files through read-only memory maps")
+    parser.add_argument(
+        "--patchJobs",
+        type=int,
+        default=DEFAULT_PATCH_JOBS,
+        help="Worker processes that read and parse --commitDiffSetDir patches",
+    )
+    parser.add_argument("--commitDiffCacheDir", help="Persistent parsed patch cache for --commitDiffSetDir, keyed by patch file content")
+    parser.add_argument(
+        "--replayShards",
+        type=int,
+        default=DEFAULT_REPLAY_SHARDS,
+        help="Worker processes that replay rename-linked file lineages of buffered Algorithm B windows",
+    )
     return parser.parse_args()
 
 
-def run_git(repo_dir: Path, args: list[str]) -> str:
-    return run_command(["git", *args], cwd=repo_dir).stdout.strip()
+def run_git(repo_dir: Path, args: list[str], timeout: int = COMMAND_TIMEOUT_SECONDS) -> str:
+    return run_command(["git", *args], cwd=repo_dir, timeout=timeout).stdout.strip()
 
 
 def parse_day_start(value: str) -> datetime:
@@ -1806,8 +3787,8 @@ def build_svn_branch_target(repo_url: str, branch: str) -> str:
     return f"{repo_url.rstrip('/')}/{branch.strip('/')}"
 
 
-def run_svn(args: list[str]) -> str:
-    return run_command(["svn", *args]).stdout.strip()
+def run_svn(args: list[str], timeout: int = COMMAND_TIMEOUT_SECONDS) -> str:
+    return run_command(["svn", *args], timeout=timeout).stdout.strip()
 
 
 def resolve_svn_end_revision(repo_url: str, branch: str, end_time: str) -> str:
@@ -1823,6 +3804,94 @@ def resolve_svn_end_revision(repo_url: str, branch: str, end_time: str) -> str:
     return revision_id
 
 
+_GIT_LOG_FIELD_SEPARATOR = "\x1f"
+_GIT_REVISION_METADATA_FORMAT = "--format=%H%x1f%cI%x1f%P%x1f%an <%ae>"
+GIT_PRELOAD_REVISIONS_PER_TIMEOUT = 50000
+# WHY: svn log entries come from the server as XML, so fewer fit in one timeout.
+SVN_PRELOAD_REVISIONS_PER_TIMEOUT = 10000
+
+
+def _add_git_revision_metadata(cache: RevisionMetadataCache, output: str) -> None:
+    for raw_line in output.splitlines():
+        fields = raw_line.split(_GIT_LOG_FIELD_SEPARATOR)
+        if len(fields) != 4:
+            continue
+        revision_id, commit_time, parents, author = fields
+        cache.add(revision_id, parse_git_timestamp(commit_time), parents.split(), author)
+
+
+def preload_git_revision_metadata(repo_dir: Path, end_revision_id: str, timeout: int = COMMAND_TIMEOUT_SECONDS) -> RevisionMetadataCache:
+    # WHY: one `git log` stream replaces a `git show -s` process per distinct
+    # blame origin or replayed revision, which dominates runtime on histories
+    # with tens of thousands of origin revisions. The stream covers the whole
+    # history, so its timeout grows by one per-command timeout for every
+    # GIT_PRELOAD_REVISIONS_PER_TIMEOUT reachable revisions.
+    history_size = int(run_git(repo_dir, ["rev-list", "--count", end_revision_id], timeout))
+    log_timeout = timeout * max(1, -(-history_size // GIT_PRELOAD_REVISIONS_PER_TIMEOUT))
+    output = run_git(repo_dir, ["log", _GIT_REVISION_METADATA_FORMAT, end_revision_id], log_timeout)
+    cache = RevisionMetadataCache()
+    _add_git_revision_metadata(cache, output)
+    return cache
+
+
+def preload_svn_revision_metadata(repo_url: str, end_revision_id: str, timeout: int = COMMAND_TIMEOUT_SECONDS) -> RevisionMetadataCache:
+    # WHY: one ranged `svn log --xml` query replaces a per-revision log call.
+    # The repository root is queried (as get_svn_commit_time does) because
+    # merge-aware blame can resolve origins on other branches. SVN revision
+    # numbers are dense, so the end revision bounds the log size and the
+    # timeout grows by one per-command timeout per SVN_PRELOAD_REVISIONS_PER_TIMEOUT.
+    history_size = int(end_revision_id) if end_revision_id.isdigit() else 0
+    log_timeout = timeout * max(1, -(-history_size // SVN_PRELOAD_REVISIONS_PER_TIMEOUT))
+    log_xml = run_svn(["log", "--xml", "-r", f"{end_revision_id}:1", repo_url], log_timeout)
+    cache = RevisionMetadataCache()
+    for log_entry in ET.fromstring(log_xml).findall("logentry"):
+        revision_id = log_entry.attrib.get("revision")
+        date_node = log_entry.find("date")
+        if not revision_id or date_node is None or not date_node.text:
+            continue
+        author_node = log_entry.find("author")
+        parent_revision = resolve_parent_revision("svn", Path(), repo_url, "", revision_id)
+        cache.add(
+            revision_id,
+            parse_git_timestamp(date_node.text),
+            [parent_revision] if parent_revision else [],
+            (author_node.text or "") if author_node is not None else "",
+        )
+    return cache
+
+
+def preload_revision_metadata(
+    vcs_type: str,
+    repo_dir: Path,
+    repo_url: str,
+    end_revision_id: str,
+    logger: RuntimeLogger,
+    revision_ids: list[str] | None = None,
+    timeout: int = COMMAND_TIMEOUT_SECONDS,
+) -> RevisionMetadataCache:
+    try:
+        cache = (
+            preload_git_revision_metadata(repo_dir, end_revision_id, timeout)
+            if vcs_type == "git"
+            else preload_svn_revision_metadata(repo_url, end_revision_id, timeout)
+        )
+    except CommandExecutionError as exc:
+        # WHY: the preload is only a shortcut. Commit times and parents left
+        # out of the cache are resolved one revision at a time where they are
+        # read; replayed revisions are filled here because streaming replay
+        # needs their parents before the first patch is read.
+        logger.info(
+            f"Revision metadata preload from {end_revision_id} failed ({str(exc).splitlines()[0]}); falling back to per-revision lookups"
+        )
+        cache = RevisionMetadataCache()
+        if vcs_type == "git":
+            for revision_id in revision_ids or []:
+                _add_git_revision_metadata(cache, run_git(repo_dir, ["show", "-s", _GIT_REVISION_METADATA_FORMAT, revision_id]))
+        return cache
+    logger.debug(f"Preloaded revision metadata for {len(cache)} revisions reachable from {end_revision_id}")
+    return cache
+
+
 def get_commit_time(repo_dir: Path, revision_id: str, commit_times: dict[str, datetime]) -> datetime:
     commit_time = commit_times.get(revision_id)
     if commit_time is None:
@@ -1872,14 +3941,23 @@ def list_svn_doc_files(repo_url: str, branch: str, revision_id: str) -> list[str
 
 
 def parse_blame(repo_dir: Path, revision_id: str, relative_path: str) -> list[BlameLine]:
-    output = run_git(repo_dir, ["blame", "--line-porcelain", revision_id, "--", relative_path])
+    return parse_blame_porcelain(run_blame_porcelain(repo_dir, revision_id, relative_path), relative_path)[0]
+
+
+def run_blame_porcelain(repo_dir: Path, revision_spec: str, relative_path: str) -> str:
+    output = run_git(repo_dir, ["blame", "--line-porcelain", revision_spec, "--", relative_path])
     if len(output) > MAX_FILE_SIZE_BYTES:
         raise RepositoryStateError(
-            f"Blame output for {relative_path} at {revision_id} exceeds {MAX_FILE_SIZE_BYTES} byte limit "
+            f"Blame output for {relative_path} at {revision_spec} exceeds {MAX_FILE_SIZE_BYTES} byte limit "
             f"({len(output)} bytes) — possible binary or generated file"
         )
+    return output
+
+
+def parse_blame_porcelain(output: str, relative_path: str) -> tuple[list[BlameLine], list[bool]]:
     lines = output.splitlines()
     parsed: list[BlameLine] = []
+    boundary_flags: list[bool] = []
     index = 0
     while index < len(lines):
         header = lines[index]
@@ -1890,9 +3968,12 @@ def parse_blame(repo_dir: Path, revision_id: str, relative_path: str) -> list[Bl
         index += 1
 
         origin_file = relative_path
+        is_boundary = False
         while index < len(lines) and not lines[index].startswith("\t"):
             meta_line = lines[index]
-            if meta_line.startswith("filename "):
+            if meta_line == "boundary":
+                is_boundary = True
+            elif meta_line.startswith("filename "):
                 # WHY: blame can report the historical filename after rename.
                 # The metadata join needs that origin path rather than only the
                 # final path shown in the end snapshot.
@@ -1912,9 +3993,175 @@ def parse_blame(repo_dir: Path, revision_id: str, relative_path: str) -> list[Bl
                 content=content,
             )
         )
+        boundary_flags.append(is_boundary)
         index += 1
 
-    return parsed
+    return parsed, boundary_flags
+
+
+def list_git_blob_ids(repo_dir: Path, revision_id: str) -> dict[str, str]:
+    blob_ids: dict[str, str] = {}
+    for line in run_git(repo_dir, ["ls-tree", "-r", revision_id]).splitlines():
+        object_info, _separator, relative_path = line.partition("\t")
+        object_parts = object_info.split()
+        if len(object_parts) == 3 and object_parts[1] == "blob":
+            blob_ids[relative_path] = object_parts[2]
+    return blob_ids
+
+
+def hash_line_content(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8", errors="replace"), digest_size=8).hexdigest()
+
+
+BLAME_CACHE_FORMAT_VERSION = 1
+
+
+class BlameCache:
+    """On-disk Algorithm A blame cache keyed by (path, blob id, end-revision ancestry)."""
+
+    def __init__(self, cache_dir: Path, repo_dir: Path, end_revision_id: str):
+        self.cache_dir = cache_dir
+        self.repo_dir = repo_dir
+        self.end_revision_id = end_revision_id
+        self.blob_ids = list_git_blob_ids(repo_dir, end_revision_id)
+        self.hits = 0
+        self.incremental_reblames = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._changed_paths_by_revision: dict[str, set[str] | None] = {}
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, relative_path: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(relative_path.encode('utf-8')).hexdigest()}.json"
+
+    def _load_entry(self, relative_path: str) -> dict | None:
+        try:
+            entry = json.loads(self._entry_path(relative_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != BLAME_CACHE_FORMAT_VERSION
+            or entry.get("path") != relative_path
+        ):
+            return None
+        return entry
+
+    def _store_entry(self, relative_path: str, blob_id: str, blame_lines: list[BlameLine]) -> None:
+        entry = {
+            "version": BLAME_CACHE_FORMAT_VERSION,
+            "path": relative_path,
+            "blobId": blob_id,
+            "endRevisionId": self.end_revision_id,
+            "lines": [
+                [blame_line.revision_id, blame_line.origin_file, blame_line.origin_line, hash_line_content(blame_line.content)]
+                for blame_line in blame_lines
+            ],
+        }
+        entry_path = self._entry_path(relative_path)
+        temp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(json.dumps(entry, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp_path, entry_path)
+
+    def _changed_paths_since(self, revision_id: str) -> set[str] | None:
+        with self._lock:
+            if revision_id not in self._changed_paths_by_revision:
+                self._changed_paths_by_revision[revision_id] = self._collect_changed_paths(revision_id)
+            return self._changed_paths_by_revision[revision_id]
+
+    def _collect_changed_paths(self, revision_id: str) -> set[str] | None:
+        if revision_id == self.end_revision_id:
+            return set()
+        ancestry = run_command(
+            ["git", "merge-base", "--is-ancestor", revision_id, self.end_revision_id],
+            cwd=self.repo_dir,
+            check=False,
+        )
+        if ancestry.returncode != 0:
+            return None
+        # WHY: an unchanged blob is not enough to reuse a blame. A file that was
+        # edited and then reverted inside the range is re-attributed by git
+        # blame, so every path touched by any commit in the range (including
+        # each side of a merge) is treated as changed.
+        output = run_git(
+            self.repo_dir,
+            ["log", "-m", "--no-renames", "--format=", "--name-only", f"{revision_id}..{self.end_revision_id}"],
+        )
+        return {line for line in output.splitlines() if line}
+
+    def _restore(self, relative_path: str, entry: dict) -> list[BlameLine] | None:
+        raw_content = get_git_cat_file_reader(self.repo_dir).read_blob(self.end_revision_id, relative_path)
+        if raw_content is None:
+            return None
+        content_lines = decode_file_lines(raw_content)
+        cached_lines = entry["lines"]
+        if len(content_lines) != len(cached_lines):
+            return None
+        restored: list[BlameLine] = []
+        for final_line, (content, (revision_id, origin_file, origin_line, content_hash)) in enumerate(
+            zip(content_lines, cached_lines),
+            start=1,
+        ):
+            if content_hash != hash_line_content(content):
+                return None
+            restored.append(BlameLine(revision_id, origin_file, origin_line, final_line, content))
+        return restored
+
+    def _blame_incrementally(self, relative_path: str, entry: dict) -> list[BlameLine] | None:
+        previous_end_revision_id = entry["endRevisionId"]
+        output = run_blame_porcelain(self.repo_dir, f"{previous_end_revision_id}..{self.end_revision_id}", relative_path)
+        blame_lines, boundary_flags = parse_blame_porcelain(output, relative_path)
+        cached_lines = entry["lines"]
+        resolved: list[BlameLine] = []
+        for blame_line, is_boundary in zip(blame_lines, boundary_flags):
+            if not is_boundary:
+                resolved.append(blame_line)
+                continue
+            # WHY: boundary lines are unchanged since the cached end revision,
+            # so their origin line indexes the cached blame of that snapshot.
+            # Anything else (a rename, another boundary commit) needs a full
+            # blame to stay identical to a cold run.
+            if (
+                blame_line.revision_id != previous_end_revision_id
+                or blame_line.origin_file != relative_path
+                or not 1 <= blame_line.origin_line <= len(cached_lines)
+            ):
+                return None
+            revision_id, origin_file, origin_line, content_hash = cached_lines[blame_line.origin_line - 1]
+            if content_hash != hash_line_content(blame_line.content):
+                return None
+            resolved.append(BlameLine(revision_id, origin_file, origin_line, blame_line.final_line, blame_line.content))
+        return resolved
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def blame(self, relative_path: str) -> list[BlameLine]:
+        blob_id = self.blob_ids.get(relative_path)
+        entry = self._load_entry(relative_path) if blob_id else None
+        if entry is not None:
+            changed_paths = self._changed_paths_since(entry["endRevisionId"])
+            if changed_paths is not None:
+                if entry["blobId"] == blob_id and relative_path not in changed_paths:
+                    blame_lines = self._restore(relative_path, entry)
+                    if blame_lines is not None:
+                        self._count("hits")
+                        if entry["endRevisionId"] != self.end_revision_id:
+                            self._store_entry(relative_path, blob_id, blame_lines)
+                        return blame_lines
+                else:
+                    blame_lines = self._blame_incrementally(relative_path, entry)
+                    if blame_lines is not None:
+                        self._count("incremental_reblames")
+                        self._store_entry(relative_path, blob_id, blame_lines)
+                        return blame_lines
+
+        blame_lines = parse_blame(self.repo_dir, self.end_revision_id, relative_path)
+        self._count("misses")
+        if blob_id:
+            self._store_entry(relative_path, blob_id, blame_lines)
+        return blame_lines
 
 
 def parse_svn_blame(repo_url: str, branch: str, revision_id: str, relative_path: str) -> list[BlameLine]:
@@ -1970,6 +4217,392 @@ def parse_svn_blame(repo_url: str, branch: str, revision_id: str, relative_path:
     return parsed
 
 
+def iter_ordered_pool_results(
+    executor: Executor,
+    function: Callable,
+    items: Iterable,
+    max_in_flight: int,
+) -> Iterator:
+    # WHY: Executor.map submits every item up front. Keeping a bounded window
+    # of in-flight futures caps queued work (and buffered results) while still
+    # yielding in input order, so downstream aggregation and logging stay
+    # identical to the serial path.
+    pending: deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+DEFAULT_METADATA_JOBS = 1
+DEFAULT_PROTOCOL_CACHE_SIZE = 4096
+
+
+class ProtocolPrefetcher:
+    """LRU-bounded cache of fetched and indexed genCodeDesc protocols, optionally filled ahead of use by a thread pool."""
+
+    def __init__(
+        self,
+        provider: GenCodeDescProvider,
+        logger: RuntimeLogger,
+        args: argparse.Namespace,
+        jobs: int = DEFAULT_METADATA_JOBS,
+        max_cached: int = DEFAULT_PROTOCOL_CACHE_SIZE,
+    ):
+        self.provider = provider
+        self.logger = logger
+        self.args = args
+        self.max_cached = max_cached
+        self._cache: OrderedDict[str, tuple[dict, dict[str, IndexedFileDetail]]] = OrderedDict()
+        self._pending: dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="agg-metadata") if jobs > 1 else None
+
+    def _fetch(self, revision_id: str) -> tuple[dict, dict[str, IndexedFileDetail]]:
+        protocol = self.provider.get_revision_metadata(self.args.repoURL, self.args.repoBranch, revision_id, self.args.vcsType)
+        return protocol, _build_protocol_index_for_scope(protocol, self.args.scope)
+
+    def _fetch_captured(self, revision_id: str) -> tuple:
+        with self.logger.capture() as records:
+            try:
+                return self._fetch(revision_id), records, None
+            except Exception as exc:
+                return None, records, exc
+
+    def is_cached(self, revision_id: str) -> bool:
+        return revision_id in self._cache
+
+    def prefetch(self, revision_ids: Iterable[str]) -> None:
+        if self._executor is None:
+            return
+        for revision_id in revision_ids:
+            if revision_id in self._cache or revision_id in self._pending:
+                continue
+            # WHY: finished futures hold parsed protocols too, so the pending
+            # set shares the LRU bound instead of growing with the history.
+            if len(self._pending) >= self.max_cached:
+                break
+            self._pending[revision_id] = self._executor.submit(self._fetch_captured, revision_id)
+
+    def get(self, revision_id: str) -> tuple[dict, dict[str, IndexedFileDetail]]:
+        entry = self._cache.get(revision_id)
+        if entry is not None:
+            self._cache.move_to_end(revision_id)
+            return entry
+
+        future = self._pending.pop(revision_id, None)
+        if future is None:
+            entry = self._fetch(revision_id)
+        else:
+            entry, records, error = future.result()
+            # WHY: provider warnings and debug lines from the worker are
+            # replayed here, where the serial run would have emitted them.
+            self.logger.replay(records)
+            if error is not None:
+                raise error
+
+        self._cache[revision_id] = entry
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return entry
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_prefetched(
+        self,
+        blame_results: Iterable[tuple[str, list[BlameLine]]],
+        needed_revision_ids: Callable[[list[BlameLine]], Iterable[str]],
+    ) -> Iterator[tuple[str, list[BlameLine]]]:
+        """Start fetching each file's origin protocols as soon as its blame arrives."""
+        try:
+            for relative_path, blame_lines in blame_results:
+                if self._executor is not None:
+                    self.prefetch(needed_revision_ids(blame_lines))
+                yield relative_path, blame_lines
+        finally:
+            self.close()
+
+
+DEFAULT_INDEX_JOBS = 1
+PROTOCOL_INDEX_CACHE_FORMAT_VERSION = 1
+
+
+def _prepare_protocol_index(item: tuple[bytes, str]) -> tuple[dict, dict[str, IndexedFileDetail] | None, str | None]:
+    """Parse and index one protocol file's bytes; runs in worker processes, so it only returns data."""
+    data, scope = item
+    protocol = load_json_document(data.decode("utf-8"))
+    repository = protocol.get("REPOSITORY", {})
+    try:
+        return repository, _build_protocol_index_for_scope(protocol, scope), None
+    except ProtocolValidationError as exc:
+        return repository, None, str(exc)
+
+
+class ProtocolIndexPreparer:
+    """Validated Algorithm B protocol indexes, built on a process pool and cached on disk by file content hash."""
+
+    def __init__(
+        self,
+        provider: GenCodeDescProvider,
+        logger: RuntimeLogger,
+        args: argparse.Namespace,
+        jobs: int = DEFAULT_INDEX_JOBS,
+        cache_dir: Path | None = None,
+    ):
+        self.provider = provider
+        self.logger = logger
+        self.args = args
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.cache_hits = 0
+        self.indexed = 0
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}-{self.args.scope}.pickle"
+
+    def _read_cache(self, digest: str) -> tuple | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            with self._cache_path(digest).open("rb") as handle:
+                version, prepared = pickle.load(handle)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            return None
+        return prepared if version == PROTOCOL_INDEX_CACHE_FORMAT_VERSION else None
+
+    def _write_cache(self, digest: str, prepared: tuple) -> None:
+        if self.cache_dir is None:
+            return
+        cache_path = self._cache_path(digest)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(pickle.dumps((PROTOCOL_INDEX_CACHE_FORMAT_VERSION, prepared), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(temp_path, cache_path)
+        except OSError as exc:
+            self.logger.debug(f"Could not write protocol index cache entry {cache_path}: {exc}")
+
+    def _finish(self, revision_id: str, protocol_path: Path, prepared: tuple) -> dict[str, IndexedFileDetail]:
+        repository, protocol_index, error = prepared
+        self.logger.debug(f"Loaded genCodeDesc for revision {revision_id} from {protocol_path}")
+        validate_revision_metadata_identity(
+            {"REPOSITORY": repository}, self.args.repoURL, self.args.repoBranch, revision_id, self.args.vcsType, self.logger
+        )
+        if error is not None:
+            raise ProtocolValidationError(error)
+        return protocol_index
+
+    def _load_from_provider(self, revision_id: str) -> dict[str, IndexedFileDetail]:
+        protocol = self.provider.get_revision_metadata(self.args.repoURL, self.args.repoBranch, revision_id, self.args.vcsType)
+        return _build_protocol_index_for_scope(protocol, self.args.scope)
+
+    def get(self, revision_id: str) -> dict[str, IndexedFileDetail]:
+        return self.prepare([revision_id])[revision_id]
+
+    def prepare(self, revision_ids: Iterable[str]) -> dict[str, dict[str, IndexedFileDetail]]:
+        # WHY: reading and hashing stay in this process; only cache misses
+        # are parsed, validated and indexed by the pool.
+        planned: list[tuple[str, Path | None, str | None, tuple | None, bytes | None]] = []
+        for revision_id in revision_ids:
+            protocol_path = self.provider.revision_metadata_path(revision_id)
+            if protocol_path is None:
+                planned.append((revision_id, None, None, None, None))
+                continue
+            data = protocol_path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            prepared = self._read_cache(digest)
+            planned.append((revision_id, protocol_path, digest, prepared, data if prepared is None else None))
+
+        misses = [(data, self.args.scope) for _revision_id, _path, _digest, prepared, data in planned if data is not None]
+        executor = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 and len(misses) > 1 else None
+        try:
+            if executor is None:
+                miss_results = map(_prepare_protocol_index, misses)
+            else:
+                miss_results = iter_ordered_pool_results(executor, _prepare_protocol_index, misses, self.jobs * 4)
+            protocol_indexes: dict[str, dict[str, IndexedFileDetail]] = {}
+            # WHY: results are finished in request order, so provider warnings,
+            # debug lines and the first error match the serial run.
+            for revision_id, protocol_path, digest, prepared, data in planned:
+                if protocol_path is None:
+                    protocol_indexes[revision_id] = self._load_from_provider(revision_id)
+                    continue
+                if prepared is None:
+                    prepared = next(miss_results)
+                    self.indexed += 1
+                    self._write_cache(digest, prepared)
+                else:
+                    self.cache_hits += 1
+                protocol_indexes[revision_id] = self._finish(revision_id, protocol_path, prepared)
+            return protocol_indexes
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+DEFAULT_PATCH_JOBS = 1
+COMMIT_DIFF_CACHE_FORMAT_VERSION = 2
+
+
+def _load_commit_diff_patch(
+    item: tuple[Path | None, Path | None, Exception | None],
+) -> tuple[ParsedCommitDiff | None, Exception | None, bool, bool]:
+    """Read, hash and parse one patch file (or read its cached parse); runs in worker processes, so errors are returned.
+
+    Returns (parsed, error, loaded, cache_hit); loaded is False when the file
+    was missing or empty, matching where CommitDiffSetDirProvider would stop.
+    """
+    patch_path, cache_dir, error = item
+    if error is not None:
+        return None, error, False, False
+    if not patch_path.exists():
+        return None, ProtocolValidationError(f"Commit diff patch file not found: {patch_path}"), False, False
+
+    data = patch_path.read_bytes()
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(data).hexdigest()
+        cache_path = cache_dir / digest[:2] / f"{digest}.pickle"
+        try:
+            with cache_path.open("rb") as handle:
+                version, parsed = pickle.load(handle)
+            if version == COMMIT_DIFF_CACHE_FORMAT_VERSION:
+                return parsed, None, True, True
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            pass
+
+    try:
+        patch_text = data.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        return None, exc, False, False
+    if "\r" in patch_text:
+        patch_text = patch_text.replace("\r\n", "\n").replace("\r", "\n")
+    if not patch_text.strip():
+        return None, ProtocolValidationError(f"Commit diff patch file is empty: {patch_path}"), False, False
+    try:
+        parsed = parse_commit_diff_patch(patch_text)
+    except ProtocolValidationError as exc:
+        return None, exc, True, False
+
+    if cache_path is not None:
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(pickle.dumps((COMMIT_DIFF_CACHE_FORMAT_VERSION, parsed), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+    return parsed, None, True, False
+
+
+class CommitDiffPatchLoader:
+    """Reads and parses commitDiffSetDir patches on a process pool, optionally through an on-disk cache keyed by patch content hash."""
+
+    def __init__(
+        self,
+        diff_provider: CommitDiffSetDirProvider,
+        logger: RuntimeLogger,
+        jobs: int = DEFAULT_PATCH_JOBS,
+        cache_dir: Path | None = None,
+    ):
+        self.diff_provider = diff_provider
+        self.logger = logger
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.cache_hits = 0
+        self.parsed = 0
+
+    def _plan(self, revision_ids: list[str]) -> Iterator[tuple[Path | None, Path | None, Exception | None]]:
+        for revision_id in revision_ids:
+            try:
+                yield self.diff_provider.patch_index().resolve(revision_id), self.cache_dir, None
+            except ProtocolValidationError as exc:
+                yield None, None, exc
+
+    def iter_sequence(self, revision_ids: list[str]) -> Iterator[RevisionCommitDiff]:
+        # WHY: at most jobs * 4 patches are read ahead of the consumer, so a
+        # streaming replay overlaps with parsing without buffering the whole set.
+        # Errors travel with their revision and are raised in revision order,
+        # exactly where the serial provider would have raised them.
+        executor = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 and len(revision_ids) > 1 else None
+        try:
+            if executor is None:
+                results = map(_load_commit_diff_patch, self._plan(revision_ids))
+            else:
+                results = iter_ordered_pool_results(executor, _load_commit_diff_patch, self._plan(revision_ids), self.jobs * 4)
+            for revision_id, (parsed, error, loaded, cache_hit) in zip(revision_ids, results):
+                if loaded:
+                    patch_path = self.diff_provider.patch_index().resolve(revision_id)
+                    self.logger.debug(f"Loaded commit diff patch for revision {revision_id} from {patch_path}")
+                if error is not None:
+                    raise error
+                if cache_hit:
+                    self.cache_hits += 1
+                else:
+                    self.parsed += 1
+                yield RevisionCommitDiff(revision_id=revision_id, parsed_patch=parsed)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self.logger.debug(f"Loaded {len(revision_ids)} commit diff patches (parsed={self.parsed} cached={self.cache_hits} patchJobs={self.jobs})")
+
+
+def iter_algorithm_b_offline_commit_diffs(
+    args: argparse.Namespace,
+    logger: RuntimeLogger,
+    diff_provider: CommitDiffProvider,
+    revision_ids: list[str],
+) -> Iterator[RevisionCommitDiff]:
+    patch_jobs = getattr(args, "patchJobs", DEFAULT_PATCH_JOBS)
+    commit_diff_cache_dir = getattr(args, "commitDiffCacheDir", None)
+    if isinstance(diff_provider, CommitDiffSetDirProvider) and (patch_jobs > 1 or commit_diff_cache_dir):
+        loader = CommitDiffPatchLoader(
+            diff_provider,
+            logger,
+            jobs=patch_jobs,
+            cache_dir=Path(commit_diff_cache_dir) if commit_diff_cache_dir else None,
+        )
+        return loader.iter_sequence(revision_ids)
+    return iter_commit_diff_sequence(diff_provider, args.repoURL, args.repoBranch, revision_ids, args.vcsType)
+
+
+def iter_algorithm_a_blame_results(
+    args: argparse.Namespace,
+    repo_dir: Path,
+    end_revision_id: str,
+    source_files: list[str],
+    jobs: int = DEFAULT_JOBS,
+    blame_cache: BlameCache | None = None,
+) -> Iterator[tuple[str, list[BlameLine]]]:
+    def blame_file(relative_path: str) -> tuple[str, list[BlameLine]]:
+        if blame_cache is not None:
+            return relative_path, blame_cache.blame(relative_path)
+        if args.vcsType == "git":
+            return relative_path, parse_blame(repo_dir, end_revision_id, relative_path)
+        return relative_path, parse_svn_blame(args.repoURL, args.repoBranch, end_revision_id, relative_path)
+
+    if jobs <= 1:
+        for relative_path in source_files:
+            yield blame_file(relative_path)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="agg-blame")
+    try:
+        yield from iter_ordered_pool_results(executor, blame_file, source_files, jobs * 2)
+    finally:
+        # WHY: when --maxRuntime fires (or a worker fails) the main thread must
+        # not wait for queued files. Each in-flight command is still bounded by
+        # the per-command timeout in run_command.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def is_code_line(content: str, scope: str = "A") -> bool:
     stripped = content.strip()
     if not stripped:
@@ -1983,22 +4616,35 @@ def is_code_line(content: str, scope: str = "A") -> bool:
 def build_gen_code_desc_provider(args: argparse.Namespace, logger: RuntimeLogger) -> GenCodeDescProvider:
     if args.metadataSource == "genCodeDesc":
         if args.genCodeDescSetDir:
+            gen_code_desc_index_file = getattr(args, "genCodeDescIndexFile", None)
             return GenCodeDescSetDirProvider(
                 Path(args.genCodeDescSetDir),
                 args.failOnMissingProtocol,
                 args.warnOnMissingProtocol,
                 logger,
+                Path(gen_code_desc_index_file) if gen_code_desc_index_file else None,
             )
         return EmptyGenCodeDescProvider(args.failOnMissingProtocol, args.warnOnMissingProtocol, logger)
+    if args.metadataSource == "genCodeDescService":
+        gen_code_desc_cache_dir = getattr(args, "genCodeDescCacheDir", None)
+        return GenCodeDescServiceProvider(
+            args.genCodeDescServiceURL,
+            args.failOnMissingProtocol,
+            args.warnOnMissingProtocol,
+            logger,
+            Path(gen_code_desc_cache_dir) if gen_code_desc_cache_dir else None,
+            timeout=getattr(args, "timeout", COMMAND_TIMEOUT_SECONDS),
+            pool_size=getattr(args, "metadataJobs", DEFAULT_METADATA_JOBS),
+        )
 
     raise UnsupportedConfigurationError(
-        f"Unsupported metadataSource: {args.metadataSource}. Only 'genCodeDesc' is supported in the current slice."
+        f"Unsupported metadataSource: {args.metadataSource}. Supported values: {', '.join(METADATA_SOURCES)}"
     )
 
 
 def build_commit_diff_provider(args: argparse.Namespace, logger: RuntimeLogger) -> CommitDiffProvider:
     if args.commitDiffSetDir:
-        return CommitDiffSetDirProvider(Path(args.commitDiffSetDir), logger)
+        return CommitDiffSetDirProvider(Path(args.commitDiffSetDir), logger, use_mmap=getattr(args, "commitDiffMmap", False))
     return EmptyCommitDiffProvider(logger)
 
 
@@ -2023,11 +4669,16 @@ def validate_no_overlap(
     ranges: list[tuple[int, int, int]],
     range_start: int,
     range_end: int,
+    coverage: ProtocolLineCoverage | None = None,
 ) -> None:
     if range_start > range_end:
         raise ProtocolValidationError(
             f"Protocol DETAIL entry for {file_name} has lineRange.from greater than lineRange.to"
         )
+    # WHY: the sorted coverage answers "no overlap" in O(log n). The linear
+    # scans below only run to name the first conflicting entry in the error.
+    if coverage is not None and not coverage.overlaps(range_start, range_end):
+        return
     for line_number in exact_lines:
         if range_start <= line_number <= range_end:
             raise ProtocolValidationError(
@@ -2056,6 +4707,7 @@ def build_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
 
         exact_lines: dict[int, int] = {}
         ranges: list[tuple[int, int, int]] = []
+        coverage = ProtocolLineCoverage()
         code_lines = file_entry.get("codeLines", [])
         if code_lines is None:
             code_lines = []
@@ -2077,12 +4729,12 @@ def build_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
                     raise ProtocolValidationError(
                         f"Protocol DETAIL entry for {file_name} duplicates lineLocation {line_number}"
                     )
-                for range_start, range_end, _ in ranges:
-                    if range_start <= line_number <= range_end:
-                        raise ProtocolValidationError(
-                            f"Protocol DETAIL entry for {file_name} has overlapping line coverage at line {line_number}"
-                        )
+                if coverage.range_covers(line_number):
+                    raise ProtocolValidationError(
+                        f"Protocol DETAIL entry for {file_name} has overlapping line coverage at line {line_number}"
+                    )
                 exact_lines[line_number] = gen_ratio
+                coverage.add_line(line_number)
                 continue
 
             line_range = code_line.get("lineRange")
@@ -2091,8 +4743,9 @@ def build_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
                     raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} has non-object lineRange")
                 range_start = require_int(line_range.get("from"), f"Protocol DETAIL entry for {file_name} lineRange.from")
                 range_end = require_int(line_range.get("to"), f"Protocol DETAIL entry for {file_name} lineRange.to")
-                validate_no_overlap(file_name, exact_lines, ranges, range_start, range_end)
+                validate_no_overlap(file_name, exact_lines, ranges, range_start, range_end, coverage)
                 ranges.append((range_start, range_end, gen_ratio))
+                coverage.add_range(range_start, range_end)
                 continue
 
             raise ProtocolValidationError(
@@ -2122,6 +4775,7 @@ def build_doc_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
 
         exact_lines: dict[int, int] = {}
         ranges: list[tuple[int, int, int]] = []
+        coverage = ProtocolLineCoverage()
         doc_lines = file_entry.get("docLines", [])
         if doc_lines is None:
             doc_lines = []
@@ -2143,12 +4797,12 @@ def build_doc_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
                     raise ProtocolValidationError(
                         f"Protocol DETAIL entry for {file_name} duplicates lineLocation {line_number}"
                     )
-                for range_start, range_end, _ in ranges:
-                    if range_start <= line_number <= range_end:
-                        raise ProtocolValidationError(
-                            f"Protocol DETAIL entry for {file_name} has overlapping line coverage at line {line_number}"
-                        )
+                if coverage.range_covers(line_number):
+                    raise ProtocolValidationError(
+                        f"Protocol DETAIL entry for {file_name} has overlapping line coverage at line {line_number}"
+                    )
                 exact_lines[line_number] = gen_ratio
+                coverage.add_line(line_number)
                 continue
 
             line_range = doc_line.get("lineRange")
@@ -2157,8 +4811,9 @@ def build_doc_protocol_index(protocol: dict) -> dict[str, IndexedFileDetail]:
                     raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} has non-object lineRange")
                 range_start = require_int(line_range.get("from"), f"Protocol DETAIL entry for {file_name} lineRange.from")
                 range_end = require_int(line_range.get("to"), f"Protocol DETAIL entry for {file_name} lineRange.to")
-                validate_no_overlap(file_name, exact_lines, ranges, range_start, range_end)
+                validate_no_overlap(file_name, exact_lines, ranges, range_start, range_end, coverage)
                 ranges.append((range_start, range_end, gen_ratio))
+                coverage.add_range(range_start, range_end)
                 continue
 
             raise ProtocolValidationError(
@@ -2204,13 +4859,11 @@ def resolve_parent_revision(vcs_type: str, repo_dir: Path, repo_url: str, branch
 
 def best_effort_transition_hint(
     repo_dir: Path,
-    provider: GenCodeDescProvider,
     logger: RuntimeLogger,
     args: argparse.Namespace,
     blame_line: BlameLine,
     current_ratio: int,
-    protocols: dict[str, dict],
-    protocol_indexes: dict[str, dict[str, IndexedFileDetail]],
+    protocol_cache: ProtocolPrefetcher,
     parent_revisions: dict[str, str | None],
 ) -> str | None:
     if logger.level == "quiet":
@@ -2224,13 +4877,8 @@ def best_effort_transition_hint(
     if not parent_revision:
         return None
 
-    parent_protocol = protocols.get(parent_revision)
-    if parent_protocol is None:
-        parent_protocol = provider.get_revision_metadata(args.repoURL, args.repoBranch, parent_revision, args.vcsType)
-        protocols[parent_revision] = parent_protocol
-        protocol_indexes[parent_revision] = build_protocol_index(parent_protocol)
-
-    parent_ratio = line_ratio(protocol_indexes[parent_revision], blame_line.origin_file, blame_line.origin_line)
+    _parent_protocol, parent_protocol_index = protocol_cache.get(parent_revision)
+    parent_ratio = line_ratio(parent_protocol_index, blame_line.origin_file, blame_line.origin_line)
     if parent_ratio == current_ratio:
         return None
     return f"best_effort_transition={describe_ratio(parent_ratio)}->{describe_ratio(current_ratio)}"
@@ -2243,75 +4891,135 @@ def line_ratio(protocol_index: dict[str, IndexedFileDetail], origin_file: str, o
     exact_ratio = indexed_file.line_locations.get(origin_line)
     if exact_ratio is not None:
         return exact_ratio
-    for range_start, range_end, ratio in indexed_file.line_ranges:
-        if range_start <= origin_line <= range_end:
-            return ratio
-    return 0
+    return indexed_file.range_ratio(origin_line)
+
+
+def line_ratios(protocol_index: dict[str, IndexedFileDetail], origin_file: str, origin_lines: list[int]) -> list[int]:
+    """line_ratio for many lines of one file, resolved in one merge-walk over its sorted ranges."""
+    indexed_file = protocol_index.get(origin_file)
+    if indexed_file is None:
+        return [0] * len(origin_lines)
+    ratios = [indexed_file.line_locations.get(origin_line) for origin_line in origin_lines]
+    sorted_ranges = indexed_file.sorted_line_ranges
+    range_index = 0
+    for line_index in sorted(range(len(origin_lines)), key=origin_lines.__getitem__):
+        if ratios[line_index] is not None:
+            continue
+        origin_line = origin_lines[line_index]
+        while range_index < len(sorted_ranges) and sorted_ranges[range_index][1] < origin_line:
+            range_index += 1
+        if range_index < len(sorted_ranges) and sorted_ranges[range_index][0] <= origin_line:
+            ratios[line_index] = sorted_ranges[range_index][2]
+        else:
+            ratios[line_index] = 0
+    return ratios
+
+
+@dataclass(frozen=True)
+class AlgorithmCProtocolHeader:
+    path: Path
+    revision_id: str
+    revision_timestamp: datetime
+    vcs_type: str
+    repo_url: str
+    repo_branch: str
+
+
+_PROTOCOL_HEADER_KEY_PATTERNS = {key: re.compile(rf'"{key}"\s*:\s*') for key in ("protocolVersion", "REPOSITORY")}
+_PROTOCOL_HEADER_DECODER = json.JSONDecoder()
+
+
+def _scan_protocol_header_members(text: str) -> dict | None:
+    """Decode only protocolVersion and REPOSITORY, or None when the text is ambiguous and needs a full parse."""
+    members = {}
+    for key, pattern in _PROTOCOL_HEADER_KEY_PATTERNS.items():
+        matches = pattern.finditer(text)
+        match = next(matches, None)
+        # WHY: a key that is absent or appears twice (nested or commented
+        # out) cannot be trusted as the top-level member.
+        if match is None or next(matches, None) is not None:
+            return None
+        try:
+            members[key], _end = _PROTOCOL_HEADER_DECODER.raw_decode(text, match.end())
+        except ValueError:
+            return None
+    return members
+
+
+def _validate_algorithm_c_protocol_header(protocol_path: Path, protocol: object) -> AlgorithmCProtocolHeader:
+    if not isinstance(protocol, dict):
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} must be a JSON object")
+    if protocol.get("protocolVersion") != ALGORITHM_C_PROTOCOL_VERSION:
+        raise ProtocolValidationError(
+            f"Algorithm C requires protocolVersion {ALGORITHM_C_PROTOCOL_VERSION}; got {protocol.get('protocolVersion')!r} in {protocol_path.name}"
+        )
+
+    repository = protocol.get("REPOSITORY")
+    if not isinstance(repository, dict):
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY object")
+
+    protocol_vcs_type = repository.get("vcsType")
+    protocol_repo_url = repository.get("repoURL")
+    protocol_repo_branch = repository.get("repoBranch")
+    if not isinstance(protocol_vcs_type, str) or protocol_vcs_type not in {"git", "svn"}:
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing valid REPOSITORY.vcsType")
+    if not isinstance(protocol_repo_url, str) or not protocol_repo_url:
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.repoURL")
+    if not isinstance(protocol_repo_branch, str) or not protocol_repo_branch:
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.repoBranch")
+
+    revision_id = repository.get("revisionId")
+    if not isinstance(revision_id, str) or not revision_id:
+        raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.revisionId")
+
+    revision_timestamp = parse_protocol_timestamp(
+        repository.get("revisionTimestamp"),
+        f"REPOSITORY.revisionTimestamp in {protocol_path.name}",
+    )
+    return AlgorithmCProtocolHeader(
+        protocol_path, revision_id, revision_timestamp, protocol_vcs_type, protocol_repo_url, protocol_repo_branch
+    )
 
 
-def load_algorithm_c_protocols(base_dir: Path) -> list[tuple[dict, datetime, str]]:
-    protocols: list[tuple[dict, datetime, str]] = []
+def scan_algorithm_c_protocol_headers(base_dir: Path) -> list[AlgorithmCProtocolHeader]:
+    """Validate every protocol's header and return them in replay order, without keeping any DETAIL in memory."""
+    headers: list[AlgorithmCProtocolHeader] = []
     for protocol_path in sorted(base_dir.glob("*_genCodeDesc.json")):
         try:
-            protocol = load_json_document(protocol_path.read_text(encoding="utf-8"))
+            text = protocol_path.read_text(encoding="utf-8")
+            protocol = _scan_protocol_header_members(text)
+            if protocol is None:
+                protocol = load_json_document(text)
         except Exception as exc:
             raise ProtocolValidationError(f"Failed to read Algorithm C protocol from {protocol_path}: {exc}") from exc
+        headers.append(_validate_algorithm_c_protocol_header(protocol_path, protocol))
 
-        if not isinstance(protocol, dict):
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} must be a JSON object")
-        if protocol.get("protocolVersion") != ALGORITHM_C_PROTOCOL_VERSION:
-            raise ProtocolValidationError(
-                f"Algorithm C requires protocolVersion {ALGORITHM_C_PROTOCOL_VERSION}; got {protocol.get('protocolVersion')!r} in {protocol_path.name}"
-            )
+    if not headers:
+        raise ProtocolValidationError(f"Algorithm C requires at least one *_genCodeDesc.json file in {base_dir}")
 
-        repository = protocol.get("REPOSITORY")
-        if not isinstance(repository, dict):
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY object")
-
-        protocol_vcs_type = repository.get("vcsType")
-        protocol_repo_url = repository.get("repoURL")
-        protocol_repo_branch = repository.get("repoBranch")
-        if not isinstance(protocol_vcs_type, str) or protocol_vcs_type not in {"git", "svn"}:
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing valid REPOSITORY.vcsType")
-        if not isinstance(protocol_repo_url, str) or not protocol_repo_url:
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.repoURL")
-        if not isinstance(protocol_repo_branch, str) or not protocol_repo_branch:
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.repoBranch")
-
-        revision_id = repository.get("revisionId")
-        if not isinstance(revision_id, str) or not revision_id:
-            raise ProtocolValidationError(f"Algorithm C protocol at {protocol_path} missing REPOSITORY.revisionId")
-
-        revision_timestamp = parse_protocol_timestamp(
-            repository.get("revisionTimestamp"),
-            f"REPOSITORY.revisionTimestamp in {protocol_path.name}",
-        )
-        protocols.append((protocol, revision_timestamp, revision_id))
+    headers.sort(key=lambda header: (header.revision_timestamp, header.revision_id))
+    return headers
 
-    if not protocols:
-        raise ProtocolValidationError(f"Algorithm C requires at least one *_genCodeDesc.json file in {base_dir}")
 
-    protocols.sort(key=lambda item: (item[1], item[2]))
-    return protocols
+def load_algorithm_c_protocol(header: AlgorithmCProtocolHeader) -> dict:
+    try:
+        protocol = load_json_document(header.path.read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise ProtocolValidationError(f"Failed to read Algorithm C protocol from {header.path}: {exc}") from exc
+    if _validate_algorithm_c_protocol_header(header.path, protocol) != header:
+        raise ProtocolValidationError(f"Algorithm C protocol {header.path.name} changed during analysis")
+    return protocol
 
 
 def resolve_algorithm_c_repository_identity(
     args: argparse.Namespace,
-    end_protocol: dict,
+    end_header: AlgorithmCProtocolHeader,
 ) -> dict[str, str]:
-    repository = end_protocol.get("REPOSITORY")
-    if not isinstance(repository, dict):
-        raise ProtocolValidationError("Algorithm C end protocol missing REPOSITORY object")
-
     identity = {
-        "vcsType": repository.get("vcsType"),
-        "repoURL": repository.get("repoURL"),
-        "repoBranch": repository.get("repoBranch"),
+        "vcsType": end_header.vcs_type,
+        "repoURL": end_header.repo_url,
+        "repoBranch": end_header.repo_branch,
     }
-    for field_name, field_value in identity.items():
-        if not isinstance(field_value, str) or not field_value:
-            raise ProtocolValidationError(f"Algorithm C end protocol missing REPOSITORY.{field_name}")
-
     for field_name in ("vcsType", "repoURL", "repoBranch"):
         query_value = getattr(args, field_name)
         if not query_value:
@@ -2325,165 +5033,561 @@ def resolve_algorithm_c_repository_identity(
     return identity
 
 
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_seconds(value: datetime) -> int:
+    # WHY: flooring keeps day-bound comparisons exact, since start bounds are
+    # whole seconds and end bounds end at .999999 of their last second.
+    return (value - _UNIX_EPOCH) // timedelta(seconds=1)
+
+
+class OriginLineIntervals:
+    """Disjoint originalLine intervals of one blame origin, sorted by start, each carrying (genRatio, epoch seconds)."""
+
+    __slots__ = ("starts", "ends", "values")
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.values: list[tuple[int, int]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def __iter__(self) -> Iterator[tuple[int, int, tuple[int, int]]]:
+        return zip(self.starts, self.ends, self.values)
+
+    def remove(self, first: int, last: int) -> int:
+        """Drop lines first..last, splitting intervals that straddle either edge."""
+        low = bisect.bisect_left(self.ends, first)
+        high = bisect.bisect_right(self.starts, last)
+        if low >= high:
+            return low
+        starts: list[int] = []
+        ends: list[int] = []
+        values: list[tuple[int, int]] = []
+        if self.starts[low] < first:
+            starts.append(self.starts[low])
+            ends.append(first - 1)
+            values.append(self.values[low])
+        if self.ends[high - 1] > last:
+            starts.append(last + 1)
+            ends.append(self.ends[high - 1])
+            values.append(self.values[high - 1])
+        self.starts[low:high] = starts
+        self.ends[low:high] = ends
+        self.values[low:high] = values
+        return low + (1 if starts and starts[0] < first else 0)
+
+    def assign(self, first: int, last: int, value: tuple[int, int]) -> None:
+        index = self.remove(first, last)
+        # WHY: line-by-line adds of one block would otherwise cost one
+        # interval each, so equal neighbours are merged as they arrive.
+        merge_left = index > 0 and self.ends[index - 1] == first - 1 and self.values[index - 1] == value
+        merge_right = index < len(self.starts) and self.starts[index] == last + 1 and self.values[index] == value
+        if merge_left and merge_right:
+            self.ends[index - 1] = self.ends[index]
+            del self.starts[index], self.ends[index], self.values[index]
+        elif merge_left:
+            self.ends[index - 1] = last
+        elif merge_right:
+            self.starts[index] = first
+        else:
+            self.starts.insert(index, first)
+            self.ends.insert(index, last)
+            self.values.insert(index, value)
+
+
+class SurvivingLineSet:
+    """Algorithm C surviving lines, grouped by (revisionId, originalFilePath) origin with interned ids."""
+
+    def __init__(self) -> None:
+        self.revision_numbers: dict[str, int] = {}
+        self.path_numbers: dict[str, int] = {}
+        self.origins: dict[tuple[int, int], OriginLineIntervals] = {}
+        self.omitted_origins: set[tuple[int, int]] = set()
+        self._values: dict[tuple[int, int], tuple[int, int]] = {}
+
+    @staticmethod
+    def _number(numbers: dict[str, int], value: str) -> int:
+        number = numbers.get(value)
+        if number is None:
+            number = numbers[value] = len(numbers)
+        return number
+
+    def assign(self, revision_id: str, path: str, first: int, last: int, gen_ratio: int, epoch: int) -> None:
+        key = (self._number(self.revision_numbers, revision_id), self._number(self.path_numbers, path))
+        intervals = self.origins.get(key)
+        if intervals is None:
+            intervals = self.origins[key] = OriginLineIntervals()
+        value = (gen_ratio, epoch)
+        intervals.assign(first, last, self._values.setdefault(value, value))
+
+    def remove(self, revision_id: str, path: str, first: int, last: int) -> None:
+        key = (self.revision_numbers.get(revision_id), self.path_numbers.get(path))
+        intervals = self.origins.get(key)
+        if intervals is None:
+            return
+        intervals.remove(first, last)
+        if not intervals:
+            del self.origins[key]
+
+    def assign_omitted(self, revision_id: str, count: int, epoch: int) -> None:
+        # WHY: the N omitted lines of one revision are one interval; their
+        # legacy per-line names are only rebuilt when LiveLine logs need them.
+        self.assign(revision_id, f"__omitted_{revision_id}__", 0, count - 1, 0, epoch)
+        self.omitted_origins.add((self.revision_numbers[revision_id], self.path_numbers[f"__omitted_{revision_id}__"]))
+
+    def summarize(self, start_epoch: int, end_epoch: int) -> tuple[int, int, int]:
+        total = full = partial = 0
+        for intervals in self.origins.values():
+            for first, last, (gen_ratio, epoch) in intervals:
+                if not start_epoch <= epoch <= end_epoch:
+                    continue
+                line_count = last - first + 1
+                total += line_count
+                if gen_ratio == 100:
+                    full += line_count
+                elif gen_ratio > 0:
+                    partial += line_count
+        return total, full, partial
+
+    def live_lines(self, start_epoch: int, end_epoch: int) -> list[tuple[str, int, str, int]]:
+        """In-window lines as (originalFilePath, originalLine, revisionId, genRatio), sorted for LiveLine logs."""
+        revision_names = list(self.revision_numbers)
+        path_names = list(self.path_numbers)
+        lines: list[tuple[str, int, str, int]] = []
+        for (revision_number, path_number), intervals in self.origins.items():
+            revision_id = revision_names[revision_number]
+            omitted = (revision_number, path_number) in self.omitted_origins
+            for first, last, (gen_ratio, epoch) in intervals:
+                if not start_epoch <= epoch <= end_epoch:
+                    continue
+                for origin_line in range(first, last + 1):
+                    if omitted:
+                        lines.append((f"__omitted_{revision_id}_{origin_line}__", 0, revision_id, gen_ratio))
+                    else:
+                        lines.append((path_names[path_number], origin_line, revision_id, gen_ratio))
+        lines.sort(key=lambda line: (line[0], line[1], line[2]))
+        return lines
+
+
+ALGORITHM_C_CHECKPOINT_MAGIC = b"AGCC"
+ALGORITHM_C_CHECKPOINT_FORMAT_VERSION = 1
+ALGORITHM_C_CHECKPOINTS_KEPT = 3
+
+
+def fingerprint_algorithm_c_headers(headers: Iterable[AlgorithmCProtocolHeader]) -> str:
+    """SHA-256 over the replayed protocol files' names, sizes, mtimes and REPOSITORY order keys."""
+    digest = hashlib.sha256()
+    for header in headers:
+        stat = header.path.stat()
+        digest.update(
+            f"{header.path.name}\0{stat.st_size}\0{stat.st_mtime_ns}\0{header.revision_id}\0"
+            f"{header.revision_timestamp.isoformat()}\n".encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+@dataclass
+class AlgorithmCCheckpoint:
+    applied_count: int
+    surviving_lines: SurvivingLineSet
+    warnings: list[str]
+
+
+class AlgorithmCCheckpointStore:
+    """On-disk Algorithm C surviving-line checkpoints for one repository identity and scope.
+
+    File layout: magic, little-endian (formatVersion, metadataLength), JSON metadata,
+    then a zlib-compressed int64 array of (revision, path, intervalCount, (first, last, genRatio, epoch)*) records.
+    """
+
+    def __init__(self, checkpoint_dir: Path, repository_identity: Mapping[str, str], scope: str, logger: RuntimeLogger):
+        self.checkpoint_dir = checkpoint_dir
+        self.logger = logger
+        self.identity = [repository_identity["vcsType"], repository_identity["repoURL"], repository_identity["repoBranch"], scope]
+        self.prefix = f"algc-{hashlib.sha256(json.dumps(self.identity).encode('utf-8')).hexdigest()[:16]}-"
+
+    def _candidates(self) -> list[Path]:
+        try:
+            paths = [path for path in self.checkpoint_dir.glob(f"{self.prefix}*.ckpt") if path.stem[len(self.prefix) :].isdigit()]
+        except OSError:
+            return []
+        return sorted(paths, key=lambda path: int(path.stem[len(self.prefix) :]), reverse=True)
+
+    def _decode(self, data: bytes) -> tuple[dict, SurvivingLineSet]:
+        header_size = len(ALGORITHM_C_CHECKPOINT_MAGIC) + 8
+        if len(data) < header_size or not data.startswith(ALGORITHM_C_CHECKPOINT_MAGIC):
+            raise ValueError("not an Algorithm C checkpoint")
+        version, metadata_length = struct.unpack_from("<II", data, len(ALGORITHM_C_CHECKPOINT_MAGIC))
+        if version != ALGORITHM_C_CHECKPOINT_FORMAT_VERSION:
+            raise ValueError(f"unsupported format version {version}")
+        metadata = json.loads(data[header_size : header_size + metadata_length].decode("utf-8"))
+        body = data[header_size + metadata_length :]
+        if hashlib.sha256(body).hexdigest() != metadata["bodySha256"] or metadata["identity"] != self.identity:
+            raise ValueError("checksum or identity mismatch")
+        records = array.array("q")
+        records.frombytes(zlib.decompress(body))
+        if sys.byteorder != "little":
+            records.byteswap()
+
+        surviving_lines = SurvivingLineSet()
+        surviving_lines.revision_numbers = {revision_id: number for number, revision_id in enumerate(metadata["revisions"])}
+        surviving_lines.path_numbers = {path: number for number, path in enumerate(metadata["paths"])}
+        surviving_lines.omitted_origins = {tuple(origin) for origin in metadata["omitted"]}
+        position = 0
+        while position < len(records):
+            revision_number, path_number, interval_count = records[position : position + 3]
+            position += 3
+            intervals = surviving_lines.origins[(revision_number, path_number)] = OriginLineIntervals()
+            for _ in range(interval_count):
+                first, last, gen_ratio, epoch = records[position : position + 4]
+                position += 4
+                value = surviving_lines._values.setdefault((gen_ratio, epoch), (gen_ratio, epoch))
+                intervals.starts.append(first)
+                intervals.ends.append(last)
+                intervals.values.append(value)
+        return metadata, surviving_lines
+
+    def load(self, replay_headers: list[AlgorithmCProtocolHeader]) -> AlgorithmCCheckpoint | None:
+        """Newest checkpoint whose applied protocols are still an unchanged prefix of the replay order."""
+        for path in self._candidates():
+            applied_count = int(path.stem[len(self.prefix) :])
+            try:
+                if applied_count > len(replay_headers) or (
+                    fingerprint_algorithm_c_headers(replay_headers[:applied_count]) != self._read_fingerprint(path)
+                ):
+                    self.logger.debug(f"Skipping Algorithm C checkpoint {path.name}: protocol set changed")
+                    continue
+                metadata, surviving_lines = self._decode(path.read_bytes())
+            except (OSError, ValueError, KeyError, TypeError, struct.error, zlib.error) as exc:
+                self.logger.debug(f"Ignoring unreadable Algorithm C checkpoint {path.name}: {exc}")
+                continue
+            return AlgorithmCCheckpoint(applied_count, surviving_lines, list(metadata["warnings"]))
+        return None
+
+    @staticmethod
+    def _read_fingerprint(path: Path) -> str:
+        # WHY: the fingerprint sits in the metadata block, so rejected
+        # candidates are dismissed without reading their line records.
+        with path.open("rb") as handle:
+            prefix = handle.read(len(ALGORITHM_C_CHECKPOINT_MAGIC) + 8)
+            if len(prefix) < len(ALGORITHM_C_CHECKPOINT_MAGIC) + 8 or not prefix.startswith(ALGORITHM_C_CHECKPOINT_MAGIC):
+                raise ValueError("not an Algorithm C checkpoint")
+            _version, metadata_length = struct.unpack_from("<II", prefix, len(ALGORITHM_C_CHECKPOINT_MAGIC))
+            return json.loads(handle.read(metadata_length).decode("utf-8"))["fingerprint"]
+
+    def save(self, replay_headers: list[AlgorithmCProtocolHeader], surviving_lines: SurvivingLineSet, warnings: list[str]) -> None:
+        records = array.array("q")
+        for (revision_number, path_number), intervals in surviving_lines.origins.items():
+            records.extend((revision_number, path_number, len(intervals.starts)))
+            for first, last, (gen_ratio, epoch) in intervals:
+                records.extend((first, last, gen_ratio, epoch))
+        if sys.byteorder != "little":
+            records.byteswap()
+        body = zlib.compress(records.tobytes())
+        metadata = json.dumps(
+            {
+                "version": ALGORITHM_C_CHECKPOINT_FORMAT_VERSION,
+                "identity": self.identity,
+                "revisionTimestamp": replay_headers[-1].revision_timestamp.isoformat(),
+                "revisionId": replay_headers[-1].revision_id,
+                "appliedCount": len(replay_headers),
+                "fingerprint": fingerprint_algorithm_c_headers(replay_headers),
+                "warnings": warnings,
+                "revisions": list(surviving_lines.revision_numbers),
+                "paths": list(surviving_lines.path_numbers),
+                "omitted": sorted(surviving_lines.omitted_origins),
+                "bodySha256": hashlib.sha256(body).hexdigest(),
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        checkpoint_path = self.checkpoint_dir / f"{self.prefix}{len(replay_headers):010d}.ckpt"
+        temp_path = checkpoint_path.with_name(f"{checkpoint_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(
+                ALGORITHM_C_CHECKPOINT_MAGIC
+                + struct.pack("<II", ALGORITHM_C_CHECKPOINT_FORMAT_VERSION, len(metadata))
+                + metadata
+                + body
+            )
+            os.replace(temp_path, checkpoint_path)
+            for stale_path in self._candidates()[ALGORITHM_C_CHECKPOINTS_KEPT:]:
+                stale_path.unlink()
+        except OSError as exc:
+            self.logger.debug(f"Could not write Algorithm C checkpoint {checkpoint_path}: {exc}")
+            return
+        self.logger.debug(f"Wrote Algorithm C checkpoint {checkpoint_path.name} appliedProtocols={len(replay_headers)}")
+
+
+def _require_line_range(value: object, context: str) -> tuple[int, int]:
+    if not isinstance(value, dict):
+        raise ProtocolValidationError(f"{context} must be an object with from and to")
+    first = require_int(value.get("from"), f"{context}.from")
+    last = require_int(value.get("to"), f"{context}.to")
+    if first > last:
+        raise ProtocolValidationError(f"{context} has from greater than to")
+    return first, last
+
+
+def apply_algorithm_c_protocol(
+    protocol: dict,
+    header: AlgorithmCProtocolHeader,
+    scope: str,
+    surviving_lines: SurvivingLineSet,
+    timestamp_epochs: dict[str, int],
+) -> str | None:
+    """Apply one protocol's DETAIL to the surviving set; returns the omitted-lines warning, if any."""
+    detail_entries = protocol.get("DETAIL", [])
+    if not isinstance(detail_entries, list):
+        raise ProtocolValidationError("Protocol DETAIL must be a list")
+
+    protocol_add_count = 0
+    protocol_delete_count = 0
+
+    for file_entry in detail_entries:
+        if not isinstance(file_entry, dict):
+            raise ProtocolValidationError("Each Protocol DETAIL entry must be an object")
+        file_name = file_entry.get("fileName")
+        if not isinstance(file_name, str) or not file_name:
+            raise ProtocolValidationError("Protocol DETAIL entry missing fileName")
+
+        line_field_names: list[str] = []
+        if scope in ("A", "B", "D"):
+            line_field_names.append("codeLines")
+        if scope in ("C", "D"):
+            line_field_names.append("docLines")
+
+        for line_field in line_field_names:
+            line_entries = file_entry.get(line_field, [])
+            if line_entries is None:
+                continue
+            if not isinstance(line_entries, list):
+                raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} has non-list {line_field}")
+
+            for line_entry in line_entries:
+                if not isinstance(line_entry, dict):
+                    raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} contains a non-object {line_field} item")
+                change_type = line_entry.get("changeType")
+                blame = line_entry.get("blame")
+                if not isinstance(blame, dict):
+                    raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame object")
+
+                origin_revision_id = blame.get("revisionId")
+                origin_file_path = blame.get("originalFilePath")
+                if not isinstance(origin_revision_id, str) or not origin_revision_id:
+                    raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame.revisionId")
+                if not isinstance(origin_file_path, str) or not origin_file_path:
+                    raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame.originalFilePath")
+
+                if change_type == "delete":
+                    if "originalLineRange" in blame:
+                        first_line, last_line = _require_line_range(
+                            blame["originalLineRange"],
+                            f"Algorithm C delete entry for {file_name} blame.originalLineRange",
+                        )
+                    else:
+                        first_line = last_line = require_int(
+                            blame.get("originalLine"),
+                            f"Algorithm C delete entry for {file_name} blame.originalLine",
+                        )
+                    surviving_lines.remove(origin_revision_id, origin_file_path, first_line, last_line)
+                    protocol_delete_count += 1
+                    continue
+
+                if change_type != "add":
+                    raise ProtocolValidationError(
+                        f"Algorithm C {line_field} entry for {file_name} must declare changeType=add or changeType=delete"
+                    )
+
+                origin_line = require_int(
+                    blame.get("originalLine"),
+                    f"Algorithm C add entry for {file_name} blame.originalLine",
+                )
+                line_count = 1
+                if "lineRange" in line_entry:
+                    range_from, range_to = _require_line_range(
+                        line_entry["lineRange"], f"Algorithm C add entry for {file_name} lineRange"
+                    )
+                    # WHY: a lineRange entry is one contiguous block of a
+                    # single origin that starts at blame.originalLine.
+                    line_count = range_to - range_from + 1
+                gen_ratio = require_int(
+                    line_entry.get("genRatio"),
+                    f"Algorithm C add entry for {file_name} genRatio",
+                )
+                if not 0 <= gen_ratio <= 100:
+                    raise ProtocolValidationError(f"Algorithm C add entry for {file_name} has genRatio outside 0..100")
+                raw_timestamp = blame.get("timestamp")
+                blame_epoch = timestamp_epochs.get(raw_timestamp) if isinstance(raw_timestamp, str) else None
+                if blame_epoch is None:
+                    blame_epoch = epoch_seconds(
+                        parse_protocol_timestamp(raw_timestamp, f"Algorithm C add entry for {file_name} blame.timestamp")
+                    )
+                    timestamp_epochs[raw_timestamp] = blame_epoch
+                surviving_lines.assign(
+                    origin_revision_id, origin_file_path, origin_line, origin_line + line_count - 1, gen_ratio, blame_epoch
+                )
+                protocol_add_count += line_count
+
+    protocol_summary = protocol.get("SUMMARY", {})
+    declared_total = 0
+    if scope in ("A", "B", "D"):
+        declared_total += protocol_summary.get("totalCodeLines", 0) or 0
+    if scope in ("C", "D"):
+        declared_total += protocol_summary.get("totalDocLines", 0) or 0
+    if isinstance(declared_total, int) and declared_total > protocol_add_count and protocol_delete_count == 0:
+        omitted_count = declared_total - protocol_add_count
+        protocol_repo = protocol.get("REPOSITORY", {})
+        omit_revision_id = protocol_repo.get("revisionId", header.revision_id)
+        omit_ts_raw = protocol_repo.get("revisionTimestamp")
+        omit_timestamp = parse_protocol_timestamp(omit_ts_raw, f"Algorithm C omitted-line fallback for revision {omit_revision_id}") if omit_ts_raw else header.revision_timestamp
+        surviving_lines.assign_omitted(omit_revision_id, omitted_count, epoch_seconds(omit_timestamp))
+        return (
+            f"Protocol revision {omit_revision_id} declares {declared_total} lines in SUMMARY "
+            f"but DETAIL contains only {protocol_add_count}; "
+            f"{omitted_count} omitted line(s) treated as manual (genRatio=0)"
+        )
+    return None
+
+
 def build_result_algorithm_c(args: argparse.Namespace, logger: RuntimeLogger) -> dict:
+    return build_results_algorithm_c(args, logger, [(args.startTime, args.endTime)])[0]
+
+
+def build_results_algorithm_c(args: argparse.Namespace, logger: RuntimeLogger, windows: list[tuple[str, str]]) -> list[dict]:
+    """One Algorithm C replay answering every (startTime, endTime) window at its end protocol's boundary."""
     if args.outputFormat != "json":
         raise UnsupportedConfigurationError("Only JSON output is implemented in the current Algorithm C slice")
     if not args.genCodeDescSetDir:
         raise UnsupportedConfigurationError("Current Algorithm C slice requires --genCodeDescSetDir")
 
     analysis_start = time_mod.monotonic()
-    protocols = load_algorithm_c_protocols(Path(args.genCodeDescSetDir))
-    end_bound = parse_day_end(args.endTime)
-    start_bound = parse_day_start(args.startTime)
+    headers = scan_algorithm_c_protocol_headers(Path(args.genCodeDescSetDir))
+    latest_end_bound = max(parse_day_end(end_time) for _start_time, end_time in windows)
 
     requested_end_revision_id = args.endRevisionId
 
     if requested_end_revision_id is not None:
-        end_protocol = next((item for item in protocols if item[2] == requested_end_revision_id), None)
-        if end_protocol is None:
+        end_header = next((header for header in headers if header.revision_id == requested_end_revision_id), None)
+        if end_header is None:
             raise ProtocolValidationError(f"Algorithm C endRevisionId {requested_end_revision_id!r} was not found in --genCodeDescSetDir")
     else:
-        eligible_by_time = [item for item in protocols if item[1] <= end_bound]
+        eligible_by_time = [header for header in headers if header.revision_timestamp <= latest_end_bound]
         if not eligible_by_time:
             raise ProtocolValidationError("Algorithm C found no genCodeDesc protocol at or before endTime")
-        end_protocol = eligible_by_time[-1]
+        end_header = eligible_by_time[-1]
+
+    repository_identity = resolve_algorithm_c_repository_identity(args, end_header)
+    headers = [
+        header
+        for header in headers
+        if header.vcs_type == repository_identity["vcsType"]
+        and header.repo_url == repository_identity["repoURL"]
+        and header.repo_branch == repository_identity["repoBranch"]
+    ]
+    replay_headers = [header for header in headers if header.revision_timestamp <= end_header.revision_timestamp]
+    replay_timestamps = [header.revision_timestamp for header in replay_headers]
+
+    # WHY: a window's answer is the surviving set after every protocol up to
+    # its end protocol, i.e. a prefix of the one replay order.
+    boundaries: list[tuple[int, int, AlgorithmCProtocolHeader]] = []
+    for window_index, (_start_time, end_time) in enumerate(windows):
+        if requested_end_revision_id is not None:
+            window_end_header = end_header
+        else:
+            window_end_count = bisect.bisect_right(replay_timestamps, parse_day_end(end_time))
+            if window_end_count == 0:
+                raise ProtocolValidationError(f"Algorithm C found no genCodeDesc protocol at or before endTime {end_time}")
+            window_end_header = replay_headers[window_end_count - 1]
+        applied_boundary = bisect.bisect_right(replay_timestamps, window_end_header.revision_timestamp)
+        boundaries.append((applied_boundary, window_index, window_end_header))
+    boundaries.sort(key=lambda boundary: boundary[:2])
+
+    def log_window_start(window_index: int, window_end_header: AlgorithmCProtocolHeader) -> None:
+        start_time, end_time = windows[window_index]
+        logger.info(
+            f"Starting analysis for repo={repository_identity['repoURL']} "
+            f"branch={repository_identity['repoBranch']} window={start_time}..{end_time} endRevision={window_end_header.revision_id}"
+        )
 
-    repository_identity = resolve_algorithm_c_repository_identity(args, end_protocol[0])
-    filtered_protocols = []
-    for protocol, revision_timestamp, revision_id in protocols:
-        repository = protocol.get("REPOSITORY", {})
-        if (
-            repository.get("vcsType") == repository_identity["vcsType"]
-            and repository.get("repoURL") == repository_identity["repoURL"]
-            and repository.get("repoBranch") == repository_identity["repoBranch"]
-        ):
-            filtered_protocols.append((protocol, revision_timestamp, revision_id))
-    protocols = filtered_protocols
+    log_window_start(boundaries[0][1], boundaries[0][2])
+    timestamp_epochs: dict[str, int] = {}
+    surviving_lines = SurvivingLineSet()
+    applied_warnings: list[str] = []
+    applied_count = 0
 
-    end_revision_timestamp = end_protocol[1]
-    end_revision_id = end_protocol[2]
-    logger.info(
-        f"Starting analysis for repo={repository_identity['repoURL']} "
-        f"branch={repository_identity['repoBranch']} window={args.startTime}..{args.endTime} endRevision={end_revision_id}"
+    checkpoint_dir = getattr(args, "checkpointDir", None)
+    checkpoint_store = (
+        AlgorithmCCheckpointStore(Path(checkpoint_dir), repository_identity, args.scope, logger) if checkpoint_dir else None
     )
-    surviving_lines: dict[tuple[str, str, int], tuple[int, datetime]] = {}
-
-    for protocol, revision_timestamp, _revision_id in protocols:
-        if revision_timestamp > end_revision_timestamp:
-            continue
-        detail_entries = protocol.get("DETAIL", [])
-        if not isinstance(detail_entries, list):
-            raise ProtocolValidationError("Protocol DETAIL must be a list")
-
-        protocol_add_count = 0
-        protocol_delete_count = 0
-
-        for file_entry in detail_entries:
-            if not isinstance(file_entry, dict):
-                raise ProtocolValidationError("Each Protocol DETAIL entry must be an object")
-            file_name = file_entry.get("fileName")
-            if not isinstance(file_name, str) or not file_name:
-                raise ProtocolValidationError("Protocol DETAIL entry missing fileName")
-
-            line_field_names: list[str] = []
-            if args.scope in ("A", "B", "D"):
-                line_field_names.append("codeLines")
-            if args.scope in ("C", "D"):
-                line_field_names.append("docLines")
-
-            for line_field in line_field_names:
-                line_entries = file_entry.get(line_field, [])
-                if line_entries is None:
-                    continue
-                if not isinstance(line_entries, list):
-                    raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} has non-list {line_field}")
-
-                for line_entry in line_entries:
-                    if not isinstance(line_entry, dict):
-                        raise ProtocolValidationError(f"Protocol DETAIL entry for {file_name} contains a non-object {line_field} item")
-                    change_type = line_entry.get("changeType")
-                    blame = line_entry.get("blame")
-                    if not isinstance(blame, dict):
-                        raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame object")
-
-                    origin_revision_id = blame.get("revisionId")
-                    origin_file_path = blame.get("originalFilePath")
-                    if not isinstance(origin_revision_id, str) or not origin_revision_id:
-                        raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame.revisionId")
-                    if not isinstance(origin_file_path, str) or not origin_file_path:
-                        raise ProtocolValidationError(f"Algorithm C {line_field} entry for {file_name} missing blame.originalFilePath")
-
-                    if change_type == "delete":
-                        origin_line = require_int(
-                            blame.get("originalLine"),
-                            f"Algorithm C delete entry for {file_name} blame.originalLine",
-                        )
-                        surviving_lines.pop((origin_revision_id, origin_file_path, origin_line), None)
-                        protocol_delete_count += 1
-                        continue
+    if checkpoint_store is not None:
+        # WHY: the resumed state must not be past the earliest window's end.
+        checkpoint = checkpoint_store.load(replay_headers[: boundaries[0][0]])
+        if checkpoint is not None:
+            applied_count = checkpoint.applied_count
+            surviving_lines = checkpoint.surviving_lines
+            applied_warnings = checkpoint.warnings
+            logger.info(
+                f"Resuming Algorithm C from checkpoint appliedProtocols={applied_count} "
+                f"remainingProtocols={len(replay_headers) - applied_count}"
+            )
+            for warning in applied_warnings:
+                logger.warn(warning)
+    resumed_count = applied_count
+
+    results: list[dict | None] = [None] * len(windows)
+    for position, (applied_boundary, window_index, window_end_header) in enumerate(boundaries):
+        if position:
+            log_window_start(window_index, window_end_header)
+        for header in replay_headers[applied_count:applied_boundary]:
+            warning = apply_algorithm_c_protocol(load_algorithm_c_protocol(header), header, args.scope, surviving_lines, timestamp_epochs)
+            if warning is not None:
+                logger.warn(warning)
+                applied_warnings.append(warning)
+        applied_count = max(applied_count, applied_boundary)
+        results[window_index] = _summarize_algorithm_c_window(
+            args,
+            logger,
+            surviving_lines,
+            windows[window_index],
+            window_end_header.revision_id,
+            repository_identity,
+            analysis_start,
+            # WHY: a single window keeps the logger's warnings; batch windows
+            # only report the warnings raised up to their own boundary.
+            None if len(windows) == 1 else list(applied_warnings),
+        )
+    if checkpoint_store is not None and applied_count > resumed_count:
+        checkpoint_store.save(replay_headers[:applied_count], surviving_lines, applied_warnings)
+    return results
 
-                    if change_type != "add":
-                        raise ProtocolValidationError(
-                            f"Algorithm C {line_field} entry for {file_name} must declare changeType=add or changeType=delete"
-                        )
 
-                    origin_line = require_int(
-                        blame.get("originalLine"),
-                        f"Algorithm C add entry for {file_name} blame.originalLine",
-                    )
-                    gen_ratio = require_int(
-                        line_entry.get("genRatio"),
-                        f"Algorithm C add entry for {file_name} genRatio",
-                    )
-                    if not 0 <= gen_ratio <= 100:
-                        raise ProtocolValidationError(f"Algorithm C add entry for {file_name} has genRatio outside 0..100")
-                    blame_timestamp = parse_protocol_timestamp(
-                        blame.get("timestamp"),
-                        f"Algorithm C add entry for {file_name} blame.timestamp",
-                    )
-                    surviving_lines[(origin_revision_id, origin_file_path, origin_line)] = (gen_ratio, blame_timestamp)
-                    protocol_add_count += 1
-
-        protocol_summary = protocol.get("SUMMARY", {})
-        declared_total = 0
-        if args.scope in ("A", "B", "D"):
-            declared_total += protocol_summary.get("totalCodeLines", 0) or 0
-        if args.scope in ("C", "D"):
-            declared_total += protocol_summary.get("totalDocLines", 0) or 0
-        if isinstance(declared_total, int) and declared_total > protocol_add_count and protocol_delete_count == 0:
-            omitted_count = declared_total - protocol_add_count
-            protocol_repo = protocol.get("REPOSITORY", {})
-            omit_revision_id = protocol_repo.get("revisionId", _revision_id)
-            omit_ts_raw = protocol_repo.get("revisionTimestamp")
-            omit_timestamp = parse_protocol_timestamp(omit_ts_raw, f"Algorithm C omitted-line fallback for revision {omit_revision_id}") if omit_ts_raw else revision_timestamp
-            for i in range(omitted_count):
-                omitted_key = (omit_revision_id, f"__omitted_{omit_revision_id}_{i}__", 0)
-                surviving_lines[omitted_key] = (0, omit_timestamp)
-            logger.warn(
-                f"Protocol revision {omit_revision_id} declares {declared_total} lines in SUMMARY "
-                f"but DETAIL contains only {protocol_add_count}; "
-                f"{omitted_count} omitted line(s) treated as manual (genRatio=0)"
+def _summarize_algorithm_c_window(
+    args: argparse.Namespace,
+    logger: RuntimeLogger,
+    surviving_lines: SurvivingLineSet,
+    window: tuple[str, str],
+    end_revision_id: str,
+    repository_identity: dict[str, str],
+    analysis_start: float,
+    warnings: list[str] | None,
+) -> dict:
+    start_epoch = epoch_seconds(parse_day_start(window[0]))
+    end_epoch = epoch_seconds(parse_day_end(window[1]))
+    # WHY: per-line expansion and its sort only serve LiveLine logs, so
+    # quiet runs count whole intervals instead.
+    if logger.info_enabled():
+        for origin_file_path, origin_line, origin_revision_id, gen_ratio in surviving_lines.live_lines(start_epoch, end_epoch):
+            logger.info(
+                f"LiveLine {origin_file_path}:{origin_line} aggregate "
+                f"origin={origin_file_path}:{origin_line}@{origin_revision_id} "
+                f"classification={describe_ratio(gen_ratio)}"
             )
-
-    total_code_lines = 0
-    full_generated_code_lines = 0
-    partial_generated_code_lines = 0
-    for (origin_revision_id, origin_file_path, origin_line), (gen_ratio, blame_timestamp) in sorted(
-        surviving_lines.items(),
-        key=lambda item: (item[0][1], item[0][2], item[0][0]),
-    ):
-        if not (start_bound <= blame_timestamp <= end_bound):
-            continue
-        total_code_lines += 1
-        logger.info(
-            f"LiveLine {origin_file_path}:{origin_line} aggregate "
-            f"origin={origin_file_path}:{origin_line}@{origin_revision_id} "
-            f"classification={describe_ratio(gen_ratio)}"
-        )
-        if gen_ratio == 100:
-            full_generated_code_lines += 1
-        elif gen_ratio > 0:
-            partial_generated_code_lines += 1
+    total_code_lines, full_generated_code_lines, partial_generated_code_lines = surviving_lines.summarize(start_epoch, end_epoch)
 
     elapsed = time_mod.monotonic() - analysis_start
     if args.scope == "C":
@@ -2517,6 +5621,7 @@ def build_result_algorithm_c(args: argparse.Namespace, logger: RuntimeLogger) ->
         logger,
         protocol_version=ALGORITHM_C_PROTOCOL_VERSION,
         repository_override=repository_identity,
+        warnings=warnings,
     )
 
 
@@ -2549,6 +5654,55 @@ def build_result(args: argparse.Namespace) -> dict:
         return build_result_algorithm_c(args, logger)
     if args.algorithm != "A":
         raise UnsupportedConfigurationError("Only Algorithm A, B, and the current Algorithm C slice are implemented")
+    return build_result_algorithm_a(args, logger)
+
+
+def query_window_args(args: argparse.Namespace, window: tuple[str, str]) -> argparse.Namespace:
+    return argparse.Namespace(**{**vars(args), "startTime": window[0], "endTime": window[1]})
+
+
+def build_window_results(args: argparse.Namespace) -> list[dict]:
+    """One result document per --windows entry, in request order, sharing blame, replay or accumulation where possible."""
+    windows = args.queryWindows
+    results: list[dict] | None = None
+    if args.algorithm == "C":
+        results = build_results_algorithm_c(args, RuntimeLogger(args.logLevel), windows)
+    elif args.algorithm == "B" and resolve_algorithm_b_metric(args) == "live_changed_source_ratio" and not args.commitDiffSetDir:
+        results = build_results_algorithm_b_live_snapshot_local_git(args, RuntimeLogger(args.logLevel), windows)
+
+    if results is None:
+        results = [{} for _window in windows]
+        end_snapshots: dict[str, AlgorithmAEndSnapshot] = {}
+        # WHY: windows run in end order so consecutive windows that resolve to
+        # the same end revision share its Algorithm A blame.
+        for window_index in sorted(range(len(windows)), key=lambda index: parse_day_end(windows[index][1])):
+            window_args = query_window_args(args, windows[window_index])
+            if args.algorithm == "A":
+                results[window_index] = build_result_algorithm_a(window_args, RuntimeLogger(args.logLevel), end_snapshots)
+            else:
+                results[window_index] = build_result(window_args)
+
+    return [
+        {**result, "WINDOW": {"startTime": start_time, "endTime": end_time}}
+        for result, (start_time, end_time) in zip(results, windows)
+    ]
+
+
+@dataclass
+class AlgorithmAEndSnapshot:
+    """Blame results of one Algorithm A end revision, kept so windows sharing it are not re-blamed."""
+
+    end_revision_id: str
+    source_files: list[str]
+    revision_metadata: RevisionMetadataCache
+    blame_results: list[tuple[str, list[BlameLine]]]
+
+
+def build_result_algorithm_a(
+    args: argparse.Namespace,
+    logger: RuntimeLogger,
+    end_snapshots: dict[str, AlgorithmAEndSnapshot] | None = None,
+) -> dict:
     if args.scope not in ("A", "B", "C", "D"):
         raise UnsupportedConfigurationError("Only Scope A, B, C, and D are implemented in the current Git/SVN Algorithm A slice")
     if args.outputFormat != "json":
@@ -2562,8 +5716,16 @@ def build_result(args: argparse.Namespace) -> dict:
     provider = build_gen_code_desc_provider(args, logger)
     start_bound = parse_day_start(args.startTime)
     end_bound = parse_day_end(args.endTime)
-    if args.vcsType == "git":
-        end_revision_id = resolve_end_revision(repo_dir, args.repoBranch, args.endTime)
+    end_revision_id = (
+        resolve_end_revision(repo_dir, args.repoBranch, args.endTime)
+        if args.vcsType == "git"
+        else resolve_svn_end_revision(args.repoURL, args.repoBranch, args.endTime)
+    )
+    end_snapshot = None if end_snapshots is None else end_snapshots.get(end_revision_id)
+    if end_snapshot is not None:
+        source_files = end_snapshot.source_files
+        repo_identity_url = logical_repo_url
+    elif args.vcsType == "git":
         if args.scope == "C":
             source_files = list_doc_files(repo_dir, end_revision_id)
         elif args.scope == "D":
@@ -2572,7 +5734,6 @@ def build_result(args: argparse.Namespace) -> dict:
             source_files = list_source_files(repo_dir, end_revision_id)
         repo_identity_url = logical_repo_url
     else:
-        end_revision_id = resolve_svn_end_revision(args.repoURL, args.repoBranch, args.endTime)
         if args.scope == "C":
             source_files = list_svn_doc_files(args.repoURL, args.repoBranch, end_revision_id)
         elif args.scope == "D":
@@ -2584,23 +5745,65 @@ def build_result(args: argparse.Namespace) -> dict:
         f"Starting analysis for repo={repo_identity_url} branch={args.repoBranch} window={args.startTime}..{args.endTime} endRevision={end_revision_id}"
     )
 
-    protocols: dict[str, dict] = {}
-    protocol_indexes: dict[str, dict[str, IndexedFileDetail]] = {}
-    parent_revisions: dict[str, str | None] = {}
-    commit_times: dict[str, datetime] = {}
+    if end_snapshot is not None:
+        revision_metadata = end_snapshot.revision_metadata
+    else:
+        revision_metadata = preload_revision_metadata(
+            args.vcsType, repo_dir, args.repoURL, end_revision_id, logger, timeout=getattr(args, "timeout", COMMAND_TIMEOUT_SECONDS)
+        )
+    parent_revisions = revision_metadata.first_parent_revisions()
+    commit_times = revision_metadata.commit_times
     total_code_lines = 0
     full_generated_code_lines = 0
     partial_generated_code_lines = 0
 
     logger.debug(f"Resolved {len(source_files)} source files in the end snapshot")
 
-    for relative_path in source_files:
+    jobs = getattr(args, "jobs", DEFAULT_JOBS)
+    if jobs > 1:
+        logger.debug(f"Blaming {len(source_files)} files with {jobs} parallel workers")
+
+    blame_cache_dir = getattr(args, "blameCacheDir", None)
+    blame_cache = BlameCache(Path(blame_cache_dir), repo_dir, end_revision_id) if blame_cache_dir and end_snapshot is None else None
+    if end_snapshot is not None:
+        logger.debug(f"Reusing blame results of end revision {end_revision_id} for {len(source_files)} files")
+        blame_results: Iterable[tuple[str, list[BlameLine]]] = end_snapshot.blame_results
+    else:
+        blame_results = iter_algorithm_a_blame_results(args, repo_dir, end_revision_id, source_files, jobs, blame_cache)
+        if end_snapshots is not None:
+            # WHY: windows are answered in end order, so only the latest end
+            # revision's blame is kept and memory stays one snapshot deep.
+            end_snapshots.clear()
+            end_snapshot = end_snapshots[end_revision_id] = AlgorithmAEndSnapshot(end_revision_id, source_files, revision_metadata, [])
+            blame_results = _record_blame_results(blame_results, end_snapshot.blame_results)
+
+    # WHY: metadata is revision-scoped. Many lines share one origin revision,
+    # so protocols are fetched and indexed once per revision and kept in a
+    # bounded LRU rather than refetched per line or held for the whole history.
+    protocol_cache = ProtocolPrefetcher(
+        provider,
+        logger,
+        args,
+        getattr(args, "metadataJobs", DEFAULT_METADATA_JOBS),
+        getattr(args, "protocolCacheSize", DEFAULT_PROTOCOL_CACHE_SIZE),
+    )
+
+    def needed_revision_ids(blame_lines: list[BlameLine]) -> dict[str, None]:
+        revision_ids: dict[str, None] = {}
+        for blame_line in blame_lines:
+            commit_time = commit_times.get(blame_line.revision_id)
+            if commit_time is None or not (start_bound <= commit_time <= end_bound):
+                continue
+            if not is_code_line(blame_line.content, args.scope):
+                continue
+            revision_ids[blame_line.revision_id] = None
+            parent_revision = parent_revisions.get(blame_line.revision_id)
+            if parent_revision and logger.info_enabled():
+                revision_ids[parent_revision] = None
+        return revision_ids
+
+    for relative_path, blame_lines in protocol_cache.iter_prefetched(blame_results, needed_revision_ids):
         logger.debug(f"Scanning file {relative_path}")
-        blame_lines = (
-            parse_blame(repo_dir, end_revision_id, relative_path)
-            if args.vcsType == "git"
-            else parse_svn_blame(args.repoURL, args.repoBranch, end_revision_id, relative_path)
-        )
         for blame_line in blame_lines:
             if not is_code_line(blame_line.content, args.scope):
                 logger.debug(f"Skip non-code line {relative_path}:{blame_line.final_line}")
@@ -2622,32 +5825,18 @@ def build_result(args: argparse.Namespace) -> dict:
                 continue
 
             total_code_lines += 1
-            protocol = protocols.get(blame_line.revision_id)
-            if protocol is None:
-                # WHY: metadata is revision-scoped. Many lines can share one
-                # origin revision, so caching keeps lookup cost aligned with the
-                # revision model instead of repeating the same fetch per line.
-                protocol = provider.get_revision_metadata(args.repoURL, args.repoBranch, blame_line.revision_id, args.vcsType)
-                protocols[blame_line.revision_id] = protocol
-                if args.scope == "C":
-                    protocol_indexes[blame_line.revision_id] = build_doc_protocol_index(protocol)
-                elif args.scope == "D":
-                    protocol_indexes[blame_line.revision_id] = build_combined_protocol_index(protocol)
-                else:
-                    protocol_indexes[blame_line.revision_id] = build_protocol_index(protocol)
-            else:
+            if protocol_cache.is_cached(blame_line.revision_id):
                 logger.debug(f"Reuse cached genCodeDesc for revision {blame_line.revision_id}")
+            _protocol, protocol_index = protocol_cache.get(blame_line.revision_id)
 
-            ratio = line_ratio(protocol_indexes[blame_line.revision_id], blame_line.origin_file, blame_line.origin_line)
+            ratio = line_ratio(protocol_index, blame_line.origin_file, blame_line.origin_line)
             transition_hint = best_effort_transition_hint(
                 repo_dir,
-                provider,
                 logger,
                 args,
                 blame_line,
                 ratio,
-                protocols,
-                protocol_indexes,
+                protocol_cache,
                 parent_revisions,
             )
             line_message = (
@@ -2668,6 +5857,12 @@ def build_result(args: argparse.Namespace) -> dict:
             elif ratio > 0:
                 partial_generated_code_lines += 1
 
+    if blame_cache is not None:
+        logger.info(
+            f"Blame cache {blame_cache.cache_dir}: hits={blame_cache.hits} "
+            f"incrementalReblames={blame_cache.incremental_reblames} misses={blame_cache.misses}"
+        )
+
     elapsed = time_mod.monotonic() - analysis_start
     logger.info(
         "Finished analysis with "
@@ -2698,6 +5893,15 @@ def build_result(args: argparse.Namespace) -> dict:
     )
 
 
+def _record_blame_results(
+    blame_results: Iterable[tuple[str, list[BlameLine]]],
+    recorded: list[tuple[str, list[BlameLine]]],
+) -> Iterator[tuple[str, list[BlameLine]]]:
+    for blame_result in blame_results:
+        recorded.append(blame_result)
+        yield blame_result
+
+
 # Exit codes for distinct failure categories.
 EXIT_SUCCESS = 0
 EXIT_INPUT_ERROR = 1
@@ -2721,7 +5925,7 @@ def main() -> None:
         else:
             print("WARNING: --maxRuntime timeout not supported on this platform", file=sys.stderr)
 
-        result = build_result(args)
+        result = build_window_results(args) if args.queryWindows is not None else build_result(args)
         output = json.dumps(result, indent=2)
         if args.outputFile:
             Path(args.outputFile).write_text(output, encoding="utf-8")
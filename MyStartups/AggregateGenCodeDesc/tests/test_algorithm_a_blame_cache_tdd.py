@@ -0,0 +1,124 @@
+import io
+import re
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness
+
+
+def _args(repo_dir: Path, blame_cache_dir: Path | None) -> Namespace:
+    return Namespace(
+        repoURL=str(repo_dir),
+        repoBranch="main",
+        startTime="2026-03-03",
+        endTime="2026-03-31",
+        vcsType="git",
+        algorithm="A",
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=None,
+        workingDir=None,
+        failOnMissingProtocol=False,
+        warnOnMissingProtocol=False,
+        includeBreakdown="none",
+        logLevel="info",
+        blameCacheDir=str(blame_cache_dir) if blame_cache_dir else None,
+    )
+
+
+def _run(repo_dir: Path, blame_cache_dir: Path | None) -> tuple[dict, dict[str, int]]:
+    with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+        result = aggregateGenCodeDesc.build_result(_args(repo_dir, blame_cache_dir))
+    counts: dict[str, int] = {}
+    match = re.search(r"hits=(\d+) incrementalReblames=(\d+) misses=(\d+)", stderr.getvalue())
+    if match:
+        counts = dict(zip(("hits", "incrementalReblames", "misses"), map(int, match.groups())))
+    return result, counts
+
+
+class TestAlgorithmABlameCacheTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_warm_and_incremental_runs_match_cold_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root_dir = Path(temp_dir)
+            repo_dir = root_dir / "repo"
+            cache_dir = root_dir / "blame-cache"
+            repo_dir.mkdir()
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/calc.py", "def calc(x):\n    value = x\n    return value\n")
+            repo.write("src/util.py", "def util():\n    return 1\n")
+            repo.write("src/stable.py", "STABLE = 1\n")
+            repo.commit_all("r1", "2026-03-01T09:00:00Z")
+            repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+            repo.commit_all("r2", "2026-03-05T09:00:00Z")
+
+            cold_result, _ = _run(repo_dir, None)
+            first_result, first_counts = _run(repo_dir, cache_dir)
+            warm_result, warm_counts = _run(repo_dir, cache_dir)
+
+            self.assertEqual(first_result, cold_result)
+            self.assertEqual(warm_result, cold_result)
+            self.assertEqual(first_counts, {"hits": 0, "incrementalReblames": 0, "misses": 3})
+            self.assertEqual(warm_counts, {"hits": 3, "incrementalReblames": 0, "misses": 0})
+
+            # WHY: calc.py is edited and then reverted, so its blob matches the
+            # cached one but git blame re-attributes the lines to the revert.
+            repo.write("src/util.py", "def util():\n    helper = 2\n    return 1\n")
+            repo.commit_all("r3", "2026-03-06T09:00:00Z")
+            repo.write("src/calc.py", "def calc(x):\n    value = x + 2\n    return value\n")
+            repo.commit_all("r4", "2026-03-07T09:00:00Z")
+            repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+            repo.commit_all("r5", "2026-03-08T09:00:00Z")
+
+            cold_result, _ = _run(repo_dir, None)
+            incremental_result, incremental_counts = _run(repo_dir, cache_dir)
+
+        self.assertEqual(incremental_result, cold_result)
+        self.assertEqual(incremental_counts, {"hits": 1, "incrementalReblames": 2, "misses": 0})
+        self.assertEqual(cold_result["SUMMARY"]["totalCodeLines"], 2)
+
+    def test_blame_cache_rejects_unrelated_end_revision_and_reblames(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root_dir = Path(temp_dir)
+            repo_dir = root_dir / "repo"
+            cache_dir = root_dir / "blame-cache"
+            repo_dir.mkdir()
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/calc.py", "def calc(x):\n    return x\n")
+            base = repo.commit_all("r1", "2026-03-04T09:00:00Z")
+            repo.checkout_new_branch("side")
+            repo.write("src/calc.py", "def calc(x):\n    return x * 3\n")
+            side = repo.commit_all("r2", "2026-03-05T09:00:00Z")
+            repo.checkout("main")
+            repo.write("src/calc.py", "def calc(x):\n    return x * 2\n")
+            main = repo.commit_all("r3", "2026-03-06T09:00:00Z")
+
+            side_cache = aggregateGenCodeDesc.BlameCache(cache_dir, repo_dir, side)
+            side_cache.blame("src/calc.py")
+            main_cache = aggregateGenCodeDesc.BlameCache(cache_dir, repo_dir, main)
+            main_lines = main_cache.blame("src/calc.py")
+
+        self.assertEqual((main_cache.hits, main_cache.incremental_reblames, main_cache.misses), (0, 0, 1))
+        self.assertEqual([line.revision_id for line in main_lines], [base, main])
+
+    def test_blame_cache_requires_git_algorithm_a(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args = _args(Path(temp_dir), Path(temp_dir) / "blame-cache")
+            args.vcsType = "svn"
+            args.repoURL = "svn://example.local/repo"
+            args.commitDiffSetDir = None
+            args.queryArgsFile = None
+
+            with self.assertRaisesRegex(aggregateGenCodeDesc.InputValidationError, "--blameCacheDir is only supported"):
+                aggregateGenCodeDesc.validate_inputs(args)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import io
+import tempfile
+import threading
+import time
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import ProtocolPrefetcher, RuntimeLogger
+from tests.cli_test_support import GitRepoHarness, write_revision_protocol
+
+
+class _SlowProvider(aggregateGenCodeDesc.GenCodeDescProvider):
+    def __init__(self, logger: RuntimeLogger):
+        self.logger = logger
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_revision_metadata(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict:
+        index = int(revision_id[1:])
+        with self._lock:
+            self.calls.append(revision_id)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # WHY: earlier revisions finish last, so completion order is reversed.
+        time.sleep(0.01 * (6 - index))
+        with self._lock:
+            self.in_flight -= 1
+        if index % 2:
+            self.logger.warn_once(f"missing:{revision_id}", f"missing {revision_id}")
+            return {}
+        return {"DETAIL": [{"fileName": "src/a.py", "codeLines": [{"lineLocation": 1, "genRatio": 100}]}]}
+
+
+def _namespace(**overrides: object) -> Namespace:
+    values = dict(repoURL="", repoBranch="main", vcsType="git", scope="A")
+    values.update(overrides)
+    return Namespace(**values)
+
+
+class TestAlgorithmAMetadataPrefetchTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_prefetch_runs_concurrently_and_replays_worker_logs_in_request_order(self) -> None:
+        logger = RuntimeLogger("quiet")
+        provider = _SlowProvider(logger)
+        revision_ids = [f"r{index}" for index in range(6)]
+        prefetcher = ProtocolPrefetcher(provider, logger, _namespace(), jobs=4)
+
+        prefetcher.prefetch(revision_ids)
+        ratios = [
+            aggregateGenCodeDesc.line_ratio(prefetcher.get(revision_id)[1], "src/a.py", 1) for revision_id in revision_ids
+        ]
+        prefetcher.close()
+
+        self.assertGreater(provider.max_in_flight, 1)
+        self.assertEqual(ratios, [100, 0, 100, 0, 100, 0])
+        self.assertEqual(logger.warnings(), ["missing r1", "missing r3", "missing r5"])
+
+    def test_cache_is_bounded_and_refetches_evicted_revisions(self) -> None:
+        logger = RuntimeLogger("quiet")
+        provider = _SlowProvider(logger)
+        prefetcher = ProtocolPrefetcher(provider, logger, _namespace(), max_cached=2)
+
+        for revision_id in ("r5", "r4", "r5", "r3", "r4"):
+            prefetcher.get(revision_id)
+
+        self.assertEqual(provider.calls, ["r5", "r4", "r3", "r4"])
+        self.assertTrue(prefetcher.is_cached("r3"))
+        self.assertFalse(prefetcher.is_cached("r5"))
+
+    def test_build_result_with_metadata_jobs_matches_serial_output_and_logs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root_dir = Path(temp_dir)
+            repo_dir = root_dir / "repo"
+            protocol_dir = root_dir / "protocols"
+            repo_dir.mkdir()
+            protocol_dir.mkdir()
+            repo = GitRepoHarness(repo_dir)
+            for index in range(8):
+                repo.write(f"src/f{index}.py", "".join(f"value_{index}_{line} = {line}\n" for line in range(index + 2)))
+                revision_id = repo.commit_all(f"r{index}", f"2026-03-{index + 2:02d}T09:00:00Z")
+                if index % 3 == 0:
+                    continue
+                protocol = {
+                    "protocolName": "generatedTextDesc",
+                    "protocolVersion": "26.03",
+                    "DETAIL": [
+                        {
+                            "fileName": f"src/f{index}.py",
+                            "codeLines": [{"lineLocation": 1, "genRatio": 100}, {"lineLocation": 2, "genRatio": 40}],
+                        }
+                    ],
+                    "REPOSITORY": {"vcsType": "git", "repoBranch": "main"},
+                }
+                write_revision_protocol(protocol_dir, protocol, repo_dir, revision_id)
+
+            outputs = []
+            for metadata_jobs in (1, 4):
+                args = Namespace(
+                    repoURL=str(repo_dir),
+                    repoBranch="main",
+                    startTime="2026-03-01",
+                    endTime="2026-03-31",
+                    vcsType="git",
+                    algorithm="A",
+                    scope="A",
+                    outputFile=None,
+                    outputFormat="json",
+                    metadataSource="genCodeDesc",
+                    genCodeDescSetDir=str(protocol_dir),
+                    workingDir=None,
+                    failOnMissingProtocol=False,
+                    warnOnMissingProtocol=True,
+                    includeBreakdown="none",
+                    logLevel="info",
+                    metadataJobs=metadata_jobs,
+                )
+                with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                    result = aggregateGenCodeDesc.build_result(args)
+                records = [line.split(" ", 1)[1] for line in stderr.getvalue().splitlines() if "[INFO]" in line or "[WARN]" in line]
+                outputs.append((result, [record for record in records if "elapsed=" not in record]))
+
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(len(outputs[0][0]["WARNINGS"]), 3)
+        self.assertEqual(outputs[0][0]["SUMMARY"]["fullGeneratedCodeLines"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import tempfile
+import threading
+import time
+import unittest
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness, load_json, run_cli, write_revision_protocol
+
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "testdata" / "us1_live_changed_source_ratio"
+
+
+class _ProviderStub:
+    def get_revision_metadata(self, repo_url: str, repo_branch: str, revision_id: str, vcs_type: str) -> dict:
+        return {
+            "DETAIL": [
+                {"fileName": f"src/f{index}.py", "codeLines": [{"lineLocation": 1, "genRatio": 100 if index % 2 else 40}]}
+                for index in range(8)
+            ]
+        }
+
+
+def _log_records(stderr: str) -> list[str]:
+    # WHY: each log record is prefixed by a wall-clock timestamp, so only the
+    # message body can be compared between runs.
+    return [line.split(" ", 1)[1] for line in stderr.splitlines() if "LiveLine" in line or "TransitionHint" in line]
+
+
+class TestAlgorithmAParallelBlameTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_ordered_pool_results_keep_input_order_and_bound_in_flight_work(self) -> None:
+        lock = threading.Lock()
+        in_flight = 0
+        max_seen = 0
+
+        def slow_echo(value: int) -> int:
+            nonlocal in_flight, max_seen
+            with lock:
+                in_flight += 1
+                max_seen = max(max_seen, in_flight)
+            # WHY: earlier items sleep longer so completion order differs from
+            # submission order.
+            time.sleep(0.01 * (10 - value))
+            with lock:
+                in_flight -= 1
+            return value
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(aggregateGenCodeDesc.iter_ordered_pool_results(executor, slow_echo, range(10), 3))
+
+        self.assertEqual(results, list(range(10)))
+        self.assertLessEqual(max_seen, 3)
+
+    def test_build_result_with_jobs_matches_serial_summary(self) -> None:
+        blame_by_file = {
+            f"src/f{index}.py": [
+                aggregateGenCodeDesc.BlameLine(f"rev-{index % 3}", f"src/f{index}.py", 1, 1, f"value_{index} = compute()"),
+                aggregateGenCodeDesc.BlameLine(f"rev-{index % 3}", f"src/f{index}.py", 2, 2, "# comment"),
+            ]
+            for index in range(8)
+        }
+
+        def slow_blame(repo_dir: Path, revision_id: str, relative_path: str) -> list:
+            time.sleep(0.002 * (8 - int(relative_path[5])))
+            return blame_by_file[relative_path]
+
+        def fake_run_git(repo_dir: Path, git_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
+            if git_args[:2] == ["rev-list", "-1"]:
+                return "end-revision"
+            if git_args[:2] == ["rev-list", "--count"]:
+                return "3"
+            if git_args[0] == "log":
+                return "\n".join(f"rev-{index}\x1f2026-03-10T09:00:00+00:00\x1f\x1fDev <dev@example.local>" for index in range(3))
+            raise AssertionError(f"Unexpected git invocation: {git_args}")
+
+        results = []
+        for jobs in (1, 4):
+            args = Namespace(
+                repoURL="/virtual/repo",
+                repoBranch="main",
+                startTime="2026-03-01",
+                endTime="2026-03-31",
+                vcsType="git",
+                algorithm="A",
+                scope="A",
+                outputFile=None,
+                outputFormat="json",
+                metadataSource="genCodeDesc",
+                genCodeDescSetDir=None,
+                workingDir="/virtual/repo",
+                failOnMissingProtocol=False,
+                includeBreakdown="none",
+                logLevel="quiet",
+                jobs=jobs,
+            )
+            with patch.object(aggregateGenCodeDesc, "build_gen_code_desc_provider", return_value=_ProviderStub()), patch.object(
+                aggregateGenCodeDesc, "run_git", side_effect=fake_run_git
+            ), patch.object(
+                aggregateGenCodeDesc, "list_source_files", return_value=sorted(blame_by_file)
+            ), patch.object(
+                aggregateGenCodeDesc, "parse_blame", side_effect=slow_blame
+            ):
+                results.append(aggregateGenCodeDesc.build_result(args))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(
+            results[1]["SUMMARY"],
+            {"totalCodeLines": 8, "fullGeneratedCodeLines": 4, "partialGeneratedCodeLines": 4},
+        )
+
+    def test_cli_jobs_output_and_line_logs_are_identical_to_serial_run(self) -> None:
+        query = load_json(FIXTURE_DIR / "query.json")
+        revision_protocol = load_json(FIXTURE_DIR / "01_genCodeDesc.json")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root_dir = Path(temp_dir)
+            repo_dir = root_dir / "repo"
+            protocol_dir = root_dir / "protocols"
+            repo_dir.mkdir()
+            protocol_dir.mkdir()
+
+            repo = GitRepoHarness(repo_dir)
+            for index in range(6):
+                repo.write(
+                    f"src/calc{index}.py" if index else "src/calc.py",
+                    "def calc(x):\n"
+                    "    value = x + 1\n"
+                    "    boosted = value * 2\n"
+                    "    return boosted\n",
+                )
+            revision_id = repo.commit_all("us1-r1", "2026-03-10T09:00:00Z")
+            write_revision_protocol(protocol_dir, revision_protocol, repo_dir, revision_id)
+
+            serial_output = root_dir / "serial.json"
+            parallel_output = root_dir / "parallel.json"
+            serial_result = run_cli(repo_dir, serial_output, protocol_dir, query, extra_args=["--logLevel", "info"])
+            parallel_result = run_cli(
+                repo_dir,
+                parallel_output,
+                protocol_dir,
+                query,
+                extra_args=["--logLevel", "info", "--jobs", "3"],
+            )
+
+            self.assertEqual(serial_output.read_bytes(), parallel_output.read_bytes())
+            self.assertEqual(_log_records(serial_result.stderr), _log_records(parallel_result.stderr))
+            self.assertEqual(load_json(parallel_output)["SUMMARY"]["totalCodeLines"], 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import io
+import random
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import InputValidationError, RuntimeLogger
+from tests.cli_test_support import GitRepoHarness, write_revision_protocol
+
+
+def _build_history(root_dir: Path, merge: bool = False) -> tuple[Path, Path]:
+    repo_dir = root_dir / "repo"
+    protocol_dir = root_dir / "protocols"
+    repo_dir.mkdir()
+    protocol_dir.mkdir()
+    repo = GitRepoHarness(repo_dir)
+    rng = random.Random(24)
+    contents: dict[str, list[str]] = {}
+    for day in range(1, 25):
+        if merge and day == 12:
+            repo.checkout_new_branch("side")
+            repo.write("src/side.py", "side = 1\n")
+            repo.commit_all("side", "2026-03-12T08:00:00Z")
+            repo.checkout("main")
+            repo.write("README.md", "notes\n")
+            repo.commit_all("notes", "2026-03-12T08:30:00Z")
+            repo.merge_no_ff("side", "merge", "2026-03-12T08:45:00Z")
+        for index in range(rng.randint(1, 4)):
+            path = f"src/m{rng.randint(0, 9)}.py"
+            lines = contents.setdefault(path, [])
+            if lines and rng.random() < 0.5:
+                lines[rng.randrange(len(lines))] = f"edit_{day}_{index} = {day}"
+            lines.extend(f"value_{day}_{index}_{line} = {line}" for line in range(rng.randint(1, 5)))
+            repo.write(path, "".join(f"{line}\n" for line in lines))
+        if day % 7 == 3:
+            old_path = sorted(contents)[0]
+            new_path = f"src/renamed_{day}.py"
+            repo.rename(old_path, new_path)
+            contents[new_path] = contents.pop(old_path)
+        if day % 9 == 5:
+            doomed = sorted(contents)[-1]
+            (repo_dir / doomed).unlink()
+            del contents[doomed]
+        revision_id = repo.commit_all(f"d{day}", f"2026-03-{day:02d}T09:00:00Z")
+        protocol = {
+            "protocolName": "generatedTextDesc",
+            "protocolVersion": "26.03",
+            "DETAIL": [
+                {"fileName": path, "codeLines": [{"lineLocation": line, "genRatio": (0, 40, 100)[(line + day) % 3]} for line in range(1, len(lines) + 1)]}
+                for path, lines in sorted(contents.items())
+            ],
+            "REPOSITORY": {"vcsType": "git", "repoBranch": "main"},
+        }
+        write_revision_protocol(protocol_dir, protocol, repo_dir, revision_id)
+    return repo_dir, protocol_dir
+
+
+def _args(repo_dir: Path, protocol_dir: Path, replay_shards: int, log_level: str = "quiet") -> Namespace:
+    return Namespace(
+        repoURL=str(repo_dir),
+        repoBranch="main",
+        startTime="2026-03-01",
+        endTime="2026-03-31",
+        vcsType="git",
+        algorithm="B",
+        metric=None,
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        commitDiffSetDir=None,
+        workingDir=None,
+        endRevisionId=None,
+        includedRevisionIds=None,
+        failOnMissingProtocol=False,
+        warnOnMissingProtocol=False,
+        includeBreakdown="none",
+        logLevel=log_level,
+        replayShards=replay_shards,
+    )
+
+
+def _load_sequence(repo_dir: Path) -> list:
+    end_revision_id = aggregateGenCodeDesc.resolve_end_revision(repo_dir, "main", "2026-03-31")
+    revision_metadata = aggregateGenCodeDesc.preload_git_revision_metadata(repo_dir, end_revision_id)
+    revision_ids = aggregateGenCodeDesc.run_git(repo_dir, ["rev-list", "--reverse", "--topo-order", end_revision_id]).splitlines()
+    return aggregateGenCodeDesc.load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, "A", revision_metadata)
+
+
+class TestAlgorithmBReplayShardsTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_lineages_follow_renames_and_stay_in_one_shard(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, _protocol_dir = _build_history(Path(temp_dir))
+            sequence = _load_sequence(repo_dir)
+
+        shards = aggregateGenCodeDesc.plan_commit_diff_lineage_shards(sequence, 3)
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sum(len(paths) for paths in shards), len(set().union(*shards)))
+        renames = [
+            (commit_diff_file.old_path, commit_diff_file.new_path)
+            for revision_diff in sequence
+            for commit_diff_file in revision_diff.parsed_patch.files
+            if "/dev/null" not in (commit_diff_file.old_path, commit_diff_file.new_path) and commit_diff_file.old_path != commit_diff_file.new_path
+        ]
+        self.assertTrue(renames)
+        for old_path, new_path in renames:
+            self.assertEqual([old_path in paths for paths in shards], [new_path in paths for paths in shards])
+
+    def test_sharded_replay_matches_serial_file_states_and_result(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            sequence = _load_sequence(repo_dir)
+            serial_states = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(sequence)
+            sharded_states = aggregateGenCodeDesc.replay_commit_diff_sequence_sharded(sequence, None, "A", 3)
+
+            serial = aggregateGenCodeDesc.build_result(_args(repo_dir, protocol_dir, 1))
+            original_sharded = aggregateGenCodeDesc.replay_commit_diff_sequence_sharded
+            with patch.object(aggregateGenCodeDesc, "replay_commit_diff_sequence_sharded", wraps=original_sharded) as sharded_replay:
+                sharded = aggregateGenCodeDesc.build_result(_args(repo_dir, protocol_dir, 3))
+                with patch("sys.stderr", new_callable=io.StringIO):
+                    info = aggregateGenCodeDesc.build_result(_args(repo_dir, protocol_dir, 3, log_level="info"))
+
+        self.assertEqual(sharded_states, {path: states for path, states in serial_states.items() if path != "/dev/null"})
+        self.assertEqual(sharded_replay.call_count, 1)
+        self.assertEqual(sharded, serial)
+        # WHY: TransitionHints need the gen_ratio column of every revision, so info runs replay serially.
+        self.assertEqual(info, serial)
+        self.assertGreater(serial["SUMMARY"]["fullGeneratedCodeLines"], 0)
+
+    def test_merge_windows_replay_serially(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir), merge=True)
+            sequence = _load_sequence(repo_dir)
+            serial = aggregateGenCodeDesc.build_result(_args(repo_dir, protocol_dir, 1))
+            original_replay = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence
+            with patch.object(aggregateGenCodeDesc, "reconstruct_final_file_states_by_path_from_commit_diff_sequence", wraps=original_replay) as serial_replay:
+                sharded = aggregateGenCodeDesc.build_result_algorithm_b_live_snapshot_local_git(_args(repo_dir, protocol_dir, 3), RuntimeLogger("quiet"))
+
+        self.assertIsNone(aggregateGenCodeDesc.replay_commit_diff_sequence_sharded(sequence, None, "A", 3))
+        self.assertEqual(serial_replay.call_count, 1)
+        self.assertEqual(sharded, serial)
+
+    def test_replay_shards_flag_is_validated(self) -> None:
+        base = dict(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+        )
+        cases = [
+            (dict(replayShards=0), "--replayShards must be a positive integer"),
+            (dict(algorithm="A", replayShards=2), "--replayShards is only supported with --algorithm B"),
+        ]
+        for overrides, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(InputValidationError, message):
+                    aggregateGenCodeDesc.validate_inputs(Namespace(**{**base, **overrides}))
+
+
+if __name__ == "__main__":
+    unittest.main()
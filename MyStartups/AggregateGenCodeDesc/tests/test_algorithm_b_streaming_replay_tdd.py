@@ -0,0 +1,133 @@
+import io
+import tempfile
+import unittest
+import weakref
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness
+
+
+class _Snapshot(dict):
+    pass
+
+
+def _build_history(repo_dir: Path) -> GitRepoHarness:
+    repo = GitRepoHarness(repo_dir)
+    repo.write("src/calc.py", "def calc(x):\n    return x\n")
+    repo.commit_all("r1", "2026-03-02T09:00:00Z")
+    repo.checkout_new_branch("feature")
+    repo.write("src/feature.py", "def feature():\n    return 1\n")
+    repo.commit_all("r2", "2026-03-03T09:00:00Z")
+    repo.write("README.md", "feature notes\n")
+    repo.commit_all("r3", "2026-03-03T10:00:00Z")
+    repo.checkout("main")
+    repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+    repo.commit_all("r4", "2026-03-04T09:00:00Z")
+    repo.merge_no_ff("feature", "r5", "2026-03-05T09:00:00Z")
+    for index in range(12):
+        repo.write("src/calc.py", f"def calc(x):\n    value = x + {index}\n    return value\n")
+        repo.commit_all(f"linear-{index}", f"2026-03-{10 + index:02d}T09:00:00Z")
+    return repo
+
+
+def _args(repo_dir: Path, replay_mode: str, log_level: str) -> Namespace:
+    return Namespace(
+        repoURL=str(repo_dir),
+        repoBranch="main",
+        startTime="2026-03-01",
+        endTime="2026-03-31",
+        vcsType="git",
+        algorithm="B",
+        metric="live_changed_source_ratio",
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=None,
+        commitDiffSetDir=None,
+        workingDir=None,
+        endRevisionId=None,
+        includedRevisionIds=None,
+        failOnMissingProtocol=False,
+        warnOnMissingProtocol=False,
+        includeBreakdown="none",
+        logLevel=log_level,
+        replayMode=replay_mode,
+    )
+
+
+class TestAlgorithmBStreamingReplayTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_stream_replay_frees_snapshots_after_their_last_child(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            _build_history(repo_dir)
+            end_revision_id = aggregateGenCodeDesc.resolve_end_revision(repo_dir, "main", "2026-03-31")
+            revision_metadata = aggregateGenCodeDesc.preload_git_revision_metadata(repo_dir, end_revision_id)
+            revision_ids = aggregateGenCodeDesc.run_git(repo_dir, ["rev-list", "--reverse", "--topo-order", end_revision_id]).splitlines()
+            buffered = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+                aggregateGenCodeDesc.load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, "A", revision_metadata)
+            )
+
+            live_snapshots = 0
+            max_live_snapshots = 0
+            tracked_ids: set[int] = set()
+            original_derive = aggregateGenCodeDesc.FileStateSnapshot.derive
+
+            def release(snapshot_id: int) -> None:
+                nonlocal live_snapshots
+                live_snapshots -= 1
+                tracked_ids.discard(snapshot_id)
+
+            def tracked_derive(snapshot, *args):
+                nonlocal live_snapshots, max_live_snapshots
+                derived = original_derive(snapshot, *args)
+                if id(derived) not in tracked_ids:
+                    tracked_ids.add(id(derived))
+                    live_snapshots += 1
+                    max_live_snapshots = max(max_live_snapshots, live_snapshots)
+                    weakref.finalize(derived, release, id(derived))
+                return derived
+
+            with patch.object(aggregateGenCodeDesc.FileStateSnapshot, "derive", new=tracked_derive), patch.object(
+                aggregateGenCodeDesc.FileStateSnapshot, "MAX_DEPTH", 2
+            ):
+                streamed = aggregateGenCodeDesc.replay_commit_diff_stream(
+                    aggregateGenCodeDesc.iter_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, "A", revision_metadata),
+                    revision_ids,
+                    revision_metadata.parent_revision_ids,
+                )
+
+        self.assertEqual(streamed, buffered)
+        # WHY: 17 revisions are replayed. With a short flattening depth only
+        # the current base chain and the pending merge parent's chain stay
+        # reachable, however long the linear tail grows.
+        self.assertLessEqual(max_live_snapshots, 4)
+
+    def test_streaming_build_result_matches_buffered_output_and_line_logs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            _build_history(repo_dir)
+            outputs = {}
+            for replay_mode in ("buffered", "streaming"):
+                for log_level in ("quiet", "info"):
+                    with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                        result = aggregateGenCodeDesc.build_result(_args(repo_dir, replay_mode, log_level))
+                    line_logs = [
+                        line.split(" ", 1)[1]
+                        for line in stderr.getvalue().splitlines()
+                        if "LiveLine" in line or "TransitionHint" in line
+                    ]
+                    outputs[replay_mode, log_level] = (result, line_logs)
+
+        self.assertEqual(outputs["streaming", "info"], outputs["buffered", "info"])
+        self.assertEqual(outputs["streaming", "quiet"], outputs["buffered", "quiet"])
+        self.assertTrue(outputs["streaming", "info"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import io
+import json
+import random
+import tempfile
+import unittest
+from argparse import Namespace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import InputValidationError, RuntimeLogger
+
+
+REPO_URL = "https://example.local/repo/algc"
+BASE_TIME = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _write_protocol(protocol_dir: Path, revision_id: str, day: int, code_lines: list[dict], summary: dict | None = None) -> None:
+    protocol = {
+        "protocolName": "generatedTextDesc",
+        "protocolVersion": "26.04",
+        "DETAIL": [{"fileName": "src/app.py", "codeLines": code_lines}],
+        "REPOSITORY": {
+            "vcsType": "git",
+            "repoURL": REPO_URL,
+            "repoBranch": "main",
+            "revisionId": revision_id,
+            "revisionTimestamp": _timestamp(BASE_TIME + timedelta(days=day)),
+        },
+    }
+    if summary is not None:
+        protocol["SUMMARY"] = summary
+    (protocol_dir / f"{revision_id}_genCodeDesc.json").write_text(json.dumps(protocol), encoding="utf-8")
+
+
+def _write_random_day(protocol_dir: Path, rng: random.Random, day: int, live: list[tuple[str, str, int]]) -> None:
+    revision_id = f"d{day:02d}"
+    code_lines = []
+    # WHY: every seventh day under-reports DETAIL in SUMMARY without deletes,
+    # which takes the omitted-lines fallback and its warning.
+    omits_lines = day % 7 == 3
+    for key in rng.sample(live, 0 if omits_lines else min(len(live), rng.randint(0, 4))):
+        live.remove(key)
+        code_lines.append({"changeType": "delete", "blame": {"revisionId": key[0], "originalFilePath": key[1], "originalLine": key[2]}})
+    first = rng.randint(1, 5)
+    for line in range(first, first + rng.randint(0, 8)):
+        key = (revision_id, f"src/m{rng.randint(0, 2)}.py", line)
+        live.append(key)
+        code_lines.append(
+            {
+                "changeType": "add",
+                "genRatio": rng.choice((0, 40, 100)),
+                "blame": {
+                    "revisionId": key[0],
+                    "originalFilePath": key[1],
+                    "originalLine": key[2],
+                    "timestamp": _timestamp(BASE_TIME + timedelta(days=day)),
+                },
+            }
+        )
+    summary = {"totalCodeLines": len(code_lines) + 2} if omits_lines else None
+    _write_protocol(protocol_dir, revision_id, day, code_lines, summary)
+
+
+def _args(protocol_dir: Path, checkpoint_dir: Path | None, end_time: str = "2026-03-31") -> Namespace:
+    return Namespace(
+        repoURL="",
+        repoBranch="",
+        startTime="2026-03-01",
+        endTime=end_time,
+        vcsType="",
+        algorithm="C",
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        endRevisionId=None,
+        includeBreakdown="none",
+        logLevel="info",
+        checkpointDir=str(checkpoint_dir) if checkpoint_dir else None,
+    )
+
+
+def _run(protocol_dir: Path, checkpoint_dir: Path | None, end_time: str = "2026-03-31") -> tuple[dict, list[str], list[str]]:
+    loaded: list[str] = []
+    original_load = aggregateGenCodeDesc.load_algorithm_c_protocol
+
+    def recording_load(header: aggregateGenCodeDesc.AlgorithmCProtocolHeader) -> dict:
+        loaded.append(header.revision_id)
+        return original_load(header)
+
+    with patch("sys.stderr", new_callable=io.StringIO) as stderr, patch.object(
+        aggregateGenCodeDesc, "load_algorithm_c_protocol", new=recording_load
+    ):
+        result = aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir, checkpoint_dir, end_time), RuntimeLogger("info"))
+    live_lines = [line[line.index("LiveLine") :] for line in stderr.getvalue().splitlines() if "LiveLine" in line]
+    return {"SUMMARY": result["SUMMARY"], "WARNINGS": result.get("WARNINGS")}, live_lines, loaded
+
+
+class TestAlgorithmCCheckpointTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_daily_resumed_runs_match_cold_runs_and_load_only_new_protocols(self) -> None:
+        rng = random.Random(18)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            checkpoint_dir = Path(temp_dir) / "checkpoints"
+            protocol_dir.mkdir()
+            live: list[tuple[str, str, int]] = []
+            for day in range(0, 10):
+                _write_random_day(protocol_dir, rng, day, live)
+
+            for day in range(10, 20):
+                _write_random_day(protocol_dir, rng, day, live)
+                cold, cold_lines, _cold_loaded = _run(protocol_dir, None)
+                resumed, resumed_lines, resumed_loaded = _run(protocol_dir, checkpoint_dir)
+
+                self.assertEqual((resumed, resumed_lines), (cold, cold_lines))
+                self.assertEqual(resumed_loaded, [f"d{index:02d}" for index in range(day + 1)] if day == 10 else [f"d{day:02d}"])
+
+            self.assertEqual(len(list(checkpoint_dir.glob("*.ckpt"))), aggregateGenCodeDesc.ALGORITHM_C_CHECKPOINTS_KEPT)
+            self.assertTrue(cold["WARNINGS"])
+
+    def test_changed_or_backfilled_protocols_invalidate_checkpoints(self) -> None:
+        rng = random.Random(180)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            checkpoint_dir = Path(temp_dir) / "checkpoints"
+            protocol_dir.mkdir()
+            live: list[tuple[str, str, int]] = []
+            for day in (0, 2, 4, 6):
+                _write_random_day(protocol_dir, rng, day, live)
+                _run(protocol_dir, checkpoint_dir)
+
+            # WHY: a backfilled protocol sorts before the checkpointed ones, so
+            # only checkpoints written before its timestamp stay valid.
+            _write_random_day(protocol_dir, rng, 3, live)
+            _write_random_day(protocol_dir, rng, 8, live)
+            resumed, resumed_lines, loaded = _run(protocol_dir, checkpoint_dir)
+            cold, cold_lines, _loaded = _run(protocol_dir, None)
+            self.assertEqual((resumed, resumed_lines), (cold, cold_lines))
+            self.assertEqual(loaded, ["d03", "d04", "d06", "d08"])
+
+            _write_protocol(protocol_dir, "d00", 0, [])
+            resumed, resumed_lines, loaded = _run(protocol_dir, checkpoint_dir)
+            cold, cold_lines, _loaded = _run(protocol_dir, None)
+            self.assertEqual((resumed, resumed_lines), (cold, cold_lines))
+            self.assertEqual(loaded, ["d00", "d02", "d03", "d04", "d06", "d08"])
+
+    def test_earlier_end_time_and_corrupt_checkpoints_fall_back_to_full_replay(self) -> None:
+        rng = random.Random(1800)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            checkpoint_dir = Path(temp_dir) / "checkpoints"
+            protocol_dir.mkdir()
+            live: list[tuple[str, str, int]] = []
+            for day in range(6):
+                _write_random_day(protocol_dir, rng, day, live)
+            _run(protocol_dir, checkpoint_dir)
+
+            resumed, resumed_lines, loaded = _run(protocol_dir, checkpoint_dir, end_time="2026-03-03")
+            self.assertEqual((resumed, resumed_lines), _run(protocol_dir, None, end_time="2026-03-03")[:2])
+            self.assertEqual(loaded, ["d00", "d01", "d02"])
+
+            for checkpoint_path in checkpoint_dir.glob("*.ckpt"):
+                data = bytearray(checkpoint_path.read_bytes())
+                data[-1] ^= 0xFF
+                checkpoint_path.write_bytes(bytes(data))
+            resumed, resumed_lines, loaded = _run(protocol_dir, checkpoint_dir)
+            self.assertEqual((resumed, resumed_lines), _run(protocol_dir, None)[:2])
+            self.assertEqual(len(loaded), 6)
+
+    def test_checkpoint_dir_requires_algorithm_c(self) -> None:
+        base = dict(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+            checkpointDir="/tmp/checkpoints",
+        )
+        with self.assertRaisesRegex(InputValidationError, "--checkpointDir is only supported with --algorithm C"):
+            aggregateGenCodeDesc.validate_inputs(Namespace(**base))
+        with tempfile.NamedTemporaryFile() as handle:
+            with self.assertRaisesRegex(InputValidationError, "--checkpointDir is not a directory"):
+                aggregateGenCodeDesc.validate_inputs(Namespace(**{**base, "algorithm": "C", "checkpointDir": handle.name}))
+
+
+if __name__ == "__main__":
+    unittest.main()
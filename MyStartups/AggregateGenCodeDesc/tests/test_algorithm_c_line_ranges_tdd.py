@@ -0,0 +1,175 @@
+import io
+import json
+import random
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import OriginLineIntervals, ProtocolValidationError, RuntimeLogger, SurvivingLineSet
+
+
+REPO_URL = "https://example.local/repo/algc"
+
+
+def _write_protocol(protocol_dir: Path, revision_id: str, day: int, code_lines: list[dict], summary: dict | None = None) -> None:
+    protocol = {
+        "protocolName": "generatedTextDesc",
+        "protocolVersion": "26.04",
+        "DETAIL": [{"fileName": "src/app.py", "codeLines": code_lines}],
+        "REPOSITORY": {
+            "vcsType": "git",
+            "repoURL": REPO_URL,
+            "repoBranch": "main",
+            "revisionId": revision_id,
+            "revisionTimestamp": f"2026-03-{day:02d}T09:00:00Z",
+        },
+    }
+    if summary is not None:
+        protocol["SUMMARY"] = summary
+    (protocol_dir / f"{revision_id}_genCodeDesc.json").write_text(json.dumps(protocol), encoding="utf-8")
+
+
+def _add(revision_id: str, first: int, last: int, ratio: int, day: int, *, as_range: bool) -> list[dict]:
+    blame = {"revisionId": revision_id, "originalFilePath": "src/app.py", "timestamp": f"2026-03-{day:02d}T09:00:00Z"}
+    if as_range:
+        return [{"changeType": "add", "lineRange": {"from": first, "to": last}, "genRatio": ratio, "blame": {**blame, "originalLine": first}}]
+    return [{"changeType": "add", "lineLocation": line, "genRatio": ratio, "blame": {**blame, "originalLine": line}} for line in range(first, last + 1)]
+
+
+def _delete(revision_id: str, first: int, last: int, *, as_range: bool) -> list[dict]:
+    blame = {"revisionId": revision_id, "originalFilePath": "src/app.py"}
+    if as_range:
+        return [{"changeType": "delete", "blame": {**blame, "originalLineRange": {"from": first, "to": last}}}]
+    return [{"changeType": "delete", "blame": {**blame, "originalLine": line}} for line in range(first, last + 1)]
+
+
+def _args(protocol_dir: Path, log_level: str = "quiet") -> Namespace:
+    return Namespace(
+        repoURL="",
+        repoBranch="",
+        startTime="2026-03-01",
+        endTime="2026-03-31",
+        vcsType="",
+        algorithm="C",
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        endRevisionId=None,
+        includeBreakdown="none",
+        logLevel=log_level,
+    )
+
+
+def _run(protocol_dir: Path) -> tuple[dict, list[str]]:
+    with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+        summary = aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir, "info"), RuntimeLogger("info"))["SUMMARY"]
+    return summary, [line[line.index("LiveLine") :] for line in stderr.getvalue().splitlines() if "LiveLine" in line]
+
+
+class TestAlgorithmCLineRangesTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_intervals_match_per_line_dictionary_model(self) -> None:
+        rng = random.Random(17)
+        for _ in range(300):
+            intervals = OriginLineIntervals()
+            model: dict[int, tuple[int, int]] = {}
+            for _ in range(rng.randint(1, 30)):
+                first = rng.randint(1, 60)
+                last = first + rng.randint(0, 12)
+                if rng.random() < 0.6:
+                    value = (rng.choice((0, 100)), rng.choice((1, 2)))
+                    intervals.assign(first, last, value)
+                    model.update({line: value for line in range(first, last + 1)})
+                else:
+                    intervals.remove(first, last)
+                    for line in range(first, last + 1):
+                        model.pop(line, None)
+
+            expanded = {line: value for start, end, value in intervals for line in range(start, end + 1)}
+            self.assertEqual(expanded, model)
+            pairs = list(intervals)
+            for (_s1, end, value), (start, _e2, next_value) in zip(pairs, pairs[1:]):
+                self.assertLess(end, start)
+                self.assertFalse(end + 1 == start and value == next_value, "adjacent equal intervals must be merged")
+
+    def test_range_entries_match_expanded_single_line_entries(self) -> None:
+        history = [
+            ("r1", 2, [("add", "r1", 1, 400, 100)]),
+            ("r2", 3, [("delete", "r1", 50, 120), ("add", "r2", 1, 30, 40)]),
+            ("r3", 4, [("delete", "r1", 1, 10), ("delete", "r2", 5, 5), ("add", "r1", 60, 70, 0)]),
+            ("r4", 5, [("delete", "r1", 300, 999)]),
+        ]
+        results = []
+        for as_range in (True, False):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                protocol_dir = Path(temp_dir)
+                for revision_id, day, operations in history:
+                    code_lines = []
+                    for operation in operations:
+                        if operation[0] == "delete":
+                            code_lines += _delete(operation[1], operation[2], operation[3], as_range=as_range)
+                        else:
+                            origin_day = {"r1": 2, "r2": 3}[operation[1]]
+                            code_lines += _add(operation[1], operation[2], operation[3], operation[4], origin_day, as_range=as_range)
+                    _write_protocol(protocol_dir, revision_id, day, code_lines)
+                results.append(_run(protocol_dir))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][0], {"totalCodeLines": 258, "fullGeneratedCodeLines": 218, "partialGeneratedCodeLines": 29})
+
+    def test_bulk_range_stays_one_interval(self) -> None:
+        surviving = SurvivingLineSet()
+        surviving.assign("r1", "src/gen.py", 1, 2_000_000, 100, 0)
+        surviving.remove("r1", "src/gen.py", 1_000_000, 1_000_009)
+
+        (intervals,) = surviving.origins.values()
+        self.assertEqual([(start, end) for start, end, _value in intervals], [(1, 999_999), (1_000_010, 2_000_000)])
+        self.assertEqual(surviving.summarize(0, 0), (1_999_990, 1_999_990, 0))
+
+    def test_omitted_lines_keep_their_log_names(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            _write_protocol(protocol_dir, "r1", 2, _add("r1", 1, 1, 100, 2, as_range=False), {"totalCodeLines": 13})
+
+            summary, live_lines = _run(protocol_dir)
+
+        self.assertEqual(summary["totalCodeLines"], 13)
+        self.assertEqual(
+            live_lines[:3],
+            [
+                "LiveLine __omitted_r1_0__:0 aggregate origin=__omitted_r1_0__:0@r1 classification=human/unattributed",
+                "LiveLine __omitted_r1_10__:0 aggregate origin=__omitted_r1_10__:0@r1 classification=human/unattributed",
+                "LiveLine __omitted_r1_11__:0 aggregate origin=__omitted_r1_11__:0@r1 classification=human/unattributed",
+            ],
+        )
+
+    def test_malformed_ranges_are_rejected(self) -> None:
+        cases = [
+            (
+                [{"changeType": "delete", "blame": {"revisionId": "r1", "originalFilePath": "src/app.py", "originalLineRange": {"from": 9, "to": 3}}}],
+                "blame.originalLineRange has from greater than to",
+            ),
+            (
+                [{"changeType": "delete", "blame": {"revisionId": "r1", "originalFilePath": "src/app.py", "originalLineRange": [1, 2]}}],
+                "blame.originalLineRange must be an object",
+            ),
+            (
+                [{**_add("r1", 1, 1, 100, 2, as_range=True)[0], "lineRange": {"from": 1, "to": "x"}}],
+                "lineRange.to must be an integer",
+            ),
+        ]
+        for code_lines, message in cases:
+            with self.subTest(message=message), tempfile.TemporaryDirectory() as temp_dir:
+                _write_protocol(Path(temp_dir), "r1", 2, code_lines)
+                with self.assertRaisesRegex(ProtocolValidationError, message):
+                    aggregateGenCodeDesc.build_result_algorithm_c(_args(Path(temp_dir)), RuntimeLogger("quiet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import io
+import json
+import random
+import tempfile
+import tracemalloc
+import unittest
+from argparse import Namespace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+import pytest
+from aggregateGenCodeDesc import ProtocolValidationError, RuntimeLogger
+
+
+REPO_URL = "https://example.local/repo/algc"
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _write_protocol(protocol_dir: Path, name: str, revision_id: str, revision_time: datetime, code_lines: list[dict], **extra: object) -> None:
+    protocol = {
+        "protocolName": "generatedTextDesc",
+        "protocolVersion": "26.04",
+        "DETAIL": [{"fileName": "src/app.py", "codeLines": code_lines}],
+        "REPOSITORY": {
+            "vcsType": "git",
+            "repoURL": REPO_URL,
+            "repoBranch": "main",
+            "revisionId": revision_id,
+            "revisionTimestamp": _timestamp(revision_time),
+        },
+        **extra,
+    }
+    (protocol_dir / f"{name}_genCodeDesc.json").write_text(json.dumps(protocol, indent=2), encoding="utf-8")
+
+
+def _add(revision_id: str, path: str, line: int, ratio: int, blame_time: datetime) -> dict:
+    return {
+        "changeType": "add",
+        "genRatio": ratio,
+        "blame": {"revisionId": revision_id, "originalFilePath": path, "originalLine": line, "timestamp": _timestamp(blame_time)},
+    }
+
+
+def _delete(revision_id: str, path: str, line: int) -> dict:
+    return {"changeType": "delete", "blame": {"revisionId": revision_id, "originalFilePath": path, "originalLine": line}}
+
+
+def _write_random_history(protocol_dir: Path, rng: random.Random, revision_count: int, lines_per_revision: int) -> list[tuple]:
+    base = datetime(2026, 2, 20, tzinfo=timezone.utc)
+    live: list[tuple[str, str, int]] = []
+    history = []
+    for index in range(revision_count):
+        revision_id = f"c{index:03d}"
+        revision_time = base + timedelta(days=index, seconds=rng.randint(0, 86_399), microseconds=rng.randint(0, 999_999))
+        code_lines = []
+        deleted = rng.sample(live, min(len(live), rng.randint(0, 3)))
+        for key in deleted:
+            live.remove(key)
+            code_lines.append(_delete(*key))
+        if not deleted:
+            for line in range(rng.randint(0, lines_per_revision)):
+                key = (revision_id, f"src/m{rng.randint(0, 4)}.py", line + 1)
+                live.append(key)
+                code_lines.append(_add(*key, rng.choice((0, 40, 100)), revision_time))
+        # WHY: file names are shuffled so replay order must come from the headers.
+        _write_protocol(protocol_dir, f"{rng.randint(0, 10**9):09d}", revision_id, revision_time, code_lines)
+        history.append((revision_id, revision_time, code_lines))
+    return history
+
+
+def _reference_summary(history: list[tuple], start: datetime, end: datetime) -> tuple[int, int, int, list[str]]:
+    surviving: dict[tuple[str, str, int], tuple[int, datetime]] = {}
+    for _revision_id, revision_time, code_lines in sorted(history, key=lambda item: (item[1], item[0])):
+        if revision_time > end:
+            continue
+        for entry in code_lines:
+            blame = entry["blame"]
+            key = (blame["revisionId"], blame["originalFilePath"], blame["originalLine"])
+            if entry["changeType"] == "delete":
+                surviving.pop(key, None)
+            else:
+                surviving[key] = (entry["genRatio"], datetime.fromisoformat(blame["timestamp"].replace("Z", "+00:00")))
+    live = sorted((key for key, (_ratio, when) in surviving.items() if start <= when <= end), key=lambda key: (key[1], key[2], key[0]))
+    ratios = [surviving[key][0] for key in live]
+    return (
+        len(live),
+        sum(1 for ratio in ratios if ratio == 100),
+        sum(1 for ratio in ratios if 0 < ratio < 100),
+        [f"{path}:{line}@{revision_id}" for revision_id, path, line in live],
+    )
+
+
+def _args(protocol_dir: Path, end_time: str = "2026-03-31", log_level: str = "quiet") -> Namespace:
+    return Namespace(
+        repoURL="",
+        repoBranch="",
+        startTime="2026-03-01",
+        endTime=end_time,
+        vcsType="",
+        algorithm="C",
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        endRevisionId=None,
+        includeBreakdown="none",
+        logLevel=log_level,
+    )
+
+
+class TestAlgorithmCStreamingTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_streamed_replay_matches_reference_summary_and_log_order(self) -> None:
+        rng = random.Random(16)
+        for _ in range(5):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                protocol_dir = Path(temp_dir)
+                history = _write_random_history(protocol_dir, rng, 50, 12)
+                expected = _reference_summary(
+                    history,
+                    datetime(2026, 3, 1, tzinfo=timezone.utc),
+                    datetime(2026, 3, 31, 23, 59, 59, 999_999, tzinfo=timezone.utc),
+                )
+
+                summary = aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir), RuntimeLogger("quiet"))["SUMMARY"]
+                with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                    aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir, log_level="info"), RuntimeLogger("info"))
+                logged = [line.split("origin=", 1)[1].split(" ", 1)[0] for line in stderr.getvalue().splitlines() if "LiveLine" in line]
+
+            self.assertEqual(
+                (summary["totalCodeLines"], summary["fullGeneratedCodeLines"], summary["partialGeneratedCodeLines"], logged),
+                expected,
+            )
+
+    def test_window_bounds_hold_at_sub_second_precision(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            moments = [
+                datetime(2026, 2, 28, 23, 59, 59, 900_000, tzinfo=timezone.utc),
+                datetime(2026, 3, 1, 0, 0, 0, tzinfo=timezone.utc),
+                datetime(2026, 3, 31, 23, 59, 59, 999_999, tzinfo=timezone.utc),
+            ]
+            code_lines = [_add("c1", "src/app.py", line, 100, moment) for line, moment in enumerate(moments, start=1)]
+            _write_protocol(protocol_dir, "c1", "c1", moments[-1], code_lines)
+
+            summary = aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir), RuntimeLogger("quiet"))["SUMMARY"]
+
+        self.assertEqual(summary["totalCodeLines"], 2)
+
+    def test_header_scan_skips_detail_and_falls_back_for_ambiguous_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            day = datetime(2026, 3, 2, tzinfo=timezone.utc)
+            _write_protocol(protocol_dir, "a", "c1", day, [_add("c1", "src/app.py", 1, 100, day)])
+            _write_protocol(protocol_dir, "b", "c2", day + timedelta(days=1), [], NOTES={"REPOSITORY": "nested"})
+            (protocol_dir / "c_genCodeDesc.json").write_text(
+                "// exported by hand\n"
+                + json.dumps(
+                    {
+                        "protocolVersion": "26.04",
+                        "REPOSITORY": {
+                            "vcsType": "git",
+                            "repoURL": REPO_URL,
+                            "repoBranch": "main",
+                            "revisionId": "c0",
+                            "revisionTimestamp": "2026-03-01T08:00:00Z",
+                        },
+                        "DETAIL": [],
+                    }
+                ),
+                encoding="utf-8",
+            )
+            parsed: list[str] = []
+            original_load = aggregateGenCodeDesc.load_json_document
+
+            def counting_load(text: str) -> object:
+                parsed.append(text)
+                return original_load(text)
+
+            with patch.object(aggregateGenCodeDesc, "load_json_document", new=counting_load):
+                headers = aggregateGenCodeDesc.scan_algorithm_c_protocol_headers(protocol_dir)
+
+        # WHY: only the file with a nested REPOSITORY key needs a full parse;
+        # the leading comment alone does not confuse the header scan.
+        self.assertEqual(len(parsed), 1)
+        self.assertEqual([header.revision_id for header in headers], ["c0", "c1", "c2"])
+        self.assertEqual(headers[0].revision_timestamp, datetime(2026, 3, 1, 8, tzinfo=timezone.utc))
+
+    def test_header_errors_match_full_parse_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            _write_protocol(protocol_dir, "a", "c1", datetime(2026, 3, 2, tzinfo=timezone.utc), [])
+            protocol_path = protocol_dir / "a_genCodeDesc.json"
+            protocol = json.loads(protocol_path.read_text(encoding="utf-8"))
+            protocol["REPOSITORY"]["repoBranch"] = ""
+            protocol_path.write_text(json.dumps(protocol), encoding="utf-8")
+
+            with self.assertRaisesRegex(ProtocolValidationError, "missing REPOSITORY.repoBranch"):
+                aggregateGenCodeDesc.scan_algorithm_c_protocol_headers(protocol_dir)
+
+            protocol_path.write_text("[1, 2]", encoding="utf-8")
+            with self.assertRaisesRegex(ProtocolValidationError, "must be a JSON object"):
+                aggregateGenCodeDesc.scan_algorithm_c_protocol_headers(protocol_dir)
+
+
+@pytest.mark.long_running
+class TestAlgorithmCStreamingBenchmarkTdd(unittest.TestCase):
+    def test_streamed_replay_peak_memory_is_below_load_everything_reference(self) -> None:
+        rng = random.Random(160)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            history = _write_random_history(protocol_dir, rng, 40, 20_000)
+
+            tracemalloc.start()
+            protocols = [json.loads(path.read_text(encoding="utf-8")) for path in sorted(protocol_dir.glob("*.json"))]
+            expected = _reference_summary(
+                history,
+                datetime(2026, 3, 1, tzinfo=timezone.utc),
+                datetime(2026, 3, 31, 23, 59, 59, 999_999, tzinfo=timezone.utc),
+            )
+            _current, reference_peak = tracemalloc.get_traced_memory()
+            del protocols
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            summary = aggregateGenCodeDesc.build_result_algorithm_c(_args(protocol_dir), RuntimeLogger("quiet"))["SUMMARY"]
+            _current, streamed_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        self.assertEqual(summary["totalCodeLines"], expected[0])
+        self.assertLess(streamed_peak, reference_peak / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import random
+import time
+import unittest
+
+import aggregateGenCodeDesc
+import pytest
+from aggregateGenCodeDesc import CommitDiffFile, CommitDiffHunk, CommitDiffLine, LineState, ProtocolValidationError
+
+
+def _line_states(count: int) -> list[LineState]:
+    return [LineState(content=f"line {index}", origin_revision_id="r0", gen_ratio=0) for index in range(count)]
+
+
+def _random_commit_diff_file(rng: random.Random, old_lines: list[LineState], hunk_count: int) -> CommitDiffFile:
+    starts = sorted(rng.sample(range(len(old_lines)), hunk_count))
+    hunks = []
+    line_offset = 0
+    old_end = 0
+    for start in starts:
+        if start < old_end:
+            continue
+        lines: list[CommitDiffLine] = []
+        old_index = start
+        new_line_number = start + 1 + line_offset
+        for _ in range(rng.randint(1, 6)):
+            kind = rng.choice(("context", "delete", "add"))
+            if kind != "add" and old_index >= len(old_lines):
+                kind = "add"
+            if kind == "add":
+                lines.append(CommitDiffLine("add", f"added {start}-{len(lines)}", None, new_line_number))
+                new_line_number += 1
+                line_offset += 1
+                continue
+            lines.append(
+                CommitDiffLine(
+                    kind,
+                    old_lines[old_index].content,
+                    old_index + 1,
+                    new_line_number if kind == "context" else None,
+                )
+            )
+            old_index += 1
+            if kind == "context":
+                new_line_number += 1
+            else:
+                line_offset -= 1
+        old_length = old_index - start
+        new_length = sum(1 for line in lines if line.kind != "delete")
+        hunks.append(CommitDiffHunk(start + 1, old_length, start + 1, new_length, lines))
+        old_end = old_index
+    return CommitDiffFile(old_path="src/big.py", new_path="src/big.py", hunks=hunks)
+
+
+class TestCommitDiffHunkRebuildTdd(unittest.TestCase):
+    def test_rebuild_matches_in_place_engine_on_random_hunks(self) -> None:
+        rng = random.Random(8)
+        for _ in range(200):
+            old_lines = _line_states(rng.randint(1, 60))
+            commit_diff_file = _random_commit_diff_file(rng, old_lines, rng.randint(1, min(8, len(old_lines))))
+
+            rebuilt = aggregateGenCodeDesc.apply_commit_diff_file_to_line_states(old_lines, commit_diff_file, "r1")
+            in_place = aggregateGenCodeDesc._apply_commit_diff_hunks_in_place(old_lines, commit_diff_file, "r1", None)
+
+            self.assertEqual(rebuilt, in_place)
+
+    def test_rebuild_keeps_mismatch_and_bounds_errors(self) -> None:
+        old_lines = _line_states(3)
+        cases = [
+            (CommitDiffHunk(9, 0, 9, 1, [CommitDiffLine("add", "x", None, 9)]), "hunk starts outside current file bounds for src/big.py: 9"),
+            (CommitDiffHunk(2, 1, 2, 1, [CommitDiffLine("context", "nope", 2, 2)]), "context mismatch for src/big.py at line 2"),
+            (CommitDiffHunk(3, 1, 3, 0, [CommitDiffLine("delete", "nope", 3, None)]), "delete mismatch for src/big.py at line 3"),
+            (CommitDiffHunk(1, 0, 1, 0, [CommitDiffLine("moved", "x", 1, 1)]), "Unsupported commit diff line kind: moved"),
+        ]
+        for hunk, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(ProtocolValidationError, message):
+                    aggregateGenCodeDesc.apply_commit_diff_file_to_line_states(
+                        old_lines, CommitDiffFile("src/big.py", "src/big.py", [hunk]), "r1"
+                    )
+
+    def test_unordered_hunks_keep_in_place_semantics(self) -> None:
+        old_lines = _line_states(4)
+        commit_diff_file = CommitDiffFile(
+            "src/big.py",
+            "src/big.py",
+            [
+                CommitDiffHunk(3, 1, 3, 1, [CommitDiffLine("delete", "line 2", 3, None), CommitDiffLine("add", "two", None, 3)]),
+                CommitDiffHunk(1, 1, 1, 1, [CommitDiffLine("delete", "line 0", 1, None), CommitDiffLine("add", "zero", None, 1)]),
+            ],
+        )
+
+        updated = aggregateGenCodeDesc.apply_commit_diff_file_to_line_states(old_lines, commit_diff_file, "r1")
+
+        self.assertEqual([line.content for line in updated], ["zero", "line 1", "two", "line 3"])
+
+
+@pytest.mark.long_running
+class TestCommitDiffHunkRebuildBenchmarkTdd(unittest.TestCase):
+    def _time(self, engine, old_lines: list[LineState], commit_diff_file: CommitDiffFile) -> float:
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            engine(old_lines, commit_diff_file, "r1", None)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    def test_rebuild_scales_linearly_on_large_files_with_many_hunks(self) -> None:
+        rng = random.Random(100_000)
+        timings = {}
+        for line_count, hunk_count in ((25_000, 1_000), (100_000, 4_000)):
+            old_lines = _line_states(line_count)
+            commit_diff_file = _random_commit_diff_file(rng, old_lines, hunk_count)
+            timings[line_count] = (
+                self._time(aggregateGenCodeDesc.apply_commit_diff_file_to_line_states, old_lines, commit_diff_file),
+                self._time(aggregateGenCodeDesc._apply_commit_diff_hunks_in_place, old_lines, commit_diff_file),
+            )
+
+        # WHY: 4x the lines and 4x the hunks is 16x the in-place work but only
+        # 4x the rebuild work. The bound leaves room for timer noise.
+        self.assertLess(timings[100_000][0], timings[25_000][0] * 10)
+        self.assertLess(timings[100_000][0], timings[100_000][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
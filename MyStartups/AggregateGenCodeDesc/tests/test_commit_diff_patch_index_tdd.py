@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import CommitDiffSetDirProvider, InputValidationError, ProtocolValidationError, RuntimeLogger
+
+
+def _patch_text(revision_index: int) -> str:
+    return (
+        "diff --git a/src/demo.py b/src/demo.py\n"
+        "--- a/src/demo.py\n"
+        "+++ b/src/demo.py\n"
+        f"@@ -{revision_index} +{revision_index},2 @@\n"
+        f"+print('revision {revision_index}')\n"
+    )
+
+
+class TestCommitDiffPatchIndexTdd(unittest.TestCase):
+    def test_directory_is_scanned_once_for_listing_and_every_patch_lookup(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir)
+            for index in range(300):
+                (base_dir / f"{index + 1:05d}_r{index}_commitDiff.patch").write_text(_patch_text(index + 1), encoding="utf-8")
+            (base_dir / "README.txt").write_text("not a patch\n", encoding="utf-8")
+            provider = CommitDiffSetDirProvider(base_dir, RuntimeLogger("quiet"))
+            args = Namespace(includedRevisionIds=None, commitDiffSetDir=temp_dir)
+
+            original_parse = aggregateGenCodeDesc.parse_commit_diff_patch_filename
+            with patch.object(aggregateGenCodeDesc, "parse_commit_diff_patch_filename", wraps=original_parse) as parse_name:
+                revision_ids = aggregateGenCodeDesc.resolve_algorithm_b_offline_revision_ids(args, provider)
+                sequence = aggregateGenCodeDesc.load_commit_diff_sequence(provider, "", "main", revision_ids, "git")
+
+        self.assertEqual(parse_name.call_count, 300)
+        self.assertEqual(revision_ids, [f"r{index}" for index in range(300)])
+        self.assertEqual(sequence[299].parsed_patch.files[0].hunks[0].lines[0].new_line_number, 300)
+
+    def test_duplicates_fail_only_for_the_duplicated_revision(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir)
+            for file_name in ("0001_r1_commitDiff.patch", "0002_r1_commitDiff.patch", "0003_r2_commitDiff.patch"):
+                (base_dir / file_name).write_text(_patch_text(1), encoding="utf-8")
+            provider = CommitDiffSetDirProvider(base_dir, RuntimeLogger("quiet"))
+
+            self.assertIn("revision 1", provider.get_commit_diff_patch("", "main", "r2", "git"))
+            with self.assertRaisesRegex(ProtocolValidationError, "Multiple commit diff patch files matched revision r1"):
+                provider.get_commit_diff_patch("", "main", "r1", "git")
+            with self.assertRaisesRegex(ProtocolValidationError, "Commit diff patch file not found"):
+                provider.get_commit_diff_patch("", "main", "r9", "git")
+
+    def test_memory_mapped_reads_match_read_text(self) -> None:
+        contents = {
+            "r1": _patch_text(1),
+            "r2": _patch_text(2).replace("\n", "\r\n"),
+            "r3": _patch_text(3).replace("print", "печать") * 20_000,
+            "r4": "\n",
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir)
+            for revision_id, text in contents.items():
+                (base_dir / f"{revision_id}_commitDiff.patch").write_bytes(text.encode("utf-8"))
+            (base_dir / "r5_commitDiff.patch").write_bytes(b"")
+            plain = CommitDiffSetDirProvider(base_dir, RuntimeLogger("quiet"))
+            mapped = CommitDiffSetDirProvider(base_dir, RuntimeLogger("quiet"), use_mmap=True)
+
+            for revision_id in ("r1", "r2", "r3"):
+                with self.subTest(revision_id=revision_id):
+                    self.assertEqual(
+                        mapped.get_commit_diff_patch("", "main", revision_id, "git"),
+                        plain.get_commit_diff_patch("", "main", revision_id, "git"),
+                    )
+            for revision_id in ("r4", "r5"):
+                with self.subTest(revision_id=revision_id):
+                    with self.assertRaisesRegex(ProtocolValidationError, "Commit diff patch file is empty"):
+                        mapped.get_commit_diff_patch("", "main", revision_id, "git")
+
+    def test_commit_diff_mmap_requires_commit_diff_set_dir(self) -> None:
+        args = Namespace(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+            commitDiffMmap=True,
+        )
+
+        with self.assertRaisesRegex(InputValidationError, "--commitDiffMmap requires --commitDiffSetDir"):
+            aggregateGenCodeDesc.validate_inputs(args)
+
+
+if __name__ == "__main__":
+    unittest.main()
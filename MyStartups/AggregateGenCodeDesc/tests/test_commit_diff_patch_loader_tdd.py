@@ -0,0 +1,175 @@
+import difflib
+import io
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import (
+    CommitDiffPatchLoader,
+    CommitDiffSetDirProvider,
+    InputValidationError,
+    ProtocolValidationError,
+    RuntimeLogger,
+    iter_commit_diff_sequence,
+)
+from tests.cli_test_support import load_json
+
+
+US7_DIR = Path(__file__).resolve().parent.parent / "testdata" / "us7_mixed_multi_commit_window"
+
+
+def _write_patches(base_dir: Path, count: int) -> list[str]:
+    lines: list[str] = []
+    revision_ids = []
+    for index in range(count):
+        new_lines = [*lines[: index // 2], f"value_{index} = {index}", *lines[index // 2 + 1 :], f"tail_{index}"]
+        body = difflib.unified_diff(lines, new_lines, "a/src/a.py", "b/src/a.py", lineterm="")
+        (base_dir / f"{index + 1:04d}_r{index}_commitDiff.patch").write_text(
+            "\n".join(["diff --git a/src/a.py b/src/a.py", *body]) + "\n", encoding="utf-8"
+        )
+        revision_ids.append(f"r{index}")
+        lines = new_lines
+    return revision_ids
+
+
+def _load(base_dir: Path, revision_ids: list[str], jobs: int = 1, cache_dir: Path | None = None, serial: bool = False):
+    logger = RuntimeLogger("debug")
+    provider = CommitDiffSetDirProvider(base_dir, logger)
+    loader = CommitDiffPatchLoader(provider, logger, jobs=jobs, cache_dir=cache_dir)
+    loaded = []
+    error = None
+    with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+        sequence = iter_commit_diff_sequence(provider, "", "main", revision_ids, "git") if serial else loader.iter_sequence(revision_ids)
+        try:
+            for revision_diff in sequence:
+                loaded.append(revision_diff)
+        except (ProtocolValidationError, UnicodeDecodeError) as exc:
+            error = (type(exc).__name__, str(exc))
+    logs = [line.split(" ", 1)[1] for line in stderr.getvalue().splitlines() if "Loaded commit diff patch for" in line]
+    return loaded, error, logs, loader
+
+
+class TestCommitDiffPatchLoaderTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_pool_and_cache_match_serial_provider_in_revision_order(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir) / "patches"
+            base_dir.mkdir()
+            revision_ids = _write_patches(base_dir, 40)
+            serial = _load(base_dir, revision_ids, serial=True)
+
+            for jobs, cache_dir in ((3, None), (1, Path(temp_dir) / "cache"), (3, Path(temp_dir) / "cache")):
+                with self.subTest(jobs=jobs, cache=cache_dir is not None):
+                    loaded, error, logs, _loader = _load(base_dir, revision_ids, jobs=jobs, cache_dir=cache_dir)
+                    self.assertEqual((loaded, error, logs), serial[:3])
+
+        self.assertEqual([revision_diff.revision_id for revision_diff in serial[0]], revision_ids)
+
+    def test_cache_is_keyed_by_patch_content(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir) / "patches"
+            cache_dir = Path(temp_dir) / "cache"
+            base_dir.mkdir()
+            revision_ids = _write_patches(base_dir, 6)
+            cold = _load(base_dir, revision_ids, cache_dir=cache_dir)
+
+            with patch.object(aggregateGenCodeDesc, "parse_commit_diff_patch", side_effect=AssertionError("re-parsed")):
+                warm = _load(base_dir, revision_ids, cache_dir=cache_dir)
+
+            patch_path = base_dir / "0003_r2_commitDiff.patch"
+            patch_path.write_text(patch_path.read_text(encoding="utf-8").replace("value_2 = 2", "value_2 = 22"), encoding="utf-8")
+            edited = _load(base_dir, revision_ids, cache_dir=cache_dir)
+
+        self.assertEqual(warm[:3], cold[:3])
+        self.assertEqual((warm[3].cache_hits, warm[3].parsed), (6, 0))
+        self.assertEqual((edited[3].cache_hits, edited[3].parsed), (5, 1))
+        added = [line.content for line in edited[0][2].parsed_patch.files[0].hunks[0].lines if line.kind == "add"]
+        self.assertIn("value_2 = 22", added)
+
+    def test_first_error_in_revision_order_wins(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_dir = Path(temp_dir) / "patches"
+            base_dir.mkdir()
+            revision_ids = _write_patches(base_dir, 12)
+            (base_dir / "0005_r4_commitDiff.patch").write_text("diff --git a/src/a.py b/src/a.py\n@@ broken\n", encoding="utf-8")
+            (base_dir / "0008_r7_commitDiff.patch").unlink()
+            (base_dir / "0003_r2_commitDiff.patch").write_bytes(b"\xff\xfe")
+            cases = [
+                (revision_ids, "UnicodeDecodeError"),
+                (revision_ids[3:], "Malformed commit diff hunk header: @@ broken"),
+                (revision_ids[5:], "Commit diff patch file not found"),
+            ]
+            for requested, message in cases:
+                with self.subTest(message=message):
+                    serial = _load(base_dir, requested, serial=True)
+                    parallel = _load(base_dir, requested, jobs=4, cache_dir=Path(temp_dir) / "cache")
+
+                    self.assertEqual(parallel[:3], serial[:3])
+                    self.assertIn(message, " ".join(serial[1]))
+
+    def test_offline_results_match_with_pool_cache_and_streaming(self) -> None:
+        query = load_json(US7_DIR / "query.json")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = []
+            for patch_jobs, cache_dir, replay_mode in ((1, None, "buffered"), (2, temp_dir, "buffered"), (2, temp_dir, "streaming")):
+                args = Namespace(
+                    repoURL=query["repoURL"],
+                    repoBranch=query["repoBranch"],
+                    startTime=query["startTime"],
+                    endTime=query["endTime"],
+                    vcsType=query["vcsType"],
+                    algorithm="B",
+                    metric=query["metric"],
+                    scope="A",
+                    outputFile=None,
+                    outputFormat="json",
+                    metadataSource="genCodeDesc",
+                    genCodeDescSetDir=str(US7_DIR),
+                    commitDiffSetDir=str(US7_DIR / "commitDiffSet"),
+                    workingDir=None,
+                    endRevisionId=query["endRevisionId"],
+                    includedRevisionIds=None,
+                    failOnMissingProtocol=False,
+                    warnOnMissingProtocol=False,
+                    includeBreakdown="none",
+                    logLevel="quiet",
+                    replayMode=replay_mode,
+                    patchJobs=patch_jobs,
+                    commitDiffCacheDir=cache_dir,
+                )
+                results.append(aggregateGenCodeDesc.build_result(args))
+
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+    def test_patch_flags_are_validated(self) -> None:
+        base = dict(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+        )
+        cases = [
+            (dict(patchJobs=0), "--patchJobs must be a positive integer"),
+            (dict(patchJobs=2), "--patchJobs and --commitDiffCacheDir require --commitDiffSetDir"),
+            (dict(commitDiffCacheDir="/tmp/cache"), "--patchJobs and --commitDiffCacheDir require --commitDiffSetDir"),
+        ]
+        for overrides, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(InputValidationError, message):
+                    aggregateGenCodeDesc.validate_inputs(Namespace(**{**base, **overrides}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import difflib
+import io
+import mmap
+import random
+import tempfile
+import tracemalloc
+import unittest
+
+from aggregateGenCodeDesc import (
+    CommitDiffFile,
+    CommitDiffHunk,
+    CompactHunkLines,
+    LineState,
+    ProtocolValidationError,
+    apply_commit_diff_file_to_line_states,
+    iter_commit_diff_file_sections,
+    parse_commit_diff_patch,
+)
+
+
+def _unified_patch(path: str, old_lines: list[str], new_lines: list[str], newline: str = "\n") -> str:
+    body = difflib.unified_diff(old_lines, new_lines, f"a/{path}", f"b/{path}", lineterm="", n=2)
+    return newline.join([f"diff --git a/{path} b/{path}", *body]) + newline
+
+
+def _random_revision(rng: random.Random, old_lines: list[str]) -> list[str]:
+    new_lines = list(old_lines)
+    for _ in range(rng.randint(1, 6)):
+        position = rng.randint(0, len(new_lines))
+        if new_lines and rng.random() < 0.4:
+            del new_lines[min(position, len(new_lines) - 1)]
+        else:
+            new_lines.insert(position, f"line {rng.randint(0, 10**6)}\x0c" if rng.random() < 0.05 else f"line {rng.randint(0, 10**6)}")
+    return new_lines
+
+
+class TestCommitDiffStreamingParserTdd(unittest.TestCase):
+    def test_compact_hunks_replay_like_materialized_hunks(self) -> None:
+        rng = random.Random(22)
+        for _ in range(200):
+            old_lines = [f"line {index}" for index in range(rng.randint(0, 40))]
+            new_lines = _random_revision(rng, old_lines)
+            # WHY: form feeds split lines like str.splitlines(), so such files are
+            # compared in their split form, as the old parser saw them.
+            new_lines = "\n".join(new_lines).splitlines() if new_lines else []
+            if old_lines == new_lines:
+                continue
+            newline = rng.choice(("\n", "\r\n"))
+            parsed_file = parse_commit_diff_patch(_unified_patch("src/a.py", old_lines, new_lines, newline)).files[0]
+            materialized_file = CommitDiffFile(
+                parsed_file.old_path,
+                parsed_file.new_path,
+                [CommitDiffHunk(hunk.old_start, hunk.old_length, hunk.new_start, hunk.new_length, list(hunk.lines)) for hunk in parsed_file.hunks],
+            )
+            old_states = [LineState(content=line, origin_revision_id=None, gen_ratio=0) for line in old_lines]
+
+            replayed = apply_commit_diff_file_to_line_states(old_states, parsed_file, "r1")
+
+            self.assertEqual(replayed, apply_commit_diff_file_to_line_states(old_states, materialized_file, "r1"))
+            self.assertEqual([state.content for state in replayed], new_lines)
+            for hunk in parsed_file.hunks:
+                self.assertIsInstance(hunk.lines, CompactHunkLines)
+                self.assertEqual([hunk.lines[index] for index in range(-len(hunk.lines), len(hunk.lines))], list(hunk.lines) * 2)
+                self.assertEqual(hunk.lines[1:3], list(hunk.lines)[1:3])
+
+    def test_file_sections_are_yielded_before_the_rest_is_parsed(self) -> None:
+        patch_text = (
+            _unified_patch("src/a.py", ["a"], ["b"])
+            + "diff --git a/src/b.py b/src/b.py\n--- a/src/b.py\n+++ b/src/b.py\n@@ -1 +1 @@\n?unsupported\n"
+        )
+
+        sections = iter_commit_diff_file_sections(patch_text)
+        first = next(sections)
+
+        self.assertEqual((first.new_path, [line.kind for line in first.hunks[0].lines]), ("src/a.py", ["delete", "add"]))
+        with self.assertRaisesRegex(ProtocolValidationError, r"Unsupported commit diff patch line: \?unsupported"):
+            next(sections)
+
+    def test_parsed_patch_keeps_compact_lines_instead_of_line_objects(self) -> None:
+        old_lines = [f"    value_{index} = compute_something_long({index}, {index * 7})" for index in range(20_000)]
+        body = []
+        for index, line in enumerate(old_lines):
+            body += [f"-{line}", f"+{line.replace('compute', 'derive')}"] if index % 3 else [f" {line}"]
+        patch_text = "\n".join(["diff --git a/src/big.py b/src/big.py", "--- a/src/big.py", "+++ b/src/big.py", "@@ -1,20000 +1,20000 @@", *body]) + "\n"
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as stream:
+            stream.write(patch_text)
+            stream.seek(0)
+            tracemalloc.start()
+            parsed = parse_commit_diff_patch(stream)
+            retained, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        hunk_lines = parsed.files[0].hunks[0].lines
+        self.assertEqual(len(hunk_lines), 6_667 + 2 * 13_333)
+        self.assertEqual((hunk_lines[-1].old_line_number, hunk_lines[-1].new_line_number), (None, 20_000))
+        # WHY: one CommitDiffLine plus its content string per line costs several
+        # times the patch text; a compact hunk keeps each content once plus
+        # about 13 bytes per line.
+        self.assertLess(retained, len(patch_text) * 3 // 2)
+
+    def test_streams_and_mappings_parse_like_text_and_hunks_own_their_lines(self) -> None:
+        patch_text = (
+            _unified_patch("src/a.py", list("abcdefghijkl"), list("aBcdefghijKl"), "\r\n")
+            + _unified_patch("src/b.py", ["x"], ["y"]).rstrip("\n")
+        )
+        expected = parse_commit_diff_patch(patch_text)
+
+        with tempfile.TemporaryFile("w+b") as handle:
+            handle.write(patch_text.encode("utf-8"))
+            handle.flush()
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                from_mapping = parse_commit_diff_patch(mapped)
+            handle.seek(0)
+            from_stream = parse_commit_diff_patch(io.TextIOWrapper(handle, encoding="utf-8", newline=""))
+
+        self.assertEqual(from_mapping, expected)
+        self.assertEqual(from_stream, expected)
+        self.assertEqual(len(expected.files[0].hunks), 2)
+        for hunk in expected.files[0].hunks:
+            self.assertEqual(hunk.lines.text, "".join(line.content for line in hunk.lines))
+        with self.assertRaises(UnicodeDecodeError) as mapped_error:
+            parse_commit_diff_patch(patch_text.encode("utf-8") + b"+\xff\n")
+        with self.assertRaises(UnicodeDecodeError) as text_error:
+            (patch_text.encode("utf-8") + b"+\xff\n").decode("utf-8")
+        self.assertEqual(str(mapped_error.exception), str(text_error.exception))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import pickle
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import LineState, LineStateColumns, ProtocolValidationError, RevisionIdTable
+
+
+def _reference_changed_summary(file_states: dict[str, list[LineState]], included: set[str]) -> tuple[int, int, int]:
+    counts = [0, 0, 0]
+    for line_states in file_states.values():
+        for line_state in line_states:
+            if line_state.origin_revision_id in included and aggregateGenCodeDesc.is_code_line(line_state.content):
+                counts[0] += 1
+                counts[1] += line_state.gen_ratio == 100
+                counts[2] += 0 < line_state.gen_ratio < 100
+    return tuple(counts)
+
+
+class TestCompactLineStateTdd(unittest.TestCase):
+    def test_line_state_has_no_per_instance_dict(self) -> None:
+        line_state = LineState(content="x = 1", origin_revision_id="r1", gen_ratio=100)
+
+        self.assertFalse(hasattr(line_state, "__dict__"))
+        self.assertEqual(line_state, LineState("x = 1", "r1", 100))
+
+    def test_replayed_repeated_lines_share_one_content_string(self) -> None:
+        parsed_patch = aggregateGenCodeDesc.parse_commit_diff_patch(
+            "diff --git a/src/a.c b/src/a.c\n--- /dev/null\n+++ b/src/a.c\n@@ -0,0 +1,2 @@\n+int a() {\n+    return 0;\n"
+            "diff --git a/src/b.c b/src/b.c\n--- /dev/null\n+++ b/src/b.c\n@@ -0,0 +1,2 @@\n+int b() {\n+    return 0;\n"
+        )
+        file_states = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+            [aggregateGenCodeDesc.RevisionCommitDiff(revision_id="r1", parsed_patch=parsed_patch)]
+        )
+
+        self.assertIs(file_states["src/a.c"][1].content, file_states["src/b.c"][1].content)
+
+    def test_replayed_file_states_are_columns_indexed_by_revision(self) -> None:
+        sequence = [
+            aggregateGenCodeDesc.RevisionCommitDiff(
+                revision_id="r1",
+                parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                    "diff --git a/src/a.py b/src/a.py\n--- /dev/null\n+++ b/src/a.py\n@@ -0,0 +1,2 @@\n+a = 1\n+b = 2\n"
+                ),
+            ),
+            aggregateGenCodeDesc.RevisionCommitDiff(
+                revision_id="r2",
+                parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                    "diff --git a/src/a.py b/src/a.py\n--- a/src/a.py\n+++ b/src/a.py\n@@ -1,2 +1,2 @@\n a = 1\n-b = 2\n+b = 3\n"
+                ),
+            ),
+        ]
+
+        line_states = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(sequence)["src/a.py"]
+
+        self.assertIsInstance(line_states, LineStateColumns)
+        self.assertEqual(line_states.contents, ["a = 1", "b = 3"])
+        self.assertEqual([aggregateGenCodeDesc.REVISION_ID_TABLE[origin] for origin in line_states.origins], ["r1", "r2"])
+        self.assertEqual((line_states.origins.typecode, line_states.gen_ratios.typecode), ("I", "B"))
+        self.assertEqual(line_states, [LineState("a = 1", "r1", 0), LineState("b = 3", "r2", 0)])
+
+    def test_pickled_columns_remap_origins_to_the_loading_process_table(self) -> None:
+        columns = LineStateColumns.from_line_states([LineState("x = 1", "r7", 100), LineState("", None, 0), LineState("y = 2", "r3", 40)])
+
+        payload = pickle.dumps(columns)
+        with patch.object(aggregateGenCodeDesc, "REVISION_ID_TABLE", RevisionIdTable()) as worker_table:
+            worker_table.index("r3")
+            loaded = pickle.loads(payload)
+            self.assertEqual([worker_table[origin] for origin in loaded.origins], ["r7", None, "r3"])
+            self.assertEqual(list(loaded.gen_ratios), [100, 0, 40])
+
+    def test_summaries_match_per_line_reference(self) -> None:
+        rng = random.Random(10)
+        revision_ids = [f"r{index}" for index in range(12)]
+        contents = ["}", "", "# note", "    // todo", "x = 1", "return value", "  * doc"]
+        file_states = {
+            f"src/f{file_index}.py": [
+                LineState(rng.choice(contents), rng.choice(revision_ids + [None]), rng.choice((0, 0, 40, 100)))
+                for _ in range(rng.randint(0, 40))
+            ]
+            for file_index in range(30)
+        }
+        included = set(rng.sample(revision_ids, 5))
+
+        summary = aggregateGenCodeDesc.summarize_live_changed_file_states_by_revision_ids(file_states, sorted(included))
+        column_summary = aggregateGenCodeDesc.summarize_live_changed_file_states_by_revision_ids(
+            {path: LineStateColumns.from_line_states(line_states) for path, line_states in file_states.items()}, sorted(included)
+        )
+
+        self.assertEqual(
+            (summary["totalCodeLines"], summary["fullGeneratedCodeLines"], summary["partialGeneratedCodeLines"]),
+            _reference_changed_summary(file_states, included),
+        )
+        self.assertEqual(column_summary, summary)
+
+        base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        commit_times = {revision_id: base + timedelta(days=index) for index, revision_id in enumerate(revision_ids)}
+        in_window = {revision_id for revision_id, commit_time in commit_times.items() if base + timedelta(days=3) <= commit_time <= base + timedelta(days=8)}
+
+        snapshot_summary = aggregateGenCodeDesc.summarize_live_snapshot_file_states(
+            file_states, commit_times, base + timedelta(days=3), base + timedelta(days=8)
+        )
+
+        self.assertEqual(
+            (snapshot_summary["totalCodeLines"], snapshot_summary["fullGeneratedCodeLines"], snapshot_summary["partialGeneratedCodeLines"]),
+            _reference_changed_summary(file_states, in_window),
+        )
+
+    def test_missing_commit_time_only_fails_for_code_lines(self) -> None:
+        commit_times = {"r1": datetime(2026, 3, 2, tzinfo=timezone.utc)}
+        start_bound = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        end_bound = datetime(2026, 3, 31, tzinfo=timezone.utc)
+        comment_only = {"src/a.py": [LineState("x = 1", "r1", 100), LineState("# gone", "r9", 0), LineState("", "r9", 0)]}
+
+        summary = aggregateGenCodeDesc.summarize_live_snapshot_file_states(comment_only, commit_times, start_bound, end_bound)
+
+        self.assertEqual(summary["totalCodeLines"], 1)
+        with self.assertRaisesRegex(ProtocolValidationError, "Missing commit time for replayed live-snapshot revision r9"):
+            aggregateGenCodeDesc.summarize_live_snapshot_file_states(
+                {**comment_only, "src/b.py": [LineState("y = 2", "r9", 0)]}, commit_times, start_bound, end_bound
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
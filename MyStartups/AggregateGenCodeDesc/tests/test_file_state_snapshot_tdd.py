@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import EMPTY_FILE_STATE_SNAPSHOT, FileStateSnapshot, FileStateWorkingSet, LineState
+
+
+def _lines(*contents: str) -> list[LineState]:
+    return [LineState(content=content, origin_revision_id="r1", gen_ratio=0) for content in contents]
+
+
+class TestFileStateSnapshotTdd(unittest.TestCase):
+    def test_working_set_matches_dict_insertion_order_semantics(self) -> None:
+        operations = [
+            ("set", "a.py"),
+            ("set", "b.py"),
+            ("set", "c.py"),
+            ("freeze", None),
+            ("pop", "a.py"),
+            ("set", "a.py"),
+            ("set", "b.py"),
+            ("pop", "c.py"),
+            ("set", "d.py"),
+            ("freeze", None),
+            ("pop", "d.py"),
+            ("set", "d.py"),
+            ("pop", "b.py"),
+            ("set", "e.py"),
+            ("freeze", None),
+        ]
+        expected: dict[str, list[LineState]] = {}
+        snapshot = EMPTY_FILE_STATE_SNAPSHOT
+        working_set = FileStateWorkingSet(snapshot)
+        for step, (operation, path) in enumerate(operations):
+            if operation == "set":
+                value = _lines(f"{path}-{step}")
+                expected[path] = value
+                working_set[path] = value
+            elif operation == "pop":
+                self.assertIs(working_set.pop(path), expected.pop(path))
+            else:
+                snapshot = working_set.freeze()
+                working_set = FileStateWorkingSet(snapshot)
+                self.assertEqual(list(snapshot.items()), list(expected.items()))
+                self.assertEqual(len(snapshot), len(expected))
+
+        self.assertEqual(list(snapshot), ["a.py", "d.py", "e.py"])
+        self.assertNotIn("b.py", snapshot)
+
+    def test_snapshot_shares_untouched_files_and_flattens_long_chains(self) -> None:
+        base_working_set = FileStateWorkingSet(EMPTY_FILE_STATE_SNAPSHOT)
+        for index in range(50):
+            base_working_set[f"src/f{index}.py"] = _lines(f"value = {index}")
+        base = base_working_set.freeze()
+
+        with patch.object(FileStateSnapshot, "MAX_DEPTH", 4):
+            snapshot = base
+            for revision in range(10):
+                working_set = FileStateWorkingSet(snapshot)
+                working_set["src/f0.py"] = _lines(f"value = {revision}")
+                snapshot = working_set.freeze()
+                self.assertLessEqual(snapshot._depth, 4)
+
+        self.assertIs(snapshot["src/f7.py"], base["src/f7.py"])
+        self.assertEqual(snapshot["src/f0.py"][0].content, "value = 9")
+        self.assertEqual(list(snapshot)[:2], ["src/f0.py", "src/f1.py"])
+        self.assertIs(FileStateWorkingSet(snapshot).freeze(), snapshot)
+
+    def test_replay_does_not_copy_untouched_line_lists(self) -> None:
+        first = aggregateGenCodeDesc.RevisionCommitDiff(
+            revision_id="r1",
+            parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                "diff --git a/src/a.py b/src/a.py\n--- /dev/null\n+++ b/src/a.py\n@@ -0,0 +1 @@\n+a = 1\n"
+                "diff --git a/src/b.py b/src/b.py\n--- /dev/null\n+++ b/src/b.py\n@@ -0,0 +1 @@\n+b = 1\n"
+            ),
+        )
+        second = aggregateGenCodeDesc.RevisionCommitDiff(
+            revision_id="r2",
+            parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                "diff --git a/src/a.py b/src/a.py\n--- a/src/a.py\n+++ b/src/a.py\n@@ -1 +1 @@\n-a = 1\n+a = 2\n"
+            ),
+            parent_revision_ids=["r1"],
+        )
+        revision_file_states: dict = {}
+        aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+            [first, second],
+            out_revision_file_states=revision_file_states,
+        )
+
+        self.assertIs(revision_file_states["r2"]["src/b.py"], revision_file_states["r1"]["src/b.py"])
+        self.assertEqual(revision_file_states["r1"]["src/a.py"][0].content, "a = 1")
+        self.assertEqual(revision_file_states["r2"]["src/a.py"][0].content, "a = 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
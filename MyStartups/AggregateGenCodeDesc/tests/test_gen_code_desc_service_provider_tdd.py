@@ -0,0 +1,280 @@
+import json
+import tempfile
+import threading
+import unittest
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import GenCodeDescServiceProvider, InputValidationError, ProtocolValidationError, RuntimeLogger
+from tests.cli_test_support import GitRepoHarness, write_revision_protocol
+
+
+def _protocol(revision_id: str, ratio: int = 100) -> dict:
+    return {
+        "REPOSITORY": {"vcsType": "git", "repoURL": "https://example.local/repo", "revisionId": revision_id},
+        "DETAIL": [{"fileName": "src/a.py", "codeLines": [{"lineLocation": 1, "genRatio": ratio}]}],
+    }
+
+
+class _StandInMetadataService:
+    """Local stand-in for the genCodeDesc metadata service."""
+
+    def __init__(self, protocols: dict[str, dict], base_path: str = "/api"):
+        self.protocols = protocols
+        self.base_path = base_path
+        self.requests: list[tuple[str, str]] = []
+        self.client_ports: set[int] = set()
+        self.failures_before_success = 0
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: object) -> None:
+                return None
+
+            def _reply(self, status: int, body: object | None = None) -> None:
+                payload = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _record(self) -> bool:
+                with service._lock:
+                    service.requests.append((self.command, self.path))
+                    service.client_ports.add(self.client_address[1])
+                    if service.failures_before_success:
+                        service.failures_before_success -= 1
+                        return False
+                return True
+
+            def do_GET(self) -> None:
+                if not self._record():
+                    self._reply(503)
+                    return
+                url = urlsplit(self.path)
+                prefix = f"{service.base_path}/revisions/"
+                query = parse_qs(url.query)
+                if not url.path.startswith(prefix) or query.get("vcsType") != ["git"]:
+                    self._reply(400)
+                    return
+                protocol = service.protocols.get(unquote(url.path[len(prefix) :]))
+                self._reply(200, protocol) if protocol is not None else self._reply(404)
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if not self._record():
+                    self._reply(503)
+                    return
+                if self.path != f"{service.base_path}/revisions/batch":
+                    self._reply(404)
+                    return
+                found = {revision_id: service.protocols[revision_id] for revision_id in body["revisionIds"] if revision_id in service.protocols}
+                self._reply(200, {"protocols": found})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}{base_path}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestGenCodeDescServiceProviderTdd(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self) -> None:
+        self.service = _StandInMetadataService({f"r{index}": _protocol(f"r{index}") for index in range(0, 10, 2)})
+        self.addCleanup(self.service.stop)
+
+    def _provider(self, **overrides: object) -> GenCodeDescServiceProvider:
+        options = dict(logger=RuntimeLogger("quiet"), backoff_seconds=0)
+        options.update(overrides)
+        provider = GenCodeDescServiceProvider(self.service.url, False, **options)
+        self.addCleanup(provider.close)
+        return provider
+
+    def test_revisions_are_fetched_over_one_keep_alive_connection(self) -> None:
+        logger = RuntimeLogger("quiet")
+        provider = self._provider(logger=logger, warn_on_missing=True)
+
+        protocols = [provider.get_revision_metadata("https://example.local/repo", "main", f"r{index}", "git") for index in range(4)]
+
+        self.assertEqual([protocol.get("REPOSITORY", {}).get("revisionId") for protocol in protocols], ["r0", None, "r2", None])
+        self.assertEqual(len(self.service.requests), 4)
+        self.assertEqual(len(self.service.client_ports), 1)
+        self.assertEqual(logger.warnings(), [
+            f"genCodeDesc record not found for revision r1 at {self.service.url}; treating affected lines as human/unattributed",
+            f"genCodeDesc record not found for revision r3 at {self.service.url}; treating affected lines as human/unattributed",
+        ])
+
+    def test_batch_prefetch_replaces_per_revision_requests(self) -> None:
+        provider = self._provider(batch_size=4)
+        revision_ids = [f"r{index}" for index in range(10)]
+
+        provider.prefetch_revision_metadata("https://example.local/repo", "main", revision_ids, "git")
+        protocols = [provider.get_revision_metadata("https://example.local/repo", "main", revision_id, "git") for revision_id in revision_ids]
+
+        self.assertEqual([method for method, _path in self.service.requests], ["POST", "POST", "POST"])
+        self.assertEqual(sum(1 for protocol in protocols if protocol), 5)
+
+    def test_transient_failures_are_retried_with_backoff(self) -> None:
+        self.service.failures_before_success = 2
+        provider = self._provider()
+
+        protocol = provider.get_revision_metadata("", "main", "r4", "git")
+
+        self.assertEqual(protocol["REPOSITORY"]["revisionId"], "r4")
+        self.assertEqual(len(self.service.requests), 3)
+
+        self.service.failures_before_success = 10
+        with self.assertRaisesRegex(ProtocolValidationError, r"failed after 4 attempts: HTTP 503"):
+            provider.get_revision_metadata("", "main", "r6", "git")
+
+    def test_identity_mismatch_and_required_records_fail(self) -> None:
+        self.service.protocols["r1"] = _protocol("r9")
+        provider = GenCodeDescServiceProvider(self.service.url, True, logger=RuntimeLogger("quiet"), backoff_seconds=0)
+        self.addCleanup(provider.close)
+
+        with self.assertRaisesRegex(ProtocolValidationError, "Metadata revisionId mismatch for revision r1"):
+            provider.get_revision_metadata("", "main", "r1", "git")
+        with self.assertRaisesRegex(ProtocolValidationError, "genCodeDesc record not found for revision r3"):
+            provider.get_revision_metadata("", "main", "r3", "git")
+
+    def test_write_through_cache_serves_reruns_offline(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "cache"
+            revision_ids = [f"r{index}" for index in range(6)]
+            provider = self._provider(cache_dir=cache_dir)
+            provider.prefetch_revision_metadata("", "main", revision_ids[:3], "git")
+            online = [provider.get_revision_metadata("", "main", revision_id, "git") for revision_id in revision_ids]
+            provider.close()
+            self.service.stop()
+
+            offline_provider = GenCodeDescServiceProvider(
+                self.service.url, False, logger=RuntimeLogger("quiet"), cache_dir=cache_dir, max_retries=0
+            )
+            found_revision_ids = revision_ids[::2]
+            offline_provider.prefetch_revision_metadata("", "main", found_revision_ids, "git")
+            offline = [offline_provider.get_revision_metadata("", "main", revision_id, "git") for revision_id in found_revision_ids]
+
+            for revision_id in ("r1", "r7"):
+                with self.assertRaisesRegex(ProtocolValidationError, "failed after 1 attempts"):
+                    offline_provider.get_revision_metadata("", "main", revision_id, "git")
+            self.assertEqual(len(list(cache_dir.rglob("*.json"))), 3)
+
+        self.assertEqual(offline, online[::2])
+        self.assertEqual(len(self.service.requests), 4)
+
+    def test_records_uploaded_after_a_miss_are_picked_up_on_rerun(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir) / "cache"
+            legacy_key = self._provider()._cache_key("", "main", "r5", "git")
+            (cache_dir / legacy_key[:2]).mkdir(parents=True)
+            (cache_dir / legacy_key[:2] / f"{legacy_key}.json").write_text('{"revisionId":"r5","protocol":null}', encoding="utf-8")
+            runs = []
+            for _run in range(2):
+                provider = self._provider(cache_dir=cache_dir)
+                provider.prefetch_revision_metadata("", "main", ["r1"], "git")
+                runs.append([provider.get_revision_metadata("", "main", revision_id, "git") for revision_id in ("r1", "r3", "r5")])
+                provider.close()
+                self.service.protocols.update({revision_id: _protocol(revision_id) for revision_id in ("r1", "r3", "r5")})
+
+        self.assertEqual(runs[0], [{}, {}, {}])
+        self.assertEqual([protocol["REPOSITORY"]["revisionId"] for protocol in runs[1]], ["r1", "r3", "r5"])
+        self.assertEqual(
+            [method for method, _path in self.service.requests],
+            ["POST", "GET", "GET", "POST", "GET", "GET"],
+        )
+
+    def test_service_source_requires_url_and_rejects_stray_service_flags(self) -> None:
+        base = dict(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+        )
+        cases = [
+            (dict(metadataSource="genCodeDescService"), "requires --genCodeDescServiceURL"),
+            (dict(metadataSource="genCodeDescService", genCodeDescServiceURL="ftp://host/x"), "must be an http:// or https:// URL"),
+            (
+                dict(metadataSource="genCodeDescService", genCodeDescServiceURL="http://host", algorithm="C"),
+                "not supported with --algorithm C",
+            ),
+            (dict(metadataSource="genCodeDesc", genCodeDescCacheDir="/tmp/x"), "require --metadataSource genCodeDescService"),
+        ]
+        for overrides, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(InputValidationError, message):
+                    aggregateGenCodeDesc.validate_inputs(Namespace(**{**base, **overrides}))
+
+    def test_algorithm_b_result_matches_set_dir_provider_with_one_batch_request(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir) / "repo"
+            protocol_dir = Path(temp_dir) / "protocols"
+            repo_dir.mkdir()
+            protocol_dir.mkdir()
+            repo = GitRepoHarness(repo_dir)
+            for index in range(6):
+                repo.write(f"src/f{index}.py", "".join(f"value_{line} = {line}\n" for line in range(index + 2)))
+                revision_id = repo.commit_all(f"r{index}", f"2026-03-{index + 2:02d}T09:00:00Z")
+                if index % 2:
+                    continue
+                protocol = {
+                    "protocolName": "generatedTextDesc",
+                    "protocolVersion": "26.03",
+                    "DETAIL": [{"fileName": f"src/f{index}.py", "codeLines": [{"lineLocation": 1, "genRatio": 100}]}],
+                    "REPOSITORY": {"vcsType": "git", "repoBranch": "main"},
+                }
+                write_revision_protocol(protocol_dir, protocol, repo_dir, revision_id)
+                self.service.protocols[revision_id] = protocol
+
+            summaries = []
+            for source in ("genCodeDesc", "genCodeDescService"):
+                args = Namespace(
+                    repoURL=str(repo_dir),
+                    repoBranch="main",
+                    startTime="2026-03-01",
+                    endTime="2026-03-31",
+                    vcsType="git",
+                    algorithm="B",
+                    metric="live_changed_source_ratio",
+                    scope="A",
+                    outputFile=None,
+                    outputFormat="json",
+                    metadataSource=source,
+                    genCodeDescSetDir=str(protocol_dir) if source == "genCodeDesc" else None,
+                    genCodeDescServiceURL=self.service.url,
+                    commitDiffSetDir=None,
+                    workingDir=None,
+                    endRevisionId=None,
+                    includedRevisionIds=None,
+                    failOnMissingProtocol=False,
+                    warnOnMissingProtocol=False,
+                    includeBreakdown="none",
+                    logLevel="quiet",
+                )
+                summaries.append(aggregateGenCodeDesc.build_result(args)["SUMMARY"])
+
+        self.assertEqual(summaries[1], summaries[0])
+        self.assertEqual(summaries[0]["fullGeneratedCodeLines"], 3)
+        self.assertEqual([method for method, _path in self.service.requests], ["POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,12 @@
+import json
+import tempfile
 import unittest
+from argparse import Namespace
 from pathlib import Path
+from unittest.mock import patch
 
-from aggregateGenCodeDesc import GenCodeDescSetDirProvider, ProtocolValidationError, RuntimeLogger
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import GenCodeDescSetDirProvider, InputValidationError, ProtocolValidationError, RuntimeLogger
 
 
 US6_DIR = Path(__file__).resolve().parent.parent / "testdata" / "us6_period_added_ratio"
@@ -34,6 +39,83 @@ class TestGenCodeDescSetDirProviderTdd(unittest.TestCase):
 
         self.assertIn("Protocol file not found for revision us6-r404", str(context.exception))
 
+    def _write_protocols(self, protocol_dir: Path, count: int) -> None:
+        for index in range(count):
+            protocol = {"REPOSITORY": {"vcsType": "git", "revisionId": f"rev-{index}"}, "DETAIL": []}
+            (protocol_dir / f"{index:04d}_genCodeDesc.json").write_text(json.dumps(protocol), encoding="utf-8")
+
+    def _count_parsed_files(self, provider: GenCodeDescSetDirProvider, revision_ids: list[str]) -> tuple[list[dict], int]:
+        original_load = aggregateGenCodeDesc.load_json_document
+        parsed: list[str] = []
+
+        def counting_load(text: str) -> object:
+            parsed.append(text)
+            return original_load(text)
+
+        with patch.object(aggregateGenCodeDesc, "load_json_document", new=counting_load):
+            protocols = [provider.get_revision_metadata("", "main", revision_id, "git") for revision_id in revision_ids]
+        return protocols, len(parsed)
+
+    def test_missing_revisions_scan_the_directory_once(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            self._write_protocols(protocol_dir, 20)
+            provider = GenCodeDescSetDirProvider(protocol_dir, False, logger=RuntimeLogger("quiet"))
+
+            protocols, parsed_count = self._count_parsed_files(
+                provider, [f"human-{index}" for index in range(50)] + ["rev-3", "rev-19"]
+            )
+
+        # WHY: 20 files indexed once, then only the two matched files are loaded.
+        self.assertEqual(parsed_count, 22)
+        self.assertEqual(protocols[:50], [{}] * 50)
+        self.assertEqual([protocol["REPOSITORY"]["revisionId"] for protocol in protocols[50:]], ["rev-3", "rev-19"])
+
+    def test_index_file_is_reused_and_invalidated_per_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            protocol_dir.mkdir()
+            index_path = Path(temp_dir) / "genCodeDesc.index.json"
+            self._write_protocols(protocol_dir, 10)
+
+            _, first_parsed = self._count_parsed_files(GenCodeDescSetDirProvider(protocol_dir, False, index_path=index_path), ["rev-4"])
+            _, warm_parsed = self._count_parsed_files(GenCodeDescSetDirProvider(protocol_dir, False, index_path=index_path), ["rev-4"])
+
+            changed = {"REPOSITORY": {"vcsType": "git", "revisionId": "rev-renamed"}, "DETAIL": []}
+            (protocol_dir / "0004_genCodeDesc.json").write_text(json.dumps(changed), encoding="utf-8")
+            protocols, changed_parsed = self._count_parsed_files(
+                GenCodeDescSetDirProvider(protocol_dir, False, index_path=index_path), ["rev-4", "rev-renamed"]
+            )
+
+        self.assertEqual((first_parsed, warm_parsed, changed_parsed), (11, 1, 2))
+        self.assertEqual(protocols[0], {})
+        self.assertEqual(protocols[1]["REPOSITORY"]["revisionId"], "rev-renamed")
+
+    def test_index_file_requires_gen_code_desc_set_dir(self) -> None:
+        args = Namespace(
+            repoURL="svn://example.local/repo",
+            repoBranch="trunk",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="svn",
+            algorithm="A",
+            metric="live_changed_source_ratio",
+            scope="A",
+            outputFile=None,
+            outputFormat="json",
+            metadataSource="genCodeDesc",
+            genCodeDescSetDir=None,
+            commitDiffSetDir=None,
+            queryArgsFile=None,
+            workingDir=None,
+            includeBreakdown="none",
+            logLevel="quiet",
+            genCodeDescIndexFile="index.json",
+        )
+
+        with self.assertRaisesRegex(InputValidationError, "--genCodeDescIndexFile requires --genCodeDescSetDir"):
+            aggregateGenCodeDesc.validate_inputs(args)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,165 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness
+
+
+class TestGitCatFileReaderTdd(unittest.TestCase):
+    def test_reader_pipelines_many_reads_through_one_session(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            for index in range(300):
+                repo.write(f"src/f{index}.py", f"value = {index}\nprint(value)\n")
+            revision_id = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+
+            requests = [(revision_id, f"src/f{index}.py") for index in range(300)]
+            requests.append((revision_id, "src/missing.py"))
+            requests.append((revision_id, "src"))
+            with aggregateGenCodeDesc.GitCatFileReader(repo_dir) as reader:
+                contents = reader.read_blobs(requests)
+                single = reader.read_blob(revision_id, "src/f7.py")
+
+        self.assertEqual(contents[0], b"value = 0\nprint(value)\n")
+        self.assertEqual(contents[299], b"value = 299\nprint(value)\n")
+        self.assertIsNone(contents[300])
+        self.assertIsNone(contents[301])
+        self.assertEqual(single, b"value = 7\nprint(value)\n")
+
+    def test_reader_rejects_oversized_blob_from_header_before_reading_payload(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/big.py", "x = 1\n" * 100)
+            revision_id = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+
+            with aggregateGenCodeDesc.GitCatFileReader(repo_dir, max_file_size=64) as reader:
+                with self.assertRaisesRegex(aggregateGenCodeDesc.RepositoryStateError, "exceeds 64 byte limit"):
+                    reader.read_blob(revision_id, "src/big.py")
+
+    def test_reader_stays_in_step_after_oversized_blob_mid_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/a.py", "a = 1\n")
+            repo.write("src/big.py", "x = 1\n" * 100)
+            repo.write("src/c.py", "c = 3\n")
+            revision_id = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+
+            with aggregateGenCodeDesc.GitCatFileReader(repo_dir, max_file_size=64) as reader:
+                with self.assertRaisesRegex(aggregateGenCodeDesc.RepositoryStateError, "src/big.py .* exceeds 64 byte limit"):
+                    reader.read_blobs([(revision_id, path) for path in ("src/a.py", "src/big.py", "src/c.py")])
+                after_oversized = reader.read_blobs([(revision_id, "src/c.py"), (revision_id, "src/a.py")])
+
+        self.assertEqual(after_oversized, [b"c = 3\n", b"a = 1\n"])
+
+    def test_failed_session_is_closed_and_replaced_in_the_registry(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/a.py", "a = 1\n")
+            revision_id = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+
+            reader = aggregateGenCodeDesc.get_git_cat_file_reader(repo_dir)
+            self.addCleanup(aggregateGenCodeDesc.close_git_cat_file_readers)
+            with patch.object(reader, "_read_header", side_effect=aggregateGenCodeDesc.CommandExecutionError("broken pipe")):
+                with self.assertRaisesRegex(aggregateGenCodeDesc.CommandExecutionError, "broken pipe"):
+                    reader.read_blob(revision_id, "src/a.py")
+            replacement = aggregateGenCodeDesc.get_git_cat_file_reader(repo_dir)
+            content = replacement.read_blob(revision_id, "src/a.py")
+
+        self.assertTrue(reader.closed)
+        self.assertIsNot(replacement, reader)
+        self.assertEqual(content, b"a = 1\n")
+
+    def test_local_git_sequence_loader_reads_file_contents_without_per_file_show(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/calc.py", "def calc(x):\n    return x\n")
+            first = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+            repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+            second = repo.commit_all("r2", "2026-03-03T09:00:00Z")
+
+            git_calls: list[list[str]] = []
+            original_run_command = aggregateGenCodeDesc.run_command
+
+            def recording_run_command(command: list[str], **kwargs) -> object:
+                git_calls.append(command[1:])
+                return original_run_command(command, **kwargs)
+
+            with patch.object(aggregateGenCodeDesc, "run_command", side_effect=recording_run_command):
+                sequence = aggregateGenCodeDesc.load_git_commit_diff_sequence_from_repository(repo_dir, [first, second])
+            aggregateGenCodeDesc.close_git_cat_file_readers()
+
+        self.assertEqual(
+            [call for call in git_calls if call[0] == "show" and ":" in call[-1]],
+            [],
+        )
+        self.assertEqual(sequence[1].base_file_lines_by_old_path["src/calc.py"], ["def calc(x):", "    return x"])
+        self.assertEqual(
+            sequence[1].final_file_lines_by_new_path["src/calc.py"],
+            ["def calc(x):", "    value = x + 1", "    return value"],
+        )
+
+    def test_newline_paths_are_read_and_non_utf8_content_is_decoded_strictly(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/a.py", "a = 1\n")
+            repo.write("src/odd\nname.py", "odd = 1\n")
+            (repo_dir / "src/latin1.py").write_bytes(b"name = 'caf\xe9'\n")
+            revision_id = repo.commit_all("r1", "2026-03-02T09:00:00Z")
+
+            with aggregateGenCodeDesc.GitCatFileReader(repo_dir) as reader:
+                contents = reader.read_blobs(
+                    [(revision_id, "src/odd\nname.py"), (revision_id, "src/a.py"), (revision_id, "src/gone\n.py")]
+                )
+                lines_by_path = aggregateGenCodeDesc.read_git_file_lines_by_path(reader, [(revision_id, "src/latin1.py")])
+                with self.assertRaises(UnicodeDecodeError):
+                    lines_by_path["src/latin1.py"]
+
+        self.assertEqual(contents, [b"odd = 1\n", b"a = 1\n", None])
+
+    def test_concurrent_lookups_start_one_session_per_repository(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = GitRepoHarness(repo_dir)
+            repo.write("src/a.py", "a = 1\n")
+            repo.commit_all("r1", "2026-03-02T09:00:00Z")
+            aggregateGenCodeDesc.close_git_cat_file_readers()
+            self.addCleanup(aggregateGenCodeDesc.close_git_cat_file_readers)
+            original_class = aggregateGenCodeDesc.GitCatFileReader
+            started: list[object] = []
+
+            def slow_reader(path: Path) -> object:
+                time.sleep(0.05)
+                reader = original_class(path)
+                started.append(reader)
+                return reader
+
+            barrier = threading.Barrier(8)
+            readers: list[object] = []
+
+            def lookup() -> None:
+                barrier.wait()
+                readers.append(aggregateGenCodeDesc.get_git_cat_file_reader(repo_dir))
+
+            with patch.object(aggregateGenCodeDesc, "GitCatFileReader", side_effect=slow_reader):
+                threads = [threading.Thread(target=lookup) for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(len(started), 1)
+        self.assertEqual({id(reader) for reader in readers}, {id(started[0])})
+
+
+if __name__ == "__main__":
+    unittest.main()
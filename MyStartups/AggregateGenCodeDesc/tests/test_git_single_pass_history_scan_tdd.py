@@ -0,0 +1,155 @@
+import subprocess
+import tempfile
+import threading
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness
+
+
+def _build_history(repo_dir: Path) -> GitRepoHarness:
+    repo = GitRepoHarness(repo_dir)
+    repo.write("src/calc.py", "def calc(x):\n    return x\n")
+    repo.write("notes.txt", "plain notes\n")
+    repo.commit_all("r1", "2026-03-02T09:00:00Z")
+    repo.checkout_new_branch("feature")
+    repo.write("src/feature.py", "def feature():\n    return 1\n")
+    repo.commit_all("r2", "2026-03-03T09:00:00Z")
+    repo.checkout("main")
+    repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+    repo.write("notes.txt", "plain notes\nmore notes\n")
+    repo.commit_all("r3", "2026-03-04T09:00:00Z")
+    repo.merge_no_ff("feature", "r4", "2026-03-05T09:00:00Z")
+    repo.rename("src/calc.py", "src/calculator.py")
+    repo.write("src/calculator.py", "def calc(x):\n    value = x + 1\n    return value * 2\n")
+    repo.commit_all("r5", "2026-03-06T09:00:00Z")
+    repo.write("notes.txt", "plain notes only\n")
+    repo.commit_all("r6", "2026-03-07T09:00:00Z")
+    repo.rename("notes.txt", "src/notes.py")
+    repo.commit_all("r7", "2026-03-08T09:00:00Z")
+    return repo
+
+
+def _comparable(revision_diff: aggregateGenCodeDesc.RevisionCommitDiff) -> tuple:
+    return (
+        revision_diff.revision_id,
+        revision_diff.parsed_patch,
+        revision_diff.parent_revision_ids,
+        dict(revision_diff.base_file_lines_by_old_path or {}),
+        dict(revision_diff.final_file_lines_by_new_path or {}),
+    )
+
+
+class TestGitSinglePassHistoryScanTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_single_pass_scan_matches_per_revision_loader(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = _build_history(repo_dir)
+            ids = repo.commit_ids
+            revision_ids = [ids[label] for label in ("r1", "r3", "r2", "r4", "r5", "r6", "r7")]
+
+            per_revision = aggregateGenCodeDesc.load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids)
+            single_pass = list(aggregateGenCodeDesc.iter_git_commit_diff_sequence_single_pass(repo_dir, revision_ids))
+
+        self.assertEqual([_comparable(item) for item in single_pass], [_comparable(item) for item in per_revision])
+        self.assertNotIn(ids["r6"], [item.revision_id for item in single_pass])
+        self.assertEqual(single_pass[3].parent_revision_ids, [ids["r3"], ids["r2"]])
+
+    def test_single_pass_scan_yields_before_the_log_finishes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = _build_history(repo_dir)
+            ids = repo.commit_ids
+
+            scan = aggregateGenCodeDesc.iter_git_commit_diff_sequence_single_pass(repo_dir, [ids["r1"], ids["r3"]])
+            first = next(scan)
+            scan.close()
+
+        self.assertEqual(first.revision_id, ids["r1"])
+        self.assertIsNone(first.parent_revision_ids)
+
+    def test_single_pass_scan_survives_stderr_larger_than_a_pipe_buffer(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = _build_history(repo_dir)
+            ids = repo.commit_ids
+            revision_ids = [ids[label] for label in ("r1", "r3", "r2", "r4", "r5", "r7")]
+            original_popen = subprocess.Popen
+
+            def noisy_git_log(command, *args, **kwargs):
+                if command[:2] == ["git", "log"]:
+                    # Stand-in for git warnings: 512 KiB on stderr before any patch output.
+                    command = ["sh", "-c", 'head -c 524288 /dev/zero | tr "\\0" w >&2; exec git "$@"', "sh", *command[1:]]
+                return original_popen(command, *args, **kwargs)
+
+            outcome: dict[str, object] = {}
+
+            def scan(scan_revision_ids: list[str]) -> None:
+                try:
+                    outcome["diffs"] = list(aggregateGenCodeDesc.iter_git_commit_diff_sequence_single_pass(repo_dir, scan_revision_ids))
+                except aggregateGenCodeDesc.CommandExecutionError as exc:
+                    outcome["error"] = str(exc)
+
+            with patch.object(aggregateGenCodeDesc.subprocess, "Popen", side_effect=noisy_git_log):
+                for scan_revision_ids in (revision_ids, ["0" * 40]):
+                    worker = threading.Thread(target=scan, args=(scan_revision_ids,), daemon=True)
+                    worker.start()
+                    worker.join(timeout=60)
+                    self.assertFalse(worker.is_alive(), "git log -p stalled on a full stderr pipe")
+
+        self.assertEqual([item.revision_id for item in outcome["diffs"]], revision_ids)
+        self.assertRegex(outcome["error"], r"Command failed \(\d+\): git log -p .*\nw{100}")
+
+    def test_algorithm_b_single_pass_matches_per_revision_result_without_per_revision_git_calls(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            _build_history(repo_dir)
+            results = {}
+            git_calls: list[list[str]] = []
+            original_run_command = aggregateGenCodeDesc.run_command
+
+            def recording_run_command(command: list[str], **kwargs) -> object:
+                git_calls.append(command[1:])
+                return original_run_command(command, **kwargs)
+
+            for mode in ("per-revision", "single-pass"):
+                git_calls.clear()
+                args = Namespace(
+                    repoURL=str(repo_dir),
+                    repoBranch="main",
+                    startTime="2026-03-01",
+                    endTime="2026-03-31",
+                    vcsType="git",
+                    algorithm="B",
+                    metric="live_changed_source_ratio",
+                    scope="A",
+                    outputFile=None,
+                    outputFormat="json",
+                    metadataSource="genCodeDesc",
+                    genCodeDescSetDir=None,
+                    commitDiffSetDir=None,
+                    workingDir=None,
+                    endRevisionId=None,
+                    includedRevisionIds=None,
+                    failOnMissingProtocol=False,
+                    warnOnMissingProtocol=False,
+                    includeBreakdown="none",
+                    logLevel="quiet",
+                    gitHistoryScan=mode,
+                )
+                with patch.object(aggregateGenCodeDesc, "run_command", side_effect=recording_run_command):
+                    results[mode] = aggregateGenCodeDesc.build_result(args)
+
+            single_pass_calls = list(git_calls)
+
+        self.assertEqual(results["single-pass"], results["per-revision"])
+        self.assertEqual([call for call in single_pass_calls if call[0] in {"show", "diff"}], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import LineState
+
+
+def _states(origin: str, *contents: str, gen_ratio: int = 0) -> list[LineState]:
+    return [LineState(content=content, origin_revision_id=origin, gen_ratio=gen_ratio) for content in contents]
+
+
+class TestMergeLineAlignmentTdd(unittest.TestCase):
+    def test_repeated_closing_braces_follow_the_branch_that_added_them(self) -> None:
+        # WHY: merged lines are copied column values rather than shared objects,
+        # so the first parent's lines are told apart by their gen_ratio.
+        first_parent = _states("r1", "a {", "}", "b {", "}", gen_ratio=100)
+        feature_parent = _states("r1", "a {", "}") + _states("r2", "x {", "y", "}") + _states("r1", "b {", "}")
+        final_lines = [line.content for line in feature_parent]
+
+        merged = aggregateGenCodeDesc.merge_commit_file_line_states(first_parent, [feature_parent], final_lines, "m1", "src/a.c")
+
+        self.assertEqual(
+            [line.origin_revision_id for line in merged],
+            ["r1", "r1", "r2", "r2", "r2", "r1", "r1"],
+        )
+        self.assertEqual(merged[1], first_parent[1])
+        self.assertEqual(merged[4], feature_parent[4])
+        self.assertEqual(merged[6], first_parent[3])
+
+    def test_octopus_merge_attributes_each_block_to_its_parent(self) -> None:
+        base = ["def main():", "", "    return 0", ""]
+        first_parent = _states("r1", *base)
+        parents = [
+            _states("r1", *base) + _states(f"f{branch}", f"def feature_{branch}():", "", "    return 0", "")
+            for branch in range(3)
+        ]
+        final_lines = list(base)
+        for branch in range(3):
+            final_lines += [f"def feature_{branch}():", "", "    return 0", ""]
+        final_lines.append("# merged")
+
+        merged = aggregateGenCodeDesc.merge_commit_file_line_states(first_parent, parents, final_lines, "m1", "src/main.py")
+
+        self.assertEqual(
+            [line.origin_revision_id for line in merged],
+            ["r1"] * 4 + ["f0"] * 4 + ["f1"] * 4 + ["f2"] * 4 + ["m1"],
+        )
+
+    def test_alignment_matches_unique_anchors_and_fills_repeated_gaps(self) -> None:
+        final_ids = [1, 9, 9, 2, 9, 3, 4]
+        parent_ids = [1, 9, 2, 9, 9, 4]
+
+        alignment = aggregateGenCodeDesc.align_final_lines_to_parent(final_ids, parent_ids)
+
+        self.assertEqual(alignment, [0, 1, None, 2, 3, None, 5])
+
+    def test_large_merge_alignment_is_exact_for_moved_free_edits(self) -> None:
+        parent_ids = [index % 50 if index % 7 == 0 else 1000 + index for index in range(20_000)]
+        final_ids = [line_id for index, line_id in enumerate(parent_ids) if index % 11 != 0]
+
+        alignment = aggregateGenCodeDesc.align_final_lines_to_parent(final_ids, parent_ids)
+
+        self.assertEqual(alignment, [index for index in range(20_000) if index % 11 != 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import json
+import pickle
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import (
+    GenCodeDescSetDirProvider,
+    IndexedFileDetail,
+    InputValidationError,
+    ProtocolIndexPreparer,
+    ProtocolValidationError,
+    RuntimeLogger,
+)
+
+
+REPO_URL = "https://example.local/repo"
+
+
+def _write_protocol(protocol_dir: Path, revision_id: str, code_lines: list[dict], **repository: str) -> None:
+    protocol = {
+        "protocolName": "generatedTextDesc",
+        "protocolVersion": "26.03",
+        "DETAIL": [{"fileName": "src/a.py", "codeLines": code_lines}],
+        "REPOSITORY": {"vcsType": "git", "repoURL": REPO_URL, "repoBranch": "main", "revisionId": revision_id, **repository},
+    }
+    (protocol_dir / f"{revision_id}_genCodeDesc.json").write_text(json.dumps(protocol), encoding="utf-8")
+
+
+def _code_lines(index: int) -> list[dict]:
+    return [
+        {"lineLocation": 1, "genRatio": 100},
+        {"lineRange": {"from": 3, "to": 3 + index}, "genRatio": 10 * (index % 10)},
+    ]
+
+
+def _prepare(protocol_dir: Path, revision_ids: list[str], jobs: int = 1, cache_dir: Path | None = None) -> tuple[dict, list[str], ProtocolIndexPreparer]:
+    logger = RuntimeLogger("debug")
+    provider = GenCodeDescSetDirProvider(protocol_dir, False, warn_on_missing=True, logger=logger)
+    args = Namespace(repoURL=REPO_URL, repoBranch="main", vcsType="git", scope="A")
+    preparer = ProtocolIndexPreparer(provider, logger, args, jobs=jobs, cache_dir=cache_dir)
+    with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+        protocol_indexes = preparer.prepare(revision_ids)
+    records = [line.split(" ", 1)[1] for line in stderr.getvalue().splitlines() if "[DEBUG]" in line or "[WARN]" in line]
+    return protocol_indexes, records, preparer
+
+
+class TestProtocolIndexPreparerTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_indexed_file_detail_pickles_without_derived_views(self) -> None:
+        detail = IndexedFileDetail(line_locations={1: 100}, line_ranges=[(20, 30, 40), (5, 9, 0)])
+
+        restored = pickle.loads(pickle.dumps(detail))
+
+        self.assertEqual(restored, detail)
+        self.assertEqual(restored.range_starts, [5, 20])
+        self.assertEqual(restored.range_ratio(25), 40)
+        self.assertNotIn(b"range_starts", pickle.dumps(detail))
+
+    def test_process_pool_matches_serial_indexes_and_logs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            revision_ids = [f"r{index:02d}" for index in range(24)]
+            for index, revision_id in enumerate(revision_ids):
+                if index % 5 != 4:
+                    _write_protocol(protocol_dir, revision_id, _code_lines(index))
+
+            serial = _prepare(protocol_dir, revision_ids)
+            parallel = _prepare(protocol_dir, revision_ids, jobs=4)
+
+        self.assertEqual(parallel[:2], serial[:2])
+        self.assertEqual(parallel[2].indexed, 20)
+        self.assertEqual(aggregateGenCodeDesc.line_ratio(parallel[0]["r07"], "src/a.py", 10), 70)
+        self.assertEqual(parallel[0]["r04"], {})
+        self.assertEqual(sum(1 for line in serial[1] if "[WARN]" in line), 4)
+
+    def test_content_hash_cache_skips_validation_until_a_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            cache_dir = Path(temp_dir) / "cache"
+            protocol_dir.mkdir()
+            revision_ids = ["r1", "r2", "r3"]
+            for index, revision_id in enumerate(revision_ids):
+                _write_protocol(protocol_dir, revision_id, _code_lines(index))
+            cold, cold_logs, _preparer = _prepare(protocol_dir, revision_ids, cache_dir=cache_dir)
+
+            with patch.object(aggregateGenCodeDesc, "build_protocol_index", side_effect=AssertionError("re-validated")):
+                warm, warm_logs, warm_preparer = _prepare(protocol_dir, revision_ids, cache_dir=cache_dir)
+
+            _write_protocol(protocol_dir, "r2", [{"lineLocation": 1, "genRatio": 40}])
+            edited, _logs, edited_preparer = _prepare(protocol_dir, revision_ids, cache_dir=cache_dir)
+
+        self.assertEqual((warm, warm_logs), (cold, cold_logs))
+        self.assertEqual((warm_preparer.cache_hits, warm_preparer.indexed), (3, 0))
+        self.assertEqual((edited_preparer.cache_hits, edited_preparer.indexed), (2, 1))
+        self.assertEqual(aggregateGenCodeDesc.line_ratio(edited["r2"], "src/a.py", 1), 40)
+
+    def test_first_error_in_revision_order_wins_and_is_cached(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir) / "protocols"
+            cache_dir = Path(temp_dir) / "cache"
+            protocol_dir.mkdir()
+            for index in range(6):
+                _write_protocol(protocol_dir, f"r{index}", _code_lines(index))
+            _write_protocol(protocol_dir, "r2", [{"lineLocation": 1}, {"lineRange": {"from": 1, "to": 2}}])
+            _write_protocol(protocol_dir, "r4", _code_lines(4), vcsType="svn")
+            revision_ids = [f"r{index}" for index in range(6)]
+
+            for jobs, cache in ((1, None), (3, cache_dir), (3, cache_dir)):
+                with self.subTest(jobs=jobs, cache=cache):
+                    with self.assertRaisesRegex(ProtocolValidationError, "overlapping line coverage at line 1"):
+                        _prepare(protocol_dir, revision_ids, jobs=jobs, cache_dir=cache)
+            with self.assertRaisesRegex(ProtocolValidationError, "vcsType mismatch for revision r4"):
+                _prepare(protocol_dir, revision_ids[3:], jobs=3, cache_dir=cache_dir)
+
+    def test_index_flags_are_validated(self) -> None:
+        base = dict(
+            repoURL="/tmp/repo",
+            repoBranch="main",
+            startTime="2026-03-01",
+            endTime="2026-03-31",
+            vcsType="git",
+            algorithm="B",
+            scope="A",
+            commitDiffSetDir=None,
+            genCodeDescSetDir=None,
+            workingDir=None,
+            queryArgsFile=None,
+        )
+        cases = [
+            (dict(indexJobs=0), "--indexJobs must be a positive integer"),
+            (dict(algorithm="A", indexJobs=2), "only supported with --algorithm B"),
+            (dict(algorithm="A", protocolIndexCacheDir="/tmp/cache"), "only supported with --algorithm B"),
+        ]
+        for overrides, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(InputValidationError, message):
+                    aggregateGenCodeDesc.validate_inputs(Namespace(**{**base, **overrides}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,99 @@
+import json
+import random
 import tempfile
+import time
 import unittest
 from pathlib import Path
 
-from aggregateGenCodeDesc import load_json_document
+import pytest
+from aggregateGenCodeDesc import load_json_document, strip_json_comments
 from tests.cli_test_support import load_json
 
 
+PROTOCOL_SAMPLES = sorted((Path(__file__).resolve().parent.parent).glob("genCodeDescProto*.json"))
+
+
+def _reference_strip_json_comments(raw_text: str) -> str:
+    """The original per-character state machine, kept as the equivalence oracle."""
+    result: list[str] = []
+    in_string = False
+    escaped = False
+    in_line_comment = False
+    in_block_comment = False
+    index = 0
+
+    while index < len(raw_text):
+        char = raw_text[index]
+        next_char = raw_text[index + 1] if index + 1 < len(raw_text) else ""
+
+        if in_line_comment:
+            if char == "\n":
+                in_line_comment = False
+                result.append(char)
+            index += 1
+            continue
+
+        if in_block_comment:
+            if char == "*" and next_char == "/":
+                in_block_comment = False
+                index += 2
+                continue
+            if char == "\n":
+                result.append(char)
+            index += 1
+            continue
+
+        if in_string:
+            result.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            index += 1
+            continue
+
+        if char == "/" and next_char == "/":
+            in_line_comment = True
+            index += 2
+            continue
+
+        if char == "/" and next_char == "*":
+            in_block_comment = True
+            index += 2
+            continue
+
+        result.append(char)
+        if char == '"':
+            in_string = True
+        index += 1
+
+    return "".join(result)
+
+
+def _synthetic_protocol_text(file_count: int, lines_per_file: int, with_comments: bool) -> str:
+    protocol = {
+        "protocolName": "generatedTextDesc",
+        "protocolVersion": "26.03",
+        "REPOSITORY": {"vcsType": "git", "repoURL": "https://example.com/org/repo.git", "revisionId": "abc123"},
+        "DETAIL": [
+            {
+                "fileName": f"src/pkg_{file_index}/module.py",
+                "codeLines": [
+                    {"lineLocation": line, "genRatio": 100 if line % 3 else 40, "genMethod": "vibeCoding"}
+                    for line in range(1, lines_per_file + 1)
+                ],
+            }
+            for file_index in range(file_count)
+        ],
+    }
+    text = json.dumps(protocol, indent=2)
+    if with_comments:
+        text = "// generated by a code agent\n" + text.replace('"genMethod"', '/* method */ "genMethod"', file_count)
+    return text
+
+
 class TestProtocolJsoncLoadingTdd(unittest.TestCase):
     def test_loader_accepts_jsonc_protocol_sample(self) -> None:
         protocol_text = """
@@ -46,6 +134,57 @@ class TestProtocolJsoncLoadingTdd(unittest.TestCase):
 
             self.assertEqual(protocol, {"protocolName": "generatedTextDesc"})
 
+    def test_stripper_matches_reference_on_samples_and_random_text(self) -> None:
+        texts = [path.read_text(encoding="utf-8") for path in PROTOCOL_SAMPLES]
+        texts += [
+            '{"url": "https://a//b", "p": "a/*b*/c"} // tail',
+            '{"a": "esc \\" // still string", /* x\n y */ "b": 1}',
+            '{"a": 1} /* unterminated\n block',
+            '{"a": "unterminated \\',
+            "/*/ not closed */ {}",
+            "{} //",
+        ]
+        rng = random.Random(12)
+        alphabet = ['"', "\\", "/", "*", "\n", "a", " ", "{", "}"]
+        texts += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(3000)]
+
+        for text in texts:
+            self.assertEqual(strip_json_comments(text), _reference_strip_json_comments(text), text)
+
+    def test_loader_fast_path_matches_stripped_parse(self) -> None:
+        self.assertTrue(PROTOCOL_SAMPLES)
+        for path in PROTOCOL_SAMPLES:
+            text = path.read_text(encoding="utf-8")
+            self.assertEqual(load_json_document(text), json.loads(_reference_strip_json_comments(text)), path.name)
+        plain_text = _synthetic_protocol_text(5, 10, with_comments=False)
+        self.assertEqual(load_json_document(plain_text), json.loads(plain_text))
+        with self.assertRaises(json.JSONDecodeError):
+            load_json_document('{"a": 1,, // broken\n}')
+
+
+@pytest.mark.long_running
+class TestProtocolJsoncLoadingBenchmarkTdd(unittest.TestCase):
+    def _best_time(self, loader, text: str) -> float:
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            loader(text)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    def test_loader_beats_per_character_stripping_on_large_protocols(self) -> None:
+        def reference_loader(text: str) -> dict:
+            return json.loads(_reference_strip_json_comments(text))
+
+        cases = {path.name: path.read_text(encoding="utf-8") for path in PROTOCOL_SAMPLES}
+        cases["synthetic-plain"] = _synthetic_protocol_text(200, 100, with_comments=False)
+        cases["synthetic-jsonc"] = _synthetic_protocol_text(200, 100, with_comments=True)
+        for name, text in cases.items():
+            self.assertEqual(load_json_document(text), reference_loader(text), name)
+            fast, reference = self._best_time(load_json_document, text), self._best_time(reference_loader, text)
+            if len(text) > 1_000_000:
+                self.assertLess(fast * 3, reference, name)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import ProtocolValidationError
+
+
+def _protocol(code_lines: list[dict]) -> dict:
+    return {"DETAIL": [{"fileName": "src/gen.py", "codeLines": code_lines}]}
+
+
+def _random_code_lines(rng: random.Random, entry_count: int) -> list[dict]:
+    code_lines = []
+    line_number = 1
+    for _ in range(entry_count):
+        line_number += rng.randint(0, 3)
+        ratio = rng.choice((0, 30, 100))
+        if rng.random() < 0.5:
+            code_lines.append({"lineLocation": line_number, "genRatio": ratio})
+            line_number += 1
+        else:
+            length = rng.randint(0, 5)
+            code_lines.append({"lineRange": {"from": line_number, "to": line_number + length}, "genRatio": ratio})
+            line_number += length + 1
+    rng.shuffle(code_lines)
+    return code_lines
+
+
+def _reference_ratio(code_lines: list[dict], line_number: int) -> int:
+    for code_line in code_lines:
+        if code_line.get("lineLocation") == line_number:
+            return code_line["genRatio"]
+        line_range = code_line.get("lineRange")
+        if line_range and line_range["from"] <= line_number <= line_range["to"]:
+            return code_line["genRatio"]
+    return 0
+
+
+class TestProtocolRangeIndexTdd(unittest.TestCase):
+    def test_line_ratio_and_batch_lookup_match_linear_reference(self) -> None:
+        rng = random.Random(13)
+        for _ in range(100):
+            code_lines = _random_code_lines(rng, rng.randint(0, 40))
+            for builder in (aggregateGenCodeDesc.build_protocol_index, aggregateGenCodeDesc.build_combined_protocol_index):
+                protocol_index = builder(_protocol(code_lines))
+                probe_lines = [rng.randint(0, 200) for _ in range(60)]
+
+                expected = [_reference_ratio(code_lines, line_number) for line_number in probe_lines]
+
+                self.assertEqual(
+                    [aggregateGenCodeDesc.line_ratio(protocol_index, "src/gen.py", line_number) for line_number in probe_lines],
+                    expected,
+                )
+                self.assertEqual(aggregateGenCodeDesc.line_ratios(protocol_index, "src/gen.py", probe_lines), expected)
+
+        self.assertEqual(aggregateGenCodeDesc.line_ratios({}, "src/missing.py", [1, 2]), [0, 0])
+
+    def test_overlap_errors_name_the_first_conflicting_entry(self) -> None:
+        cases = [
+            (
+                [{"lineRange": {"from": 10, "to": 20}}, {"lineLocation": 15}],
+                "overlapping line coverage at line 15",
+            ),
+            (
+                [{"lineLocation": 30}, {"lineLocation": 12}, {"lineRange": {"from": 10, "to": 40}}],
+                "overlapping line coverage at line 30",
+            ),
+            (
+                [{"lineRange": {"from": 50, "to": 60}}, {"lineRange": {"from": 1, "to": 5}}, {"lineRange": {"from": 3, "to": 55}}],
+                "overlapping line ranges 3-55 and 50-60",
+            ),
+            (
+                [{"lineRange": {"from": 8, "to": 3}}],
+                "lineRange.from greater than lineRange.to",
+            ),
+        ]
+        for code_lines, message in cases:
+            for builder in (aggregateGenCodeDesc.build_protocol_index, aggregateGenCodeDesc.build_doc_protocol_index):
+                field_name = "codeLines" if builder is aggregateGenCodeDesc.build_protocol_index else "docLines"
+                with self.subTest(message=message, builder=builder.__name__):
+                    with self.assertRaisesRegex(ProtocolValidationError, message):
+                        builder({"DETAIL": [{"fileName": "src/gen.py", field_name: code_lines}]})
+
+    def test_index_build_handles_many_adjacent_ranges(self) -> None:
+        code_lines = [{"lineRange": {"from": start, "to": start + 1}, "genRatio": 100} for start in range(1, 40_000, 2)]
+        code_lines.reverse()
+
+        protocol_index = aggregateGenCodeDesc.build_protocol_index(_protocol(code_lines))
+
+        self.assertEqual(aggregateGenCodeDesc.line_ratio(protocol_index, "src/gen.py", 39_999), 100)
+        self.assertEqual(aggregateGenCodeDesc.line_ratio(protocol_index, "src/gen.py", 40_001), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+import json
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import InputValidationError, RuntimeLogger
+from tests.cli_test_support import GitRepoHarness, run_cli, write_revision_protocol
+
+
+WINDOWS = [
+    ("2026-03-01", "2026-03-07"),
+    ("2026-03-08", "2026-03-14"),
+    ("2026-03-10", "2026-03-14"),
+    ("2026-03-15", "2026-03-21"),
+    ("2026-03-01", "2026-03-31"),
+    ("2026-03-22", "2026-03-28"),
+]
+
+
+def _build_history(root_dir: Path) -> tuple[Path, Path]:
+    repo_dir = root_dir / "repo"
+    protocol_dir = root_dir / "protocols"
+    repo_dir.mkdir()
+    protocol_dir.mkdir()
+    repo = GitRepoHarness(repo_dir)
+    contents = {f"src/f{index}.py": [] for index in range(3)}
+    for day in range(2, 29, 2):
+        path = f"src/f{day % 3}.py"
+        lines = contents[path]
+        if lines:
+            lines[len(lines) // 2] = f"changed_{day} = {day}"
+        lines.extend(f"value_{day}_{line} = {line}" for line in range(day % 4 + 1))
+        repo.write(path, "".join(f"{line}\n" for line in lines))
+        revision_id = repo.commit_all(f"d{day}", f"2026-03-{day:02d}T09:00:00Z")
+        protocol = {
+            "protocolName": "generatedTextDesc",
+            "protocolVersion": "26.03",
+            "DETAIL": [
+                {"fileName": path, "codeLines": [{"lineLocation": line, "genRatio": (0, 40, 100)[(line + day) % 3]} for line in range(1, len(lines) + 1)]}
+            ],
+            "REPOSITORY": {"vcsType": "git", "repoBranch": "main"},
+        }
+        write_revision_protocol(protocol_dir, protocol, repo_dir, revision_id)
+    return repo_dir, protocol_dir
+
+
+def _args(repo_dir: Path, protocol_dir: Path, algorithm: str, windows: list[tuple[str, str]] | None = None) -> Namespace:
+    return Namespace(
+        repoURL=str(repo_dir),
+        repoBranch="main",
+        startTime="2026-03-01",
+        endTime="2026-03-31",
+        vcsType="git",
+        algorithm=algorithm,
+        metric=None,
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        commitDiffSetDir=None,
+        workingDir=None,
+        endRevisionId=None,
+        includedRevisionIds=None,
+        failOnMissingProtocol=False,
+        warnOnMissingProtocol=False,
+        includeBreakdown="none",
+        logLevel="quiet",
+        queryWindows=windows,
+    )
+
+
+class TestQueryWindowsTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_algorithm_a_windows_match_single_runs_and_blame_each_end_snapshot_once(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            blamed: list[tuple[str, str]] = []
+            original_parse_blame = aggregateGenCodeDesc.parse_blame
+
+            def recording_parse_blame(repo_dir: Path, end_revision_id: str, relative_path: str) -> list:
+                blamed.append((end_revision_id, relative_path))
+                return original_parse_blame(repo_dir, end_revision_id, relative_path)
+
+            with patch.object(aggregateGenCodeDesc, "parse_blame", new=recording_parse_blame):
+                singles = [
+                    {**aggregateGenCodeDesc.build_result(aggregateGenCodeDesc.query_window_args(_args(repo_dir, protocol_dir, "A"), window)), "WINDOW": {"startTime": window[0], "endTime": window[1]}}
+                    for window in WINDOWS
+                ]
+                single_blames = list(blamed)
+                blamed.clear()
+                batch = aggregateGenCodeDesc.build_window_results(_args(repo_dir, protocol_dir, "A", WINDOWS))
+
+        self.assertEqual(batch, singles)
+        self.assertEqual(len(blamed), len(set(blamed)))
+        self.assertEqual(set(blamed), set(single_blames))
+        self.assertLess(len(blamed), len(single_blames))
+
+    def test_algorithm_b_windows_match_single_runs_from_one_replay(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            singles = [
+                aggregateGenCodeDesc.build_result(aggregateGenCodeDesc.query_window_args(_args(repo_dir, protocol_dir, "B"), window))
+                for window in WINDOWS
+            ]
+            original_load = aggregateGenCodeDesc.load_algorithm_b_git_commit_diff_sequence
+            with patch.object(aggregateGenCodeDesc, "load_algorithm_b_git_commit_diff_sequence", wraps=original_load) as load:
+                batch = aggregateGenCodeDesc.build_window_results(_args(repo_dir, protocol_dir, "B", WINDOWS))
+
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual([{key: value for key, value in result.items() if key != "WINDOW"} for result in batch], singles)
+        self.assertEqual([result["WINDOW"]["startTime"] for result in batch], [window[0] for window in WINDOWS])
+        self.assertGreater(batch[-1]["SUMMARY"]["fullGeneratedCodeLines"], 0)
+
+    def test_algorithm_c_windows_match_single_runs_from_one_accumulation(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            protocol_dir = Path(temp_dir)
+            for day in range(2, 29, 3):
+                revision_id = f"c{day:02d}"
+                timestamp = f"2026-03-{day:02d}T09:00:00Z"
+                code_lines = [
+                    {"changeType": "add", "genRatio": (0, 40, 100)[line % 3], "blame": {"revisionId": revision_id, "originalFilePath": "src/app.py", "originalLine": line, "timestamp": timestamp}}
+                    for line in range(1, day % 5 + 2)
+                ]
+                omits_lines = day % 9 == 2
+                if day > 5 and not omits_lines:
+                    code_lines.append({"changeType": "delete", "blame": {"revisionId": f"c{day - 3:02d}", "originalFilePath": "src/app.py", "originalLine": 1}})
+                protocol = {
+                    "protocolName": "generatedTextDesc",
+                    "protocolVersion": "26.04",
+                    "DETAIL": [{"fileName": "src/app.py", "codeLines": code_lines}],
+                    "REPOSITORY": {"vcsType": "git", "repoURL": "https://example.local/repo", "repoBranch": "main", "revisionId": revision_id, "revisionTimestamp": timestamp},
+                }
+                if omits_lines:
+                    protocol["SUMMARY"] = {"totalCodeLines": len(code_lines) + 3}
+                (protocol_dir / f"{revision_id}_genCodeDesc.json").write_text(json.dumps(protocol), encoding="utf-8")
+
+            args = _args(Path(""), protocol_dir, "C", WINDOWS)
+            args.repoURL = ""
+            args.vcsType = ""
+            args.repoBranch = ""
+            singles = [
+                aggregateGenCodeDesc.build_result_algorithm_c(aggregateGenCodeDesc.query_window_args(args, window), RuntimeLogger("quiet"))
+                for window in WINDOWS
+            ]
+            original_load = aggregateGenCodeDesc.load_algorithm_c_protocol
+            with patch.object(aggregateGenCodeDesc, "load_algorithm_c_protocol", wraps=original_load) as load:
+                batch = aggregateGenCodeDesc.build_window_results(args)
+
+        self.assertEqual(load.call_count, 9)
+        self.assertEqual([{key: value for key, value in result.items() if key != "WINDOW"} for result in batch], singles)
+        # WHY: each window only reports warnings from protocols replayed up to its own end.
+        self.assertEqual([len(result["WARNINGS"]) for result in batch], [1, 2, 2, 3, 3, 3])
+
+    def test_cli_writes_one_result_document_per_window(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            windows_path = Path(temp_dir) / "windows.json"
+            windows_path.write_text(json.dumps([{"startTime": start, "endTime": end} for start, end in WINDOWS[:2]]), encoding="utf-8")
+            output_file = Path(temp_dir) / "result.json"
+            query = {"vcsType": "git", "repoBranch": "main", "startTime": "", "endTime": ""}
+
+            run_cli(repo_dir, output_file, protocol_dir, query, extra_args=["--algorithm", "B", "--windows", str(windows_path)])
+            results = json.loads(output_file.read_text(encoding="utf-8"))
+
+            expected = [
+                aggregateGenCodeDesc.build_result(aggregateGenCodeDesc.query_window_args(_args(repo_dir, protocol_dir, "B"), window))
+                for window in WINDOWS[:2]
+            ]
+        self.assertEqual([result.pop("WINDOW") for result in results], [{"startTime": start, "endTime": end} for start, end in WINDOWS[:2]])
+        self.assertEqual([result["SUMMARY"] for result in results], [result["SUMMARY"] for result in expected])
+
+    def test_windows_come_from_file_or_query_args_and_are_validated(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            windows_path = Path(temp_dir) / "windows.json"
+            windows_path.write_text(json.dumps({"windows": [{"startTime": "2026-03-08", "endTime": "2026-03-14"}, {"startTime": "2026-02-01", "endTime": "2026-02-28"}]}), encoding="utf-8")
+            query_args_path = Path(temp_dir) / "queryArgs.json"
+            query_args_path.write_text(json.dumps({"algorithm": "C", "windows": [{"startTime": "2026-03-01", "endTime": "2026-03-07"}]}), encoding="utf-8")
+            base = dict(
+                repoURL="",
+                repoBranch="",
+                startTime="",
+                endTime="",
+                vcsType="",
+                algorithm="",
+                metric=None,
+                scope=None,
+                endRevisionId=None,
+                includedRevisionIds=None,
+                genCodeDescSetDir=None,
+                queryArgsFile=str(query_args_path),
+            )
+
+            from_file = aggregateGenCodeDesc.apply_query_args(Namespace(**base, windows=str(windows_path)))
+            from_query_args = aggregateGenCodeDesc.apply_query_args(Namespace(**base))
+
+            self.assertEqual(from_file.queryWindows, [("2026-03-08", "2026-03-14"), ("2026-02-01", "2026-02-28")])
+            self.assertEqual(from_query_args.queryWindows, [("2026-03-01", "2026-03-07")])
+            from_file.commitDiffSetDir = None
+            from_file.workingDir = None
+            from_file.genCodeDescSetDir = temp_dir
+            aggregateGenCodeDesc.validate_inputs(from_file)
+            self.assertEqual((from_file.startTime, from_file.endTime), ("2026-02-01", "2026-03-14"))
+
+            cases = [
+                ([], "--windows must be a non-empty list"),
+                ([{"startTime": "2026-03-01"}], r"--windows\[0\].endTime must be a non-empty string"),
+                ([{"startTime": "2026-03-09", "endTime": "2026-03-08"}], r"--windows\[0\] has startTime after endTime"),
+            ]
+            for windows, message in cases:
+                with self.subTest(message=message):
+                    windows_path.write_text(json.dumps(windows), encoding="utf-8")
+                    with self.assertRaisesRegex(InputValidationError, message):
+                        aggregateGenCodeDesc.apply_query_args(Namespace(**base, windows=str(windows_path)))
+
+            combined = aggregateGenCodeDesc.apply_query_args(Namespace(**{**base, "endRevisionId": "abc"}))
+            combined.commitDiffSetDir = None
+            combined.workingDir = None
+            combined.genCodeDescSetDir = temp_dir
+            with self.assertRaisesRegex(InputValidationError, "--windows cannot be combined with --endRevisionId"):
+                aggregateGenCodeDesc.validate_inputs(combined)
+
+            windows_path.write_text(json.dumps({"windows": [{"startTime": "2026-03-08", "endTime": "2026-03-14"}]}), encoding="utf-8")
+            cases = [
+                (dict(startTime="2026-01-01", windows=str(windows_path)), {"algorithm": "C"}),
+                (dict(endTime="2026-03-31"), {"algorithm": "C", "windows": [{"startTime": "2026-03-01", "endTime": "2026-03-07"}]}),
+                ({}, {"algorithm": "C", "startTime": "2026-01-01", "windows": [{"startTime": "2026-03-01", "endTime": "2026-03-07"}]}),
+            ]
+            for overrides, query_args in cases:
+                with self.subTest(overrides=overrides, query_args=query_args):
+                    query_args_path.write_text(json.dumps(query_args), encoding="utf-8")
+                    explicit = aggregateGenCodeDesc.apply_query_args(Namespace(**{**base, **overrides}))
+                    explicit.commitDiffSetDir = None
+                    explicit.workingDir = None
+                    explicit.genCodeDescSetDir = temp_dir
+                    with self.assertRaisesRegex(InputValidationError, "--windows cannot be combined with --startTime or --endTime"):
+                        aggregateGenCodeDesc.validate_inputs(explicit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import io
+import tempfile
+import unittest
+from argparse import Namespace
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from tests.cli_test_support import GitRepoHarness
+
+
+def _build_history(repo_dir: Path) -> GitRepoHarness:
+    repo = GitRepoHarness(repo_dir)
+    repo.write("src/calc.py", "def calc(x):\n    return x\n")
+    repo.commit_all("r1", "2026-03-02T09:00:00Z")
+    repo.checkout_new_branch("feature")
+    repo.write("src/feature.py", "def feature():\n    return 1\n")
+    repo.commit_all("r2", "2026-03-03T09:00:00Z")
+    repo.checkout("main")
+    repo.write("src/calc.py", "def calc(x):\n    value = x + 1\n    return value\n")
+    repo.commit_all("r3", "2026-03-04T09:00:00Z")
+    repo.merge_no_ff("feature", "r4", "2026-03-05T09:00:00Z")
+    return repo
+
+
+class TestRevisionMetadataPreloadTdd(unittest.TestCase):
+    def test_git_preload_resolves_times_parents_and_authors_in_one_log_pass(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = _build_history(repo_dir)
+            ids = repo.commit_ids
+
+            cache = aggregateGenCodeDesc.preload_git_revision_metadata(repo_dir, ids["r4"])
+
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.commit_times[ids["r2"]], datetime(2026, 3, 3, 9, 0, tzinfo=timezone.utc))
+        self.assertEqual(cache.parent_revision_ids[ids["r4"]], [ids["r3"], ids["r2"]])
+        self.assertEqual(cache.parent_revision_ids[ids["r1"]], [])
+        self.assertEqual(cache.authors[ids["r1"]], "AggregateGenCodeDesc Tests <tests@example.local>")
+        self.assertEqual(cache.first_parent_revisions()[ids["r4"]], ids["r3"])
+        self.assertIsNone(cache.first_parent_revisions()[ids["r1"]])
+
+    def test_svn_preload_parses_one_ranged_log_query(self) -> None:
+        svn_calls: list[list[str]] = []
+        svn_timeouts: list[int] = []
+
+        def fake_run_svn(svn_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
+            svn_calls.append(svn_args)
+            svn_timeouts.append(timeout)
+            return (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                "<log>"
+                '<logentry revision="3"><author>alice</author><date>2026-03-04T09:00:00.000000Z</date></logentry>'
+                '<logentry revision="2"><date>2026-03-03T09:00:00.000000Z</date></logentry>'
+                '<logentry revision="1"><author>bob</author><date>2026-03-02T09:00:00.000000Z</date></logentry>'
+                "</log>"
+            )
+
+        with patch.object(aggregateGenCodeDesc, "run_svn", side_effect=fake_run_svn):
+            cache = aggregateGenCodeDesc.preload_svn_revision_metadata("file:///virtual/repo", "3")
+
+        self.assertEqual(svn_calls, [["log", "--xml", "-r", "3:1", "file:///virtual/repo"]])
+        self.assertEqual(svn_timeouts, [aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS])
+        self.assertEqual(cache.parent_revision_ids, {"3": ["2"], "2": ["1"], "1": []})
+        self.assertEqual(cache.authors, {"3": "alice", "2": "", "1": "bob"})
+        self.assertEqual(cache.commit_times["2"], datetime(2026, 3, 3, 9, 0, tzinfo=timezone.utc))
+
+    def test_algorithm_a_resolves_commit_times_and_parents_without_per_revision_git_calls(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            _build_history(repo_dir)
+            args = Namespace(
+                repoURL=str(repo_dir),
+                repoBranch="main",
+                startTime="2026-03-01",
+                endTime="2026-03-31",
+                vcsType="git",
+                algorithm="A",
+                scope="A",
+                outputFile=None,
+                outputFormat="json",
+                metadataSource="genCodeDesc",
+                genCodeDescSetDir=None,
+                workingDir=None,
+                failOnMissingProtocol=False,
+                warnOnMissingProtocol=False,
+                includeBreakdown="none",
+                logLevel="info",
+            )
+            git_calls: list[list[str]] = []
+            original_run_command = aggregateGenCodeDesc.run_command
+
+            def recording_run_command(command: list[str], **kwargs) -> object:
+                git_calls.append(command[1:])
+                return original_run_command(command, **kwargs)
+
+            with patch.object(aggregateGenCodeDesc, "run_command", side_effect=recording_run_command), patch("sys.stderr"):
+                result = aggregateGenCodeDesc.build_result(args)
+
+        self.assertEqual(result["SUMMARY"]["totalCodeLines"], 5)
+        self.assertEqual([call for call in git_calls if call[0] == "show"], [])
+        self.assertEqual([call for call in git_calls if call[0] == "rev-parse"], [])
+        self.assertEqual(len([call for call in git_calls if call[0] == "log"]), 1)
+
+    def test_git_preload_timeout_scales_with_history_size(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            repo = _build_history(repo_dir)
+            timeouts: dict[str, int] = {}
+            original_run_command = aggregateGenCodeDesc.run_command
+
+            def recording_run_command(command: list[str], **kwargs) -> object:
+                timeouts[command[1]] = kwargs["timeout"]
+                return original_run_command(command, **kwargs)
+
+            with patch.object(aggregateGenCodeDesc, "run_command", side_effect=recording_run_command), patch.object(
+                aggregateGenCodeDesc, "GIT_PRELOAD_REVISIONS_PER_TIMEOUT", 3
+            ):
+                cache = aggregateGenCodeDesc.preload_git_revision_metadata(repo_dir, repo.commit_ids["r4"], timeout=7)
+
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(timeouts, {"rev-list": 7, "log": 14})
+
+    def test_svn_preload_timeout_scales_with_the_end_revision(self) -> None:
+        svn_timeouts: list[int] = []
+
+        def fake_run_svn(svn_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
+            svn_timeouts.append(timeout)
+            return '<?xml version="1.0" encoding="UTF-8"?>\n<log></log>'
+
+        with patch.object(aggregateGenCodeDesc, "run_svn", side_effect=fake_run_svn):
+            for end_revision_id in ("9999", "10001", "45000"):
+                aggregateGenCodeDesc.preload_svn_revision_metadata("file:///virtual/repo", end_revision_id, timeout=7)
+
+        self.assertEqual(svn_timeouts, [7, 14, 35])
+
+    def test_failed_preload_falls_back_to_per_revision_lookups(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir = Path(temp_dir)
+            _build_history(repo_dir)
+            original_run_command = aggregateGenCodeDesc.run_command
+
+            def timing_out_log(command: list[str], **kwargs) -> object:
+                if command[1] == "log" and command[2].startswith("--format=%H"):
+                    raise aggregateGenCodeDesc.CommandExecutionError(f"Command timed out after {kwargs['timeout']}s: {' '.join(command)}")
+                return original_run_command(command, **kwargs)
+
+            protocol_dir = Path(temp_dir) / "protocols"
+            protocol_dir.mkdir()
+            results = {}
+            for algorithm, replay_mode in (("A", None), ("B", "buffered"), ("B", "streaming")):
+                args = Namespace(
+                    repoURL=str(repo_dir),
+                    repoBranch="main",
+                    startTime="2026-03-01",
+                    endTime="2026-03-31",
+                    vcsType="git",
+                    algorithm=algorithm,
+                    metric=None,
+                    scope="A",
+                    outputFile=None,
+                    outputFormat="json",
+                    metadataSource="genCodeDesc",
+                    genCodeDescSetDir=str(protocol_dir),
+                    commitDiffSetDir=None,
+                    workingDir=None,
+                    endRevisionId=None,
+                    includedRevisionIds=None,
+                    failOnMissingProtocol=False,
+                    warnOnMissingProtocol=False,
+                    includeBreakdown="none",
+                    logLevel="info",
+                    replayMode=replay_mode,
+                )
+                with patch("sys.stderr", new_callable=io.StringIO):
+                    expected = aggregateGenCodeDesc.build_result(args)
+                with patch.object(aggregateGenCodeDesc, "run_command", side_effect=timing_out_log), patch(
+                    "sys.stderr", new_callable=io.StringIO
+                ) as stderr:
+                    fallback = aggregateGenCodeDesc.build_result(args)
+                results[(algorithm, replay_mode)] = (fallback, expected, stderr.getvalue())
+
+        for key, (fallback, expected, log_text) in results.items():
+            with self.subTest(key=key):
+                self.assertEqual(fallback, expected)
+                self.assertIn("failed (Command timed out after 30s: git log --format=%H", log_text)
+                self.assertIn("falling back to per-revision lookups", log_text)
+
+if __name__ == "__main__":
+    unittest.main()
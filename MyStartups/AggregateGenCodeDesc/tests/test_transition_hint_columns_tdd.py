@@ -0,0 +1,222 @@
+import io
+import random
+import tempfile
+import unittest
+import weakref
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import aggregateGenCodeDesc
+from aggregateGenCodeDesc import PreviousGenRatioColumns, RuntimeLogger
+from tests.cli_test_support import GitRepoHarness, write_revision_protocol
+
+
+def _build_history(root_dir: Path) -> tuple[Path, Path]:
+    repo_dir = root_dir / "repo"
+    protocol_dir = root_dir / "protocols"
+    repo_dir.mkdir()
+    protocol_dir.mkdir()
+    repo = GitRepoHarness(repo_dir)
+    rng = random.Random(25)
+    contents: dict[str, list[str]] = {}
+
+    def commit(label: str, date: str) -> None:
+        for index in range(rng.randint(1, 3)):
+            path = f"src/m{rng.randint(0, 4)}.py"
+            lines = contents.setdefault(path, [])
+            for _ in range(rng.randint(0, 2)):
+                if lines:
+                    lines[rng.randrange(len(lines))] = f"edit_{label}_{index}_{rng.randint(0, 99)} = 1"
+            lines.insert(rng.randint(0, len(lines)), f"value_{label}_{index} = 2")
+            repo.write(path, "".join(f"{line}\n" for line in lines))
+        revision_id = repo.commit_all(label, date)
+        protocol = {
+            "protocolName": "generatedTextDesc",
+            "protocolVersion": "26.03",
+            "DETAIL": [
+                {"fileName": path, "codeLines": [{"lineLocation": line, "genRatio": rng.choice((0, 40, 100))} for line in range(1, len(lines) + 1)]}
+                for path, lines in sorted(contents.items())
+            ],
+            "REPOSITORY": {"vcsType": "git", "repoBranch": "main"},
+        }
+        write_revision_protocol(protocol_dir, protocol, repo_dir, revision_id)
+
+    for day in range(1, 8):
+        commit(f"d{day}", f"2026-03-{day:02d}T09:00:00Z")
+    repo.checkout_new_branch("side")
+    repo.write("src/side.py", "side = 1\n")
+    repo.commit_all("side", "2026-03-08T09:00:00Z")
+    repo.checkout("main")
+    for day in range(9, 12):
+        commit(f"d{day}", f"2026-03-{day:02d}T09:00:00Z")
+    repo.merge_no_ff("side", "merge", "2026-03-12T09:00:00Z")
+    for day in range(13, 20):
+        commit(f"d{day}", f"2026-03-{day:02d}T09:00:00Z")
+    return repo_dir, protocol_dir
+
+
+def _args(repo_dir: Path, protocol_dir: Path, replay_mode: str) -> Namespace:
+    return Namespace(
+        repoURL=str(repo_dir),
+        repoBranch="main",
+        startTime="2026-03-01",
+        endTime="2026-03-31",
+        vcsType="git",
+        algorithm="B",
+        metric=None,
+        scope="A",
+        outputFile=None,
+        outputFormat="json",
+        metadataSource="genCodeDesc",
+        genCodeDescSetDir=str(protocol_dir),
+        commitDiffSetDir=None,
+        workingDir=None,
+        endRevisionId=None,
+        includedRevisionIds=None,
+        failOnMissingProtocol=False,
+        warnOnMissingProtocol=False,
+        includeBreakdown="none",
+        logLevel="info",
+        replayMode=replay_mode,
+    )
+
+
+class TestTransitionHintColumnsTdd(unittest.TestCase):
+    maxDiff = None
+
+    def test_columns_answer_like_the_previous_revision_snapshot(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            end_revision_id = aggregateGenCodeDesc.resolve_end_revision(repo_dir, "main", "2026-03-31")
+            revision_metadata = aggregateGenCodeDesc.preload_git_revision_metadata(repo_dir, end_revision_id)
+            revision_ids = aggregateGenCodeDesc.run_git(repo_dir, ["rev-list", "--reverse", "--topo-order", end_revision_id]).splitlines()
+            sequence = aggregateGenCodeDesc.load_git_commit_diff_sequence_from_repository(repo_dir, revision_ids, "A", revision_metadata)
+            provider = aggregateGenCodeDesc.GenCodeDescSetDirProvider(protocol_dir, False)
+            preparer = aggregateGenCodeDesc.ProtocolIndexPreparer(provider, RuntimeLogger("quiet"), _args(repo_dir, protocol_dir, "buffered"))
+            protocol_indexes = preparer.prepare(revision_ids)
+            columns = PreviousGenRatioColumns(
+                "A",
+                [revision_diff.revision_id for revision_diff in sequence],
+                {revision_diff.revision_id: revision_diff.parent_revision_ids or [] for revision_diff in sequence},
+            )
+            revision_file_states: dict = {}
+            file_states_by_path = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(
+                sequence,
+                protocol_indexes,
+                out_revision_file_states=revision_file_states,
+                on_revision=columns.record,
+            )
+
+        previous_revision_ids = aggregateGenCodeDesc._make_revision_prev_map(sequence)
+        transitions = 0
+        for path, line_states in file_states_by_path.items():
+            for line_number, line_state in enumerate(line_states, start=1):
+                previous_lines = revision_file_states.get(previous_revision_ids.get(line_state.origin_revision_id), {}).get(path, [])
+                expected = previous_lines[line_number - 1].gen_ratio if line_number <= len(previous_lines) else None
+                self.assertEqual(columns.gen_ratio_before(line_state.origin_revision_id, path, line_number), expected)
+                transitions += expected is not None and expected != line_state.gen_ratio
+        self.assertGreater(transitions, 0)
+
+    def test_info_logs_match_across_replay_modes_and_quiet_runs_record_nothing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_dir, protocol_dir = _build_history(Path(temp_dir))
+            line_logs = {}
+            results = {}
+            for replay_mode in ("buffered", "streaming"):
+                with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                    results[replay_mode] = aggregateGenCodeDesc.build_result(_args(repo_dir, protocol_dir, replay_mode))
+                line_logs[replay_mode] = [
+                    line.split(" ", 1)[1] for line in stderr.getvalue().splitlines() if "LiveLine" in line or "TransitionHint" in line
+                ]
+
+            quiet_args = _args(repo_dir, protocol_dir, "buffered")
+            quiet_args.logLevel = "quiet"
+            with patch.object(PreviousGenRatioColumns, "record", side_effect=AssertionError("recorded")):
+                quiet = aggregateGenCodeDesc.build_result(quiet_args)
+
+        self.assertEqual(line_logs["streaming"], line_logs["buffered"])
+        self.assertTrue(any("TransitionHint" in line for line in line_logs["buffered"]))
+        self.assertEqual(results["streaming"], results["buffered"])
+        self.assertEqual(quiet["SUMMARY"], results["buffered"]["SUMMARY"])
+
+    def test_buffered_replay_drops_snapshots_no_later_revision_reads(self) -> None:
+        sequence = [
+            aggregateGenCodeDesc.RevisionCommitDiff(
+                revision_id=f"r{index}",
+                parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                    f"diff --git a/src/a.py b/src/a.py\n--- a/src/a.py\n+++ b/src/a.py\n@@ -{index},0 +{index + 1} @@\n+line_{index} = {index}\n"
+                ),
+            )
+            for index in range(40)
+        ]
+        live_snapshots: dict[int, weakref.ref] = {}
+        original_derive = aggregateGenCodeDesc.FileStateSnapshot.derive
+        max_live_snapshots = 0
+
+        def tracked_derive(snapshot, *args):
+            nonlocal max_live_snapshots
+            derived = original_derive(snapshot, *args)
+            key = id(derived)
+            live_snapshots.setdefault(key, weakref.ref(derived, lambda _ref: live_snapshots.pop(key, None)))
+            max_live_snapshots = max(max_live_snapshots, len(live_snapshots))
+            return derived
+
+        with patch.object(aggregateGenCodeDesc.FileStateSnapshot, "derive", new=tracked_derive), patch.object(
+            aggregateGenCodeDesc.FileStateSnapshot, "MAX_DEPTH", 2
+        ):
+            file_states_by_path = aggregateGenCodeDesc.reconstruct_final_file_states_by_path_from_commit_diff_sequence(sequence)
+
+        self.assertEqual(len(file_states_by_path["src/a.py"]), 40)
+        # WHY: 40 revisions are replayed; with a short flattening depth only
+        # the current base chain stays reachable when nothing is logged.
+        self.assertLessEqual(max_live_snapshots, 4)
+        self.assertIsNone(
+            aggregateGenCodeDesc.replay_algorithm_b_commit_diffs(
+                Namespace(repoURL="", repoBranch="main", vcsType="git", scope="A"),
+                RuntimeLogger("quiet"),
+                aggregateGenCodeDesc.GenCodeDescSetDirProvider(Path("."), False),
+                sequence,
+                [revision_diff.revision_id for revision_diff in sequence],
+                {},
+            )[1]
+        )
+
+    def test_retained_columns_stay_bounded_over_a_long_window(self) -> None:
+        # WHY: each revision rewrites the same two lines, so every earlier
+        # origin leaves the live state and its column must go with it.
+        sequence = [
+            aggregateGenCodeDesc.RevisionCommitDiff(
+                revision_id="r0",
+                parsed_patch=aggregateGenCodeDesc.parse_commit_diff_patch(
+                    "diff --git a/src/a.py b/src/a.py\n--- /dev/null\n+++ b/src/a.py\n@@ -0,0 +1,3 @@\n+keep = 0\n+a = 0\n+b = 0\n"
+                ),
+            )
+        ]
+        for index in range(1, 400):
+            parsed_patch = aggregateGenCodeDesc.parse_commit_diff_patch(
+                "diff --git a/src/a.py b/src/a.py\n--- a/src/a.py\n+++ b/src/a.py\n"
+                f"@@ -2,2 +2,2 @@\n-a = {index - 1}\n-b = {index - 1}\n+a = {index}\n+b = {index}\n"
+            )
+            sequence.append(aggregateGenCodeDesc.RevisionCommitDiff(revision_id=f"r{index}", parsed_patch=parsed_patch, parent_revision_ids=[f"r{index - 1}"]))
+        revision_ids = [revision_diff.revision_id for revision_diff in sequence]
+        parent_map = {revision_diff.revision_id: revision_diff.parent_revision_ids or [] for revision_diff in sequence}
+        columns = PreviousGenRatioColumns("A", revision_ids, parent_map)
+        max_retained_columns = 0
+
+        def record(revision_diff, file_states) -> None:
+            nonlocal max_retained_columns
+            columns.record(revision_diff, file_states)
+            max_retained_columns = max(max_retained_columns, len(columns._base_columns_by_revision))
+
+        aggregateGenCodeDesc.replay_commit_diff_stream(sequence, revision_ids, parent_map, on_revision=record)
+
+        self.assertLessEqual(max_retained_columns, 2)
+        self.assertEqual(set(columns._base_columns_by_revision), {"r399"})
+        self.assertEqual(columns._states_by_revision, {})
+        self.assertEqual(columns.gen_ratio_before("r399", "src/a.py", 2), 0)
+        self.assertIsNone(columns.gen_ratio_before("r1", "src/a.py", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
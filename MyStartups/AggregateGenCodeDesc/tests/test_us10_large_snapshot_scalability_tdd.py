@@ -52,11 +52,21 @@ class TestUs10LargeSnapshotScalabilityTdd(unittest.TestCase):
         )
         provider = _ProviderStub()
         commit_show_calls: list[list[str]] = []
+        commit_log_calls: list[list[str]] = []
         index_build_inputs: list[dict] = []
 
-        def fake_run_git(repo_dir: Path, git_args: list[str]) -> str:
+        def fake_run_git(repo_dir: Path, git_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
             if git_args[:2] == ["rev-list", "-1"]:
                 return "end-revision"
+            if git_args[:2] == ["rev-list", "--count"]:
+                return "3"
+            if git_args[0] == "log":
+                commit_log_calls.append(git_args)
+                return (
+                    "end-revision\x1f2026-03-20T09:00:00+00:00\x1frev-b\x1fDev <dev@example.local>\n"
+                    "rev-b\x1f2026-03-10T09:00:00+00:00\x1frev-a\x1fDev <dev@example.local>\n"
+                    "rev-a\x1f2026-03-10T09:00:00+00:00\x1f\x1fDev <dev@example.local>"
+                )
             if git_args[:3] == ["show", "-s", "--format=%cI"]:
                 commit_show_calls.append(git_args)
                 return "2026-03-10T09:00:00+00:00"
@@ -98,7 +108,8 @@ class TestUs10LargeSnapshotScalabilityTdd(unittest.TestCase):
 
         self.assertEqual(provider.calls, ["rev-a", "rev-b"])
         self.assertEqual(len(index_build_inputs), 2)
-        self.assertEqual(len(commit_show_calls), 2)
+        self.assertEqual(len(commit_log_calls), 1)
+        self.assertEqual(commit_show_calls, [])
         self.assertEqual(
             result,
             {
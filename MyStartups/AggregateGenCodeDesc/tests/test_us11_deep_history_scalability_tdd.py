@@ -48,12 +48,21 @@ class TestUs11DeepHistoryScalabilityTdd(unittest.TestCase):
         )
         provider = _ProviderStub()
         commit_show_calls: list[list[str]] = []
+        commit_log_calls: list[list[str]] = []
 
-        def fake_run_git(repo_dir: Path, git_args: list[str]) -> str:
+        def fake_run_git(repo_dir: Path, git_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
             if git_args[:2] == ["rev-list", "-1"]:
                 return "end-revision"
+            if git_args[:2] == ["rev-list", "--count"]:
+                return "2"
             if git_args[:3] == ["ls-tree", "-r", "--name-only"]:
                 return "src/calc.py"
+            if git_args[0] == "log":
+                commit_log_calls.append(git_args)
+                return (
+                    "end-revision\x1f2026-03-20T09:00:00+00:00\x1frev-1\x1fDev <dev@example.local>\n"
+                    "rev-1\x1f2026-03-10T09:00:00+00:00\x1f\x1fDev <dev@example.local>"
+                )
             if git_args[:3] == ["show", "-s", "--format=%cI"]:
                 commit_show_calls.append(git_args)
                 return "2026-03-10T09:00:00+00:00"
@@ -83,7 +92,8 @@ class TestUs11DeepHistoryScalabilityTdd(unittest.TestCase):
         ):
             result = aggregateGenCodeDesc.build_result(args)
 
-        self.assertEqual(len(commit_show_calls), 1)
+        self.assertEqual(len(commit_log_calls), 1)
+        self.assertEqual(commit_show_calls, [])
         self.assertEqual(provider.calls, ["rev-1"])
         self.assertEqual(
             result,
@@ -52,13 +52,16 @@ class TestUs12SvnMergedBranchScalabilityTdd(unittest.TestCase):
         revision_log_calls: list[str] = []
         index_build_inputs: list[dict] = []
 
-        def fake_run_svn(svn_args: list[str]) -> str:
+        def fake_run_svn(svn_args: list[str], timeout: int = aggregateGenCodeDesc.COMMAND_TIMEOUT_SECONDS) -> str:
             if svn_args[:3] == ["log", "--xml", "-r"]:
                 revision_id = svn_args[3]
                 revision_log_calls.append(revision_id)
                 return (
                     '<?xml version="1.0" encoding="UTF-8"?>\n'
-                    f'<log><logentry revision="{revision_id}"><date>2026-03-10T09:00:00.000000Z</date></logentry></log>'
+                    '<log>'
+                    '<logentry revision="7"><author>dev</author><date>2026-03-10T09:00:00.000000Z</date></logentry>'
+                    '<logentry revision="5"><author>dev</author><date>2026-03-10T09:00:00.000000Z</date></logentry>'
+                    '</log>'
                 )
             raise AssertionError(f"Unexpected svn invocation: {svn_args}")
 
@@ -91,8 +94,7 @@ class TestUs12SvnMergedBranchScalabilityTdd(unittest.TestCase):
 
         self.assertEqual(provider.calls, ["5", "7"])
         self.assertEqual(len(index_build_inputs), 2)
-        self.assertEqual(revision_log_calls.count("5"), 1)
-        self.assertEqual(revision_log_calls.count("7"), 1)
+        self.assertEqual(revision_log_calls, ["end-revision:1"])
         self.assertEqual(
             result,
             {